@@ -0,0 +1,6 @@
+"""
+Generation engine benchmarks
+
+The suite lives in benchmarks.suite and is run by scripts/run_benchmarks.py.
+It is a development tool and is not imported by the API.
+"""
@@ -0,0 +1,546 @@
+"""
+Reproducible benchmarks for the generation engine.
+
+Micro-benchmarks time single hot calls (facility transitions, deterioration,
+treatment selection, serialization, demographics); macro scenarios run the
+job pipeline end to end for a patient count, temporal or legacy casualty
+generation, medical simulation on or off, and each output format.
+
+Everything runs in-process from an in-memory configuration that stands in
+for the configuration repository, as in the scenario sweep: no database,
+Redis or API server is needed. Every round is seeded, results are
+written as JSON, and ``compare_results`` flags throughput or peak-RSS
+regressions against a stored baseline.
+
+Usage:
+    suite = build_suite(groups=("micro", "macro"), sizes=(1000,))
+    report = run_suite(suite)
+    regressions = [c for c in compare_results(report, load_report("benchmarks/baseline.json")) if c.regressed]
+"""
+
+import asyncio
+import contextlib
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+import gc
+import io
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import psutil
+
+from patient_generator.reference_data import load_reference
+from patient_generator.schemas_config import ConfigurationTemplateDB
+
+logger = logging.getLogger(__name__)
+
+BENCHMARK_FORMAT_VERSION = 1
+DEFAULT_BASELINE_PATH = os.path.join("benchmarks", "baseline.json")
+DEFAULT_MACRO_SIZES = (1000,)
+MACRO_SIZES = (1000, 10000, 100000)
+OUTPUT_FORMATS = ("json", "csv", "xml")
+MAX_SLOWDOWN = 0.10  # fraction of baseline throughput that may be lost
+MAX_RSS_GROWTH = 0.10  # fraction of baseline peak RSS that may be added
+RSS_SAMPLE_INTERVAL = 0.005  # seconds between peak-RSS samples
+
+_BASE_DATE = datetime(2025, 1, 1, tzinfo=timezone.utc)
+_INJURY_MIX = {"Disease": 0.52, "Non-Battle Injury": 0.33, "Battle Injury": 0.15}
+_WAR_INJURY = "125670008"
+
+
+@dataclass
+class Benchmark:
+    """
+    One named benchmark.
+
+    ``setup`` runs untimed and returns the function timed in each round; each
+    round performs ``operations`` operations (calls or patients).
+    """
+
+    name: str
+    group: str
+    setup: Callable[[], Callable[[], Any]]
+    operations: int
+    rounds: int = 5
+    warmup: int = 1
+    params: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class BenchmarkResult:
+    """Timings and peak memory of one benchmark."""
+
+    name: str
+    group: str
+    operations: int
+    times: List[float]
+    peak_rss_bytes: int
+    params: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def median(self) -> float:
+        """Median seconds per round."""
+        return statistics.median(self.times)
+
+    @property
+    def ops_per_second(self) -> float:
+        """Operations per second at the median round time."""
+        return self.operations / self.median if self.median > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the result for a report."""
+        return {
+            "name": self.name,
+            "group": self.group,
+            "params": self.params,
+            "rounds": len(self.times),
+            "operations": self.operations,
+            "min": min(self.times),
+            "median": self.median,
+            "mean": statistics.fmean(self.times),
+            "stddev": statistics.stdev(self.times) if len(self.times) > 1 else 0.0,
+            "ops_per_second": self.ops_per_second,
+            "peak_rss_mb": self.peak_rss_bytes / 1024 / 1024,
+        }
+
+
+@dataclass
+class BenchmarkComparison:
+    """A benchmark measured against its baseline."""
+
+    name: str
+    ops_per_second: float
+    baseline_ops_per_second: Optional[float]
+    peak_rss_mb: float
+    baseline_peak_rss_mb: Optional[float]
+    reasons: List[str] = field(default_factory=list)
+
+    @property
+    def regressed(self) -> bool:
+        """Whether throughput or peak RSS is worse than the thresholds allow."""
+        return bool(self.reasons)
+
+    @property
+    def throughput_change(self) -> Optional[float]:
+        """Relative throughput change, e.g. -0.2 for 20% slower."""
+        if not self.baseline_ops_per_second:
+            return None
+        return self.ops_per_second / self.baseline_ops_per_second - 1
+
+
+class _PeakRSS:
+    """Samples process RSS on a background thread and keeps the maximum."""
+
+    def __init__(self, interval: float = RSS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.process = psutil.Process()
+        self.peak = self.process.memory_info().rss
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="benchmark-rss", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self.process.memory_info().rss)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.process.memory_info().rss)
+
+
+def _seed(seed: int):
+    random.seed(seed)
+    np.random.seed(seed)  # noqa: NPY002 - the simulator modules use the legacy global RNG
+
+
+def run_benchmark(benchmark: Benchmark, seed: int = 0) -> BenchmarkResult:
+    """
+    Run one benchmark: setup, warmup rounds, then seeded, timed rounds.
+
+    Args:
+        benchmark: Benchmark to run
+        seed: Seed applied before every round
+
+    Returns:
+        Round times and the peak RSS seen while the rounds ran
+    """
+    target = benchmark.setup()
+    for _ in range(benchmark.warmup):
+        _seed(seed)
+        target()
+
+    gc.collect()
+    times = []
+    with _PeakRSS() as rss:
+        for _ in range(benchmark.rounds):
+            _seed(seed)
+            start = time.perf_counter()
+            target()
+            times.append(time.perf_counter() - start)
+
+    return BenchmarkResult(
+        name=benchmark.name,
+        group=benchmark.group,
+        operations=benchmark.operations,
+        times=times,
+        peak_rss_bytes=rss.peak,
+        params=benchmark.params,
+    )
+
+
+# --- Stand-in configuration --------------------------------------------------
+
+
+def benchmark_configuration(total_patients: int) -> ConfigurationTemplateDB:
+    """In-memory configuration for benchmark runs; its id and timestamps are fixed so warm stacks are reused."""
+    return ConfigurationTemplateDB(
+        id="benchmark",
+        name="Benchmark",
+        description="In-memory configuration for benchmarks",
+        total_patients=total_patients,
+        injury_distribution=_INJURY_MIX,
+        front_configs=[],
+        facility_configs=[],
+        created_at=_BASE_DATE,
+        updated_at=_BASE_DATE,
+    )
+
+
+def _flow_simulator(total_patients: int):
+    from src.domain.services.pipeline_pool import get_pipeline_pool
+
+    _, simulator = get_pipeline_pool().checkout(benchmark_configuration(total_patients))
+    return simulator
+
+
+# --- Micro-benchmarks --------------------------------------------------------
+
+
+def _setup_get_next_facility(calls: int) -> Callable[[], Any]:
+    from patient_generator.facility_markov_chain import FacilityMarkovChain
+
+    chain = FacilityMarkovChain()
+    states = [("POI", "T1"), ("Role1", "T2"), ("Role2", "T1"), ("Role3", "T3")]
+    arguments = [states[i % len(states)] for i in range(calls)]
+
+    def target():
+        for facility, triage in arguments:
+            chain.get_next_facility(facility, triage)
+
+    return target
+
+
+def _setup_simulate_deterioration(calls: int) -> Callable[[], Any]:
+    from medical_simulation.patient_flow_orchestrator import PatientFlowOrchestrator
+
+    orchestrator = PatientFlowOrchestrator()
+    injuries = [("gunshot", "critical"), ("blast", "moderate"), ("burn", "minor")]
+    patient_ids = []
+    for i in range(calls):
+        injury_type, severity = injuries[i % len(injuries)]
+        patient_ids.append(orchestrator.initialize_patient(f"B{i}", injury_type, severity).id)
+    patients = [orchestrator.patients[patient_id] for patient_id in patient_ids]
+
+    def target():
+        for patient in patients:
+            patient.current_health = patient.initial_health
+        for patient_id in patient_ids:
+            orchestrator.simulate_deterioration(patient_id, 1)
+
+    return target
+
+
+def _setup_select_treatments(calls: int) -> Callable[[], Any]:
+    from patient_generator.treatment_utility_model import TreatmentUtilityModel
+
+    model = TreatmentUtilityModel()
+    cases = [("Severe", "POI"), ("Moderate", "Role1"), ("Severe", "Role2")]
+
+    def target():
+        for i in range(calls):
+            severity, facility = cases[i % len(cases)]
+            model.select_treatments(_WAR_INJURY, severity, facility, time_elapsed_minutes=i % 120)
+
+    return target
+
+
+def _setup_to_dict(calls: int) -> Callable[[], Any]:
+    simulator = _flow_simulator(calls)
+    _seed(0)
+    patients = []
+    for i in range(calls):
+        patient = simulator._create_initial_patient(i)
+        simulator._simulate_patient_flow_single(patient)
+        patients.append(patient)
+
+    def target():
+        for patient in patients:
+            patient.to_dict()
+
+    return target
+
+
+def _setup_generate_person(calls: int) -> Callable[[], Any]:
+    from patient_generator.demographics import DemographicsGenerator
+
+    generator = DemographicsGenerator()
+    nationalities = ["USA", "GBR", "DEU", "POL"]
+
+    def target():
+        for i in range(calls):
+            generator.generate_person(nationalities[i % len(nationalities)])
+
+    return target
+
+
+MICRO_BENCHMARKS: Tuple[Tuple[str, Callable[[int], Callable[[], Any]], int], ...] = (
+    ("micro.get_next_facility", _setup_get_next_facility, 10000),
+    ("micro.simulate_deterioration", _setup_simulate_deterioration, 2000),
+    ("micro.select_treatments", _setup_select_treatments, 2000),
+    ("micro.to_dict", _setup_to_dict, 200),
+    ("micro.generate_person", _setup_generate_person, 5000),
+)
+
+
+# --- Macro scenarios ---------------------------------------------------------
+
+
+def _generation_service_class():
+    from src.domain.services.cached_demographics_service import CachedDemographicsService
+    from src.domain.services.cached_medical_service import CachedMedicalService
+    from src.domain.services.patient_generation_service import AsyncPatientGenerationService
+
+    class BenchmarkGenerationService(AsyncPatientGenerationService):
+        """Generation service with the scenario switches applied to each job's simulator."""
+
+        def __init__(self, temporal: bool, medical_simulation: bool):
+            # The configuration is passed in memory, so no database is opened
+            self.pipeline = None
+            self.config_manager = None
+            self.db = None
+            self.cached_demographics = CachedDemographicsService()
+            self.cached_medical = CachedMedicalService()
+            self.temporal = temporal
+            self.medical_simulation = medical_simulation
+
+        def _initialize_pipeline(self, config: ConfigurationTemplateDB):
+            super()._initialize_pipeline(config)
+            simulator = self.pipeline.flow_simulator
+            simulator.use_medical_simulation = self.medical_simulation
+            if not self.temporal:
+                # Without warfare types the simulator falls back to legacy generation
+                legacy = {k: v for k, v in load_reference("injuries.json").items() if k != "warfare_types"}
+                simulator._load_injuries_config = lambda: legacy
+
+    return BenchmarkGenerationService
+
+
+def _setup_macro(total_patients: int, temporal: bool, medical_simulation: bool, output_format: str):
+    from src.domain.services.patient_generation_service import GenerationContext
+
+    service_class = _generation_service_class()
+    config = benchmark_configuration(total_patients)
+
+    def target():
+        with tempfile.TemporaryDirectory() as output_dir, contextlib.redirect_stdout(io.StringIO()):
+            context = GenerationContext(
+                config=config, job_id="benchmark", output_directory=output_dir, output_formats=[output_format]
+            )
+            asyncio.run(service_class(temporal, medical_simulation).generate_patients(context))
+
+    return target
+
+
+def macro_scenarios(total_patients: int) -> List[Dict[str, Any]]:
+    """
+    Scenarios run for one patient count.
+
+    The reference scenario is temporal generation with medical simulation,
+    written as JSON; each other scenario changes one of those switches.
+    """
+    reference = {"temporal": True, "medical_simulation": True, "output_format": "json"}
+    variants = [{}, {"temporal": False}, {"medical_simulation": False}]
+    variants += [{"output_format": output_format} for output_format in OUTPUT_FORMATS if output_format != "json"]
+    return [{"total_patients": total_patients, **reference, **variant} for variant in variants]
+
+
+def _macro_name(scenario: Dict[str, Any]) -> str:
+    generation = "temporal" if scenario["temporal"] else "legacy"
+    medical = "medsim" if scenario["medical_simulation"] else "nomedsim"
+    return f"macro.{scenario['total_patients']}.{generation}.{medical}.{scenario['output_format']}"
+
+
+def build_suite(
+    groups: Iterable[str] = ("micro", "macro"),
+    sizes: Iterable[int] = DEFAULT_MACRO_SIZES,
+    name_filter: Optional[str] = None,
+    rounds: Optional[int] = None,
+) -> List[Benchmark]:
+    """
+    Build the benchmarks to run.
+
+    Args:
+        groups: "micro" and/or "macro"
+        sizes: Patient counts for macro scenarios
+        name_filter: Keep only benchmarks whose name contains this text
+        rounds: Override the number of timed rounds
+
+    Returns:
+        Benchmarks in run order
+    """
+    groups = set(groups)
+    suite: List[Benchmark] = []
+
+    if "micro" in groups:
+        for name, setup, calls in MICRO_BENCHMARKS:
+            suite.append(Benchmark(name, "micro", lambda s=setup, c=calls: s(c), calls, params={"calls": calls}))
+
+    if "macro" in groups:
+        for size in sizes:
+            for scenario in macro_scenarios(size):
+                suite.append(
+                    Benchmark(
+                        _macro_name(scenario),
+                        "macro",
+                        lambda s=scenario: _setup_macro(**s),
+                        size,
+                        # No warmup: the median of three rounds discards the one that builds the stack,
+                        # and larger runs are timed once
+                        rounds=3 if size <= 1000 else 1,
+                        warmup=0,
+                        params=scenario,
+                    )
+                )
+
+    if name_filter:
+        suite = [benchmark for benchmark in suite if name_filter in benchmark.name]
+    if rounds is not None:
+        for benchmark in suite:
+            benchmark.rounds = rounds
+    return suite
+
+
+def run_suite(
+    suite: List[Benchmark], seed: int = 0, progress_callback: Optional[Callable[[BenchmarkResult], None]] = None
+) -> Dict[str, Any]:
+    """
+    Run benchmarks in order and build a machine-readable report.
+
+    Args:
+        suite: Benchmarks from build_suite()
+        seed: Seed applied before every round
+        progress_callback: Called with each finished result
+
+    Returns:
+        Report with environment details and one entry per benchmark
+    """
+    results = []
+    for benchmark in suite:
+        logger.info("Running benchmark %s", benchmark.name)
+        result = run_benchmark(benchmark, seed)
+        results.append(result.to_dict())
+        if progress_callback:
+            progress_callback(result)
+
+    return {
+        "version": BENCHMARK_FORMAT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "seed": seed,
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+        },
+        "benchmarks": results,
+    }
+
+
+def compare_results(
+    report: Dict[str, Any],
+    baseline: Dict[str, Any],
+    max_slowdown: float = MAX_SLOWDOWN,
+    max_rss_growth: float = MAX_RSS_GROWTH,
+) -> List[BenchmarkComparison]:
+    """
+    Compare a report against a baseline report.
+
+    Benchmarks missing from the baseline are listed without regressions.
+
+    Args:
+        report: Current report from run_suite()
+        baseline: Stored baseline report
+        max_slowdown: Allowed relative throughput loss
+        max_rss_growth: Allowed relative peak-RSS growth
+
+    Returns:
+        One comparison per benchmark in the current report
+    """
+    baseline_by_name = {entry["name"]: entry for entry in baseline.get("benchmarks", [])}
+    comparisons = []
+    for entry in report["benchmarks"]:
+        previous = baseline_by_name.get(entry["name"])
+        comparison = BenchmarkComparison(
+            name=entry["name"],
+            ops_per_second=entry["ops_per_second"],
+            baseline_ops_per_second=previous["ops_per_second"] if previous else None,
+            peak_rss_mb=entry["peak_rss_mb"],
+            baseline_peak_rss_mb=previous["peak_rss_mb"] if previous else None,
+        )
+        if previous:
+            if entry["ops_per_second"] < previous["ops_per_second"] * (1 - max_slowdown):
+                comparison.reasons.append(f"throughput {comparison.throughput_change:+.1%}")
+            if entry["peak_rss_mb"] > previous["peak_rss_mb"] * (1 + max_rss_growth):
+                comparison.reasons.append(f"peak RSS {entry['peak_rss_mb'] / previous['peak_rss_mb'] - 1:+.1%}")
+        comparisons.append(comparison)
+    return comparisons
+
+
+def format_comparison(comparisons: List[BenchmarkComparison]) -> str:
+    """Render comparisons as a fixed-width table."""
+    lines = [f"{'benchmark':<44} {'ops/s':>12} {'baseline':>12} {'change':>8} {'peak MB':>9}  status"]
+    for comparison in comparisons:
+        baseline = "-"
+        change = "-"
+        status = "new"
+        if comparison.baseline_ops_per_second is not None:
+            baseline = f"{comparison.baseline_ops_per_second:.1f}"
+            change = f"{comparison.throughput_change:+.1%}"
+            status = f"REGRESSED ({', '.join(comparison.reasons)})" if comparison.regressed else "ok"
+        lines.append(
+            f"{comparison.name:<44} {comparison.ops_per_second:>12.1f} {baseline:>12} {change:>8} "
+            f"{comparison.peak_rss_mb:>9.1f}  {status}"
+        )
+    return "\n".join(lines)
+
+
+def save_report(report: Dict[str, Any], path: str):
+    """Write a report or baseline as JSON."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+def load_report(path: str) -> Dict[str, Any]:
+    """Read a report or baseline written by save_report()."""
+    with open(path) as f:
+        report = json.load(f)
+    if report.get("version") != BENCHMARK_FORMAT_VERSION:
+        msg = f"Unsupported benchmark report version in {path}: {report.get('version')}"
+        raise ValueError(msg)
+    return report
@@ -35,6 +35,13 @@ class Settings:
     MAX_PATIENTS_PER_JOB: int = int(os.getenv("MAX_PATIENTS_PER_JOB", "10000"))
     JOB_TIMEOUT_SECONDS: int = int(os.getenv("JOB_TIMEOUT_SECONDS", "3600"))
 
+    # Rate Limiting
+    # Per-API-key request and patient quotas (Redis-backed, shared across replicas)
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "True").lower() in ("true", "1", "yes")
+
+    # Import the simulation stack in the background at startup instead of on the first generation request
+    PREWARM_GENERATION_STACK: bool = os.getenv("PREWARM_GENERATION_STACK", "False").lower() in ("true", "1", "yes")
+
     # Encryption
     DEFAULT_ENCRYPTION_PASSWORD: Optional[str] = os.getenv("DEFAULT_ENCRYPTION_PASSWORD")
 
@@ -3,8 +3,25 @@ Deterioration Calculator for Medical Simulation
 Calculates patient health deterioration based on injuries and conditions
 """
 
-import json
-from typing import Dict, List, Optional
+from itertools import permutations
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from patient_generator.reference_data import load_reference
+
+# Key of the precomputed rate table: (injury_type, severity, triage_category, hemorrhage, environment_mask)
+RateKey = Tuple[str, str, Optional[str], bool, int]
+RateTables = Tuple[Dict[Tuple[str, str, bool], float], Dict[RateKey, float], Dict[Tuple[Tuple[str, str], ...], float]]
+
+# Profiles outside the deterioration model memoized per table, on top of the precomputed ones
+MAX_DERIVED_PROFILES = 1024
+
+# Rate tables are built once per injuries config and shared by every calculator
+# (one is created per simulated patient). An entry is reused while the reference
+# registry hands out the same parsed config, i.e. until the file changes on disk.
+_shared_tables: Dict[str, Tuple[Any, RateTables, int]] = {}
+_shared_tables_lock = threading.Lock()
 
 
 class DeteriorationCalculator:
@@ -15,8 +32,8 @@ class DeteriorationCalculator:
 
     def __init__(self, injuries_config_path: str = "patient_generator/injuries.json"):
         """Initialize with injuries configuration"""
-        with open(injuries_config_path) as f:
-            self.config = json.load(f)
+        path = os.path.abspath(injuries_config_path)
+        self.config = load_reference(path)
         self.deterioration_model = self.config.get("deterioration_model", {})
         self.environmental_modifiers = self.config.get("environmental_modifiers", {})
 
@@ -28,6 +45,126 @@ class DeteriorationCalculator:
             "T4": 0.5,  # Expectant patients deteriorate slower (already dying)
         }
 
+        # Environmental conditions are addressed by bit position in an environment mask
+        self.environment_bits = {condition: 1 << bit for bit, condition in enumerate(self.environmental_modifiers)}
+
+        tables, self._rate_table_limit = self._shared_rate_tables(path)
+        self._base_rates, self._rate_table, self._compound_rates = tables
+
+    def _shared_rate_tables(self, path: str) -> Tuple[RateTables, int]:
+        """Rate tables for this config version, built by the first calculator that needs them"""
+        with _shared_tables_lock:
+            cached = _shared_tables.get(path)
+            if cached is not None and cached[0] is self.config:
+                return cached[1], cached[2]
+            self._base_rates, self._rate_table, self._compound_rates = {}, {}, {}
+            self._build_rate_tables()
+            tables = (self._base_rates, self._rate_table, self._compound_rates)
+            limit = len(self._rate_table) + MAX_DERIVED_PROFILES
+            _shared_tables[path] = (self.config, tables, limit)
+            return tables, limit
+
+    def _build_rate_tables(self):
+        """
+        Precompute deterioration rates for every known profile.
+
+        Covers each (injury_type, severity) in the deterioration model, with and
+        without hemorrhage, for every triage category and every combination of
+        environmental conditions, plus compound rates for single and paired
+        injuries. Values are derived with the same methods used on the slow
+        path so table lookups and direct calculation agree exactly.
+        """
+        hemorrhage_marker = [{"condition": "hemorrhage"}]
+        profiles = [
+            (injury_type, severity)
+            for injury_type, severities in self.deterioration_model.items()
+            for severity in severities
+        ]
+
+        for injury_type, severity in profiles:
+            for hemorrhage in (False, True):
+                self._base_rates[(injury_type, severity, hemorrhage)] = self.calculate_base_deterioration(
+                    injury_type, severity, hemorrhage_marker if hemorrhage else None
+                )
+
+        triage_categories = [*self.triage_multipliers, None]
+        environment_masks = range(1 << len(self.environment_bits))
+        for injury_type, severity in profiles:
+            for hemorrhage in (False, True):
+                for triage_category in triage_categories:
+                    for environment_mask in environment_masks:
+                        key = (injury_type, severity, triage_category, hemorrhage, environment_mask)
+                        self._rate_table[key] = self._derive_rate(*key)
+
+        for combo_size in (1, 2):
+            for combo in permutations(profiles, combo_size):
+                self._compound_rates[combo] = self._derive_compound(combo)
+
+    def _derive_rate(
+        self,
+        injury_type: str,
+        severity: str,
+        triage_category: Optional[str],
+        hemorrhage: bool,
+        environment_mask: int,
+    ) -> float:
+        """Compute a full deterioration rate without consulting the tables"""
+        base_key = (injury_type, severity, hemorrhage)
+        base_rate = self._base_rates.get(base_key)
+        if base_rate is None:
+            base_rate = self.calculate_base_deterioration(
+                injury_type, severity, [{"condition": "hemorrhage"}] if hemorrhage else None
+            )
+        rate = self.apply_triage_multiplier(base_rate, triage_category)
+        conditions = [condition for condition, bit in self.environment_bits.items() if environment_mask & bit]
+        return self.apply_environmental_factors(rate, conditions)
+
+    def environment_mask(self, conditions: Iterable[str]) -> int:
+        """
+        Convert environmental conditions to the bit mask used by the rate table.
+
+        Unknown conditions are ignored, matching apply_environmental_factors.
+        Compute this once per scenario or patient, not per deterioration step.
+        """
+        mask = 0
+        for condition in conditions:
+            mask |= self.environment_bits.get(condition, 0)
+        return mask
+
+    def get_deterioration_rate(
+        self,
+        injury_type: str,
+        severity: str,
+        triage_category: Optional[str] = None,
+        hemorrhage: bool = False,
+        environment_mask: int = 0,
+    ) -> float:
+        """
+        Look up the deterioration rate for a patient profile.
+
+        Equivalent to calculate_base_deterioration followed by
+        apply_triage_multiplier and apply_environmental_factors, but answered
+        with a single table index. Profiles outside the precomputed table are
+        derived and memoized, up to MAX_DERIVED_PROFILES of them.
+
+        Args:
+            injury_type: "Battle Injury", "Non-Battle Injury", or "Disease"
+            severity: Injury severity level
+            triage_category: Patient's triage category (T1-T4)
+            hemorrhage: Whether the hemorrhage multiplier applies
+            environment_mask: Mask from environment_mask()
+
+        Returns:
+            Deterioration rate per hour
+        """
+        key = (injury_type, severity, triage_category, hemorrhage, environment_mask)
+        rate = self._rate_table.get(key)
+        if rate is None:
+            rate = self._derive_rate(*key)
+            if len(self._rate_table) < self._rate_table_limit:
+                self._rate_table[key] = rate
+        return rate
+
     def calculate_base_deterioration(
         self, injury_type: str, severity: str, injuries: Optional[List[Dict]] = None
     ) -> float:
@@ -42,6 +179,11 @@ class DeteriorationCalculator:
         Returns:
             Base deterioration rate per hour (0-100 scale)
         """
+        if not injuries:
+            cached = self._base_rates.get((injury_type, severity, False))
+            if cached is not None:
+                return cached
+
         # Get base rate from model
         if injury_type not in self.deterioration_model:
             return 5.0  # Default mild deterioration
@@ -122,13 +264,19 @@ class DeteriorationCalculator:
         if not injuries:
             return 0.0
 
+        combo = tuple((injury.get("type", "Battle Injury"), injury.get("severity", "Moderate")) for injury in injuries)
+        cached = self._compound_rates.get(combo)
+        if cached is not None:
+            return cached
+        return self._derive_compound(combo)
+
+    def _derive_compound(self, combo: Tuple[Tuple[str, str], ...]) -> float:
+        """Combine per-injury base rates into a compound deterioration rate"""
         # Find the most severe injury as primary driver
         primary_rate = 0.0
         secondary_sum = 0.0
 
-        for injury in injuries:
-            injury_type = injury.get("type", "Battle Injury")
-            severity = injury.get("severity", "Moderate")
+        for injury_type, severity in combo:
             rate = self.calculate_base_deterioration(injury_type, severity)
 
             if rate > primary_rate:
@@ -63,6 +63,7 @@ class Patient:
     destination: Optional[str] = None
     transport_id: Optional[str] = None
     treatments_received: List[Dict] = None
+    applied_treatment_mask: int = 0  # Treatment catalog bitmask of treatments_received
     timeline: List[Dict] = None
     died_at: Optional[datetime] = None
     discharged_at: Optional[datetime] = None
@@ -397,6 +398,7 @@ class PatientFlowOrchestrator:
         # Update patient
         patient.current_health = new_health
         patient.treatments_received.extend(treatments)
+        patient.applied_treatment_mask |= self.treatment_mods.catalog.applied_mask(treatments)
 
         # Check for death
         if new_health <= 0:
@@ -435,28 +437,19 @@ class PatientFlowOrchestrator:
         if patient.state in [PatientState.DIED, PatientState.DISCHARGED]:
             return patient.current_health if patient.state == PatientState.DISCHARGED else 0
 
-        # Calculate deterioration based on original severity
-        base_deterioration = self.deterioration_calc.calculate_base_deterioration(
+        # Deterioration from original severity with the triage multiplier applied
+        # (T1 patients deteriorate faster); precomputed table lookup
+        base_deterioration = self.deterioration_calc.get_deterioration_rate(
             patient.injury_type,
             patient.severity,  # Use stored severity, not recalculated
-        )
-
-        # Apply triage-based deterioration multiplier (T1 patients deteriorate faster)
-        base_deterioration = self.deterioration_calc.apply_triage_multiplier(
-            base_deterioration, patient.triage_category
+            patient.triage_category,
         )
 
         # Apply treatment-based deterioration modifiers
         # Get the best (lowest) deterioration modifier from all treatments
-        treatment_deterioration_modifier = 1.0
-        if patient.treatments_received:
-            for treatment in patient.treatments_received:
-                treatment_name = treatment.get("name") or treatment.get("treatment")
-                if treatment_name and treatment_name in self.treatment_mods.treatments:
-                    treatment_def = self.treatment_mods.treatments[treatment_name]
-                    modifier = treatment_def.get("deterioration_modifier", 1.0)
-                    # Use the best (lowest) modifier
-                    treatment_deterioration_modifier = min(treatment_deterioration_modifier, modifier)
+        treatment_deterioration_modifier = self.treatment_mods.best_deterioration_modifier(
+            patient.applied_treatment_mask
+        )
 
         # Apply the treatment modifier to base deterioration
         # E.g., tourniquet reduces deterioration by 70% (modifier = 0.3)
@@ -737,6 +730,8 @@ class PatientFlowOrchestrator:
         # Update metrics
         self.metrics["patients_died"] += 1
 
+        self.end_diagnostic_session(patient_id)
+
         # Free up facility bed if applicable
         if patient.current_location in ["Role1", "Role2", "Role3", "CSU"]:
             self.facility_manager.discharge_patient(patient_id, patient.current_location)
@@ -772,10 +767,25 @@ class PatientFlowOrchestrator:
             self.metrics["patients_discharged"] = 0
         self.metrics["patients_discharged"] += 1
 
+        self.end_diagnostic_session(patient_id)
+
         # Free up facility bed if applicable
         if patient.current_location in ["Role1", "Role2", "Role3", "CSU"]:
             self.facility_manager.discharge_patient(patient_id, patient.current_location)
 
+    def end_diagnostic_session(self, patient_id: str):
+        """
+        Release the patient's diagnostic engine state.
+
+        Called on death and discharge, and by callers once a patient leaves the
+        simulation. Diagnoses already recorded on the patient are kept.
+
+        Args:
+            patient_id: Patient identifier
+        """
+        if self.diagnostic_engine:
+            self.diagnostic_engine.release_session(patient_id)
+
     def get_system_status(self) -> Dict[str, Any]:
         """
         Get comprehensive system status.
@@ -5,6 +5,8 @@ Models the effects of medical interventions on patient health
 
 from typing import Dict, List, Optional, Tuple
 
+from patient_generator.treatment_catalog import get_treatment_catalog
+
 
 class TreatmentModifiers:
     """
@@ -17,6 +19,16 @@ class TreatmentModifiers:
         self.treatments = self._define_treatments()
         self.facility_capabilities = self._define_facility_capabilities()
 
+        # Integer IDs and bitmasks for the per-hop hot path
+        self.catalog = get_treatment_catalog()
+        self.facility_capability_masks = {
+            facility: self.catalog.mask_of(treatments) for facility, treatments in self.facility_capabilities.items()
+        }
+        self._deterioration_modifiers = {
+            self.catalog.intern(name): treatment["deterioration_modifier"] for name, treatment in self.treatments.items()
+        }
+        self._best_modifier_by_mask: Dict[int, float] = {0: 1.0}
+
     def _define_treatments(self) -> Dict[str, Dict]:
         """Define available treatments and their effects"""
         return {
@@ -207,6 +219,26 @@ class TreatmentModifiers:
 
         return base_treatments
 
+    def best_deterioration_modifier(self, applied_mask: int) -> float:
+        """
+        Get the best (lowest) deterioration modifier among applied treatments.
+
+        Args:
+            applied_mask: Catalog bitmask of treatments the patient has received
+
+        Returns:
+            Lowest deterioration modifier, 1.0 if no known treatment applies
+        """
+        modifier = self._best_modifier_by_mask.get(applied_mask)
+        if modifier is None:
+            modifier = min(
+                (value for treatment_id, value in self._deterioration_modifiers.items() if applied_mask >> treatment_id & 1),
+                default=1.0,
+            )
+            modifier = min(1.0, modifier)
+            self._best_modifier_by_mask[applied_mask] = modifier
+        return modifier
+
     def apply_treatment(
         self, treatment_name: str, current_health: int, current_deterioration: float
     ) -> Tuple[int, float, Dict]:
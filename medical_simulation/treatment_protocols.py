@@ -5,7 +5,14 @@ Maps SNOMED injury codes to appropriate treatment protocols based on military me
 
 from dataclasses import dataclass
 from enum import Enum
-from typing import Dict, List, Optional, Set
+from typing import Dict, List, Optional, Set, Tuple
+
+from patient_generator.treatment_catalog import get_treatment_catalog
+
+# Selections depend only on the protocols defined below and the selection
+# inputs, so all managers (the bridge creates one per patient) share them
+MAX_CACHED_SELECTIONS = 4096
+_selection_cache: Dict[Tuple, Tuple[str, ...]] = {}
 
 
 class TreatmentCategory(Enum):
@@ -53,6 +60,12 @@ class TreatmentProtocolManager:
         self.protocols = self._initialize_protocols()
         self.treatment_by_category = self._map_treatments_by_category()
 
+        # Contraindications as treatment catalog bitmasks, keyed by SNOMED code
+        self.catalog = get_treatment_catalog()
+        self.contraindication_masks = {
+            code: self.catalog.mask_of(protocol.contraindicated_treatments) for code, protocol in self.protocols.items()
+        }
+
     def _initialize_protocols(self) -> Dict[str, TreatmentProtocol]:
         """Initialize all treatment protocols based on SNOMED codes."""
         protocols = {}
@@ -436,6 +449,26 @@ class TreatmentProtocolManager:
             List of appropriate treatment names
         """
         protocol = self.get_protocol(snomed_code)
+        within_window = protocol is not None and time_elapsed_minutes <= protocol.critical_time_window_minutes
+        cache_key = (snomed_code, facility, severity in ["severe", "critical"], body_part, within_window)
+        cached = _selection_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+
+        treatments = self._select_treatments(protocol, facility, severity, body_part, within_window)
+        if len(_selection_cache) < MAX_CACHED_SELECTIONS:
+            _selection_cache[cache_key] = tuple(treatments)
+        return treatments
+
+    def _select_treatments(
+        self,
+        protocol: Optional[TreatmentProtocol],
+        facility: FacilityLevel,
+        severity: str,
+        body_part: Optional[str],
+        within_window: bool,
+    ) -> List[str]:
+        """Build the treatment list for get_appropriate_treatments."""
         if not protocol:
             # Fallback to generic trauma protocol
             return self._get_generic_treatments(facility, severity, body_part)
@@ -451,14 +484,16 @@ class TreatmentProtocolManager:
             treatments.extend(protocol.secondary_treatments[facility])
 
         # Filter out contraindicated treatments
-        treatments = [t for t in treatments if t not in protocol.contraindicated_treatments]
+        contraindicated = self.contraindication_masks.get(protocol.snomed_code, 0)
+        if contraindicated:
+            treatments = [t for t in treatments if not self.catalog.bit_of(t) & contraindicated]
 
         # Filter based on body part constraints
         if body_part:
             treatments = [t for t in treatments if self._validate_treatment_for_body_part(t, body_part)]
 
         # Prioritize based on critical time window
-        if time_elapsed_minutes <= protocol.critical_time_window_minutes:
+        if within_window:
             # Within critical window - prioritize life-saving interventions
             treatments = self._prioritize_critical_treatments(treatments)
 
@@ -568,14 +603,9 @@ class TreatmentProtocolManager:
             return True  # Allow if no protocol defined
 
         # Check for contraindicated treatments
-        for treatment in treatments:
-            if treatment in protocol.contraindicated_treatments:
-                return False
-
         # Additional validation rules can be added here
         # For example, checking for incompatible treatment combinations
-
-        return True
+        return not self.catalog.known_mask_of(treatments) & self.contraindication_masks.get(snomed_code, 0)
 
     def get_treatment_sequence(
         self, snomed_code: str, facilities_visited: List[FacilityLevel]
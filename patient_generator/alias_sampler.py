@@ -0,0 +1,176 @@
+"""
+Alias Sampler
+Walker/Vose alias tables for O(1) weighted draws during patient generation
+"""
+
+from collections import OrderedDict
+import random
+import threading
+from typing import Any, Dict, Hashable, List, Optional, Sequence
+
+import numpy as np
+
+DEFAULT_CACHE_SIZE = 1024
+
+
+class AliasSampler:
+    """
+    Weighted sampler backed by a Vose alias table.
+
+    Construction is O(n); each draw afterwards costs one uniform variate and
+    one comparison regardless of the number of outcomes. Items with zero or
+    negative weight are dropped, matching how the generator has always
+    treated them.
+    """
+
+    def __init__(self, items: Sequence[Any], weights: Sequence[float]):
+        if len(items) != len(weights):
+            msg = f"Got {len(items)} items but {len(weights)} weights"
+            raise ValueError(msg)
+
+        pairs = [(item, float(weight)) for item, weight in zip(items, weights) if weight > 0]
+        self.items: List[Any] = [item for item, _ in pairs]
+        self._prob: List[float] = []
+        self._alias: List[int] = []
+        if pairs:
+            self._build([weight for _, weight in pairs])
+
+        self._prob_array = np.asarray(self._prob, dtype=float)
+        self._alias_array = np.asarray(self._alias, dtype=np.intp)
+        self._item_array: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_dict(cls, weights: Dict[Any, float]) -> "AliasSampler":
+        """Build a sampler from an item -> weight mapping"""
+        return cls(list(weights.keys()), list(weights.values()))
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __bool__(self) -> bool:
+        return bool(self.items)
+
+    def _build(self, weights: List[float]):
+        n = len(weights)
+        total = sum(weights)
+        scaled = [weight * n / total for weight in weights]
+        prob = [0.0] * n
+        alias = list(range(n))
+
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            prob[less] = scaled[less]
+            alias[less] = more
+            scaled[more] = scaled[more] + scaled[less] - 1.0
+            (small if scaled[more] < 1.0 else large).append(more)
+
+        # Whatever is left is 1.0 up to rounding error
+        for i in large + small:
+            prob[i] = 1.0
+
+        self._prob = prob
+        self._alias = alias
+
+    def sample(self) -> Any:
+        """
+        Draw one item using the stdlib ``random`` generator.
+
+        Returns:
+            The selected item, or None if the sampler has no positive weights
+        """
+        n = len(self.items)
+        if not n:
+            return None
+        u = random.random() * n
+        column = int(u)
+        if u - column < self._prob[column]:
+            return self.items[column]
+        return self.items[self._alias[column]]
+
+    def draw_indices(self, n: int) -> np.ndarray:
+        """Draw ``n`` item indices as a NumPy array using the global NumPy generator"""
+        if not self.items:
+            msg = "Cannot draw from a sampler with no positive weights"
+            raise ValueError(msg)
+        columns = np.random.randint(0, len(self.items), size=n)  # noqa: NPY002
+        accept = np.random.random(n) < self._prob_array[columns]  # noqa: NPY002
+        return np.where(accept, columns, self._alias_array[columns])
+
+    def draw(self, n: int) -> np.ndarray:
+        """Draw ``n`` items as a NumPy array"""
+        if self._item_array is None:
+            self._item_array = np.asarray(self.items)
+        return self._item_array[self.draw_indices(n)]
+
+
+class SamplerCache:
+    """
+    Bounded LRU cache of alias samplers.
+
+    Samplers are keyed by a caller-supplied version (typically the active
+    configuration's id and version) together with the distribution contents,
+    so a distribution rebuilt every call still hits the same table and a
+    configuration change never reuses stale ones.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._samplers: OrderedDict[Hashable, AliasSampler] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._samplers)
+
+    def get(self, weights: Dict[Any, float], version: Hashable = None) -> AliasSampler:
+        """
+        Return the sampler for a weight mapping, building it on first use.
+
+        Args:
+            weights: Item -> weight mapping
+            version: Configuration version the distribution belongs to
+
+        Returns:
+            Cached AliasSampler for the distribution
+        """
+        key = (version, tuple(weights.items()))
+        with self._lock:
+            sampler = self._samplers.get(key)
+            if sampler is not None:
+                self._samplers.move_to_end(key)
+                self.hits += 1
+                return sampler
+
+        sampler = AliasSampler.from_dict(weights)
+        with self._lock:
+            self.misses += 1
+            self._samplers[key] = sampler
+            while len(self._samplers) > self.maxsize:
+                self._samplers.popitem(last=False)
+        return sampler
+
+    def invalidate(self, version: Hashable = None):
+        """Drop samplers for one version, or every sampler if no version is given"""
+        with self._lock:
+            if version is None:
+                self._samplers.clear()
+                return
+            for key in [key for key in self._samplers if key[0] == version]:
+                del self._samplers[key]
+
+
+_sampler_cache = SamplerCache()
+
+
+def get_sampler_cache() -> SamplerCache:
+    """Return the process-wide sampler cache"""
+    return _sampler_cache
+
+
+def get_sampler(weights: Dict[Any, float], version: Hashable = None) -> AliasSampler:
+    """Return a cached alias sampler for a weight mapping"""
+    return _sampler_cache.get(weights, version)
@@ -22,6 +22,7 @@ try:
     from .flow_simulator import PatientFlowSimulator
     from .formatter import OutputFormatter
     from .medical import MedicalConditionGenerator
+    from .memory_budget import MemoryBudgetController
     from .nationality_data import NationalityDataProvider  # New import
 except ImportError:
     from patient_generator.config_manager import ConfigurationManager
@@ -29,6 +30,7 @@ except ImportError:
     from patient_generator.flow_simulator import PatientFlowSimulator
     from patient_generator.formatter import OutputFormatter
     from patient_generator.medical import MedicalConditionGenerator
+    from patient_generator.memory_budget import MemoryBudgetController
     from patient_generator.nationality_data import NationalityDataProvider
 
 
@@ -57,6 +59,7 @@ class PatientGeneratorApp:
         # Performance settings (can be overridden by env vars or future config options)
         # For now, keep determination logic, but it could also be part of ConfigurationTemplate
         self.num_workers: int = self._determine_worker_count()
+        self.memory_budget = MemoryBudgetController(budget_bytes=self._determine_memory_budget())
         self.batch_size: int = self._determine_batch_size()  # Depends on total_patients
 
         # Shared generators
@@ -104,22 +107,15 @@ class PatientGeneratorApp:
         except Exception:
             return 4
 
-    def _determine_batch_size(self) -> int:
-        # TODO: Potentially make this part of ConfigurationTemplate
+    def _determine_memory_budget(self) -> Optional[int]:
+        # Standalone runs may set their own limit; otherwise the job memory limit applies
         env_max_memory = os.environ.get("PATIENT_GENERATOR_MAX_MEMORY")
-        max_memory_mb = int(env_max_memory) if env_max_memory and env_max_memory.isdigit() else None
+        return int(env_max_memory) * 1024 * 1024 if env_max_memory and env_max_memory.isdigit() else None
 
-        try:
-            available_memory = (
-                (max_memory_mb * 1024 * 1024) if max_memory_mb else (psutil.virtual_memory().available * 0.5)
-            )
-        except Exception:
-            available_memory = 1024 * 1024 * 1024  # 1GB default
-
-        estimated_memory_per_patient = 50 * 1024  # 50KB
-        memory_based_batch_size = int(available_memory / estimated_memory_per_patient)
+    def _determine_batch_size(self) -> int:
+        # Bytes per patient are measured once the casualty flow has been generated
         worker_adjusted_size = max(50, int(self.total_patients / (self.num_workers * 2)))
-        return min(memory_based_batch_size, worker_adjusted_size, 500)  # Cap at 500
+        return self.memory_budget.batch_size(limit=worker_adjusted_size)
 
     # _default_config method is removed as config comes from ConfigurationManager
 
@@ -279,7 +275,10 @@ class PatientGeneratorApp:
         current_phase_idx = 1  # Generating Patient Flow
         self._start_new_phase()
         self._update_progress(progress_callback, current_phase_idx, 0, phases)
-        patients = self.flow_simulator.generate_casualty_flow()  # Uses total_patients from config
+        with self.memory_budget.running():
+            checkpoint = self.memory_budget.checkpoint()
+            patients = self.flow_simulator.generate_casualty_flow()  # Uses total_patients from config
+            self.memory_budget.observe_since(len(patients), checkpoint)
         self._update_progress(progress_callback, current_phase_idx, 100, phases)
 
         # Subsequent phases (Demographics, Medical, FHIR, Output)
@@ -288,6 +287,9 @@ class PatientGeneratorApp:
             self._start_new_phase()
             self._update_progress(progress_callback, current_phase_idx, 0, phases, {"processed_patients": 0})
             processed_count = 0
+            # Re-size from the measured cost per patient, waiting first if memory is short
+            self.memory_budget.throttle_sync()
+            self.batch_size = self._determine_batch_size()
             with concurrent.futures.ThreadPoolExecutor(max_workers=self.num_workers) as executor:
                 patient_batches = [patients[j : j + self.batch_size] for j in range(0, len(patients), self.batch_size)]
                 future_to_batch = {
@@ -388,6 +390,7 @@ class PatientGeneratorApp:
                 "patients_per_second": round(len(patients) / total_time_val if total_time_val > 0 else 0, 2),
                 "thread_count": self.num_workers,
                 "batch_size": self.batch_size,
+                "batching": self.memory_budget.telemetry(),
             },
         }
         if progress_callback:
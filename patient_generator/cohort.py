@@ -0,0 +1,112 @@
+"""
+Patient Cohort
+Columnar patient attributes drawn in bulk from a casualty timeline
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Patients are drawn and materialized in blocks of this size so memory stays
+# bounded when callers stream very large timelines.
+COHORT_CHUNK_SIZE = 50_000
+
+
+@dataclass
+class PatientCohort:
+    """
+    Attributes for a block of patients, one array entry per patient.
+
+    ``event_index`` points into the casualty timeline the cohort was expanded
+    from; event-level data (timestamp, event id, environment) is looked up
+    through it rather than copied per patient. Warfare injury columns are
+    None when warfare modifiers are disabled.
+    """
+
+    patient_ids: np.ndarray
+    event_index: np.ndarray
+    warfare_types: np.ndarray
+    injury_types: np.ndarray
+    triage_categories: np.ndarray
+    body_parts: np.ndarray
+    genders: np.ndarray
+    fronts: np.ndarray
+    nationalities: np.ndarray
+    primary_injuries: Optional[np.ndarray] = None
+    additional_injuries: Optional[Dict[int, List[str]]] = None
+    severities: Optional[np.ndarray] = None
+    polytrauma: Optional[np.ndarray] = None
+    mass_casualty: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return len(self.patient_ids)
+
+
+def expand_timeline(patient_counts: Sequence[int], limit: Optional[int] = None) -> np.ndarray:
+    """
+    Expand per-event patient counts into one event index per patient.
+
+    Args:
+        patient_counts: Number of casualties in each timeline event
+        limit: Optional maximum number of patients
+
+    Returns:
+        Integer array mapping each patient to its event
+    """
+    counts = np.asarray(patient_counts, dtype=np.int64)
+    event_index = np.repeat(np.arange(len(counts)), np.maximum(counts, 0))
+    if limit is not None:
+        event_index = event_index[: max(limit, 0)]
+    return event_index
+
+
+def factorize(column: np.ndarray) -> Tuple[np.ndarray, List[Any]]:
+    """
+    Encode a column as integer codes in order of first appearance.
+
+    Object columns are hashed in one pass instead of sorted, which is much
+    faster for the handful of distinct strings a cohort column holds.
+
+    Returns:
+        Tuple of (codes array, distinct values)
+    """
+    if column.dtype != object:
+        uniques, codes = np.unique(column, return_inverse=True)
+        return codes.reshape(-1), uniques.tolist()
+
+    positions: Dict[Any, int] = {}
+    codes = np.fromiter(
+        (positions.setdefault(value, len(positions)) for value in column.tolist()),
+        dtype=np.int64,
+        count=len(column),
+    )
+    return codes, list(positions)
+
+
+def group_indices(*columns: np.ndarray) -> Dict[Tuple[Any, ...], np.ndarray]:
+    """
+    Group row positions by the combined values of one or more columns.
+
+    Args:
+        columns: Equal-length arrays
+
+    Returns:
+        Mapping of value tuple -> positions holding that combination
+    """
+    if not columns or not len(columns[0]):
+        return {}
+
+    combined = np.zeros(len(columns[0]), dtype=np.int64)
+    for column in columns:
+        codes, uniques = factorize(column)
+        combined = combined * len(uniques) + codes
+
+    order = np.argsort(combined, kind="stable")
+    boundaries = np.flatnonzero(np.diff(combined[order])) + 1
+
+    groups = {}
+    for positions in np.split(order, boundaries):
+        first = positions[0]
+        groups[tuple(column[first] for column in columns)] = positions
+    return groups
@@ -1,14 +1,39 @@
 # patient_generator/config_manager.py
+from datetime import datetime, timezone
+import hashlib
 import json  # Added for loading JSON
+import os
 from typing import Any, Dict, List, Optional
 
 from .database import ConfigurationRepository, Database
+from .reference_data import load_reference
 from .schemas_config import (  # Added FrontsConfiguration, FrontDefinition
+    ConfigurationTemplateCreate,
     ConfigurationTemplateDB,
     FrontDefinition,
     FrontsConfiguration,
 )
 
+# Inline configurations are never stored, so their timestamps carry no meaning
+INLINE_CONFIGURATION_TIMESTAMP = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def inline_configuration(template: ConfigurationTemplateCreate) -> ConfigurationTemplateDB:
+    """
+    Builds an in-memory configuration template for a job that sent its configuration inline.
+
+    The ID is derived from the content (patient count excluded, since jobs
+    override it anyway), so identical inline configurations share an ID and
+    can reuse the same warm generation stack.
+    """
+    digest = hashlib.sha256(template.model_dump_json(exclude={"total_patients"}).encode()).hexdigest()[:16]
+    return ConfigurationTemplateDB(
+        **template.model_dump(),
+        id=f"inline-{digest}",
+        created_at=INLINE_CONFIGURATION_TIMESTAMP,
+        updated_at=INLINE_CONFIGURATION_TIMESTAMP,
+    )
+
 
 class ConfigurationManager:
     """
@@ -18,33 +43,43 @@ class ConfigurationManager:
 
     _active_configuration: Optional[ConfigurationTemplateDB] = None
     _config_id_loaded: Optional[str] = None
-    _repository: ConfigurationRepository
+    _repository: Optional[ConfigurationRepository] = None
     _static_fronts_config: Optional[FrontsConfiguration] = None  # Added for fronts_config.json
 
     def __init__(
         self,
         database_instance: Optional[Database] = None,
         static_fronts_config_path: str = "patient_generator/fronts_config.json",
+        configuration: Optional[ConfigurationTemplateDB] = None,
     ):
         """
         Initializes the ConfigurationManager.
-        If database_instance is not provided, it gets a default instance.
-        Loads the static fronts configuration.
+        If database_instance is not provided, a default instance is used the first
+        time a configuration is loaded by ID. A configuration passed in directly
+        (e.g. an inline job configuration) becomes active without touching the
+        database. Loads the static fronts configuration.
         """
-        db = database_instance or Database.get_instance()
-        self._repository = ConfigurationRepository(db)
+        self._database = database_instance
         self._load_static_fronts_config(static_fronts_config_path)
-        # Note: Consider if loading a default DB config immediately is desired,
-        # or if it should wait for an explicit load_configuration call.
+        if configuration is not None:
+            self.set_active_configuration(configuration)
+
+    @property
+    def repository(self) -> ConfigurationRepository:
+        """Configuration repository, connected on first use."""
+        if self._repository is None:
+            self._repository = ConfigurationRepository(self._database or Database.get_instance())
+        return self._repository
 
     def _load_static_fronts_config(self, file_path: str):
         """
         Loads the static fronts configuration from the specified JSON file.
         """
         try:
-            with open(file_path) as f:
-                data = json.load(f)
-            self._static_fronts_config = FrontsConfiguration.model_validate(data)
+            # Parsed and validated once per process; later managers share the result
+            self._static_fronts_config = load_reference(
+                os.path.abspath(file_path), FrontsConfiguration.model_validate
+            )
             print(f"Successfully loaded static fronts configuration from: {file_path}")
         except FileNotFoundError:
             print(f"Static fronts configuration file not found: {file_path}. Static fronts will not be used.")
@@ -73,10 +108,9 @@ class ConfigurationManager:
         Returns True if successful, False otherwise.
         """
         try:
-            config = self._repository.get_configuration(config_id)
+            config = self.repository.get_configuration(config_id)
             if config:
-                self._active_configuration = config
-                self._config_id_loaded = config_id
+                self.set_active_configuration(config)
                 print(f"Successfully loaded configuration: {config.name} (ID: {config_id})")
                 return True
             print(f"Configuration with ID '{config_id}' not found.")
@@ -89,6 +123,13 @@ class ConfigurationManager:
             self._config_id_loaded = None
             return False
 
+    def set_active_configuration(self, config: ConfigurationTemplateDB) -> None:
+        """
+        Sets an in-memory configuration template as active.
+        """
+        self._active_configuration = config
+        self._config_id_loaded = config.id
+
     def get_active_configuration(self) -> Optional[ConfigurationTemplateDB]:
         """
         Returns the currently active configuration template.
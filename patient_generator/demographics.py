@@ -3,6 +3,8 @@ import json
 import os  # Added import for path joining
 import random
 
+from .reference_data import load_reference
+
 
 class DemographicsGenerator:
     """Generates realistic demographics based on nationality"""
@@ -13,8 +15,7 @@ class DemographicsGenerator:
         json_path = os.path.join(base_dir, "demographics.json")
 
         try:
-            with open(json_path, encoding="utf-8") as f:
-                self.demographic_data = json.load(f).get("NATO_NATIONS", {})
+            self.demographic_data = load_reference(json_path).get("NATO_NATIONS", {})
         except FileNotFoundError:
             print(f"Error: demographics.json not found at {json_path}")
             self.demographic_data = {}
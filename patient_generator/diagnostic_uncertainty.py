@@ -14,13 +14,35 @@ Author: Medical SME Agent + Probabilistic Math SME Agent
 Version: 1.0.0
 """
 
+from bisect import bisect_right
+from collections import deque
+from dataclasses import dataclass, field
 import json
 import os
 import random
-from typing import Any, Dict, List, Optional
+from typing import Any, Deque, Dict, List, Optional, Sequence
 
 import numpy as np
 
+from .reference_data import load_reference
+
+# Diagnostic updates kept per patient; a patient normally visits at most five facilities
+MAX_HISTORY_PER_PATIENT = 16
+
+
+@dataclass
+class DiagnosticSession:
+    """
+    Diagnostic state for one patient while they are in the facility chain.
+
+    Opened on the first diagnostic update and released when the patient
+    reaches a terminal state, so engine memory tracks patients in flight.
+    """
+
+    patient_id: str
+    current_state: str = "initial_assessment"
+    diagnostic_history: Deque[Dict[str, Any]] = field(default_factory=lambda: deque(maxlen=MAX_HISTORY_PER_PATIENT))
+
 
 class DiagnosticUncertaintyEngine:
     """
@@ -51,14 +73,22 @@ class DiagnosticUncertaintyEngine:
         self.severity_impact = self.confusion_data["severity_impact"]
         self.environmental_factors = self.confusion_data["environmental_factors"]
 
-        # HMM state tracking per patient
-        self.patient_diagnostic_states = {}
+        # Session-scoped HMM state per patient in flight
+        self.patient_diagnostic_states: Dict[str, DiagnosticSession] = {}
+
+        # Cumulative transition table: row i is the CDF of next states from state i
+        transitions = self.hmm_params["transition_probabilities"]
+        self.hmm_states: List[str] = list(transitions)
+        self._state_index = {state: index for index, state in enumerate(self.hmm_states)}
+        table = np.array([[transitions[row].get(col, 0.0) for col in self.hmm_states] for row in self.hmm_states])
+        self.transition_cdf = np.cumsum(table / table.sum(axis=1, keepdims=True), axis=1)
+        self.transition_cdf[:, -1] = 1.0
+        self._transition_cdf_rows = [list(row) for row in self.transition_cdf]
 
     def _load_confusion_matrices(self) -> Dict[str, Any]:
         """Load confusion matrices configuration from JSON file."""
         try:
-            with open(self.config_path) as f:
-                return json.load(f)
+            return load_reference(self.config_path)
         except FileNotFoundError:
             msg = f"Confusion matrices config not found: {self.config_path}"
             raise FileNotFoundError(msg)
@@ -218,18 +248,11 @@ class DiagnosticUncertaintyEngine:
         Returns:
             Updated diagnosis with improvement probability
         """
-        # Get previous diagnostic state
-        if patient_id not in self.patient_diagnostic_states:
-            self.patient_diagnostic_states[patient_id] = {
-                "diagnostic_history": [],
-                "current_state": "initial_assessment",
-            }
-
-        patient_state = self.patient_diagnostic_states[patient_id]
+        patient_state = self.open_session(patient_id)
 
         # Calculate improvement probability
         old_accuracy = self.facility_accuracy.get(
-            patient_state["diagnostic_history"][-1]["facility"] if patient_state["diagnostic_history"] else "POI", 0.65
+            patient_state.diagnostic_history[-1]["facility"] if patient_state.diagnostic_history else "POI", 0.65
         )
         new_accuracy = self.facility_accuracy.get(new_facility, 0.65)
 
@@ -250,11 +273,11 @@ class DiagnosticUncertaintyEngine:
             "diagnosis": current_diagnosis,
             "accuracy": new_accuracy,
             "improvement_probability": max(0.0, improvement_prob),
-            "hmm_state": patient_state["current_state"],
+            "hmm_state": patient_state.current_state,
             "additional_info": additional_info or [],
         }
 
-        patient_state["diagnostic_history"].append(diagnostic_update)
+        patient_state.diagnostic_history.append(diagnostic_update)
 
         return diagnostic_update
 
@@ -265,18 +288,44 @@ class DiagnosticUncertaintyEngine:
         Args:
             patient_id: Unique patient identifier
         """
-        if patient_id not in self.patient_diagnostic_states:
+        session = self.patient_diagnostic_states.get(patient_id)
+        if session is None:
             return
 
-        current_state = self.patient_diagnostic_states[patient_id]["current_state"]
-        transition_probs = self.hmm_params["transition_probabilities"][current_state]
+        # Inverse-CDF draw on the precomputed transition row
+        row = self._transition_cdf_rows[self._state_index[session.current_state]]
+        next_index = min(bisect_right(row, np.random.random()), len(row) - 1)  # noqa: NPY002
+        session.current_state = self.hmm_states[next_index]
 
-        # Select next state based on transition probabilities
-        states = list(transition_probs.keys())
-        probabilities = list(transition_probs.values())
+    def sample_hmm_transitions(self, state_indices: Sequence[int]) -> np.ndarray:
+        """
+        Sample next HMM states for many patients at once.
+
+        Args:
+            state_indices: Current state index (into hmm_states) per patient
+
+        Returns:
+            Array of next state indices
+        """
+        cdf = self.transition_cdf[np.asarray(state_indices, dtype=int)]
+        draws = np.random.random(len(cdf))  # noqa: NPY002
+        next_indices = (draws[:, np.newaxis] >= cdf).sum(axis=1)
+        return np.minimum(next_indices, len(self.hmm_states) - 1)
 
-        next_state = np.random.choice(states, p=probabilities)  # noqa: NPY002
-        self.patient_diagnostic_states[patient_id]["current_state"] = next_state
+    def advance_hmm_states(self, patient_ids: Sequence[str]) -> None:
+        """
+        Advance the HMM state of several open sessions with one batch draw.
+
+        Args:
+            patient_ids: Patients whose sessions should transition
+        """
+        sessions = [self.patient_diagnostic_states[pid] for pid in patient_ids if pid in self.patient_diagnostic_states]
+        if not sessions:
+            return
+
+        next_indices = self.sample_hmm_transitions([self._state_index[s.current_state] for s in sessions])
+        for session, next_index in zip(sessions, next_indices):
+            session.current_state = self.hmm_states[next_index]
 
     def get_diagnostic_confidence(self, patient_id: str) -> Dict[str, Any]:
         """
@@ -288,22 +337,22 @@ class DiagnosticUncertaintyEngine:
         Returns:
             Dict with confidence metrics and diagnostic history
         """
-        if patient_id not in self.patient_diagnostic_states:
+        patient_state = self.patient_diagnostic_states.get(patient_id)
+        if patient_state is None:
             return {"confidence": 0.0, "diagnostic_history": [], "hmm_state": "initial_assessment"}
 
-        patient_state = self.patient_diagnostic_states[patient_id]
-
         # Calculate overall confidence from diagnostic history
-        if not patient_state["diagnostic_history"]:
-            return {"confidence": 0.0, "diagnostic_history": [], "hmm_state": patient_state["current_state"]}
+        diagnostic_history = list(patient_state.diagnostic_history)
+        if not diagnostic_history:
+            return {"confidence": 0.0, "diagnostic_history": [], "hmm_state": patient_state.current_state}
 
-        latest_diagnosis = patient_state["diagnostic_history"][-1]
+        latest_diagnosis = diagnostic_history[-1]
 
         return {
             "confidence": latest_diagnosis["accuracy"],
-            "diagnostic_history": patient_state["diagnostic_history"],
-            "hmm_state": patient_state["current_state"],
-            "improvement_trend": self._calculate_improvement_trend(patient_state["diagnostic_history"]),
+            "diagnostic_history": diagnostic_history,
+            "hmm_state": patient_state.current_state,
+            "improvement_trend": self._calculate_improvement_trend(diagnostic_history),
         }
 
     def _calculate_improvement_trend(self, diagnostic_history: List[Dict[str, Any]]) -> Dict[str, float]:
@@ -332,6 +381,38 @@ class DiagnosticUncertaintyEngine:
             "final_accuracy": accuracies[-1],
         }
 
+    def open_session(self, patient_id: str) -> DiagnosticSession:
+        """
+        Get the diagnostic session for a patient, opening one if needed.
+
+        Args:
+            patient_id: Unique patient identifier
+
+        Returns:
+            The patient's DiagnosticSession
+        """
+        session = self.patient_diagnostic_states.get(patient_id)
+        if session is None:
+            session = self.patient_diagnostic_states[patient_id] = DiagnosticSession(patient_id)
+        return session
+
+    def release_session(self, patient_id: str) -> Optional[DiagnosticSession]:
+        """
+        Release a patient's diagnostic session once they reach a terminal state.
+
+        Args:
+            patient_id: Unique patient identifier
+
+        Returns:
+            The released session, or None if none was open
+        """
+        return self.patient_diagnostic_states.pop(patient_id, None)
+
+    @property
+    def active_sessions(self) -> int:
+        """Number of patients with an open diagnostic session."""
+        return len(self.patient_diagnostic_states)
+
     def reset_patient_state(self, patient_id: str):
         """
         Reset diagnostic state for a patient (useful for new scenarios).
@@ -339,8 +420,7 @@ class DiagnosticUncertaintyEngine:
         Args:
             patient_id: Unique patient identifier
         """
-        if patient_id in self.patient_diagnostic_states:
-            del self.patient_diagnostic_states[patient_id]
+        self.release_session(patient_id)
 
 
 # Utility functions for integration
@@ -10,6 +10,8 @@ from pathlib import Path
 import random
 from typing import Dict, Optional, Union
 
+from .reference_data import load_reference
+
 
 class EvacuationTimeManager:
     """
@@ -53,8 +55,7 @@ class EvacuationTimeManager:
             ValueError: If configuration structure is invalid
         """
         try:
-            with open(config_path) as f:
-                config = json.load(f)
+            config = load_reference(config_path)
 
             # Verify required top-level keys exist
             required_keys = ["evacuation_times", "transit_times", "kia_rate_modifiers"]
@@ -21,6 +21,8 @@ from typing import Any, Dict, List, Optional
 
 import numpy as np
 
+from .reference_data import load_reference
+
 
 class FacilityMarkovChain:
     """
@@ -60,8 +62,7 @@ class FacilityMarkovChain:
     def _load_transition_matrices(self) -> Dict[str, Any]:
         """Load transition matrices configuration from JSON file."""
         try:
-            with open(self.config_path) as f:
-                return json.load(f)
+            return load_reference(self.config_path)
         except FileNotFoundError:
             msg = f"Transition matrices config not found: {self.config_path}"
             raise FileNotFoundError(msg)
@@ -1,50 +1,71 @@
 import concurrent.futures
+from contextlib import nullcontext
+import contextvars
+import copy
 import datetime
+import itertools
 import json
 import logging
 import multiprocessing
 import os
 import random
-from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from patient_generator.performance import FLOW_WORKER_THREAD_PREFIX
 
 logger = logging.getLogger(__name__)
 
 if TYPE_CHECKING:
+    from patient_generator.performance import StageTimes
     from patient_generator.schemas_config import FrontDefinition
 
 try:
+    from .alias_sampler import AliasSampler, get_sampler
+    from .cohort import COHORT_CHUNK_SIZE, PatientCohort, expand_timeline, group_indices
     from .config_manager import ConfigurationManager
     from .evacuation_time_manager import EvacuationTimeManager
     from .facility_markov_chain import FacilityMarkovChain
     from .patient import Patient
-    from .temporal_generator import CasualtyEvent, TemporalPatternGenerator
+    from .reference_data import load_reference, strip_comments
+    from .temporal_generator import CasualtyEvent, CasualtyTimeline, TemporalPatternGenerator
     from .warfare_modifiers import WarfareModifiers
 
     MARKOV_CHAIN_AVAILABLE = True
     WARFARE_MODIFIERS_AVAILABLE = True
 except ImportError:
     try:
+        from patient_generator.alias_sampler import AliasSampler, get_sampler
+        from patient_generator.cohort import COHORT_CHUNK_SIZE, PatientCohort, expand_timeline, group_indices
         from patient_generator.config_manager import ConfigurationManager
         from patient_generator.evacuation_time_manager import EvacuationTimeManager
         from patient_generator.facility_markov_chain import FacilityMarkovChain
         from patient_generator.patient import Patient
-        from patient_generator.temporal_generator import CasualtyEvent, TemporalPatternGenerator
+        from patient_generator.reference_data import load_reference, strip_comments
+        from patient_generator.temporal_generator import CasualtyEvent, CasualtyTimeline, TemporalPatternGenerator
         from patient_generator.warfare_modifiers import WarfareModifiers
 
         MARKOV_CHAIN_AVAILABLE = True
         WARFARE_MODIFIERS_AVAILABLE = True
     except ImportError:
         # Fallback if Markov chain not available
+        from patient_generator.alias_sampler import AliasSampler, get_sampler
+        from patient_generator.cohort import COHORT_CHUNK_SIZE, PatientCohort, expand_timeline, group_indices
         from patient_generator.config_manager import ConfigurationManager
         from patient_generator.evacuation_time_manager import EvacuationTimeManager
         from patient_generator.patient import Patient
-        from patient_generator.temporal_generator import CasualtyEvent, TemporalPatternGenerator
+        from patient_generator.reference_data import load_reference, strip_comments
+        from patient_generator.temporal_generator import CasualtyEvent, CasualtyTimeline, TemporalPatternGenerator
 
         MARKOV_CHAIN_AVAILABLE = False
         WARFARE_MODIFIERS_AVAILABLE = False
         FacilityMarkovChain = None
         WarfareModifiers = None
 
+# Triage weights for injury types without configured ones
+DEFAULT_TRIAGE_WEIGHTS = {"T1": 0.3, "T2": 0.4, "T3": 0.3}
+
 
 class PatientFlowSimulator:
     """Optimized simulator for patient flow through medical treatment facilities, using dynamic configurations."""
@@ -58,9 +79,17 @@ class PatientFlowSimulator:
             msg = "PatientFlowSimulator requires an active configuration to be loaded in ConfigurationManager."
             raise ValueError(msg)
 
+        # Alias tables are cached per configuration version
+        self._sampler_version = (getattr(active_config, "id", None), getattr(active_config, "version", None))
+        # Samplers resolved for the per-patient distributions: name -> (source, sampler)
+        self._samplers: Dict[Hashable, Tuple[Any, AliasSampler]] = {}
+
         # Initialize evacuation time manager for realistic timeline tracking
         self.evacuation_manager = EvacuationTimeManager()
 
+        # Per-job stage timings, set on a job's forked simulator when profiled
+        self.stage_times: Optional[StageTimes] = None
+
         # Optional medical simulation enhancement
         self.use_medical_simulation = os.environ.get("ENABLE_MEDICAL_SIMULATION", "false").lower() == "true"
         # We will instantiate MedicalSimulationBridge per patient to avoid shared state issues
@@ -180,17 +209,46 @@ class PatientFlowSimulator:
 
         # Parallelization settings from simulation_parameters.json
         parallel_config = self._sim_params.get("parallelization", {})
-        self.batch_size = parallel_config.get("batch_size_default", 100)
+        self.batch_size = self.batch_size_for(self.total_patients_to_generate)
         try:
             max_workers = parallel_config.get("max_workers", 8)
             min_workers = parallel_config.get("min_workers", 2)
             self.num_workers = max(min_workers, min(multiprocessing.cpu_count(), max_workers))
-            large_threshold = parallel_config.get("large_generation_threshold", 5000)
-            if self.total_patients_to_generate > large_threshold:
-                self.batch_size = parallel_config.get("batch_size_large", 250)
         except Exception:
             self.num_workers = 4
 
+    def batch_size_for(self, total_patients: int) -> int:
+        """
+        Flow simulation batch size for a job of ``total_patients``.
+
+        Jobs above the configured large_generation_threshold use the larger batch size.
+        """
+        parallel_config = self._sim_params.get("parallelization", {})
+        if total_patients > parallel_config.get("large_generation_threshold", 5000):
+            return parallel_config.get("batch_size_large", 250)
+        return parallel_config.get("batch_size_default", 100)
+
+    def fork(self) -> "PatientFlowSimulator":
+        """
+        Return a per-job view of this simulator.
+
+        Loaded models, reference tables and transition matrices are shared with
+        the original; the patient list and the front tables that jobs override
+        are copied so concurrent jobs never see each other's state.
+        """
+        job_simulator = copy.copy(self)
+        job_simulator.patients = []
+        job_simulator.front_configs = list(self.front_configs)
+        job_simulator.front_distribution = dict(self.front_distribution)
+        job_simulator._samplers = dict(self._samplers)
+        return job_simulator
+
+    def _stage(self, stage: str, calls: int = 1):
+        """Time a block against a pipeline stage when the job is profiled."""
+        if self.stage_times is None:
+            return nullcontext()
+        return self.stage_times.time(stage, calls)
+
     def _build_transition_matrix(self) -> Dict[str, Dict[str, float]]:
         """Dynamically build the transition matrix based on configured facilities."""
         matrix: Dict[str, Dict[str, float]] = {}
@@ -281,15 +339,10 @@ class PatientFlowSimulator:
                 matrix[facility_id]["RTD"] = min(matrix[facility_id]["RTD"], 1.0)
         return matrix
 
-    def generate_casualty_flow(self):  # total_casualties now comes from config
-        """Generate casualties - check for temporal configuration"""
-
-        # Check if temporal configuration exists
-        injuries_path = os.path.join(os.path.dirname(__file__), "injuries.json")
-
+    def _temporal_injuries_config(self) -> Optional[Dict[str, Any]]:
+        """injuries.json when it describes temporal generation, else None (legacy generation)."""
         try:
-            with open(injuries_path) as f:
-                injuries_config = json.load(f)
+            injuries_config = self._load_injuries_config()
 
             # Check if new format (has warfare_types)
             if "warfare_types" in injuries_config:
@@ -297,10 +350,18 @@ class PatientFlowSimulator:
                     "Using temporal generation with base_date: %s",
                     injuries_config.get("base_date", "NOT_FOUND")
                 )
-                return self.generate_temporal_casualties()
+                return injuries_config
             logger.debug("No warfare_types found, using legacy generation")
         except Exception as e:
             logger.warning("Error loading injuries config: %s", e)
+        return None
+
+    def generate_casualty_flow(self):  # total_casualties now comes from config
+        """Generate casualties - check for temporal configuration"""
+
+        # Check if temporal configuration exists
+        if self._temporal_injuries_config() is not None:
+            return self.generate_temporal_casualties()
 
         # Fall back to original method
         total_casualties = self.total_patients_to_generate
@@ -313,7 +374,8 @@ class PatientFlowSimulator:
     def _generate_flow_sequential(self, total_casualties: int):
         patients = []
         for i in range(total_casualties):
-            patient = self._create_initial_patient(i)
+            with self._stage("creation"):
+                patient = self._create_initial_patient(i)
             self._simulate_patient_flow_single(patient)
             patients.append(patient)
         return patients
@@ -321,25 +383,70 @@ class PatientFlowSimulator:
     def _generate_flow_parallel(self, total_casualties: int):
         patient_ids = list(range(total_casualties))
         patients = []
-        with concurrent.futures.ThreadPoolExecutor(max_workers=self.num_workers) as executor:
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.num_workers, thread_name_prefix=FLOW_WORKER_THREAD_PREFIX
+        ) as executor:
             id_batches = [patient_ids[i : i + self.batch_size] for i in range(0, len(patient_ids), self.batch_size)]
-            future_to_batch = {executor.submit(self._create_patient_batch, batch): batch for batch in id_batches}
+            # Each batch runs in a copy of the caller's context so job-scoped timers follow it
+            future_to_batch = {
+                executor.submit(contextvars.copy_context().run, self._create_patient_batch, batch): batch
+                for batch in id_batches
+            }
             for future in concurrent.futures.as_completed(future_to_batch):
                 patients.extend(future.result())
 
         patients.sort(key=lambda p: p.id)  # Maintain order
 
-        with concurrent.futures.ThreadPoolExecutor(max_workers=self.num_workers) as executor:
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.num_workers, thread_name_prefix=FLOW_WORKER_THREAD_PREFIX
+        ) as executor:
             patient_batches = [patients[i : i + self.batch_size] for i in range(0, len(patients), self.batch_size)]
             future_to_batch = {
-                executor.submit(self._simulate_patient_flow_batch, batch): batch for batch in patient_batches
+                executor.submit(contextvars.copy_context().run, self._simulate_patient_flow_batch, batch): batch
+                for batch in patient_batches
             }
             for future in concurrent.futures.as_completed(future_to_batch):
                 _ = future.result()  # Ensure completion
         return patients
 
+    def iter_casualty_batches(self, batch_size: Callable[[int], int]) -> Iterator[List[Patient]]:
+        """
+        Generate the casualty flow in batches instead of one cohort.
+
+        Chooses temporal or legacy generation like generate_casualty_flow().
+        Patients are created lazily and each batch has its flow simulated
+        before it is yielded, so only the current batch is held here.
+
+        Args:
+            batch_size: Called with the number of patients still to generate;
+                returns the size of the next batch (e.g. from a memory budget)
+        """
+        total = self.total_patients_to_generate
+        injuries_config = self._temporal_injuries_config()
+        if injuries_config is not None:
+            timeline = self._casualty_timeline(injuries_config, total)
+            patients = self.iter_patients_from_timeline(timeline, injuries_config["injury_mix"], limit=total)
+        else:
+            patients = (self._create_initial_patient(i) for i in range(total))
+
+        remaining = total
+        while remaining > 0:
+            size = max(1, min(batch_size(remaining), remaining))
+            with self._stage("creation", size):
+                batch = list(itertools.islice(patients, size))
+            if not batch:
+                return
+            if len(batch) >= 500 and self.num_workers > 1:
+                self._simulate_flow_parallel(batch)
+            else:
+                for patient in batch:
+                    self._simulate_patient_flow_single(patient)
+            remaining -= len(batch)
+            yield batch
+
     def _create_patient_batch(self, id_batch: List[int]):
-        return [self._create_initial_patient(i) for i in id_batch]
+        with self._stage("creation", len(id_batch)):
+            return [self._create_initial_patient(i) for i in id_batch]
 
     def _simulate_patient_flow_batch(self, patient_batch: List[Patient]):
         for patient in patient_batch:
@@ -359,15 +466,17 @@ class PatientFlowSimulator:
         # Only use static file when no front_configs were supplied via the API request.
         if static_front_defs and not self.front_distribution:
             # Use static fronts_config.json
-            front_distribution_static = {
-                front_def.name: front_def.ratio for front_def in static_front_defs if front_def.ratio > 0
-            }
+            front_sampler = self._sampler_for(
+                "static_front",
+                static_front_defs,
+                lambda: {front_def.name: front_def.ratio for front_def in static_front_defs if front_def.ratio > 0},
+            )
 
-            if not front_distribution_static:
+            if not front_sampler:
                 patient.front = "N/A_StaticEmpty"
                 patient.nationality = "N/A_StaticEmpty"
             else:
-                selected_front_name = self._select_weighted_item(front_distribution_static)
+                selected_front_name = front_sampler.sample()
                 # Find the selected FrontDefinition object by its name
                 selected_front_def = next(
                     (fdef for fdef in static_front_defs if fdef.name == selected_front_name), None
@@ -376,15 +485,19 @@ class PatientFlowSimulator:
                 if selected_front_def:
                     patient.front = selected_front_def.name
                     # nat_def objects now have 'nationality_code' and 'percentage'
-                    nat_dist_static = {
-                        nat_def.nationality_code: nat_def.percentage
-                        for nat_def in selected_front_def.nations
-                        if nat_def.percentage > 0
-                    }
-                    if not nat_dist_static:
+                    nationality_sampler = self._sampler_for(
+                        ("static_nationality", selected_front_def.name),
+                        selected_front_def,
+                        lambda: {
+                            nat_def.nationality_code: nat_def.percentage
+                            for nat_def in selected_front_def.nations
+                            if nat_def.percentage > 0
+                        },
+                    )
+                    if not nationality_sampler:
                         patient.nationality = "N/A_FrontHasNoNations"
                     else:
-                        patient.nationality = self._select_weighted_item(nat_dist_static)
+                        patient.nationality = nationality_sampler.sample()
                 else:
                     patient.front = "ErrorStaticFront"  # Should not happen if logic is correct
                     patient.nationality = "N/A"
@@ -394,7 +507,7 @@ class PatientFlowSimulator:
             patient.nationality = "N/A_DB_NoFrontDist"
         else:
             # self.front_distribution is Dict[str(front_id), float(casualty_rate_normalized)]
-            front_id = self._select_weighted_item(self.front_distribution)
+            front_id = self._select_weighted_item(self.front_distribution, "front")
             # self.front_configs is List[Dict[str, Any]] from DB
             selected_front_config_db = next((fc for fc in self.front_configs if fc["id"] == front_id), None)
 
@@ -404,14 +517,18 @@ class PatientFlowSimulator:
                 # It's now a List[Dict[str, Any]] like [{'nationality_code': 'USA', 'percentage': 100.0}]
                 current_front_nat_dist_list = selected_front_config_db.get("nationality_distribution", [])
                 if current_front_nat_dist_list:
-                    # Convert List[Dict] to Dict[str, float] for _select_weighted_item
-                    weights_for_selection: Dict[str, float] = {
-                        item["nationality_code"]: item["percentage"]
-                        for item in current_front_nat_dist_list
-                        if "nationality_code" in item and "percentage" in item and item["percentage"] > 0
-                    }
-                    if weights_for_selection:
-                        patient.nationality = self._select_weighted_item(weights_for_selection)
+                    # Convert List[Dict] to Dict[str, float] for the sampler
+                    nationality_sampler = self._sampler_for(
+                        ("nationality", front_id),
+                        selected_front_config_db,
+                        lambda: {
+                            item["nationality_code"]: item["percentage"]
+                            for item in current_front_nat_dist_list
+                            if "nationality_code" in item and "percentage" in item and item["percentage"] > 0
+                        },
+                    )
+                    if nationality_sampler:
+                        patient.nationality = nationality_sampler.sample()
                     else:
                         patient.nationality = "N/A_DBFrontHasNoValidNationRatios"
                 else:
@@ -421,8 +538,8 @@ class PatientFlowSimulator:
                 patient.nationality = "N/A"
 
         patient.gender = random.choice(["male", "female"])
-        patient.day_of_injury = self._select_weighted_item(self.day_distribution)
-        patient.injury_type = self._select_weighted_item(self.injury_distribution)
+        patient.day_of_injury = self._select_weighted_item(self.day_distribution, "day")
+        patient.injury_type = self._select_weighted_item(self.injury_distribution, "injury")
 
         # Get triage weights with fallback for unknown injury types
         if patient.injury_type in self._triage_weights:
@@ -430,9 +547,9 @@ class PatientFlowSimulator:
         else:
             # Default triage weights if injury type not found
             logger.warning("Unknown injury type '%s'. Using default triage weights.", patient.injury_type)
-            triage_weights = {"T1": 0.3, "T2": 0.4, "T3": 0.3}
+            triage_weights = DEFAULT_TRIAGE_WEIGHTS
 
-        patient.triage_category = self._select_weighted_item(triage_weights)
+        patient.triage_category = self._select_weighted_item(triage_weights, ("triage", patient.injury_type))
 
         # Update injury timestamp with actual day of injury
         actual_injury_time = self._get_date_for_day(patient.day_of_injury)
@@ -444,20 +561,21 @@ class PatientFlowSimulator:
         patient.add_treatment(facility="POI", date=actual_injury_time)
         return patient
 
-    def _assign_body_part(self, injury_type: str) -> str:
-        """Assign a realistic body part based on injury type."""
+    def _body_part_distribution(self, injury_type: str) -> Dict[str, float]:
+        """Body part weights for an injury type."""
         injury_lower = injury_type.lower()
+        limbs = ["Left Leg", "Right Leg", "Left Arm", "Right Arm"]
 
         if "amputation" in injury_lower:
-            return random.choice(["Left Leg", "Right Leg", "Left Arm", "Right Arm"])
+            return dict.fromkeys(limbs, 1.0)
         if "brain" in injury_lower or "head" in injury_lower or "tbi" in injury_lower:
-            return "Head"
+            return {"Head": 1.0}
         if "chest" in injury_lower or "lung" in injury_lower or "abdominal" in injury_lower:
-            return "Torso"
+            return {"Torso": 1.0}
         if "fracture" in injury_lower:
-            return random.choice(["Left Leg", "Right Leg", "Left Arm", "Right Arm"])
+            return dict.fromkeys(limbs, 1.0)
         if "burn" in injury_lower:
-            return random.choice(["Head", "Torso", "Left Arm", "Right Arm", "Left Leg", "Right Leg"])
+            return dict.fromkeys(["Head", "Torso", "Left Arm", "Right Arm", "Left Leg", "Right Leg"], 1.0)
 
         # Use configurable body part distribution for generic injuries
         raw_body_part_dist = self._sim_params.get("poi_settings", {}).get("body_part_distribution", {
@@ -465,17 +583,16 @@ class PatientFlowSimulator:
             "Left Leg": 0.15, "Right Leg": 0.15
         })
         # Filter out _comment fields
-        body_part_dist = {k: v for k, v in raw_body_part_dist.items() if not k.startswith("_")}
-
-        rand = random.random()
-        cumulative = 0.0
-        for body_part, weight in body_part_dist.items():
-            cumulative += weight
-            if rand < cumulative:
-                return body_part
+        return {k: v for k, v in raw_body_part_dist.items() if not k.startswith("_")}
 
-        # Fallback if distribution doesn't sum to 1.0
-        return random.choice(list(body_part_dist.keys()))
+    def _assign_body_part(self, injury_type: str) -> str:
+        """Assign a realistic body part based on injury type."""
+        sampler = self._sampler_for(
+            ("body_part", injury_type), self._sim_params, lambda: self._body_part_distribution(injury_type)
+        )
+        if sampler:
+            return sampler.sample()
+        return random.choice(list(self._body_part_distribution(injury_type).keys()))
 
     def _simulate_patient_flow_single(self, patient: Patient):
         """
@@ -501,7 +618,8 @@ class PatientFlowSimulator:
                 medical_bridge = MedicalSimulationBridge()
 
                 # Enhance patient with medical simulation
-                patient = medical_bridge.enhance_patient(patient)
+                with self._stage("medical_bridge"):
+                    patient = medical_bridge.enhance_patient(patient)
                 # Medical simulation handled the flow
                 return
             except Exception as e:
@@ -509,11 +627,14 @@ class PatientFlowSimulator:
                 # Fall through to standard simulation
 
         # Use Markov chain if enabled, otherwise fall back to sequential flow
-        if self.use_markov_chain and self.markov_chain:
-            self._simulate_patient_flow_markov(patient)
-            return
+        with self._stage("flow"):
+            if self.use_markov_chain and self.markov_chain:
+                self._simulate_patient_flow_markov(patient)
+            else:
+                self._simulate_patient_flow_sequential(patient)
 
-        # Otherwise, use original sequential simulation logic
+    def _simulate_patient_flow_sequential(self, patient: Patient):
+        """Original facility-by-facility simulation using EvacuationTimeManager timings."""
         current_time = patient.injury_timestamp
 
         # Track current time through evacuation chain
@@ -996,27 +1117,48 @@ class PatientFlowSimulator:
         }
         return injury_names.get(code_str, f"Injury {code_str}")
 
-    def _select_weighted_item(self, weights_dict: Dict[str, float]):
-        if not weights_dict:
-            return "N/A"  # Handle empty distribution
+    def _sampler_for(self, name: Hashable, source: Any, build_weights: Callable[[], Dict[str, float]]) -> AliasSampler:
+        """
+        Sampler for a named per-patient distribution, resolved once and kept.
 
-        # Filter out items with zero or negative weights if any, though Pydantic should prevent negative
-        valid_weights_dict = {item: weight for item, weight in weights_dict.items() if weight > 0}
-        if not valid_weights_dict:
-            return "N/A"  # All weights were zero or less
+        The entry stays valid while the distribution is built from the same
+        source object; a job replacing its fronts, for example, resolves the
+        front samplers again on first use.
 
-        total_weight = sum(valid_weights_dict.values())
-        if total_weight == 0:
-            return random.choice(list(valid_weights_dict.keys()))  # If all valid weights are 0, pick one randomly
+        Args:
+            name: Name of the distribution
+            source: Object the weights are derived from
+            build_weights: Builds the item -> weight mapping on first use
 
-        # Normalize weights if they don't sum to 1 (e.g. if they are just ratios)
-        # For random.choices, weights don't strictly need to sum to 1, but it's good practice for clarity.
-        # Here, we assume weights are probabilities or can be treated as relative weights.
+        Returns:
+            AliasSampler for the distribution (empty if it has no positive weights)
+        """
+        cached = self._samplers.get(name)
+        if cached is not None and cached[0] is source:
+            return cached[1]
+        sampler = get_sampler(build_weights(), self._sampler_version)
+        self._samplers[name] = (source, sampler)
+        return sampler
+
+    def _select_weighted_item(self, weights_dict: Dict[str, float], name: Optional[Hashable] = None):
+        if not weights_dict:
+            return "N/A"  # Handle empty distribution
 
-        items = list(valid_weights_dict.keys())
-        weights = list(valid_weights_dict.values())
+        # Zero or negative weights are dropped when the alias table is built
+        if name is None:
+            sampler = get_sampler(weights_dict, self._sampler_version)
+        else:
+            sampler = self._sampler_for(name, weights_dict, lambda: weights_dict)
+        if not sampler:
+            return "N/A"  # All weights were zero or less
+        return sampler.sample()
 
-        return random.choices(items, weights=weights, k=1)[0]
+    def _draw_weighted(self, weights_dict: Dict[str, float], count: int) -> np.ndarray:
+        """Batched _select_weighted_item: ``count`` draws as an object array."""
+        sampler = get_sampler(weights_dict, self._sampler_version) if weights_dict else None
+        if not sampler:
+            return np.full(count, "N/A", dtype=object)
+        return np.array(sampler.items, dtype=object)[sampler.draw_indices(count)]
 
     def _get_date_for_day(self, day_label: str) -> datetime.datetime:
         if not hasattr(self, "_cached_base_date_obj"):
@@ -1056,30 +1198,15 @@ class PatientFlowSimulator:
         # Load injuries.json configuration
         injuries_config = self._load_injuries_config()
 
-        # Initialize temporal generator
-        warfare_patterns_path = os.path.join(os.path.dirname(__file__), "warfare_patterns.json")
-        temporal_gen = TemporalPatternGenerator(warfare_patterns_path)
-
         # Use patient count from active configuration if available, otherwise use injuries.json default
         # Use the updated total_patients_to_generate which may have been overridden
         total_patients = self.total_patients_to_generate
-        logger.info("Temporal generation using patient count: %d", total_patients)
-
-        # Generate casualty timeline
-        casualty_timeline = temporal_gen.generate_timeline(
-            days=injuries_config["days_of_fighting"],
-            total_patients=total_patients,  # Use the override from configuration
-            active_warfare_types=injuries_config["warfare_types"],
-            intensity=injuries_config["intensity"],
-            tempo=injuries_config["tempo"],
-            environmental_conditions=injuries_config["environmental_conditions"],
-            special_events=injuries_config["special_events"],
-            base_date=injuries_config["base_date"],
-        )
+        casualty_timeline = self._casualty_timeline(injuries_config, total_patients)
 
         # Generate patients based on timeline
         logger.debug("Generated %d casualty events", len(casualty_timeline))
-        patients = self._generate_patients_from_timeline(casualty_timeline, injuries_config["injury_mix"])
+        with self._stage("creation", total_patients):
+            patients = self._generate_patients_from_timeline(casualty_timeline, injuries_config["injury_mix"])
         # Trim to exact requested count (temporal distribution rounding can produce extras)
         if len(patients) > total_patients:
             patients = patients[:total_patients]
@@ -1100,12 +1227,27 @@ class PatientFlowSimulator:
 
         return patients
 
-    def _load_injuries_config(self) -> Dict[str, Any]:
-        """Load injuries.json configuration"""
-        injuries_path = os.path.join(os.path.dirname(__file__), "injuries.json")
+    def _casualty_timeline(self, injuries_config: Dict[str, Any], total_patients: int) -> CasualtyTimeline:
+        """Casualty timeline for the warfare scenario in injuries.json."""
+        # Initialize temporal generator
+        warfare_patterns_path = os.path.join(os.path.dirname(__file__), "warfare_patterns.json")
+        temporal_gen = TemporalPatternGenerator(warfare_patterns_path)
+        logger.info("Temporal generation using patient count: %d", total_patients)
 
-        with open(injuries_path) as f:
-            return json.load(f)
+        return temporal_gen.generate_timeline(
+            days=injuries_config["days_of_fighting"],
+            total_patients=total_patients,  # Use the override from configuration
+            active_warfare_types=injuries_config["warfare_types"],
+            intensity=injuries_config["intensity"],
+            tempo=injuries_config["tempo"],
+            environmental_conditions=injuries_config["environmental_conditions"],
+            special_events=injuries_config["special_events"],
+            base_date=injuries_config["base_date"],
+        )
+
+    def _load_injuries_config(self) -> Dict[str, Any]:
+        """Load injuries.json configuration (read-only view)"""
+        return load_reference("injuries.json")
 
     def _load_simulation_parameters(self) -> Dict[str, Any]:
         """Load simulation_parameters.json configuration.
@@ -1113,12 +1255,9 @@ class PatientFlowSimulator:
         Returns configurable simulation parameters like triage weights,
         day distribution, and facility defaults.
         """
-        params_path = os.path.join(os.path.dirname(__file__), "simulation_parameters.json")
         try:
-            with open(params_path) as f:
-                params = json.load(f)
-                # Filter out comment fields
-                return {k: v for k, v in params.items() if not k.startswith("_")}
+            # Comment fields are filtered out once, when the file is parsed
+            return load_reference("simulation_parameters.json", strip_comments)
         except FileNotFoundError:
             logger.warning("simulation_parameters.json not found, using defaults")
             return {}
@@ -1127,111 +1266,255 @@ class PatientFlowSimulator:
             return {}
 
     def _generate_patients_from_timeline(
-        self, timeline: List[CasualtyEvent], base_injury_mix: Dict[str, float]
+        self, timeline: Sequence[CasualtyEvent], base_injury_mix: Dict[str, float]
     ) -> List[Patient]:
         """Generate actual patients from casualty events with specific timestamps"""
+        return list(self.iter_patients_from_timeline(timeline, base_injury_mix))
 
-        patients = []
-        patient_id_counter = 0
+    def iter_patients_from_timeline(
+        self,
+        timeline: Sequence[CasualtyEvent],
+        base_injury_mix: Dict[str, float],
+        limit: Optional[int] = None,
+        warfare_patterns: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[Patient]:
+        """
+        Lazily create patients from casualty events.
 
-        # Load warfare patterns for injury distributions
-        warfare_patterns_path = os.path.join(os.path.dirname(__file__), "warfare_patterns.json")
-        with open(warfare_patterns_path) as f:
-            warfare_patterns = json.load(f)
-
-        for event in timeline:
-            for _ in range(event.patient_count):
-                patient = self._create_temporal_patient(
-                    patient_id=patient_id_counter,
-                    injury_timestamp=event.timestamp,
-                    warfare_type=event.warfare_type,
-                    event_id=event.event_id,
-                    is_mass_casualty=event.is_mass_casualty,
-                    base_injury_mix=base_injury_mix,
-                    warfare_patterns=warfare_patterns,
-                    environmental_factors=event.environmental_factors,
-                )
-                patients.append(patient)
-                patient_id_counter += 1
+        Attributes are drawn in columnar blocks of COHORT_CHUNK_SIZE patients
+        (see build_cohort) and Patient objects are built as they are yielded.
+        Used by callers that aggregate over patients without keeping them
+        (e.g. Monte-Carlo sweeps), so memory does not grow with cohort size.
 
-        return patients
+        Args:
+            timeline: CasualtyTimeline from TemporalPatternGenerator, or a list of CasualtyEvent
+            base_injury_mix: Base injury distribution used when warfare modifiers are off
+            limit: Optional maximum number of patients to yield
+            warfare_patterns: Pre-loaded warfare_patterns.json content (loaded from disk if omitted)
+        """
+        if warfare_patterns is None:
+            warfare_patterns = load_reference("warfare_patterns.json")
+
+        timeline = CasualtyTimeline.from_events(timeline)
+        event_index = expand_timeline(timeline.patient_counts, limit)
+        base_date = np.datetime64(self._get_date_for_day("Day 1").date(), "D")
+        event_days = (timeline.timestamps.astype("datetime64[D]") - base_date).astype(np.int64)
+
+        for start in range(0, len(event_index), COHORT_CHUNK_SIZE):
+            cohort = self.build_cohort(
+                timeline,
+                event_index[start : start + COHORT_CHUNK_SIZE],
+                base_injury_mix,
+                warfare_patterns,
+                first_patient_id=start,
+            )
+            yield from self._materialize_cohort(cohort, timeline, event_days)
 
-    def _create_temporal_patient(
+    def build_cohort(
         self,
-        patient_id: int,
-        injury_timestamp: datetime.datetime,
-        warfare_type: str,
-        event_id: str,
-        is_mass_casualty: bool,
+        timeline: CasualtyTimeline,
+        event_index: np.ndarray,
         base_injury_mix: Dict[str, float],
-        warfare_patterns: Dict,
-        environmental_factors: List[str],
-    ) -> Patient:
-        """Create a patient with specific temporal characteristics"""
-
-        patient = Patient(patient_id)
-        patient.set_injury_timestamp(injury_timestamp)
+        warfare_patterns: Dict[str, Any],
+        first_patient_id: int = 0,
+    ) -> PatientCohort:
+        """
+        Draw every categorical attribute for a block of patients at once.
 
-        # Store temporal metadata
-        patient.warfare_scenario = warfare_type
-        patient.casualty_event_id = event_id
-        patient.is_mass_casualty = is_mass_casualty
-        patient.environmental_conditions = environmental_factors
+        Patients sharing a warfare type (and injury type, for triage and body
+        part) are drawn together from cached alias samplers, so the cost per
+        patient is a few array operations rather than a chain of scalar draws.
 
-        # Calculate day of injury
-        base_date = datetime.datetime.strptime(self._base_date_str, "%Y-%m-%d")
-        days_since_start = (injury_timestamp.date() - base_date.date()).days
-        patient.day_of_injury = f"Day {days_since_start + 1}"
+        Args:
+            timeline: Columnar casualty timeline
+            event_index: Event position for each patient, from expand_timeline
+            base_injury_mix: Base injury distribution used when warfare modifiers are off
+            warfare_patterns: warfare_patterns.json content
+            first_patient_id: ID assigned to the first patient in the block
+
+        Returns:
+            PatientCohort holding one entry per patient
+        """
+        count = len(event_index)
+        warfare_types = timeline.warfare_types[event_index]
 
-        # Use warfare modifiers if available (MILESTONE 4)
+        injury_types = np.empty(count, dtype=object)
+        primary_injuries = additional_injuries = severities = polytrauma = mass_casualty = None
         if self.use_warfare_modifiers and self.warfare_modifiers:
-            # Get injuries using warfare modifiers
-            injury_codes, severity, metadata = self.warfare_modifiers.get_injuries_for_scenario(warfare_type)
-
-            # Store injuries as primary conditions
-            patient.primary_conditions = []
-            for code in injury_codes:
-                # Map SNOMED codes to condition objects (simplified for now)
-                patient.primary_conditions.append(
-                    {
-                        "code": code,
-                        "name": self._get_injury_name(code),  # Helper method to get name
-                    }
+            primary_injuries = np.empty(count, dtype=object)
+            additional_injuries = {}
+            severities = np.zeros(count, dtype=int)
+            polytrauma = np.zeros(count, dtype=bool)
+            mass_casualty = np.zeros(count, dtype=bool)
+            for (warfare_type,), rows in group_indices(warfare_types).items():
+                batch = self.warfare_modifiers.get_injuries_for_scenario_batch(warfare_type, len(rows))
+                primary_injuries[rows] = batch.primary
+                severities[rows] = batch.severities
+                polytrauma[rows] = batch.polytrauma
+                mass_casualty[rows] = batch.mass_casualty
+                additional_injuries.update((int(rows[row]), codes) for row, codes in batch.additional.items())
+                default_type = "Battle Injury" if "combat" in warfare_type else "Non-Battle Injury"
+                injury_types[rows] = np.where(batch.polytrauma, "Polytrauma", default_type)
+        else:
+            for (warfare_type,), rows in group_indices(warfare_types).items():
+                injury_distribution = self._get_warfare_injury_distribution(
+                    warfare_type, base_injury_mix, warfare_patterns
                 )
-
-            # Set severity based on warfare pattern
-            patient.severity = severity
-
-            # Set injury type based on metadata
-            if metadata.get("polytrauma"):
-                patient.injury_type = "Polytrauma"
+                injury_types[rows] = self._draw_weighted(injury_distribution, len(rows))
+
+        # Warfare-specific triage distribution per (warfare type, injury type)
+        triage_categories = np.empty(count, dtype=object)
+        for (warfare_type, injury_type), rows in group_indices(warfare_types, injury_types).items():
+            triage_weights = self._get_warfare_triage_weights(warfare_type, injury_type, warfare_patterns)
+            triage_categories[rows] = self._draw_weighted(triage_weights, len(rows))
+
+        body_parts = np.empty(count, dtype=object)
+        for (injury_type,), rows in group_indices(injury_types).items():
+            body_part_dist = self._body_part_distribution(injury_type)
+            if get_sampler(body_part_dist, self._sampler_version):
+                body_parts[rows] = self._draw_weighted(body_part_dist, len(rows))
             else:
-                patient.injury_type = "Battle Injury" if "combat" in warfare_type else "Non-Battle Injury"
-
-            # Store metadata
-            patient.injury_metadata = metadata
-        else:
-            # Fallback to original method
-            injury_distribution = self._get_warfare_injury_distribution(warfare_type, base_injury_mix, warfare_patterns)
-            patient.injury_type = self._select_weighted_item(injury_distribution)
-
-        # Get warfare-specific triage distribution
-        triage_weights = self._get_warfare_triage_weights(warfare_type, patient.injury_type, warfare_patterns)
-        patient.triage_category = self._select_weighted_item(triage_weights)
-
-        # Assign body part based on injury type
-        patient.body_part = self._assign_body_part(patient.injury_type)
+                body_parts[rows] = np.random.choice(list(body_part_dist.keys()), len(rows))  # noqa: NPY002
+
+        genders = np.where(np.random.random(count) < 0.5, "male", "female").astype(object)  # noqa: NPY002
+        fronts, nationalities = self._draw_fronts_and_nationalities(count)
+
+        return PatientCohort(
+            patient_ids=np.arange(first_patient_id, first_patient_id + count),
+            event_index=event_index,
+            warfare_types=warfare_types,
+            injury_types=injury_types,
+            triage_categories=triage_categories,
+            body_parts=body_parts,
+            genders=genders,
+            fronts=fronts,
+            nationalities=nationalities,
+            primary_injuries=primary_injuries,
+            additional_injuries=additional_injuries,
+            severities=severities,
+            polytrauma=polytrauma,
+            mass_casualty=mass_casualty,
+        )
 
-        # Set demographics
-        patient.gender = random.choice(["male", "female"])
+    def _draw_fronts_and_nationalities(self, count: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Draw front and nationality for ``count`` patients; unassigned entries stay None."""
+        fronts = np.full(count, None, dtype=object)
+        nationalities = np.full(count, None, dtype=object)
+        static_front_defs = self.config_manager.get_static_front_definitions()
 
-        # Set front and nationality (using existing logic)
-        self._assign_front_and_nationality(patient)
+        if static_front_defs and not self.front_distribution:
+            front_distribution_static = {
+                front_def.name: front_def.ratio for front_def in static_front_defs if front_def.ratio > 0
+            }
+            if not front_distribution_static:
+                return fronts, nationalities
+
+            front_defs_by_name = {}
+            for front_def in static_front_defs:
+                front_defs_by_name.setdefault(front_def.name, front_def)
+
+            selected = self._draw_weighted(front_distribution_static, count)
+            for (front_name,), rows in group_indices(selected).items():
+                selected_front_def = front_defs_by_name.get(front_name)
+                if not selected_front_def:
+                    continue
+                fronts[rows] = selected_front_def.name
+                nat_dist_static = {
+                    nat_def.nationality_code: nat_def.percentage
+                    for nat_def in selected_front_def.nations
+                    if nat_def.percentage > 0
+                }
+                if nat_dist_static:
+                    nationalities[rows] = self._draw_weighted(nat_dist_static, len(rows))
+                else:
+                    nationalities[rows] = "N/A_FrontHasNoNations"
+        elif self.front_distribution:
+            front_ids = self._draw_weighted(self.front_distribution, count)
+            for (front_id,), rows in group_indices(front_ids).items():
+                selected_front_config_db = next((fc for fc in self.front_configs if fc["id"] == front_id), None)
+                if not selected_front_config_db:
+                    continue
+                fronts[rows] = selected_front_config_db.get("name", front_id)
+                weights_for_selection = {
+                    item["nationality_code"]: item["percentage"]
+                    for item in selected_front_config_db.get("nationality_distribution", [])
+                    if "nationality_code" in item and "percentage" in item and item["percentage"] > 0
+                }
+                if weights_for_selection:
+                    nationalities[rows] = self._draw_weighted(weights_for_selection, len(rows))
+
+        return fronts, nationalities
+
+    def _materialize_cohort(
+        self, cohort: PatientCohort, timeline: CasualtyTimeline, event_days: np.ndarray
+    ) -> Iterator[Patient]:
+        """Build Patient objects from a cohort's columns."""
+        injury_names: Dict[str, str] = {}
+        day_labels: Dict[int, str] = {}
+        event_pos_cached = -1
+        event = None
+        columns = zip(
+            cohort.patient_ids.tolist(),
+            cohort.event_index.tolist(),
+            cohort.injury_types.tolist(),
+            cohort.triage_categories.tolist(),
+            cohort.body_parts.tolist(),
+            cohort.genders.tolist(),
+            cohort.fronts.tolist(),
+            cohort.nationalities.tolist(),
+        )
+        if cohort.primary_injuries is not None:
+            primary_injuries = cohort.primary_injuries.tolist()
+            severities = cohort.severities.tolist()
+            polytrauma = cohort.polytrauma.tolist()
+            mass_casualty = cohort.mass_casualty.tolist()
+
+        for row, (patient_id, event_pos, injury_type, triage, body_part, gender, front, nationality) in enumerate(
+            columns
+        ):
+            # Patients of one event are adjacent, so each event object is built once
+            if event_pos != event_pos_cached:
+                event = timeline[event_pos]
+                event_pos_cached = event_pos
+                day = int(event_days[event_pos])
+                day_label = day_labels.get(day)
+                if day_label is None:
+                    day_label = day_labels[day] = f"Day {day + 1}"
+            patient = Patient(patient_id)
+            patient.set_injury_timestamp(event.timestamp)
+
+            # Store temporal metadata
+            patient.warfare_scenario = event.warfare_type
+            patient.casualty_event_id = event.event_id
+            patient.is_mass_casualty = event.is_mass_casualty
+            patient.environmental_conditions = event.environmental_factors
+            patient.day_of_injury = day_label
+
+            if cohort.primary_injuries is not None:
+                conditions = []
+                for code in [primary_injuries[row], *cohort.additional_injuries.get(row, ())]:
+                    name = injury_names.get(code)
+                    if name is None:
+                        name = injury_names[code] = self._get_injury_name(code)
+                    conditions.append({"code": code, "name": name})
+                patient.primary_conditions = conditions
+                patient.severity = severities[row]
+                patient.injury_metadata = self.warfare_modifiers.build_injury_metadata(
+                    event.warfare_type, polytrauma[row], len(conditions), mass_casualty[row]
+                )
 
-        # Add initial treatment at POI
-        patient.add_treatment(facility="POI", date=injury_timestamp, treatments=[], observations=[])
+            patient.injury_type = injury_type
+            patient.triage_category = triage
+            patient.body_part = body_part
+            patient.gender = gender
+            if front is not None:
+                patient.front = front
+            if nationality is not None:
+                patient.nationality = nationality
 
-        return patient
+            # Add initial treatment at POI
+            patient.add_treatment(facility="POI", date=event.timestamp, treatments=[], observations=[])
+            yield patient
 
     def _get_warfare_injury_distribution(
         self, warfare_type: str, base_mix: Dict[str, float], warfare_patterns: Dict
@@ -1272,60 +1555,16 @@ class PatientFlowSimulator:
         warfare_config = warfare_patterns["warfare_types"][warfare_type]
         return warfare_config["triage_weights"].get(injury_type, {"T1": 0.3, "T2": 0.4, "T3": 0.3})
 
-    def _assign_front_and_nationality(self, patient: Patient):
-        """Assign front and nationality to patient using existing logic"""
-        # This uses your existing front assignment logic
-        # Just extracted to a separate method for clarity
-
-        static_front_defs = self.config_manager.get_static_front_definitions()
-
-        if static_front_defs and not self.front_distribution:
-            # Existing static front logic...
-            front_distribution_static = {
-                front_def.name: front_def.ratio for front_def in static_front_defs if front_def.ratio > 0
-            }
-
-            if front_distribution_static:
-                selected_front_name = self._select_weighted_item(front_distribution_static)
-                selected_front_def = next(
-                    (fdef for fdef in static_front_defs if fdef.name == selected_front_name), None
-                )
-
-                if selected_front_def:
-                    patient.front = selected_front_def.name
-                    nat_dist_static = {
-                        nat_def.nationality_code: nat_def.percentage
-                        for nat_def in selected_front_def.nations
-                        if nat_def.percentage > 0
-                    }
-                    if nat_dist_static:
-                        patient.nationality = self._select_weighted_item(nat_dist_static)
-                    else:
-                        patient.nationality = "N/A_FrontHasNoNations"
-        elif self.front_distribution:
-            # Existing DB-based front logic...
-            front_id = self._select_weighted_item(self.front_distribution)
-            selected_front_config_db = next((fc for fc in self.front_configs if fc["id"] == front_id), None)
-
-            if selected_front_config_db:
-                patient.front = selected_front_config_db.get("name", front_id)
-                current_front_nat_dist_list = selected_front_config_db.get("nationality_distribution", [])
-                if current_front_nat_dist_list:
-                    weights_for_selection = {
-                        item["nationality_code"]: item["percentage"]
-                        for item in current_front_nat_dist_list
-                        if "nationality_code" in item and "percentage" in item and item["percentage"] > 0
-                    }
-                    if weights_for_selection:
-                        patient.nationality = self._select_weighted_item(weights_for_selection)
-
     def _simulate_flow_parallel(self, patients: List[Patient]):
         """Simulate patient flow in parallel batches"""
-        with concurrent.futures.ThreadPoolExecutor(max_workers=self.num_workers) as executor:
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.num_workers, thread_name_prefix=FLOW_WORKER_THREAD_PREFIX
+        ) as executor:
             patient_batches = [patients[i : i + self.batch_size] for i in range(0, len(patients), self.batch_size)]
 
             future_to_batch = {
-                executor.submit(self._simulate_patient_flow_batch, batch): batch for batch in patient_batches
+                executor.submit(contextvars.copy_context().run, self._simulate_patient_flow_batch, batch): batch
+                for batch in patient_batches
             }
 
             for future in concurrent.futures.as_completed(future_to_batch):
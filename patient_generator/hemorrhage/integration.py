@@ -5,11 +5,20 @@ Example usage and helper functions.
 
 from datetime import datetime
 import json
-from typing import Any, Dict, List, Optional
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
 
 from .body_regions import BodyRegion
 from .hemorrhage_model import HemorrhageCategory, HemorrhageModel, HemorrhageProfile
 
+# Circulating blood volume of an adult casualty (ml)
+INITIAL_BLOOD_VOLUME_ML = 5000
+
+# Fraction of the bleeding rate that remains once a tourniquet is applied
+TOURNIQUET_RESIDUAL_RATE = 0.05
+
 
 class HemorrhageIntegration:
     """Helper class to integrate hemorrhage modeling with patient generator."""
@@ -72,8 +81,117 @@ class HemorrhageIntegration:
 
         return hemorrhage_data
 
+    @staticmethod
+    def _loss_parameters(
+        profiles: Sequence[HemorrhageProfile], tourniquet_times: Optional[Sequence[Optional[float]]] = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Arrays describing each profile's blood loss.
+
+        Returns:
+            (base rate ml/min, per-minute progression k/60, first tourniquet minute or inf)
+        """
+        base = np.array([p.blood_loss_ml_per_min for p in profiles], dtype=float)
+        progression = np.array([p.k for p in profiles], dtype=float) / 60
+        tourniquet_minute = np.full(len(profiles), np.inf)
+        if tourniquet_times is not None:
+            for index, (profile, tourniquet_time) in enumerate(zip(profiles, tourniquet_times)):
+                if tourniquet_time is not None and profile.controllable:
+                    # Loss is stepped per minute, so the tourniquet takes effect from the next whole minute
+                    tourniquet_minute[index] = math.ceil(tourniquet_time)
+        return base, progression, tourniquet_minute
+
+    @staticmethod
+    def _cumulative_loss(
+        base: np.ndarray, progression: np.ndarray, tourniquet_minute: np.ndarray, minutes: np.ndarray
+    ) -> np.ndarray:
+        """
+        Blood lost after a number of elapsed minutes, in closed form.
+
+        Minute m loses base * (1 + progression * m) before the tourniquet and
+        base * TOURNIQUET_RESIDUAL_RATE after it. Summing the arithmetic series
+        gives the loss at whole minutes; within a minute the loss is linear.
+        All arguments broadcast against each other.
+        """
+        whole = np.floor(minutes)
+        untreated = np.minimum(whole, tourniquet_minute)
+        loss = base * (untreated + progression * untreated * (untreated - 1) / 2)
+        loss = loss + base * TOURNIQUET_RESIDUAL_RATE * np.maximum(whole - tourniquet_minute, 0)
+
+        rate = np.where(whole >= tourniquet_minute, base * TOURNIQUET_RESIDUAL_RATE, base * (1 + progression * whole))
+        return loss + (minutes - whole) * rate
+
+    def calculate_blood_volumes(
+        self,
+        profiles: Sequence[HemorrhageProfile],
+        query_minutes: Sequence[float],
+        tourniquet_times: Optional[Sequence[Optional[float]]] = None,
+    ) -> np.ndarray:
+        """
+        Blood volume of many hemorrhage profiles at arbitrary times.
+
+        Args:
+            profiles: Hemorrhage profiles
+            query_minutes: Minutes since injury to evaluate
+            tourniquet_times: Tourniquet time per profile (None for no tourniquet)
+
+        Returns:
+            Array of shape (len(profiles), len(query_minutes)) in ml, floored at 0
+        """
+        base, progression, tourniquet_minute = self._loss_parameters(profiles, tourniquet_times)
+        minutes = np.asarray(query_minutes, dtype=float)[np.newaxis, :]
+        loss = self._cumulative_loss(
+            base[:, np.newaxis], progression[:, np.newaxis], tourniquet_minute[:, np.newaxis], minutes
+        )
+        return np.maximum(INITIAL_BLOOD_VOLUME_ML - loss, 0.0)
+
+    def calculate_exsanguination_times(
+        self, profiles: Sequence[HemorrhageProfile], tourniquet_times: Optional[Sequence[Optional[float]]] = None
+    ) -> np.ndarray:
+        """
+        Minutes until each profile's blood volume reaches zero.
+
+        Args:
+            profiles: Hemorrhage profiles
+            tourniquet_times: Tourniquet time per profile (None for no tourniquet)
+
+        Returns:
+            Array of minutes since injury, inf where the patient never exsanguinates
+        """
+        base, progression, tourniquet_minute = self._loss_parameters(profiles, tourniquet_times)
+        volume = INITIAL_BLOOD_VOLUME_ML
+        times = np.full(len(profiles), np.inf)
+        bleeding = base > 0
+        if not bleeding.any():
+            return times
+
+        b, c, t_minute = base[bleeding], progression[bleeding], tourniquet_minute[bleeding]
+
+        # Whole minutes n before the loss reaches the volume: solve b*(n + c*n*(n-1)/2) = volume
+        with np.errstate(divide="ignore", invalid="ignore"):
+            quadratic = (-(1 - c / 2) + np.sqrt((1 - c / 2) ** 2 + 2 * c * volume / b)) / c
+        linear = volume / b
+        whole = np.floor(np.where(c > 0, quadratic, linear))
+
+        # Correct floating point error so that loss(whole) < volume <= loss(whole + 1)
+        whole = np.where(self._cumulative_loss(b, c, np.inf, whole) >= volume, whole - 1, whole)
+        whole = np.where(self._cumulative_loss(b, c, np.inf, whole + 1) < volume, whole + 1, whole)
+        remaining = volume - self._cumulative_loss(b, c, np.inf, whole)
+        untreated_time = whole + remaining / (b * (1 + c * whole))
+
+        # A tourniquet applied before that point leaves only the residual bleed
+        treated_loss = self._cumulative_loss(b, c, np.inf, np.minimum(t_minute, untreated_time))
+        treated_time = t_minute + (volume - treated_loss) / (b * TOURNIQUET_RESIDUAL_RATE)
+
+        times[bleeding] = np.where(untreated_time <= t_minute, untreated_time, treated_time)
+        return times
+
     def calculate_blood_volume_timeline(
-        self, hemorrhage_profile: HemorrhageProfile, duration_minutes: int = 60, tourniquet_time: Optional[int] = None
+        self,
+        hemorrhage_profile: HemorrhageProfile,
+        duration_minutes: int = 60,
+        tourniquet_time: Optional[int] = None,
+        step_minutes: int = 1,
     ) -> List[Dict]:
         """
         Calculate blood volume over time for a hemorrhage profile.
@@ -82,44 +200,37 @@ class HemorrhageIntegration:
             hemorrhage_profile: The hemorrhage profile
             duration_minutes: How long to simulate
             tourniquet_time: When tourniquet is applied (minutes from injury)
+            step_minutes: Emit every Nth minute to downsample the timeline
 
         Returns:
-            Timeline of blood volume changes
+            Timeline of blood volume changes, ending at exsanguination if it occurs
         """
-        timeline = []
-        initial_blood_volume = 5000  # ml
-        current_volume = initial_blood_volume
-
-        for minute in range(duration_minutes):
-            # Check if tourniquet applied
-            if tourniquet_time and minute >= tourniquet_time and hemorrhage_profile.controllable:
-                # Reduce bleeding by 95% with tourniquet
-                blood_loss_rate = hemorrhage_profile.blood_loss_ml_per_min * 0.05
-            else:
-                # Apply lethal triad progression
-                progression_factor = 1 + (hemorrhage_profile.k * minute / 60)
-                blood_loss_rate = hemorrhage_profile.blood_loss_ml_per_min * progression_factor
-
-            # Calculate volume loss
-            current_volume -= blood_loss_rate
-            current_volume = max(0, current_volume)
-
-            # Record state
-            timeline.append(
-                {
-                    "minute": minute,
-                    "blood_volume_ml": current_volume,
-                    "blood_volume_percent": (current_volume / initial_blood_volume) * 100,
-                    "blood_loss_rate": blood_loss_rate,
-                    "status": self._get_hemorrhage_status(current_volume / initial_blood_volume),
-                }
-            )
+        base, progression, tourniquet_minute = self._loss_parameters([hemorrhage_profile], [tourniquet_time])
+        minutes = np.arange(0, duration_minutes, step_minutes)
 
-            # Stop if exsanguinated
-            if current_volume <= 0:
-                break
+        # Entry for minute m records the volume once that minute's loss has occurred
+        volumes = np.maximum(
+            INITIAL_BLOOD_VOLUME_ML - self._cumulative_loss(base, progression, tourniquet_minute, minutes + 1), 0.0
+        )
+        rates = np.where(
+            minutes >= tourniquet_minute, base * TOURNIQUET_RESIDUAL_RATE, base * (1 + progression * minutes)
+        )
 
-        return timeline
+        # Stop at the first entry where the patient has exsanguinated
+        depleted = np.flatnonzero(volumes <= 0)
+        if len(depleted):
+            minutes, volumes, rates = (a[: depleted[0] + 1] for a in (minutes, volumes, rates))
+
+        return [
+            {
+                "minute": int(minute),
+                "blood_volume_ml": float(volume),
+                "blood_volume_percent": (volume / INITIAL_BLOOD_VOLUME_ML) * 100,
+                "blood_loss_rate": float(rate),
+                "status": self._get_hemorrhage_status((volume / INITIAL_BLOOD_VOLUME_ML) * 100),
+            }
+            for minute, volume, rate in zip(minutes, volumes, rates)
+        ]
 
     def get_treatment_priority(self, hemorrhage_data: Dict) -> str:
         """
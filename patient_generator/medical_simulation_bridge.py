@@ -4,7 +4,6 @@ Enhances patient generation with realistic medical simulation.
 """
 
 from datetime import datetime, timedelta
-import json
 import os
 import random
 import time
@@ -13,6 +12,8 @@ from typing import Any, Dict, List, Optional
 from medical_simulation.patient_flow_orchestrator import PatientFlowOrchestrator, PatientState
 from medical_simulation.treatment_protocols import FacilityLevel, TreatmentProtocolManager
 from patient_generator.patient import Patient
+from patient_generator.reference_data import load_reference
+from patient_generator.treatment_catalog import get_treatment_catalog
 from patient_generator.treatment_utility_model import TreatmentUtilityModel
 
 
@@ -34,9 +35,7 @@ class MedicalSimulationBridge:
         self.enabled = os.environ.get("ENABLE_MEDICAL_SIMULATION", "true").lower() == "true"
 
         # Load realistic evacuation and transit times
-        evac_times_path = os.path.join(os.path.dirname(__file__), "evacuation_transit_times.json")
-        with open(evac_times_path) as f:
-            self.timing_config = json.load(f)
+        self.timing_config = load_reference("evacuation_transit_times.json")
 
         # Initialize treatment utility model independently (works with or without medical simulation)
         self.utility_model_enabled = os.environ.get("ENABLE_TREATMENT_UTILITY_MODEL", "true").lower() == "true"
@@ -45,6 +44,12 @@ class MedicalSimulationBridge:
         # Initialize treatment protocol manager
         self.protocol_manager = TreatmentProtocolManager()
 
+        # Field emergency treatments are only applied at the point of injury
+        self.catalog = get_treatment_catalog()
+        self.poi_only_mask = self.catalog.mask_of(
+            ["tourniquet", "pressure_bandage", "hemostatic_agent", "hemostatic_gauze"]
+        )
+
         # Track conversions for batch operations
         self.patient_mapping = {}  # Maps patient_generator ID to medical_sim ID
 
@@ -103,6 +108,9 @@ class MedicalSimulationBridge:
         # Apply simulation results back to original patient
         self._apply_simulation_results(patient, sim_patient_id)
 
+        # Patient has left the simulated chain; drop per-patient diagnostic state
+        self.orchestrator.end_diagnostic_session(sim_patient_id)
+
         # Update metrics
         elapsed = time.time() - start_time
         self.metrics["total_enhanced"] += 1
@@ -521,20 +529,14 @@ class MedicalSimulationBridge:
         else:
             base_time = datetime.now()
 
-        # Get sim_patient to check already applied treatments
+        # Get sim_patient to check already applied treatments (catalog bitmask)
         sim_patient = None
-        already_applied = set()
+        already_applied = 0
         if patient and hasattr(patient, "id"):
             sim_patient_id = f"sim_{patient.id}"
             sim_patient = self.orchestrator.patients.get(sim_patient_id) if hasattr(self, "orchestrator") else None
-
-            # Track what's already been applied
-            if sim_patient and hasattr(sim_patient, "treatments_received"):
-                for treatment in sim_patient.treatments_received:
-                    if isinstance(treatment, dict):
-                        treatment_name = treatment.get("name", treatment.get("treatment"))
-                        if treatment_name:
-                            already_applied.add(treatment_name)
+            if sim_patient:
+                already_applied = sim_patient.applied_treatment_mask
 
         # Try protocol-based treatment first
         if patient:
@@ -575,18 +577,15 @@ class MedicalSimulationBridge:
                 body_part=body_part,
             )
 
-            # Define POI-only treatments (field emergency treatments)
-            poi_only_treatments = {"tourniquet", "pressure_bandage", "hemostatic_agent", "hemostatic_gauze"}
+            # Skip already applied treatments, and POI-only treatments at medical facilities
+            excluded = already_applied
+            if facility_str not in ["POI", "point_of_injury"]:
+                excluded |= self.poi_only_mask
 
             if treatments:
                 filtered_treatments = []
                 for treatment_name in treatments[:3]:  # Limit to 3 treatments
-                    # Skip if already applied
-                    if treatment_name in already_applied:
-                        continue
-
-                    # Skip POI-only treatments at medical facilities
-                    if treatment_name in poi_only_treatments and facility_str not in ["POI", "point_of_injury"]:
+                    if self.catalog.bit_of(treatment_name) & excluded:
                         continue
 
                     filtered_treatments.append(
@@ -630,7 +629,7 @@ class MedicalSimulationBridge:
                 # Filter out already applied treatments
                 filtered_treatments = []
                 for treatment in potential_treatments:
-                    if treatment["name"] not in already_applied:
+                    if not self.catalog.bit_of(treatment["name"]) & already_applied:
                         filtered_treatments.append(treatment)
 
                 if filtered_treatments:
@@ -638,7 +637,7 @@ class MedicalSimulationBridge:
                     return filtered_treatments
 
         # Default treatment - only if not already applied
-        if "pressure_bandage" not in already_applied:
+        if not self.catalog.bit_of("pressure_bandage") & already_applied:
             self.metrics["fallback_used"] += 1
             return [{"name": "pressure_bandage", "applied_at": base_time}]
 
@@ -0,0 +1,253 @@
+"""
+Memory-budget-driven batch sizing
+=================================
+
+Sizes generation batches from the memory a configuration actually uses per
+patient, instead of a flat estimate. The controller watches process RSS
+against the job memory limit: batches shrink as RSS approaches it, and close
+to it the generation loop waits briefly (after a garbage collection) so
+written patients can be freed, rather than running into the limit.
+
+Bytes per patient start from a conservative estimate and are replaced by
+measurements as soon as a batch of retained patients has been created;
+medical simulation makes patients several times larger than plain ones.
+RSS is process-wide, so a batch measured while another generation run was
+active in the process is not counted.
+
+Usage:
+    budget = MemoryBudgetController()
+    with budget.running():
+        checkpoint = budget.checkpoint()
+        patients = create_patients(budget.batch_size())
+        budget.observe_since(len(patients), checkpoint)
+        await budget.throttle()  # in async loops, between batches
+"""
+
+import asyncio
+from collections import deque
+from contextlib import contextmanager
+import gc
+import logging
+import os
+import threading
+import time
+from typing import Any, Deque, Dict, Iterator, Optional, Tuple
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOB_MAX_MEMORY_MB = 512  # same default as JobResourceManager
+DEFAULT_BYTES_PER_PATIENT = 50 * 1024  # estimate until a batch has been measured
+MIN_BATCH_SIZE = 10
+MAX_BATCH_SIZE = 500
+SOFT_LIMIT = 0.8  # budget fraction above which batches are sized from the remaining headroom only
+BACKPRESSURE_LIMIT = 0.9  # budget fraction above which the generation loop waits
+BACKPRESSURE_INTERVAL = 0.05  # seconds between RSS checks while waiting
+BACKPRESSURE_MAX_WAIT = 2.0  # longest wait per batch; generation then continues at the minimum batch size
+MEASUREMENT_WEIGHT = 0.5  # weight of a new measurement in the bytes-per-patient average
+BATCH_HISTORY_SIZE = 50  # most recent batch size changes kept for telemetry
+
+
+def memory_budget_bytes() -> int:
+    """
+    Process memory budget for generation.
+
+    The job memory limit JobResourceManager enforces: JOB_MAX_MEMORY_MB,
+    512 MB by default.
+    """
+    return int(os.environ.get("JOB_MAX_MEMORY_MB", str(DEFAULT_JOB_MAX_MEMORY_MB))) * 1024 * 1024
+
+
+class _GenerationRuns:
+    """Generation runs active in this process, so RSS growth can be attributed."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.active = 0
+        self.started = 0
+
+    def enter(self):
+        with self._lock:
+            self.active += 1
+            self.started += 1
+
+    def exit(self):
+        with self._lock:
+            self.active -= 1
+
+    def exclusive(self) -> Optional[int]:
+        """Runs started so far when this is the only active run, else None."""
+        with self._lock:
+            return self.started if self.active <= 1 else None
+
+
+_runs = _GenerationRuns()
+
+
+class MemoryBudgetController:
+    """
+    Chooses batch sizes that keep process RSS inside a memory budget.
+
+    Safe to use from worker threads; the async throttle() is for the event loop.
+    """
+
+    def __init__(
+        self,
+        budget_bytes: Optional[int] = None,
+        min_batch_size: int = MIN_BATCH_SIZE,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        bytes_per_patient: int = DEFAULT_BYTES_PER_PATIENT,
+    ):
+        self.budget_bytes = budget_bytes if budget_bytes is not None else memory_budget_bytes()
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max_batch_size
+        self.bytes_per_patient = float(bytes_per_patient)
+        self.measured = False
+        self.peak_rss = 0
+        self.backpressure_waits = 0
+        self.backpressure_seconds = 0.0
+        self.batches = 0
+        self.shared_measurements = 0  # batches not measured because another run was active
+        self.batch_sizes: Deque[int] = deque(maxlen=BATCH_HISTORY_SIZE)  # sizes, recorded when they change
+        self.smallest_batch: Optional[int] = None
+        self.largest_batch: Optional[int] = None
+        self._process = psutil.Process()
+        self._lock = threading.Lock()
+
+    def rss(self) -> int:
+        """Current process RSS in bytes."""
+        rss = self._process.memory_info().rss
+        self.peak_rss = max(self.peak_rss, rss)
+        return rss
+
+    def pressure(self, rss: Optional[int] = None) -> float:
+        """RSS as a fraction of the budget."""
+        return (rss if rss is not None else self.rss()) / self.budget_bytes
+
+    def observe(self, patients: int, bytes_delta: int):
+        """
+        Record the memory retained by a batch of patients.
+
+        Batches that did not grow RSS (the allocator reused freed memory)
+        carry no information and are ignored.
+        """
+        if patients <= 0 or bytes_delta <= 0:
+            return
+        measured = bytes_delta / patients
+        with self._lock:
+            if self.measured:
+                measured = MEASUREMENT_WEIGHT * measured + (1 - MEASUREMENT_WEIGHT) * self.bytes_per_patient
+            self.bytes_per_patient = measured
+            self.measured = True
+
+    @contextmanager
+    def running(self) -> Iterator["MemoryBudgetController"]:
+        """Mark a generation run, so concurrent runs don't take its RSS growth as their own."""
+        _runs.enter()
+        try:
+            yield self
+        finally:
+            _runs.exit()
+
+    def checkpoint(self) -> Tuple[int, Optional[int]]:
+        """RSS and run counter at the start of a batch, for observe_since()."""
+        return self.rss(), _runs.exclusive()
+
+    def observe_since(self, patients: int, checkpoint: Tuple[int, Optional[int]]):
+        """
+        Record a batch measured from a checkpoint.
+
+        Ignored when another generation run was active at any point since the
+        checkpoint, because the RSS growth then includes that run's memory.
+        """
+        rss_before, started = checkpoint
+        if started is None or _runs.exclusive() != started:
+            with self._lock:
+                self.shared_measurements += 1
+            return
+        self.observe(patients, self.rss() - rss_before)
+
+    def batch_size(self, limit: Optional[int] = None) -> int:
+        """
+        Patients to handle in the next batch.
+
+        Args:
+            limit: Upper bound from the caller, e.g. patients left or a per-worker share
+
+        Returns:
+            A size between the minimum and maximum batch size (or limit, if lower)
+        """
+        rss = self.rss()
+        headroom = self.budget_bytes * SOFT_LIMIT - rss
+        if headroom <= 0:
+            size = self.min_batch_size
+        else:
+            size = int(headroom / self.bytes_per_patient)
+        size = max(self.min_batch_size, min(size, self.max_batch_size))
+        if limit is not None:
+            size = max(1, min(size, limit))
+
+        with self._lock:
+            self.batches += 1
+            if not self.batch_sizes or self.batch_sizes[-1] != size:
+                self.batch_sizes.append(size)
+            self.smallest_batch = size if self.smallest_batch is None else min(self.smallest_batch, size)
+            self.largest_batch = size if self.largest_batch is None else max(self.largest_batch, size)
+        return size
+
+    def _over_limit(self) -> bool:
+        return self.pressure() > BACKPRESSURE_LIMIT
+
+    def _record_wait(self, started: float):
+        with self._lock:
+            self.backpressure_waits += 1
+            self.backpressure_seconds += time.monotonic() - started
+
+    def _backpressure(self) -> Iterator[float]:
+        """
+        Intervals to sleep while RSS is above the backpressure limit.
+
+        Collects garbage first and stops after BACKPRESSURE_MAX_WAIT: the job
+        slows down under memory pressure but is never failed here.
+        """
+        if not self._over_limit():
+            return
+        started = time.monotonic()
+        gc.collect()
+        try:
+            while self._over_limit() and time.monotonic() - started < BACKPRESSURE_MAX_WAIT:
+                yield BACKPRESSURE_INTERVAL
+        finally:
+            self._record_wait(started)
+
+    async def throttle(self) -> int:
+        """Wait while RSS is above the backpressure limit, then size the next batch."""
+        for interval in self._backpressure():
+            await asyncio.sleep(interval)
+        return self.batch_size()
+
+    def throttle_sync(self) -> int:
+        """Blocking throttle() for worker threads."""
+        for interval in self._backpressure():
+            time.sleep(interval)
+        return self.batch_size()
+
+    def telemetry(self) -> Dict[str, Any]:
+        """Budget, measured cost per patient and the batch sizes chosen so far."""
+        with self._lock:
+            return {
+                "budget_mb": round(self.budget_bytes / 1024 / 1024, 1),
+                "bytes_per_patient": int(self.bytes_per_patient),
+                "bytes_per_patient_measured": self.measured,
+                "shared_measurements": self.shared_measurements,
+                "batches": self.batches,
+                "batch_sizes": list(self.batch_sizes),
+                "current_batch_size": self.batch_sizes[-1] if self.batch_sizes else None,
+                "smallest_batch_size": self.smallest_batch,
+                "largest_batch_size": self.largest_batch,
+                "peak_rss_mb": round(self.peak_rss / 1024 / 1024, 1),
+                "peak_pressure": round(self.peak_rss / self.budget_bytes, 3),
+                "backpressure_waits": self.backpressure_waits,
+                "backpressure_seconds": round(self.backpressure_seconds, 3),
+            }
@@ -3,6 +3,8 @@ import json
 import os
 from typing import Any, Dict, List, Optional
 
+from .reference_data import load_reference
+
 # Assuming schemas_config.py contains NationalityConfig Pydantic model
 # from .schemas_config import NationalityConfig # Not strictly needed for this data provider class itself
 
@@ -48,8 +50,7 @@ class NationalityDataProvider:
             raise FileNotFoundError(msg)
 
         try:
-            with open(data_file_path, encoding="utf-8") as f:
-                self._data = json.load(f).get("NATO_NATIONS", {})
+            self._data = load_reference(data_file_path).get("NATO_NATIONS", {})
             print(f"Successfully loaded demographics data from {data_file_path}")
         except FileNotFoundError:
             print(f"Error: Demographics data file not found at {data_file_path}.")
@@ -6,11 +6,17 @@ Minimal overhead performance monitoring with CLI-friendly output.
 Designed for identifying bottlenecks in patient generation pipeline.
 """
 
-from contextlib import contextmanager
+import bisect
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
 from dataclasses import dataclass
+import functools
+import importlib
+import itertools
+import os
 import threading
 import time
-from typing import Dict, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 import psutil
 
@@ -50,6 +56,216 @@ class PhaseMetrics:
         return self.peak_memory / (1024 * 1024)
 
 
+# Name prefix of the PatientFlowSimulator worker threads, so stack samplers can
+# tell them apart (defined here so samplers need not import the simulation stack)
+FLOW_WORKER_THREAD_PREFIX = "patient-flow"
+
+# Upper bounds (seconds) of the per-call histogram kept for every stage
+STAGE_TIME_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class _StageTimer:
+    """Times one block for StageTimes.time(); cheaper than a generator-based context manager."""
+
+    __slots__ = ("_calls", "_scale", "_stage", "_start", "_times")
+
+    def __init__(self, times: "StageTimes", stage: str, calls: int, scale: int):
+        self._times = times
+        self._stage = stage
+        self._calls = calls
+        self._scale = scale
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self._start
+        self._times.add(self._stage, elapsed * self._scale, self._calls * self._scale)
+
+
+class StageTimes:
+    """
+    Wall time accumulated per pipeline stage, with a per-call histogram.
+
+    Safe to update from the simulator's worker threads. Stages timed in bulk
+    (e.g. a whole cohort created at once) record the number of patients they
+    covered as their call count, so per-patient costs stay comparable. With
+    ``sample_every`` > 1 only every Nth call of a stage is timed and counted
+    N times, so totals remain estimates of the full cost.
+    """
+
+    def __init__(self, sample_every: int = 1):
+        self.sample_every = max(1, sample_every)
+        self._lock = threading.Lock()
+        self._seconds: Dict[str, float] = {}
+        self._calls: Dict[str, int] = {}
+        self._buckets: Dict[str, List[int]] = {}
+        self._tickets: Dict[str, Iterator[int]] = {}
+
+    def add(self, stage: str, seconds: float, calls: int = 1):
+        """Record time spent in a stage."""
+        bucket = bisect.bisect_left(STAGE_TIME_BUCKETS, seconds / calls if calls else seconds)
+        with self._lock:
+            self._seconds[stage] = self._seconds.get(stage, 0.0) + seconds
+            self._calls[stage] = self._calls.get(stage, 0) + calls
+            counts = self._buckets.get(stage)
+            if counts is None:
+                counts = self._buckets[stage] = [0] * (len(STAGE_TIME_BUCKETS) + 1)
+            counts[bucket] += calls
+
+    def time(self, stage: str, calls: int = 1):
+        """Context manager that adds the wall time of its block to a stage."""
+        if self.sample_every > 1:
+            # Each stage samples on its own counter so stages never fall out of phase
+            ticket = self._tickets.get(stage)
+            if ticket is None:
+                ticket = self._tickets.setdefault(stage, itertools.count())
+            if next(ticket) % self.sample_every:
+                return nullcontext()
+        return _StageTimer(self, stage, calls, self.sample_every)
+
+    def merge(self, other: "StageTimes"):
+        """Add another set of stage times into this one."""
+        with other._lock:
+            seconds = dict(other._seconds)
+            calls = dict(other._calls)
+            buckets = {stage: list(counts) for stage, counts in other._buckets.items()}
+        with self._lock:
+            for stage, value in seconds.items():
+                self._seconds[stage] = self._seconds.get(stage, 0.0) + value
+                self._calls[stage] = self._calls.get(stage, 0) + calls[stage]
+                counts = self._buckets.setdefault(stage, [0] * (len(STAGE_TIME_BUCKETS) + 1))
+                for i, count in enumerate(buckets[stage]):
+                    counts[i] += count
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Return {stage: {"seconds", "calls", "buckets"}}.
+
+        ``buckets`` holds per-call counts for each bound in STAGE_TIME_BUCKETS
+        plus a final overflow bucket (not cumulative).
+        """
+        with self._lock:
+            return {
+                stage: {"seconds": seconds, "calls": self._calls[stage], "buckets": list(self._buckets[stage])}
+                for stage, seconds in self._seconds.items()
+            }
+
+
+# Timer modes: "off" times nothing, "stages" times pipeline stages, "all" also
+# times the simulation hot paths below. Switchable at runtime with configure_timers().
+TIMER_MODES = ("off", "stages", "all")
+
+# Simulation calls timed in "all" mode: (stage, module, class, method)
+HOT_PATH_CALLS = (
+    ("enhance_patient", "patient_generator.medical_simulation_bridge", "MedicalSimulationBridge", "enhance_patient"),
+    (
+        "simulate_deterioration",
+        "medical_simulation.patient_flow_orchestrator",
+        "PatientFlowOrchestrator",
+        "simulate_deterioration",
+    ),
+    ("get_next_facility", "patient_generator.evacuation_time_manager", "EvacuationTimeManager", "get_next_facility"),
+    ("get_next_facility", "patient_generator.facility_markov_chain", "FacilityMarkovChain", "get_next_facility"),
+    ("to_dict", "patient_generator.patient", "Patient", "to_dict"),
+)
+
+# Stage times of the job running in the current context; hot-path wrappers
+# record into it (asyncio.to_thread carries it into worker threads)
+current_stage_times: ContextVar[Optional[StageTimes]] = ContextVar("current_stage_times", default=None)
+
+_timer_mode = os.environ.get("PIPELINE_TIMERS", "stages")
+_timer_sample_every = max(1, int(os.environ.get("PIPELINE_TIMER_SAMPLE", "1")))
+_hot_path_originals: Dict[Tuple[type, str], Callable] = {}
+_hot_path_lock = threading.Lock()
+
+
+def _timed_call(stage: str, func: Callable) -> Callable:
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        stage_times = current_stage_times.get()
+        if stage_times is None:
+            return func(*args, **kwargs)
+        with stage_times.time(stage):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def _install_hot_path_timers():
+    with _hot_path_lock:
+        if _hot_path_originals:
+            return
+        for stage, module_name, class_name, method in HOT_PATH_CALLS:
+            try:
+                cls = getattr(importlib.import_module(module_name), class_name)
+            except (ImportError, AttributeError):
+                continue
+            original = cls.__dict__.get(method)
+            if original is None:
+                continue
+            _hot_path_originals[(cls, method)] = original
+            setattr(cls, method, _timed_call(stage, original))
+
+
+def _remove_hot_path_timers():
+    with _hot_path_lock:
+        for (cls, method), original in _hot_path_originals.items():
+            setattr(cls, method, original)
+        _hot_path_originals.clear()
+
+
+def configure_timers(mode: Optional[str] = None, sample_every: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Switch pipeline timers at runtime; applies to jobs started afterwards.
+
+    Hot-path wrappers are removed as soon as the mode leaves "all", so the
+    simulation runs unwrapped; they are installed by the next job in "all"
+    mode, once the simulation stack is loaded.
+
+    Args:
+        mode: One of TIMER_MODES
+        sample_every: Time every Nth call of each stage (1 times every call)
+
+    Returns:
+        The resulting timer settings
+    """
+    global _timer_mode, _timer_sample_every
+    if mode is not None:
+        if mode not in TIMER_MODES:
+            msg = f"Unknown timer mode: {mode}"
+            raise ValueError(msg)
+        _timer_mode = mode
+        if mode != "all":
+            _remove_hot_path_timers()
+    if sample_every is not None:
+        if sample_every < 1:
+            msg = "sample_every must be at least 1"
+            raise ValueError(msg)
+        _timer_sample_every = sample_every
+    return timer_settings()
+
+
+def timer_settings() -> Dict[str, Any]:
+    """Current timer mode and sampling rate."""
+    return {
+        "mode": _timer_mode,
+        "sample_every": _timer_sample_every,
+        "hot_paths_installed": bool(_hot_path_originals),
+    }
+
+
+def new_stage_times() -> Optional[StageTimes]:
+    """Stage times for a new job under the current settings, or None when timers are off."""
+    if _timer_mode == "off":
+        return None
+    if _timer_mode == "all":
+        _install_hot_path_timers()
+    return StageTimes(_timer_sample_every)
+
+
 class PerformanceMonitor:
     """
     Ultra-simple performance monitor for patient generator.
@@ -62,9 +278,11 @@ class PerformanceMonitor:
         monitor.report()  # Print CLI-friendly report
     """
 
-    def __init__(self, enabled: bool = True):
+    def __init__(self, enabled: bool = True, stage_times: Optional[StageTimes] = None):
         self.enabled = enabled
         self.metrics: Dict[str, PhaseMetrics] = {}
+        # Pipeline stage times of finished jobs, accumulated process-wide
+        self.stage_times = stage_times if stage_times is not None else StageTimes()
         self.process = psutil.Process()
         self.overall_start_time = time.time()
         self.overall_start_memory = self.process.memory_info().rss
@@ -105,6 +323,10 @@ class PerformanceMonitor:
             except Exception:
                 phase.peak_memory = phase.end_memory
 
+    def record_stage_times(self, stage_times: StageTimes):
+        """Add a finished job's stage times to the process-wide totals."""
+        self.stage_times.merge(stage_times)
+
     def update_patient_count(self, phase_name: str, count: int):
         """Update patient count for a phase (useful for dynamic counting)."""
         if phase_name in self.metrics:
@@ -186,6 +408,12 @@ class PerformanceMonitor:
         else:
             analysis.append("• Throughput: All phases performing well")
 
+        stages = self.stage_times.snapshot()
+        if stages:
+            slowest_stage, data = max(stages.items(), key=lambda item: item[1]["seconds"])
+            per_call_ms = data["seconds"] / data["calls"] * 1000 if data["calls"] else 0.0
+            analysis.append(f"• Costliest Stage: {slowest_stage} ({data['seconds']:.2f}s, {per_call_ms:.3f}ms/call)")
+
         return "\n".join(analysis)
 
 
@@ -204,7 +432,8 @@ def get_monitor() -> PerformanceMonitor:
 def enable_monitoring():
     """Enable performance monitoring globally."""
     global _global_monitor
-    _global_monitor = PerformanceMonitor(enabled=True)
+    stage_times = _global_monitor.stage_times if _global_monitor else None
+    _global_monitor = PerformanceMonitor(enabled=True, stage_times=stage_times)
 
 
 def disable_monitoring():
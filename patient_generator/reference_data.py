@@ -0,0 +1,236 @@
+"""
+Reference Data Registry
+Parse-once, read-only access to the static JSON tables shipped with the generator
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+Validator = Callable[[Any], Any]
+Listener = Callable[[str, str], None]
+
+
+def _read_only(self, *args, **kwargs):
+    msg = f"{type(self).__name__} reference data is read-only; use thaw() for a mutable copy"
+    raise TypeError(msg)
+
+
+class FrozenDict(dict):
+    """Dict whose mutating methods raise TypeError. JSON-serializable and picklable."""
+
+    __slots__ = ()
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+    def __copy__(self) -> Dict[str, Any]:
+        return dict(self)
+
+    def __deepcopy__(self, memo) -> Dict[str, Any]:
+        return thaw(self)
+
+
+class FrozenList(list):
+    """List whose mutating methods raise TypeError. JSON-serializable and picklable."""
+
+    __slots__ = ()
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = extend = insert = pop = remove = clear = sort = reverse = _read_only
+
+    def __reduce__(self):
+        return (FrozenList, (list(self),))
+
+    def __copy__(self) -> List[Any]:
+        return list(self)
+
+    def __deepcopy__(self, memo) -> List[Any]:
+        return thaw(self)
+
+
+def freeze(value: Any) -> Any:
+    """Recursively convert parsed JSON into FrozenDict/FrozenList views"""
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return FrozenList(freeze(item) for item in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Recursively copy a frozen view back into plain, mutable dicts and lists"""
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [thaw(item) for item in value]
+    return value
+
+
+def strip_comments(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop top-level ``_comment``-style keys, as the JSON files use them for notes"""
+    return {key: value for key, value in data.items() if not key.startswith("_")}
+
+
+class _Entry:
+    __slots__ = ("data", "digest", "mtime_ns", "size")
+
+    def __init__(self, data: Any, digest: str, mtime_ns: int, size: int):
+        self.data = data
+        self.digest = digest
+        self.mtime_ns = mtime_ns
+        self.size = size
+
+
+class ReferenceDataRegistry:
+    """
+    Process-wide cache of parsed reference files.
+
+    Each file is parsed and validated once and handed out as a frozen view.
+    Every lookup stats the file; when its mtime or size changes the content
+    hash is compared and the file is only re-parsed if the bytes differ, so
+    files rewritten at runtime (e.g. injuries.json by the generation API) are
+    picked up on the next lookup.
+
+    Listeners receive ``(event, path)`` with event one of "hit", "miss" or
+    "reload", which is how the API exports the counters to Prometheus.
+    """
+
+    def __init__(self, base_dir: str = PACKAGE_DIR):
+        self.base_dir = base_dir
+        self._entries: Dict[Tuple[str, Optional[Validator]], _Entry] = {}
+        self._lock = threading.Lock()
+        self._listeners: List[Listener] = []
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def resolve(self, name: Union[str, "os.PathLike[str]"]) -> str:
+        """Absolute path for a file name relative to the package, or an explicit path"""
+        path = os.fspath(name)
+        if not Path(path).is_absolute():
+            path = os.path.join(self.base_dir, path)
+        return os.path.normpath(path)
+
+    def add_listener(self, listener: Listener):
+        """Register a callback for hit/miss/reload events"""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def _notify(self, event: str, path: str):
+        for listener in self._listeners:
+            listener(event, path)
+
+    def get(self, name: Union[str, "os.PathLike[str]"], validator: Optional[Validator] = None) -> Any:
+        """
+        Return the frozen content of a reference file.
+
+        Args:
+            name: File name inside patient_generator/, or any path
+            validator: Optional callable applied once to the parsed JSON; it may
+                raise to reject the file or return a transformed value
+
+        Returns:
+            FrozenDict/FrozenList view of the (validated) content
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+            json.JSONDecodeError: If the file is not valid JSON
+        """
+        path = self.resolve(name)
+        key = (path, validator)
+        stat = Path(path).stat()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+                self.hits += 1
+                event = "hit"
+            else:
+                event = None
+        if event:
+            self._notify(event, path)
+            return entry.data
+
+        parsed = None
+        source = self._entries.get((path, None)) if validator is not None else None
+        if source is not None and source.mtime_ns == stat.st_mtime_ns and source.size == stat.st_size:
+            # Validate from content already parsed (or seeded from a snapshot)
+            digest = source.digest
+            parsed = thaw(source.data)
+        else:
+            with open(path, "rb") as f:
+                raw = f.read()
+            digest = hashlib.sha256(raw).hexdigest()
+
+        if entry is not None and entry.digest == digest:
+            # Touched but unchanged; keep the parsed view
+            data = entry.data
+            event = "hit"
+        else:
+            if parsed is None:
+                parsed = json.loads(raw)
+            if validator is not None:
+                parsed = validator(parsed)
+            data = freeze(parsed)
+            event = "miss" if entry is None else "reload"
+
+        with self._lock:
+            self._entries[key] = _Entry(data, digest, stat.st_mtime_ns, stat.st_size)
+            if event == "hit":
+                self.hits += 1
+            elif event == "miss":
+                self.misses += 1
+            else:
+                self.reloads += 1
+        self._notify(event, path)
+        return data
+
+    def seed(self, name: Union[str, "os.PathLike[str]"], data: Any, digest: str, mtime_ns: int, size: int):
+        """
+        Install already-parsed content for a file without reading it.
+
+        Used to load a compiled snapshot; the entry is checked against the
+        file's stat like any other, so a seeded table that no longer matches
+        the file on disk is simply reloaded.
+        """
+        path = self.resolve(name)
+        entry = _Entry(freeze(data), digest, mtime_ns, size)
+        with self._lock:
+            self._entries[(path, None)] = entry
+
+    def get_mutable(self, name: Union[str, "os.PathLike[str]"], validator: Optional[Validator] = None) -> Any:
+        """Return a private, mutable deep copy of a reference file's content"""
+        return thaw(self.get(name, validator))
+
+    def invalidate(self, name: Optional[Union[str, "os.PathLike[str]"]] = None):
+        """Forget one file, or every file if no name is given"""
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+                return
+            path = self.resolve(name)
+            for key in [key for key in self._entries if key[0] == path]:
+                del self._entries[key]
+
+
+_registry = ReferenceDataRegistry()
+
+
+def get_reference_registry() -> ReferenceDataRegistry:
+    """Get the process-wide reference data registry"""
+    return _registry
+
+
+def load_reference(name: Union[str, "os.PathLike[str]"], validator: Optional[Validator] = None) -> Any:
+    """Shortcut for ``get_reference_registry().get(name, validator)``"""
+    return _registry.get(name, validator)
@@ -0,0 +1,276 @@
+"""
+Reference Snapshot
+Compiled, versioned binary snapshot of the static reference tables
+
+All JSON reference tables are compiled into one file that is memory-mapped
+and decoded with ``marshal`` (C-speed, restricted to plain data types, no
+pickle). A manifest records each source file's size, mtime and SHA-256, and
+the payload carries its own checksum, so a stale or damaged snapshot is
+detected on load and rebuilt from the JSON files.
+
+Build it ahead of time with::
+
+    python -m patient_generator.reference_snapshot [output_path]
+"""
+
+from dataclasses import dataclass
+import hashlib
+import json
+import logging
+import marshal
+import mmap
+import os
+from pathlib import Path
+import struct
+import sys
+import tempfile
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .reference_data import PACKAGE_DIR, ReferenceDataRegistry, get_reference_registry
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"MPREFSNP"
+SNAPSHOT_FORMAT_VERSION = 1
+
+# magic, format version, marshal version, manifest length, payload length, payload sha256
+_HEADER = struct.Struct("<8sHHIQ32s")
+
+SNAPSHOT_TABLES = (
+    "injuries.json",
+    "warfare_patterns.json",
+    "simulation_parameters.json",
+    "evacuation_transit_times.json",
+    "transition_matrices.json",
+    "confusion_matrices.json",
+    "treatment_protocols.json",
+    "demographics.json",
+    "scenario_presets.json",
+    "fronts_config.json",
+)
+
+DEFAULT_SNAPSHOT_PATH = os.environ.get("REFERENCE_SNAPSHOT_PATH", os.path.join(PACKAGE_DIR, "reference_snapshot.bin"))
+
+
+class SnapshotError(ValueError):
+    """Raised when a snapshot file is missing, corrupt or built by another format version."""
+
+
+@dataclass
+class SourceRecord:
+    """Manifest entry for one compiled source file."""
+
+    name: str
+    size: int
+    mtime_ns: int
+    digest: str
+
+
+@dataclass
+class ReferenceSnapshot:
+    """Decoded snapshot: source manifest plus the parsed tables."""
+
+    path: str
+    sources: List[SourceRecord]
+    tables: Dict[str, Any]
+
+    def is_stale(self, base_dir: str = PACKAGE_DIR) -> bool:
+        """
+        True if any source file changed since the snapshot was built.
+
+        Files are compared by size and mtime first; the SHA-256 is only
+        computed for files whose stat changed, so a touched but unchanged
+        file does not force a rebuild.
+        """
+        for record in self.sources:
+            path = os.path.join(base_dir, record.name)
+            try:
+                stat = Path(path).stat()
+            except OSError:
+                return True
+            if stat.st_size == record.size and stat.st_mtime_ns == record.mtime_ns:
+                continue
+            with open(path, "rb") as f:
+                if hashlib.sha256(f.read()).hexdigest() != record.digest:
+                    return True
+        return False
+
+    def seed(self, registry: Optional[ReferenceDataRegistry] = None, base_dir: str = PACKAGE_DIR) -> int:
+        """
+        Install the snapshot tables into a reference data registry.
+
+        Each table is keyed by its source file's current stat, so later
+        lookups hit without opening the JSON. Tables whose file changed are
+        skipped and load from disk as usual.
+
+        Returns:
+            Number of tables seeded
+        """
+        if registry is None:
+            registry = get_reference_registry()
+        seeded = 0
+        for record in self.sources:
+            path = os.path.join(base_dir, record.name)
+            try:
+                stat = Path(path).stat()
+            except OSError:
+                continue
+            if stat.st_size != record.size or stat.st_mtime_ns != record.mtime_ns:
+                continue
+            registry.seed(path, self.tables[record.name], record.digest, stat.st_mtime_ns, stat.st_size)
+            seeded += 1
+        return seeded
+
+
+def compile_snapshot(names: Sequence[str] = SNAPSHOT_TABLES, base_dir: str = PACKAGE_DIR) -> ReferenceSnapshot:
+    """
+    Parse the reference tables into an in-memory snapshot.
+
+    Args:
+        names: Reference file names inside base_dir
+        base_dir: Directory holding the JSON sources
+    """
+    sources: List[SourceRecord] = []
+    tables: Dict[str, Any] = {}
+    for name in names:
+        source_path = os.path.join(base_dir, name)
+        stat = Path(source_path).stat()
+        with open(source_path, "rb") as f:
+            raw = f.read()
+        tables[name] = json.loads(raw)
+        sources.append(SourceRecord(name, stat.st_size, stat.st_mtime_ns, hashlib.sha256(raw).hexdigest()))
+    return ReferenceSnapshot(path="", sources=sources, tables=tables)
+
+
+def write_snapshot(snapshot: ReferenceSnapshot, path: str = DEFAULT_SNAPSHOT_PATH) -> ReferenceSnapshot:
+    """
+    Write a snapshot to disk.
+
+    The file is written to a temporary name and renamed into place, so a
+    concurrent reader never sees a partial snapshot.
+    """
+    manifest = marshal.dumps([(s.name, s.size, s.mtime_ns, s.digest) for s in snapshot.sources])
+    payload = marshal.dumps(snapshot.tables)
+    header = _HEADER.pack(
+        SNAPSHOT_MAGIC,
+        SNAPSHOT_FORMAT_VERSION,
+        marshal.version,
+        len(manifest),
+        len(payload),
+        hashlib.sha256(payload).digest(),
+    )
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".reference_snapshot.")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            f.write(manifest)
+            f.write(payload)
+        Path(tmp_path).replace(path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+    snapshot.path = path
+    logger.info("Wrote reference snapshot %s (%d tables, %d bytes)", path, len(snapshot.tables), len(payload))
+    return snapshot
+
+
+def build_snapshot(
+    path: str = DEFAULT_SNAPSHOT_PATH, names: Sequence[str] = SNAPSHOT_TABLES, base_dir: str = PACKAGE_DIR
+) -> ReferenceSnapshot:
+    """Compile the reference tables and write them to a snapshot file"""
+    return write_snapshot(compile_snapshot(names, base_dir), path)
+
+
+def load_snapshot(path: str = DEFAULT_SNAPSHOT_PATH) -> ReferenceSnapshot:
+    """
+    Memory-map and decode a snapshot file.
+
+    Raises:
+        SnapshotError: If the file is missing, truncated, fails its checksum
+            or was written by a different format or marshal version
+    """
+    try:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            return _decode(path, view)
+    except (OSError, ValueError, EOFError, TypeError) as e:
+        if isinstance(e, SnapshotError):
+            raise
+        msg = f"Cannot read reference snapshot {path}: {e}"
+        raise SnapshotError(msg) from e
+
+
+def _decode(path: str, view: mmap.mmap) -> ReferenceSnapshot:
+    if len(view) < _HEADER.size:
+        msg = f"Reference snapshot {path} is truncated"
+        raise SnapshotError(msg)
+
+    magic, format_version, marshal_version, manifest_size, payload_size, checksum = _HEADER.unpack_from(view)
+    if magic != SNAPSHOT_MAGIC:
+        msg = f"{path} is not a reference snapshot"
+        raise SnapshotError(msg)
+    if format_version != SNAPSHOT_FORMAT_VERSION or marshal_version != marshal.version:
+        msg = f"Reference snapshot {path} was built by format {format_version}/marshal {marshal_version}"
+        raise SnapshotError(msg)
+
+    manifest_start = _HEADER.size
+    payload_start = manifest_start + manifest_size
+    if len(view) != payload_start + payload_size:
+        msg = f"Reference snapshot {path} is truncated"
+        raise SnapshotError(msg)
+
+    payload = memoryview(view)[payload_start:]
+    try:
+        if hashlib.sha256(payload).digest() != checksum:
+            msg = f"Reference snapshot {path} failed its checksum"
+            raise SnapshotError(msg)
+        manifest = marshal.loads(view[manifest_start:payload_start])
+        tables = marshal.loads(payload)
+    finally:
+        payload.release()
+
+    sources = [SourceRecord(*record) for record in manifest]
+    return ReferenceSnapshot(path=path, sources=sources, tables=tables)
+
+
+def ensure_snapshot(
+    path: str = DEFAULT_SNAPSHOT_PATH,
+    registry: Optional[ReferenceDataRegistry] = None,
+    base_dir: str = PACKAGE_DIR,
+) -> Tuple[Optional[ReferenceSnapshot], int]:
+    """
+    Load the snapshot (rebuilding it if stale or unreadable) and seed the registry.
+
+    Failing to write a rebuilt snapshot (e.g. a read-only install) is not
+    an error: the freshly parsed tables are still seeded.
+
+    Returns:
+        Tuple of (snapshot or None if the sources could not be read, tables seeded)
+    """
+    snapshot = None
+    try:
+        snapshot = load_snapshot(path)
+    except SnapshotError as e:
+        logger.info("Rebuilding reference snapshot: %s", e)
+
+    if snapshot is None or snapshot.is_stale(base_dir):
+        try:
+            snapshot = compile_snapshot(base_dir=base_dir)
+        except (OSError, ValueError) as e:
+            logger.warning("Could not compile reference data: %s", e)
+            return None, 0
+        try:
+            write_snapshot(snapshot, path)
+        except OSError as e:
+            logger.warning("Could not write reference snapshot %s: %s", path, e)
+
+    return snapshot, snapshot.seed(registry, base_dir)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    built = build_snapshot(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_SNAPSHOT_PATH)
+    print(f"Wrote {built.path} ({len(built.tables)} tables)")
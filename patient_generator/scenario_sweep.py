@@ -0,0 +1,561 @@
+"""
+Monte-Carlo Scenario Sweep Runner
+=================================
+
+Runs the same casualty scenario many times across a parameter grid (seeds,
+intensity levels, warfare mixes, ...) to get confidence intervals on
+KIA/DOW/RTD rates, time-to-role and facility load.
+
+Replicates fan out over a process pool. Each replicate streams its patients
+through ``PatientFlowSimulator`` one at a time and keeps only aggregates
+(outcome counts, time-to-role histograms, peak occupancy), so nothing
+per-patient is retained or written.
+
+Usage:
+    runner = ScenarioSweepRunner(
+        parameter_grid={"intensity": ["medium", "high"], "warfare_types": [["conventional"], ["artillery"]]},
+        replicates=50,
+        total_patients=10000,
+    )
+    result = runner.run()
+    print(result.format_table())
+"""
+
+from collections import Counter
+import concurrent.futures
+from dataclasses import dataclass, field
+from datetime import datetime
+import itertools
+import logging
+import math
+import os
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .config_manager import ConfigurationManager
+from .flow_simulator import PatientFlowSimulator
+from .patient import Patient
+from .reference_data import get_reference_registry, load_reference
+from .reference_snapshot import ensure_snapshot
+from .schemas_config import ConfigurationTemplateDB
+from .temporal_generator import TemporalPatternGenerator
+
+logger = logging.getLogger(__name__)
+
+_PACKAGE_DIR = os.path.dirname(__file__)
+
+# Scenario keys that may appear in a parameter grid (mirrors injuries.json plus simulator switches)
+SWEEPABLE_PARAMETERS = (
+    "days",
+    "total_patients",
+    "intensity",
+    "tempo",
+    "warfare_types",
+    "environmental_conditions",
+    "special_events",
+    "use_medical_simulation",
+    "use_markov_chain",
+)
+
+OUTCOMES = ("KIA", "DOW", "RTD", "Remains_Role4")
+ROLE_FACILITIES = ("Role1", "Role2", "Role3", "Role4")
+
+# Upper bin edges in hours for time-to-role histograms (last bin is open-ended)
+TIME_TO_ROLE_BIN_EDGES_HOURS = (1, 2, 4, 6, 12, 24, 48, 72, 168)
+
+# z-score for two-sided 95% confidence intervals
+_Z_95 = 1.96
+
+
+@dataclass
+class ReplicateSpec:
+    """One unit of work: a resolved scenario plus the seed for this replicate."""
+
+    scenario_index: int
+    replicate_index: int
+    seed: int
+    scenario: Dict[str, Any]
+
+
+@dataclass
+class ReplicateAggregate:
+    """Streaming aggregates collected for a single replicate."""
+
+    scenario_index: int
+    replicate_index: int
+    seed: int
+    patients: int = 0
+    outcome_counts: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(OUTCOMES, 0))
+    time_to_role_histograms: Dict[str, List[int]] = field(
+        default_factory=lambda: {
+            role: [0] * (len(TIME_TO_ROLE_BIN_EDGES_HOURS) + 1) for role in ROLE_FACILITIES
+        }
+    )
+    time_to_role_totals: Dict[str, float] = field(default_factory=lambda: dict.fromkeys(ROLE_FACILITIES, 0.0))
+    peak_occupancy: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(ROLE_FACILITIES, 0))
+    elapsed_seconds: float = 0.0
+
+    def outcome_rate(self, outcome: str) -> float:
+        """Fraction of patients with the given outcome."""
+        return self.outcome_counts.get(outcome, 0) / self.patients if self.patients else 0.0
+
+    def mean_time_to_role(self, role: str) -> Optional[float]:
+        """Mean hours from injury to first arrival at a role, None if nobody arrived."""
+        arrivals = sum(self.time_to_role_histograms[role])
+        return self.time_to_role_totals[role] / arrivals if arrivals else None
+
+
+class ReplicateAccumulator:
+    """
+    Folds patients into a ReplicateAggregate as they finish simulation.
+
+    Occupancy is tracked as a per-facility difference array over scenario
+    hours, so memory is bounded by the scenario horizon rather than the
+    number of patients.
+    """
+
+    def __init__(self, aggregate: ReplicateAggregate, base_datetime: datetime):
+        self.aggregate = aggregate
+        self.base_datetime = base_datetime
+        self._occupancy_deltas: Dict[str, Counter] = {role: Counter() for role in ROLE_FACILITIES}
+
+    def add_patient(self, patient: Patient) -> None:
+        """Record one fully simulated patient; the patient can be discarded afterwards."""
+        aggregate = self.aggregate
+        aggregate.patients += 1
+        aggregate.outcome_counts[classify_outcome(patient)] += 1
+
+        injury_offset_hours = 0.0
+        if patient.injury_timestamp:
+            injury_offset_hours = (patient.injury_timestamp - self.base_datetime).total_seconds() / 3600
+
+        first_arrivals: Dict[str, float] = {}
+        open_stay: Optional[Tuple[str, float]] = None
+
+        for event in patient.movement_timeline:
+            event_type = event.get("event_type")
+            facility = event.get("facility")
+            hours = float(event.get("hours_since_injury", 0.0) or 0.0)
+
+            if event_type == "arrival":
+                if open_stay and open_stay[0] != facility:
+                    self._record_stay(open_stay[0], open_stay[1], injury_offset_hours + hours)
+                    open_stay = None
+                if facility in self._occupancy_deltas:
+                    first_arrivals.setdefault(facility, hours)
+                    if open_stay is None:
+                        open_stay = (facility, injury_offset_hours + hours)
+            elif event_type in ("transit_start", "kia", "rtd") and open_stay:
+                self._record_stay(open_stay[0], open_stay[1], injury_offset_hours + hours)
+                open_stay = None
+
+        # Patients that remain in care occupy their last facility until the end of the horizon
+        if open_stay:
+            self._record_stay(open_stay[0], open_stay[1], None)
+
+        for role, hours in first_arrivals.items():
+            aggregate.time_to_role_histograms[role][_histogram_bin(hours)] += 1
+            aggregate.time_to_role_totals[role] += hours
+
+    def _record_stay(self, facility: str, start_hours: float, end_hours: Optional[float]) -> None:
+        deltas = self._occupancy_deltas[facility]
+        start_bucket = math.floor(start_hours)
+        deltas[start_bucket] += 1
+        if end_hours is not None:
+            end_bucket = max(start_bucket + 1, math.ceil(end_hours))
+            deltas[end_bucket] -= 1
+
+    def finalize(self) -> ReplicateAggregate:
+        """Resolve occupancy difference arrays into peak values and return the aggregate."""
+        for role, deltas in self._occupancy_deltas.items():
+            current = 0
+            peak = 0
+            for bucket in sorted(deltas):
+                current += deltas[bucket]
+                peak = max(peak, current)
+            self.aggregate.peak_occupancy[role] = peak
+        return self.aggregate
+
+
+def classify_outcome(patient: Patient) -> str:
+    """
+    Classify a simulated patient as KIA, DOW, RTD or Remains_Role4.
+
+    Deaths before reaching a treatment facility count as KIA, deaths after
+    arrival at any role as DOW (died of wounds), matching the medical bridge.
+    The recorded final status decides; the timeline is only consulted for
+    where a death happened, or when no final status was recorded.
+    """
+    death = next((event for event in reversed(patient.movement_timeline) if event.get("event_type") == "kia"), None)
+    died_at_role = death is not None and death.get("facility") not in (None, "POI")
+
+    if patient.final_status == "KIA":
+        return "DOW" if died_at_role else "KIA"
+    if patient.final_status in ("DOW", "RTD", "Remains_Role4"):
+        return patient.final_status
+    if patient.current_status == "DOW":
+        return "DOW"
+
+    for event in reversed(patient.movement_timeline):
+        event_type = event.get("event_type")
+        if event_type == "kia":
+            return "DOW" if died_at_role else "KIA"
+        if event_type == "rtd":
+            return "RTD"
+        if event_type == "remains_role4":
+            return "Remains_Role4"
+
+    if patient.current_status == "KIA":
+        return "KIA"
+    if patient.current_status == "RTD":
+        return "RTD"
+    return "Remains_Role4"
+
+
+def _histogram_bin(hours: float) -> int:
+    for index, edge in enumerate(TIME_TO_ROLE_BIN_EDGES_HOURS):
+        if hours < edge:
+            return index
+    return len(TIME_TO_ROLE_BIN_EDGES_HOURS)
+
+
+def load_base_scenario() -> Dict[str, Any]:
+    """Load the default scenario from injuries.json (comment keys stripped)."""
+    injuries_config = load_reference("injuries.json")
+
+    return {
+        "days": injuries_config["days_of_fighting"],
+        "total_patients": injuries_config["total_patients"],
+        "base_date": injuries_config["base_date"],
+        "intensity": injuries_config["intensity"],
+        "tempo": injuries_config["tempo"],
+        "warfare_types": dict(injuries_config["warfare_types"]),
+        "environmental_conditions": dict(injuries_config["environmental_conditions"]),
+        "special_events": dict(injuries_config["special_events"]),
+        "injury_mix": dict(injuries_config["injury_mix"]),
+        "use_medical_simulation": False,
+        "use_markov_chain": True,
+    }
+
+
+def _normalize_flags(value: Any, defaults: Dict[str, bool]) -> Dict[str, bool]:
+    """Accept a {name: bool} dict, a list of active names or a single name."""
+    if isinstance(value, dict):
+        return {**dict.fromkeys(defaults, False), **{k: bool(v) for k, v in value.items()}}
+    if isinstance(value, str):
+        value = [value]
+    active = set(value)
+    unknown = active - set(defaults)
+    if unknown:
+        msg = f"Unknown option(s) {sorted(unknown)}; expected a subset of {sorted(defaults)}"
+        raise ValueError(msg)
+    return {name: name in active for name in defaults}
+
+
+def _scenario_label(overrides: Dict[str, Any]) -> str:
+    parts = []
+    for key, value in overrides.items():
+        if isinstance(value, dict):
+            value = "+".join(name for name, active in value.items() if active) or "none"
+        elif isinstance(value, (list, tuple)):
+            value = "+".join(str(v) for v in value) or "none"
+        parts.append(f"{key}={value}")
+    return ", ".join(parts) or "baseline"
+
+
+# --- Worker process state ------------------------------------------------------
+# Each worker builds its simulator and temporal generator once and reuses them
+# for every replicate it runs.
+
+_worker_simulators: Dict[Tuple[Any, ...], PatientFlowSimulator] = {}
+_worker_temporal_generator: Optional[TemporalPatternGenerator] = None
+
+
+def _build_config_manager(total_patients: int, injury_mix: Dict[str, float]) -> ConfigurationManager:
+    now = datetime.now()
+    config = ConfigurationTemplateDB(
+        id="scenario-sweep",
+        name="Scenario Sweep",
+        description="In-memory configuration for Monte-Carlo sweeps",
+        total_patients=total_patients,
+        injury_distribution=injury_mix,
+        front_configs=[],
+        facility_configs=[],
+        created_at=now,
+        updated_at=now,
+    )
+    # Sweep configurations are held in memory only; the database is never touched
+    return ConfigurationManager(
+        static_fronts_config_path=os.path.join(_PACKAGE_DIR, "fronts_config.json"), configuration=config
+    )
+
+
+def _init_worker():
+    # Forked workers inherit the parent's seeded registry; spawned ones load the snapshot
+    if not len(get_reference_registry()):
+        ensure_snapshot()
+
+
+def _get_worker_simulator(scenario: Dict[str, Any]) -> PatientFlowSimulator:
+    use_medical_simulation = bool(scenario["use_medical_simulation"])
+    use_markov_chain = bool(scenario["use_markov_chain"])
+    key = (use_medical_simulation, use_markov_chain, tuple(sorted(scenario["injury_mix"].items())))
+    simulator = _worker_simulators.get(key)
+    if simulator is None:
+        simulator = PatientFlowSimulator(_build_config_manager(scenario["total_patients"], scenario["injury_mix"]))
+        simulator.use_medical_simulation = use_medical_simulation
+        simulator.use_markov_chain = use_markov_chain and simulator.markov_chain is not None
+        _worker_simulators[key] = simulator
+    simulator.total_patients_to_generate = scenario["total_patients"]
+    return simulator
+
+
+def _get_worker_temporal_generator() -> TemporalPatternGenerator:
+    global _worker_temporal_generator
+    if _worker_temporal_generator is None:
+        _worker_temporal_generator = TemporalPatternGenerator(os.path.join(_PACKAGE_DIR, "warfare_patterns.json"))
+    return _worker_temporal_generator
+
+
+def run_replicate(spec: ReplicateSpec) -> ReplicateAggregate:
+    """
+    Run one replicate and return its aggregates.
+
+    Module-level so it can be pickled into process-pool workers.
+    """
+    start = time.perf_counter()
+    scenario = spec.scenario
+
+    random.seed(spec.seed)
+    np.random.seed(spec.seed % (2**32))  # noqa: NPY002 - simulator modules use the legacy global RNG
+
+    simulator = _get_worker_simulator(scenario)
+    temporal_gen = _get_worker_temporal_generator()
+
+    timeline = temporal_gen.generate_timeline(
+        days=scenario["days"],
+        total_patients=scenario["total_patients"],
+        active_warfare_types=scenario["warfare_types"],
+        intensity=scenario["intensity"],
+        tempo=scenario["tempo"],
+        environmental_conditions=scenario["environmental_conditions"],
+        special_events=scenario["special_events"],
+        base_date=scenario["base_date"],
+    )
+
+    accumulator = ReplicateAccumulator(
+        ReplicateAggregate(
+            scenario_index=spec.scenario_index, replicate_index=spec.replicate_index, seed=spec.seed
+        ),
+        datetime.strptime(scenario["base_date"], "%Y-%m-%d"),
+    )
+
+    for patient in simulator.iter_patients_from_timeline(
+        timeline,
+        scenario["injury_mix"],
+        limit=scenario["total_patients"],
+        warfare_patterns=temporal_gen.warfare_patterns,
+    ):
+        simulator._simulate_patient_flow_single(patient)
+        accumulator.add_patient(patient)
+
+    aggregate = accumulator.finalize()
+    aggregate.elapsed_seconds = time.perf_counter() - start
+    return aggregate
+
+
+@dataclass
+class SweepResult:
+    """All replicate aggregates for a sweep plus helpers to summarize them."""
+
+    scenarios: List[Dict[str, Any]]
+    labels: List[str]
+    aggregates: List[ReplicateAggregate]
+    elapsed_seconds: float = 0.0
+
+    def summary_rows(self) -> List[Dict[str, Any]]:
+        """One row per scenario with means and 95% confidence half-widths across replicates."""
+        rows = []
+        for index, label in enumerate(self.labels):
+            replicates = [a for a in self.aggregates if a.scenario_index == index]
+            if not replicates:
+                continue
+
+            row: Dict[str, Any] = {
+                "scenario": label,
+                "replicates": len(replicates),
+                "patients_mean": float(np.mean([a.patients for a in replicates])),
+            }
+            for outcome in OUTCOMES:
+                mean, ci95 = _mean_ci([a.outcome_rate(outcome) for a in replicates])
+                row[f"{outcome}_rate"] = mean
+                row[f"{outcome}_rate_ci95"] = ci95
+            for role in ROLE_FACILITIES:
+                times = [t for t in (a.mean_time_to_role(role) for a in replicates) if t is not None]
+                row[f"{role}_hours_mean"] = float(np.mean(times)) if times else None
+                row[f"{role}_peak_mean"] = float(np.mean([a.peak_occupancy[role] for a in replicates]))
+                row[f"{role}_peak_max"] = max(a.peak_occupancy[role] for a in replicates)
+            rows.append(row)
+        return rows
+
+    def time_to_role_histograms(self, scenario_index: int) -> Dict[str, List[int]]:
+        """Time-to-role histograms merged across all replicates of one scenario."""
+        merged = {role: [0] * (len(TIME_TO_ROLE_BIN_EDGES_HOURS) + 1) for role in ROLE_FACILITIES}
+        for aggregate in self.aggregates:
+            if aggregate.scenario_index != scenario_index:
+                continue
+            for role, counts in aggregate.time_to_role_histograms.items():
+                merged[role] = [m + c for m, c in zip(merged[role], counts)]
+        return merged
+
+    def format_table(self) -> str:
+        """CLI-friendly summary table (rates in percent, +/- is the 95% CI half-width)."""
+        header = (
+            f"{'Scenario':<48} {'Reps':>5} {'KIA %':>13} {'DOW %':>13} {'RTD %':>13} "
+            f"{'R1 h':>6} {'R2 h':>6} {'R3 h':>6} {'R1 pk':>6} {'R2 pk':>6} {'R3 pk':>6}"
+        )
+        lines = [header, "-" * 140]
+        for row in self.summary_rows():
+
+            def pct(outcome: str, row: Dict[str, Any] = row) -> str:
+                return f"{row[f'{outcome}_rate'] * 100:5.1f}±{row[f'{outcome}_rate_ci95'] * 100:4.1f}"
+
+            def hours(role: str, row: Dict[str, Any] = row) -> str:
+                value = row[f"{role}_hours_mean"]
+                return f"{value:6.1f}" if value is not None else f"{'-':>6}"
+
+            lines.append(
+                f"{row['scenario'][:48]:<48} {row['replicates']:>5} {pct('KIA'):>13} {pct('DOW'):>13} "
+                f"{pct('RTD'):>13} {hours('Role1')} {hours('Role2')} {hours('Role3')} "
+                f"{row['Role1_peak_mean']:6.0f} {row['Role2_peak_mean']:6.0f} {row['Role3_peak_mean']:6.0f}"
+            )
+        total_patients = sum(a.patients for a in self.aggregates)
+        lines.append("-" * 140)
+        lines.append(
+            f"{len(self.aggregates)} replicates, {total_patients} patients in {self.elapsed_seconds:.1f}s"
+        )
+        return "\n".join(lines)
+
+
+def _mean_ci(values: List[float]) -> Tuple[float, float]:
+    if not values:
+        return 0.0, 0.0
+    mean = float(np.mean(values))
+    if len(values) < 2:
+        return mean, 0.0
+    return mean, float(_Z_95 * np.std(values, ddof=1) / math.sqrt(len(values)))
+
+
+class ScenarioSweepRunner:
+    """
+    Expands a parameter grid into scenarios and runs replicates of each.
+
+    Args:
+        parameter_grid: Maps scenario keys (see SWEEPABLE_PARAMETERS) to lists of values;
+            the cartesian product defines the scenarios
+        replicates: Number of replicates per scenario
+        total_patients: Patients per replicate unless overridden in the grid
+        max_workers: Process pool size (defaults to CPU count); 1 runs inline
+        base_seed: Seed from which every replicate seed is derived deterministically
+        base_scenario: Scenario defaults (defaults to injuries.json)
+    """
+
+    def __init__(
+        self,
+        parameter_grid: Optional[Dict[str, List[Any]]] = None,
+        *,
+        replicates: int = 10,
+        total_patients: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        base_seed: int = 0,
+        base_scenario: Optional[Dict[str, Any]] = None,
+    ):
+        if replicates < 1:
+            msg = "replicates must be at least 1"
+            raise ValueError(msg)
+
+        self.parameter_grid = parameter_grid or {}
+        unknown = set(self.parameter_grid) - set(SWEEPABLE_PARAMETERS)
+        if unknown:
+            msg = f"Unsupported sweep parameter(s): {sorted(unknown)}"
+            raise ValueError(msg)
+
+        self.replicates = replicates
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.base_seed = base_seed
+        self.base_scenario = dict(base_scenario or load_base_scenario())
+        if total_patients is not None:
+            self.base_scenario["total_patients"] = total_patients
+
+    def scenarios(self) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """Resolve the grid into full scenario dicts and human-readable labels."""
+        keys = list(self.parameter_grid)
+        scenarios = []
+        labels = []
+        for values in itertools.product(*(self.parameter_grid[key] for key in keys)):
+            overrides = dict(zip(keys, values))
+            scenario = dict(self.base_scenario)
+            for key, value in overrides.items():
+                if key in ("warfare_types", "environmental_conditions", "special_events"):
+                    value = _normalize_flags(value, self.base_scenario[key])
+                    overrides[key] = value
+                scenario[key] = value
+            scenarios.append(scenario)
+            labels.append(_scenario_label(overrides))
+        return scenarios, labels
+
+    def replicate_specs(self, scenarios: List[Dict[str, Any]]) -> List[ReplicateSpec]:
+        """Build one ReplicateSpec per (scenario, replicate) with reproducible seeds."""
+        # Independent streams per scenario and replicate, however many there are
+        scenario_seeds = np.random.SeedSequence(self.base_seed).spawn(len(scenarios))
+        specs = []
+        for scenario_index, scenario in enumerate(scenarios):
+            replicate_seeds = scenario_seeds[scenario_index].spawn(self.replicates)
+            for replicate_index in range(self.replicates):
+                seed = int(replicate_seeds[replicate_index].generate_state(1, dtype=np.uint64)[0])
+                specs.append(ReplicateSpec(scenario_index, replicate_index, seed, scenario))
+        return specs
+
+    def run(self, progress_callback: Optional[Callable[[int, int], None]] = None) -> SweepResult:
+        """
+        Run every replicate and collect aggregates.
+
+        Args:
+            progress_callback: Optional callable receiving (completed, total) after each replicate
+        """
+        start = time.perf_counter()
+        scenarios, labels = self.scenarios()
+        specs = self.replicate_specs(scenarios)
+        aggregates: List[ReplicateAggregate] = []
+
+        logger.info(
+            "Running %d scenario(s) x %d replicate(s) on %d worker(s)",
+            len(scenarios), self.replicates, self.max_workers
+        )
+
+        if self.max_workers <= 1:
+            for spec in specs:
+                aggregates.append(run_replicate(spec))
+                if progress_callback:
+                    progress_callback(len(aggregates), len(specs))
+        else:
+            ensure_snapshot()
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.max_workers, initializer=_init_worker
+            ) as executor:
+                futures = [executor.submit(run_replicate, spec) for spec in specs]
+                for future in concurrent.futures.as_completed(futures):
+                    aggregates.append(future.result())
+                    if progress_callback:
+                        progress_callback(len(aggregates), len(specs))
+
+        aggregates.sort(key=lambda a: (a.scenario_index, a.replicate_index))
+        return SweepResult(
+            scenarios=scenarios,
+            labels=labels,
+            aggregates=aggregates,
+            elapsed_seconds=time.perf_counter() - start,
+        )
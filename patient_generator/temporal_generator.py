@@ -1,9 +1,15 @@
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
-import json
+from datetime import datetime, timedelta, timezone
 import random
-from typing import Dict, List, Optional, Tuple
-import uuid
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .alias_sampler import AliasSampler
+from .reference_data import load_reference
+
+SECONDS_PER_HOUR = 3600
+SECONDS_PER_DAY = 86400
 
 
 @dataclass
@@ -19,13 +25,119 @@ class CasualtyEvent:
     special_event_type: Optional[str] = None
 
 
+class CasualtyTimeline(Sequence[CasualtyEvent]):
+    """
+    Casualty events held as parallel arrays, ordered by time.
+
+    Behaves like a read-only list of CasualtyEvent: indexing or iterating
+    builds the event objects on demand, so a timeline of a million events
+    costs a few arrays rather than a million objects. Event IDs are derived
+    from the event's kind, time and position instead of stored.
+    """
+
+    def __init__(
+        self,
+        base_datetime: datetime,
+        offsets: np.ndarray,
+        patient_counts: np.ndarray,
+        warfare_types: np.ndarray,
+        is_mass_casualty: np.ndarray,
+        environmental_factors: Sequence[Tuple[str, ...]],
+        special_event_types: np.ndarray,
+        event_ids: Optional[List[str]] = None,
+    ):
+        self.base_datetime = base_datetime
+        self.offsets = np.asarray(offsets, dtype=np.int64)  # Seconds since base_datetime
+        self.patient_counts = np.asarray(patient_counts, dtype=np.int64)
+        self.warfare_types = np.asarray(warfare_types, dtype=object)
+        self.is_mass_casualty = np.asarray(is_mass_casualty, dtype=bool)
+        # Immutable tuples, so events may share one; each CasualtyEvent gets its own list copy
+        self.environmental_factors = environmental_factors
+        self.special_event_types = np.asarray(special_event_types, dtype=object)
+        self._event_ids = event_ids
+
+    @classmethod
+    def from_events(cls, events: Sequence[CasualtyEvent]) -> "CasualtyTimeline":
+        """Build a columnar timeline from existing CasualtyEvent objects, keeping their order and IDs"""
+        if isinstance(events, CasualtyTimeline):
+            return events
+        # The base of an empty timeline is never read; any aware sentinel will do
+        base_datetime = events[0].timestamp if events else datetime.min.replace(tzinfo=timezone.utc)
+        return cls(
+            base_datetime=base_datetime,
+            offsets=np.array([(e.timestamp - base_datetime) // timedelta(seconds=1) for e in events], dtype=np.int64),
+            patient_counts=np.array([e.patient_count for e in events], dtype=np.int64),
+            warfare_types=np.array([e.warfare_type for e in events], dtype=object),
+            is_mass_casualty=np.array([e.is_mass_casualty for e in events], dtype=bool),
+            environmental_factors=[tuple(e.environmental_factors) for e in events],
+            special_event_types=np.array([e.special_event_type for e in events], dtype=object),
+            event_ids=[e.event_id for e in events],
+        )
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    @property
+    def total_patients(self) -> int:
+        """Total casualties across all events"""
+        return int(self.patient_counts.sum())
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """Event timestamps as a datetime64[s] array"""
+        if not len(self):
+            return np.empty(0, dtype="datetime64[s]")
+        base_datetime = self.base_datetime
+        if base_datetime.tzinfo is not None:
+            # datetime64 has no time zone; aware bases are expressed in UTC
+            base_datetime = base_datetime.astimezone(timezone.utc).replace(tzinfo=None)
+        return np.datetime64(base_datetime, "s") + self.offsets.astype("timedelta64[s]")
+
+    def timestamp(self, index: int) -> datetime:
+        """Timestamp of one event"""
+        return self.base_datetime + timedelta(seconds=int(self.offsets[index]))
+
+    def event_id(self, index: int) -> str:
+        """ID of one event, derived from its kind, time and position"""
+        if self._event_ids is not None:
+            return self._event_ids[index]
+        day, seconds = divmod(int(self.offsets[index]), SECONDS_PER_DAY)
+        hour, minute = seconds // SECONDS_PER_HOUR, seconds % SECONDS_PER_HOUR // 60
+        special_event_type = self.special_event_types[index]
+        if special_event_type is not None:
+            return f"SE_{special_event_type}_{day + 1}_{hour}_{index}"
+        prefix = "MC" if self.is_mass_casualty[index] else "IND"
+        return f"{prefix}_{self.warfare_types[index]}_{day}_{hour}_{minute}_{index}"
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[CasualtyEvent, List[CasualtyEvent]]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            msg = f"Timeline index {index} out of range"
+            raise IndexError(msg)
+        return CasualtyEvent(
+            timestamp=self.timestamp(index),
+            patient_count=int(self.patient_counts[index]),
+            warfare_type=self.warfare_types[index],
+            is_mass_casualty=bool(self.is_mass_casualty[index]),
+            event_id=self.event_id(index),
+            environmental_factors=list(self.environmental_factors[index]),
+            special_event_type=self.special_event_types[index],
+        )
+
+    def __iter__(self) -> Iterator[CasualtyEvent]:
+        for index in range(len(self)):
+            yield self[index]
+
+
 class TemporalPatternGenerator:
     """Generates temporal distribution patterns for casualties"""
 
     def __init__(self, warfare_patterns_path: str):
         """Initialize with warfare patterns configuration"""
-        with open(warfare_patterns_path) as f:
-            self.warfare_patterns = json.load(f)
+        self.warfare_patterns = load_reference(warfare_patterns_path)
 
         self.hourly_baseline = self.warfare_patterns["hourly_activity_baseline"]
 
@@ -39,8 +151,17 @@ class TemporalPatternGenerator:
         environmental_conditions: Dict[str, bool],
         special_events: Dict[str, bool],
         base_date: str,
-    ) -> List[CasualtyEvent]:
-        """Generate a complete timeline of casualty events"""
+    ) -> CasualtyTimeline:
+        """
+        Generate a complete timeline of casualty events.
+
+        Hourly casualty counts for each day and warfare type come from the
+        tempo pattern; the events inside every (day, warfare type, hour) cell
+        are then synthesized for the whole timeline in one batched pass.
+
+        Returns:
+            CasualtyTimeline ordered by timestamp
+        """
 
         # Parse base date
         base_datetime = datetime.strptime(base_date, "%Y-%m-%d")
@@ -53,6 +174,7 @@ class TemporalPatternGenerator:
 
         # Calculate warfare weights
         warfare_weights = self._calculate_warfare_weights(active_types)
+        warfare_codes = {wtype: code for code, wtype in enumerate(warfare_weights)}
 
         # Get intensity and tempo modifiers
         intensity_mod = self.warfare_patterns["intensity_levels"][intensity]
@@ -65,12 +187,14 @@ class TemporalPatternGenerator:
         # Distribute patients across days based on tempo
         daily_distribution = self._distribute_patients_by_day(adjusted_total, days, tempo_pattern["daily_intensity"])
 
-        # Generate events for each day
-        all_events = []
+        # Hourly casualty counts per (day, warfare type); 24 cells each
+        cell_days = []
+        cell_warfare = []
+        cell_counts = []
+        scheduled_special_events = []
 
         for day in range(days):
             day_patients = daily_distribution[day]
-            day_datetime = base_datetime + timedelta(days=day)
 
             # Check for special events on this day
             day_special_events = self._get_special_events_for_day(day + 1, special_events, day_patients, base_date)
@@ -80,32 +204,80 @@ class TemporalPatternGenerator:
                 day_patients, warfare_weights, day_special_events
             )
 
-            # Generate hourly events for each warfare type
             for warfare_type, type_patients in warfare_distribution.items():
                 if type_patients > 0:
-                    events = self._generate_warfare_type_events(
-                        warfare_type, type_patients, day, day_datetime, environmental_conditions, intensity_mod
-                    )
-                    all_events.extend(events)
-
-            # Add special events
-            all_events.extend(day_special_events)
+                    cell_days.append(day)
+                    cell_warfare.append(warfare_codes[warfare_type])
+                    cell_counts.append(self._generate_hourly_counts(warfare_type, type_patients, day))
+
+            scheduled_special_events.extend(day_special_events)
+
+        offsets, patient_counts, event_warfare, is_mass_casualty = self._synthesize_events(
+            np.array(cell_days, dtype=np.int64),
+            np.array(cell_warfare, dtype=np.int64),
+            np.array(cell_counts, dtype=np.int64).reshape(-1, 24),
+            list(warfare_weights),
+            intensity_mod,
+        )
+        warfare_types = np.array(list(warfare_weights), dtype=object)[event_warfare]
+        special_event_types = np.full(len(offsets), None, dtype=object)
+
+        # Add special events after the regular ones
+        if scheduled_special_events:
+            offsets = np.concatenate(
+                [
+                    offsets,
+                    [(event.timestamp - base_datetime) // timedelta(seconds=1) for event in scheduled_special_events],
+                ]
+            )
+            patient_counts = np.concatenate(
+                [patient_counts, [event.patient_count for event in scheduled_special_events]]
+            )
+            warfare_types = np.concatenate(
+                [
+                    warfare_types,
+                    np.array([event.warfare_type for event in scheduled_special_events], dtype=object),
+                ]
+            )
+            is_mass_casualty = np.concatenate(
+                [is_mass_casualty, [event.is_mass_casualty for event in scheduled_special_events]]
+            )
+            special_event_types = np.concatenate(
+                [
+                    special_event_types,
+                    np.array([event.special_event_type for event in scheduled_special_events], dtype=object),
+                ]
+            )
 
         # Apply environmental modifiers to all events
-        all_events = self._apply_environmental_modifiers(all_events, environmental_conditions)
+        active_conditions = [cond for cond, active in environmental_conditions.items() if active]
+        patient_counts, offsets = self._apply_environmental_modifiers(
+            patient_counts, offsets, is_mass_casualty, active_conditions
+        )
 
         # Sort events by timestamp
-        all_events.sort(key=lambda e: e.timestamp)
+        order = np.argsort(offsets, kind="stable")
+        offsets = offsets[order]
+        patient_counts = patient_counts[order]
+        warfare_types = warfare_types[order]
+        is_mass_casualty = is_mass_casualty[order]
+        special_event_types = special_event_types[order]
 
         # Validate total patient count
-        total_generated = sum(e.patient_count for e in all_events)
-        if total_generated != adjusted_total:
+        total_generated = int(patient_counts.sum())
+        if total_generated != adjusted_total and len(patient_counts):
             # Adjust last event to match exactly
-            difference = adjusted_total - total_generated
-            if all_events and difference != 0:
-                all_events[-1].patient_count += difference
-
-        return all_events
+            patient_counts[-1] += adjusted_total - total_generated
+
+        return CasualtyTimeline(
+            base_datetime=base_datetime,
+            offsets=offsets,
+            patient_counts=patient_counts,
+            warfare_types=warfare_types,
+            is_mass_casualty=is_mass_casualty,
+            environmental_factors=[tuple(active_conditions)] * len(offsets),
+            special_event_types=special_event_types,
+        )
 
     def _calculate_warfare_weights(self, active_types: List[str]) -> Dict[str, float]:
         """Calculate normalized weights for active warfare types"""
@@ -126,6 +298,10 @@ class TemporalPatternGenerator:
 
     def _distribute_patients_by_day(self, total: int, days: int, daily_intensity: List[float]) -> List[int]:
         """Distribute patients across days based on tempo pattern"""
+        # Work on a copy: the rounding adjustment below mutates weights and this list
+        # belongs to the shared warfare_patterns config
+        daily_intensity = list(daily_intensity)
+
         # Ensure we have intensity values for all days
         if len(daily_intensity) < days:
             # Repeat last value for additional days
@@ -176,70 +352,55 @@ class TemporalPatternGenerator:
 
         return distribution
 
-    def _generate_warfare_type_events(
-        self,
-        warfare_type: str,
-        total_patients: int,
-        day: int,
-        day_datetime: datetime,
-        environmental_conditions: Dict[str, bool],
-        intensity_mod: Dict,
-    ) -> List[CasualtyEvent]:
-        """Generate casualty events for a specific warfare type on a day"""
-        warfare_config = self.warfare_patterns["warfare_types"][warfare_type]
-        pattern_type = warfare_config["temporal_pattern"]["type"]
+    def _generate_hourly_counts(self, warfare_type: str, total_patients: int, day: int) -> np.ndarray:
+        """Hourly casualty counts (24 entries summing to total_patients) for a warfare type on a day"""
+        temporal_pattern = self.warfare_patterns["warfare_types"][warfare_type]["temporal_pattern"]
+        pattern_type = temporal_pattern["type"]
 
         # Generate hourly distribution based on pattern type
         if pattern_type == "sustained_combat":
-            hourly_distribution = self._generate_sustained_pattern(total_patients, warfare_config["temporal_pattern"])
-        elif pattern_type == "surge":
-            hourly_distribution = self._generate_surge_pattern(total_patients, day, warfare_config["temporal_pattern"])
-        elif pattern_type == "sporadic":
-            hourly_distribution = self._generate_sporadic_pattern(total_patients, warfare_config["temporal_pattern"])
-        elif pattern_type == "precision_strike":
-            hourly_distribution = self._generate_precision_strike_pattern(
-                total_patients, warfare_config["temporal_pattern"]
-            )
-        elif pattern_type == "phased_assault":
-            hourly_distribution = self._generate_phased_assault_pattern(
-                total_patients, warfare_config["temporal_pattern"]
-            )
-        else:
-            # Default to even distribution
-            hourly_distribution = [(h, total_patients // 24) for h in range(24)]
-
-        # Generate actual events from hourly distribution
-        events = []
-        active_env = [env for env, active in environmental_conditions.items() if active]
-
-        for hour, hour_patients in hourly_distribution:
-            if hour_patients > 0:
-                hour_events = self._generate_hour_events(
-                    warfare_type,
-                    hour_patients,
-                    day,
-                    hour,
-                    day_datetime,
-                    warfare_config["casualty_clustering"],
-                    active_env,
-                    intensity_mod,
-                )
-                events.extend(hour_events)
-
-        return events
+            return self._generate_sustained_pattern(total_patients, temporal_pattern)
+        if pattern_type == "surge":
+            return self._generate_surge_pattern(total_patients, day, temporal_pattern)
+        if pattern_type == "sporadic":
+            return self._generate_sporadic_pattern(total_patients, temporal_pattern)
+        if pattern_type == "precision_strike":
+            return self._generate_precision_strike_pattern(total_patients, temporal_pattern)
+        if pattern_type == "phased_assault":
+            return self._generate_phased_assault_pattern(total_patients, temporal_pattern)
+
+        # Default to even distribution
+        return self._allocate_hours(total_patients, np.ones(24))
+
+    def _allocate_hours(self, total_patients: int, hourly_weights: np.ndarray) -> np.ndarray:
+        """Split total_patients across 24 hours with one multinomial draw over the pattern weights"""
+        hourly_weights = np.asarray(hourly_weights, dtype=float)
+        weight_sum = hourly_weights.sum()
+        if weight_sum <= 0:
+            # Fallback: distribute evenly
+            hourly_weights = np.ones(24)
+            weight_sum = 24.0
+        return np.random.multinomial(total_patients, hourly_weights / weight_sum)  # noqa: NPY002
+
+    def _split_among_events(self, total_patients: int, event_hours: List[int]) -> np.ndarray:
+        """Split patients evenly among discrete events and total them per hour"""
+        hourly_casualties = np.zeros(24, dtype=np.int64)
+        if not event_hours:
+            return hourly_casualties
+        patients_per_event, remainder = divmod(total_patients, len(event_hours))
+        event_patients = np.full(len(event_hours), patients_per_event, dtype=np.int64)
+        event_patients[:remainder] += 1
+        np.add.at(hourly_casualties, event_hours, event_patients)
+        return hourly_casualties
 
-    def _generate_sustained_pattern(self, total_patients: int, params: Dict) -> List[Tuple[int, int]]:
+    def _generate_sustained_pattern(self, total_patients: int, params: Dict) -> np.ndarray:
         """Generate sustained combat pattern (conventional warfare)"""
-        hourly_casualties = []
         peak_hours = params["peak_hours"]
         peak_intensity = params["peak_intensity"]
         base_intensity = params["base_intensity"]
         night_reduction = params["night_reduction"]
 
-        # Calculate base hourly rate
-        total_weight = 0
         hourly_weights = []
-
         for hour in range(24):
             if hour in peak_hours:
                 weight = peak_intensity * self.hourly_baseline[hour]
@@ -249,38 +410,11 @@ class TemporalPatternGenerator:
                 weight = base_intensity * night_reduction * self.hourly_baseline[hour] * reduction_factor
             else:
                 weight = base_intensity * self.hourly_baseline[hour]
-
             hourly_weights.append(weight)
-            total_weight += weight
-
-        # Distribute patients more evenly
-        if total_weight == 0:
-            # Fallback: distribute evenly
-            patients_per_hour = total_patients // 24
-            remainder = total_patients % 24
-            for hour in range(24):
-                patients = patients_per_hour + (1 if hour < remainder else 0)
-                hourly_casualties.append((hour, patients))
-        else:
-            allocated = 0
-            for hour in range(24):
-                weight = hourly_weights[hour]
-
-                if hour == 23:  # Last hour gets remainder
-                    patients = total_patients - allocated
-                else:
-                    # Use rounding instead of int() for better distribution
-                    patients = round(total_patients * weight / total_weight)
-
-                # Ensure we don't over-allocate
-                patients = max(0, min(patients, total_patients - allocated))
 
-                hourly_casualties.append((hour, patients))
-                allocated += patients
+        return self._allocate_hours(total_patients, hourly_weights)
 
-        return hourly_casualties
-
-    def _generate_surge_pattern(self, total_patients: int, day: int, params: Dict) -> List[Tuple[int, int]]:
+    def _generate_surge_pattern(self, total_patients: int, day: int, params: Dict) -> np.ndarray:
         """Generate surge pattern (artillery)"""
         surges_per_day = params["surges_per_day"]
         surge_duration = params["surge_duration_hours"]
@@ -299,41 +433,34 @@ class TemporalPatternGenerator:
                 # Remove this hour and nearby hours to prevent overlap
                 available_hours = [h for h in available_hours if abs(h - start) > surge_duration]
 
-        # Build surge hours set
-        surge_hours = set()
+        # Build surge hours mask
+        in_surge = np.zeros(24, dtype=bool)
         for start in surge_starts:
-            for h in range(surge_duration):
-                hour = (start + h) % 24
-                surge_hours.add(hour)
+            in_surge[(start + np.arange(surge_duration)) % 24] = True
+        surge_hour_count = int(in_surge.sum())
 
         # Allocate 80% of casualties to surge hours
         surge_casualties = int(total_patients * 0.8)
         non_surge_casualties = total_patients - surge_casualties
 
-        # Distribute casualties
-        hourly_casualties = []
-
-        for hour in range(24):
-            if hour in surge_hours:
-                # High intensity during surge
-                base_rate = surge_casualties / len(surge_hours)
-                patients = int(base_rate * surge_intensity * random.uniform(0.8, 1.2))
-            # Low intensity between surges
-            elif 24 - len(surge_hours) > 0:
-                base_rate = non_surge_casualties / (24 - len(surge_hours))
-                patients = int(base_rate * between_surge * random.uniform(0.5, 1.5))
-            else:
-                patients = 0
-
-            hourly_casualties.append((hour, patients))
-
-        # Adjust for total
-        self._adjust_hourly_total(hourly_casualties, total_patients)
+        # High intensity during surges, low intensity between them, jittered per hour
+        hourly_weights = np.zeros(24)
+        if surge_hour_count:
+            hourly_weights[in_surge] = (
+                surge_casualties / surge_hour_count * surge_intensity * np.random.uniform(0.8, 1.2, surge_hour_count)  # noqa: NPY002
+            )
+        if surge_hour_count < 24:
+            hourly_weights[~in_surge] = (
+                non_surge_casualties
+                / (24 - surge_hour_count)
+                * between_surge
+                * np.random.uniform(0.5, 1.5, 24 - surge_hour_count)  # noqa: NPY002
+            )
 
         # Validate distribution to avoid hour 0 clustering
-        return self._validate_hourly_distribution(hourly_casualties, total_patients)
+        return self._validate_hourly_distribution(self._allocate_hours(total_patients, hourly_weights), total_patients)
 
-    def _generate_sporadic_pattern(self, total_patients: int, params: Dict) -> List[Tuple[int, int]]:
+    def _generate_sporadic_pattern(self, total_patients: int, params: Dict) -> np.ndarray:
         """Generate sporadic pattern (guerrilla warfare)"""
         events_range = params["events_per_day_range"]
         dawn_dusk_pref = params["dawn_dusk_preference"]
@@ -359,32 +486,13 @@ class TemporalPatternGenerator:
             hour_weights.append(weight)
 
         # Randomly select event hours
-        event_hours = []
-        total_weight = sum(hour_weights)
-
-        for _ in range(num_events):
-            r = random.uniform(0, total_weight)
-            cumulative = 0
-            for hour, weight in enumerate(hour_weights):
-                cumulative += weight
-                if r <= cumulative:
-                    event_hours.append(hour)
-                    break
+        hour_sampler = AliasSampler(range(24), hour_weights)
+        event_hours = [hour_sampler.sample() for _ in range(num_events)] if hour_sampler else []
 
         # Distribute patients among events
-        hourly_casualties = [0] * 24
-        patients_per_event = total_patients // num_events
-        remainder = total_patients % num_events
-
-        for i, hour in enumerate(event_hours):
-            patients = patients_per_event
-            if i < remainder:
-                patients += 1
-            hourly_casualties[hour] += patients
+        return self._split_among_events(total_patients, event_hours)
 
-        return [(h, p) for h, p in enumerate(hourly_casualties)]
-
-    def _generate_precision_strike_pattern(self, total_patients: int, params: Dict) -> List[Tuple[int, int]]:
+    def _generate_precision_strike_pattern(self, total_patients: int, params: Dict) -> np.ndarray:
         """Generate precision strike pattern (drone warfare)"""
         strikes_range = params["strikes_per_day_range"]
         preference = params["strike_window_preference"]
@@ -413,135 +521,99 @@ class TemporalPatternGenerator:
             strike_hours.append(hour)
 
         # Distribute patients
-        hourly_casualties = [0] * 24
-        patients_per_strike = total_patients // num_strikes
-        remainder = total_patients % num_strikes
-
-        for i, hour in enumerate(strike_hours):
-            patients = patients_per_strike
-            if i < remainder:
-                patients += 1
-            hourly_casualties[hour] += patients
-
-        return [(h, p) for h, p in enumerate(hourly_casualties)]
+        return self._split_among_events(total_patients, strike_hours)
 
-    def _generate_phased_assault_pattern(self, total_patients: int, params: Dict) -> List[Tuple[int, int]]:
+    def _generate_phased_assault_pattern(self, total_patients: int, params: Dict) -> np.ndarray:
         """Generate phased assault pattern (urban warfare)"""
         phases = params["assault_phases"]
         baseline = params["baseline_intensity"]
 
-        # Calculate total weight
-        total_weight = 0
-        phase_hours = set()
-
+        # Baseline intensity outside phases; the first phase covering an hour sets its intensity
+        hourly_intensity = np.full(24, float(baseline))
+        covered = np.zeros(24, dtype=bool)
         for phase in phases:
-            for h in range(phase["duration"]):
-                hour = (phase["start_hour"] + h) % 24
-                phase_hours.add(hour)
-                total_weight += phase["intensity"] * self.hourly_baseline[hour]
-
-        # Add baseline for non-phase hours
-        for hour in range(24):
-            if hour not in phase_hours:
-                total_weight += baseline * self.hourly_baseline[hour]
+            phase_hours = (phase["start_hour"] + np.arange(phase["duration"])) % 24
+            new_hours = phase_hours[~covered[phase_hours]]
+            hourly_intensity[new_hours] = phase["intensity"]
+            covered[new_hours] = True
 
-        # Distribute patients
-        hourly_casualties = []
-        allocated = 0
+        return self._allocate_hours(total_patients, hourly_intensity * np.asarray(self.hourly_baseline))
 
-        for hour in range(24):
-            # Check if hour is in a phase
-            in_phase = False
-            for phase in phases:
-                phase_start = phase["start_hour"]
-                phase_end = (phase_start + phase["duration"]) % 24
-
-                if phase_start <= phase_end:
-                    if phase_start <= hour < phase_end:
-                        in_phase = True
-                        intensity = phase["intensity"]
-                        break
-                elif hour >= phase_start or hour < phase_end:
-                    in_phase = True
-                    intensity = phase["intensity"]
-                    break
-
-            if not in_phase:
-                intensity = baseline
-
-            weight = intensity * self.hourly_baseline[hour]
-            if hour == 23:  # Last hour
-                patients = total_patients - allocated
-            else:
-                patients = int(total_patients * weight / total_weight)
-
-            hourly_casualties.append((hour, patients))
-            allocated += patients
-
-        return hourly_casualties
-
-    def _generate_hour_events(
+    def _synthesize_events(
         self,
-        warfare_type: str,
-        hour_patients: int,
-        day: int,
-        hour: int,
-        day_datetime: datetime,
-        clustering_params: Dict,
-        environmental_factors: List[str],
+        cell_days: np.ndarray,
+        cell_warfare: np.ndarray,
+        cell_hourly_counts: np.ndarray,
+        warfare_types: List[str],
         intensity_mod: Dict,
-    ) -> List[CasualtyEvent]:
-        """Generate specific casualty events for an hour"""
-        events = []
-        remaining_patients = hour_patients
-
-        # Check for mass casualty event
-        mass_casualty_prob = clustering_params["mass_casualty_probability"]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Turn hourly casualty counts into individual events for every cell at once.
+
+        Each (day, warfare type, hour) cell may hold one mass casualty event,
+        with the rest of its casualties split into groups of 1-3 at random
+        seconds within the hour. Group sizes for all cells come from a single
+        draw that is cut into per-cell segments by cumulative sums.
+
+        Args:
+            cell_days: Day index per (day, warfare type) row
+            cell_warfare: Warfare type code per row, indexing warfare_types
+            cell_hourly_counts: (rows, 24) casualty counts
+            warfare_types: Warfare type names by code
+            intensity_mod: Intensity level settings
+
+        Returns:
+            Tuple of (offset seconds, patient counts, warfare codes, mass casualty flags) per event
+        """
+        # Flatten to one entry per (day, warfare type, hour) cell that has casualties
+        rows, hours = np.nonzero(cell_hourly_counts)
+        counts = cell_hourly_counts[rows, hours]
+        warfare = cell_warfare[rows]
+        cell_start = cell_days[rows] * SECONDS_PER_DAY + hours * SECONDS_PER_HOUR
+
+        clustering = [self.warfare_patterns["warfare_types"][wtype]["casualty_clustering"] for wtype in warfare_types]
+        mass_casualty_prob = np.array([c["mass_casualty_probability"] for c in clustering], dtype=float)
         mass_casualty_prob *= intensity_mod.get("mass_casualty_reduction", 1.0)
+        size_low = np.array([c["cluster_size_range"][0] for c in clustering], dtype=np.int64)
+        size_high = np.array([c["cluster_size_range"][1] for c in clustering], dtype=np.int64)
 
-        if random.random() < mass_casualty_prob and remaining_patients > 5:
-            # Generate mass casualty event
-            size_range = clustering_params["cluster_size_range"]
-            size = random.randint(*size_range)
-            size = min(size, remaining_patients)
-
-            # Random minute within the hour
-            minute = random.randint(0, 59)
-            timestamp = day_datetime + timedelta(hours=hour, minutes=minute)
-
-            event = CasualtyEvent(
-                timestamp=timestamp,
-                patient_count=size,
-                warfare_type=warfare_type,
-                is_mass_casualty=True,
-                event_id=f"MC_{warfare_type}_{day}_{hour}_{minute}_{uuid.uuid4().hex[:8]}",
-                environmental_factors=environmental_factors,
-            )
-            events.append(event)
-            remaining_patients -= size
-
-        # Distribute remaining as individual or small group casualties
-        while remaining_patients > 0:
-            # Small groups of 1-3
-            group_size = min(random.randint(1, 3), remaining_patients)
-
-            # Random minute
-            minute = random.randint(0, 59)
-            second = random.randint(0, 59)
-            timestamp = day_datetime + timedelta(hours=hour, minutes=minute, seconds=second)
-
-            event = CasualtyEvent(
-                timestamp=timestamp,
-                patient_count=group_size,
-                warfare_type=warfare_type,
-                is_mass_casualty=False,
-                event_id=f"IND_{warfare_type}_{day}_{hour}_{minute}_{uuid.uuid4().hex[:8]}",
-                environmental_factors=environmental_factors,
-            )
-            events.append(event)
-            remaining_patients -= group_size
-
-        return events
+        # Check for mass casualty event
+        mass_cells = np.flatnonzero((np.random.random(len(counts)) < mass_casualty_prob[warfare]) & (counts > 5))  # noqa: NPY002
+        mass_warfare = warfare[mass_cells]
+        mass_sizes = np.minimum(
+            np.random.randint(size_low[mass_warfare], size_high[mass_warfare] + 1),  # noqa: NPY002
+            counts[mass_cells],
+        )
+        # Random minute within the hour
+        mass_offsets = cell_start[mass_cells] + 60 * np.random.randint(0, 60, len(mass_cells))  # noqa: NPY002
+
+        remaining = counts.copy()
+        remaining[mass_cells] -= mass_sizes
+
+        # Distribute remaining as individual or small group casualties: draw one candidate
+        # group size (1-3) per remaining casualty, then keep groups until each cell is full
+        draw_cell = np.repeat(np.arange(len(remaining)), remaining)
+        sizes = np.random.randint(1, 4, len(draw_cell))  # noqa: NPY002
+        group_start = np.cumsum(sizes) - sizes
+        cell_first_draw = np.cumsum(remaining) - remaining
+        cell_base = np.zeros(len(remaining), dtype=np.int64)
+        has_remaining = remaining > 0
+        cell_base[has_remaining] = group_start[cell_first_draw[has_remaining]]
+        filled = group_start - cell_base[draw_cell]
+        keep = filled < remaining[draw_cell]
+
+        group_cells = draw_cell[keep]
+        group_sizes = np.minimum(sizes[keep], remaining[group_cells] - filled[keep])
+        # Random minute and second
+        group_offsets = cell_start[group_cells] + np.random.randint(0, SECONDS_PER_HOUR, len(group_cells))  # noqa: NPY002
+
+        offsets = np.concatenate([mass_offsets, group_offsets]).astype(np.int64)
+        patient_counts = np.concatenate([mass_sizes, group_sizes]).astype(np.int64)
+        event_warfare = np.concatenate([mass_warfare, warfare[group_cells]]).astype(np.int64)
+        is_mass_casualty = np.concatenate(
+            [np.ones(len(mass_cells), dtype=bool), np.zeros(len(group_cells), dtype=bool)]
+        )
+        return offsets, patient_counts, event_warfare, is_mass_casualty
 
     def _get_special_events_for_day(
         self, day: int, special_events: Dict[str, bool], day_patients: int, base_date: str
@@ -571,7 +643,7 @@ class TemporalPatternGenerator:
                 patient_count=patients,
                 warfare_type="mixed",
                 is_mass_casualty=True,
-                event_id=f"SE_mass_casualty_{day}_{hour}_{uuid.uuid4().hex[:8]}",
+                event_id=f"SE_mass_casualty_{day}_{hour}",
                 special_event_type="mass_casualty",
             )
             events.append(event)
@@ -588,7 +660,7 @@ class TemporalPatternGenerator:
                 patient_count=patients,
                 warfare_type="mixed",
                 is_mass_casualty=True,
-                event_id=f"SE_major_offensive_{day}_{hour}_{uuid.uuid4().hex[:8]}",
+                event_id=f"SE_major_offensive_{day}_{hour}",
                 special_event_type="major_offensive",
             )
             events.append(event)
@@ -605,7 +677,7 @@ class TemporalPatternGenerator:
                 patient_count=patients,
                 warfare_type="mixed",
                 is_mass_casualty=True,
-                event_id=f"SE_ambush_{day}_{hour}_{uuid.uuid4().hex[:8]}",
+                event_id=f"SE_ambush_{day}_{hour}",
                 special_event_type="ambush",
             )
             events.append(event)
@@ -613,13 +685,20 @@ class TemporalPatternGenerator:
         return events
 
     def _apply_environmental_modifiers(
-        self, events: List[CasualtyEvent], environmental_conditions: Dict[str, bool]
-    ) -> List[CasualtyEvent]:
-        """Apply environmental effects to all events"""
-        active_conditions = [cond for cond, active in environmental_conditions.items() if active]
-
+        self,
+        patient_counts: np.ndarray,
+        offsets: np.ndarray,
+        is_mass_casualty: np.ndarray,
+        active_conditions: List[str],
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Apply environmental effects to all events.
+
+        Returns:
+            Tuple of (adjusted patient counts, adjusted offset seconds)
+        """
         if not active_conditions:
-            return events
+            return patient_counts, offsets
 
         # Calculate compound modifiers
         total_casualty_mod = 1.0
@@ -632,91 +711,24 @@ class TemporalPatternGenerator:
             total_visibility *= mod["visibility"]
             total_delay += mod["evacuation_delay_minutes"]
 
-        # Apply to each event
-        modified_events = []
+        # Adjust patient count
+        adjusted_counts = np.maximum(1, (patient_counts * total_casualty_mod).astype(np.int64))
 
-        for event in events:
-            # Adjust patient count
-            adjusted_count = max(1, int(event.patient_count * total_casualty_mod))
+        # Add discovery delay for low visibility
+        adjusted_offsets = offsets
+        if total_visibility < 0.5:
+            delays = 60 * np.random.randint(0, int(total_delay) + 1, len(offsets))  # noqa: NPY002
+            adjusted_offsets = np.where(is_mass_casualty, offsets, offsets + delays)
 
-            # Add discovery delay for low visibility
-            if total_visibility < 0.5 and not event.is_mass_casualty:
-                delay = random.randint(0, int(total_delay))
-                adjusted_timestamp = event.timestamp + timedelta(minutes=delay)
-            else:
-                adjusted_timestamp = event.timestamp
-
-            # Create modified event
-            modified_event = CasualtyEvent(
-                timestamp=adjusted_timestamp,
-                patient_count=adjusted_count,
-                warfare_type=event.warfare_type,
-                is_mass_casualty=event.is_mass_casualty,
-                event_id=event.event_id,
-                environmental_factors=active_conditions,
-                special_event_type=event.special_event_type,
-            )
+        return adjusted_counts, adjusted_offsets
 
-            modified_events.append(modified_event)
-
-        return modified_events
-
-    def _adjust_hourly_total(self, hourly_casualties: List[Tuple[int, int]], target_total: int):
-        """Adjust hourly casualties to match target total"""
-        current_total = sum(h[1] for h in hourly_casualties)
-
-        if current_total == target_total:
-            return
-
-        difference = target_total - current_total
-
-        # Find hours with casualties to adjust
-        hours_with_casualties = [(i, h[1]) for i, h in enumerate(hourly_casualties) if h[1] > 0]
-
-        if not hours_with_casualties:
-            # If no hours have casualties, distribute evenly
-            per_hour = target_total // 24
-            remainder = target_total % 24
-            for i in range(24):
-                casualties = per_hour
-                if i < remainder:
-                    casualties += 1
-                hourly_casualties[i] = (i, casualties)
-            return
-
-        # Distribute difference among hours with casualties
-        safety_counter = 0
-        max_iterations = 1000  # Prevent infinite loops
-        while difference != 0 and safety_counter < max_iterations:
-            safety_counter += 1
-            made_progress = False
-
-            for i, _ in hours_with_casualties:
-                if difference == 0:
-                    break
-
-                if difference > 0:
-                    hourly_casualties[i] = (hourly_casualties[i][0], hourly_casualties[i][1] + 1)
-                    difference -= 1
-                    made_progress = True
-                elif hourly_casualties[i][1] > 1:  # Don't reduce below 1
-                    hourly_casualties[i] = (hourly_casualties[i][0], hourly_casualties[i][1] - 1)
-                    difference += 1
-                    made_progress = True
-
-            # If no progress made in a full loop, break to prevent infinite loop
-            if not made_progress:
-                break
-
-    def _validate_hourly_distribution(
-        self, hourly_casualties: List[Tuple[int, int]], total_patients: int
-    ) -> List[Tuple[int, int]]:
+    def _validate_hourly_distribution(self, hourly_casualties: np.ndarray, total_patients: int) -> np.ndarray:
         """Validate hourly distribution and redistribute if too concentrated at hour 0"""
-        if not hourly_casualties or total_patients == 0:
+        if total_patients == 0:
             return hourly_casualties
 
         # Check if hour 0 has more than 10% of patients
-        hour_0_patients = hourly_casualties[0][1] if hourly_casualties else 0
+        hour_0_patients = int(hourly_casualties[0])
 
         if hour_0_patients > total_patients * 0.1:
             # Calculate excess to redistribute
@@ -724,22 +736,14 @@ class TemporalPatternGenerator:
             excess = hour_0_patients - target_hour_0
 
             if excess > 0:
-                # Create mutable list
-                hourly_list = list(hourly_casualties)
+                hourly_casualties = hourly_casualties.copy()
 
                 # Reduce hour 0
-                hourly_list[0] = (0, target_hour_0)
+                hourly_casualties[0] = target_hour_0
 
                 # Redistribute excess to daytime hours (6-18)
-                daytime_hours = list(range(6, 19))
-                patients_per_hour = excess // len(daytime_hours)
-                remainder = excess % len(daytime_hours)
-
-                for i, hour in enumerate(daytime_hours):
-                    additional = patients_per_hour + (1 if i < remainder else 0)
-                    current = hourly_list[hour][1]
-                    hourly_list[hour] = (hour, current + additional)
-
-                return hourly_list
+                patients_per_hour, remainder = divmod(excess, 13)
+                hourly_casualties[6:19] += patients_per_hour
+                hourly_casualties[6 : 6 + remainder] += 1
 
         return hourly_casualties
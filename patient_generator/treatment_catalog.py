@@ -0,0 +1,111 @@
+"""
+Treatment Catalog
+Interns treatment names to integer IDs so treatment sets can be held as bitmasks
+"""
+
+import threading
+from typing import Dict, Iterable, List, Optional
+
+
+class TreatmentCatalog:
+    """
+    Append-only registry mapping treatment names to integer IDs.
+
+    Each treatment owns one bit (1 << id), so facility capabilities,
+    contraindications and the treatments already applied to a patient are
+    plain ints and membership tests are single AND operations. IDs are stable
+    for the lifetime of the process; names are interned on first use.
+
+    Read paths use bit_of()/known_mask_of(): a name that was never interned
+    is in no mask, so it needs no bit, and arbitrary input never grows the
+    catalog.
+    """
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._ids
+
+    def intern(self, name: str) -> int:
+        """Return the ID for a treatment name, assigning one if new"""
+        treatment_id = self._ids.get(name)
+        if treatment_id is None:
+            with self._lock:
+                treatment_id = self._ids.get(name)
+                if treatment_id is None:
+                    treatment_id = len(self._names)
+                    self._names.append(name)
+                    self._ids[name] = treatment_id
+        return treatment_id
+
+    def id_of(self, name: str) -> Optional[int]:
+        """Return the ID for a treatment name without interning it"""
+        return self._ids.get(name)
+
+    def bit_of(self, name: str) -> int:
+        """Return the bit for a treatment name without interning it; 0 if the name is unknown"""
+        treatment_id = self._ids.get(name)
+        return 0 if treatment_id is None else 1 << treatment_id
+
+    def known_mask_of(self, names: Iterable[str]) -> int:
+        """Return the bitmask of the known names among the given ones, without interning"""
+        mask = 0
+        for name in names:
+            mask |= self.bit_of(name)
+        return mask
+
+    def name_of(self, treatment_id: int) -> str:
+        """Return the treatment name for an ID"""
+        return self._names[treatment_id]
+
+    def bit(self, name: str) -> int:
+        """Return the single-bit mask for a treatment name"""
+        return 1 << self.intern(name)
+
+    def mask_of(self, names: Iterable[str]) -> int:
+        """Return the bitmask covering all given treatment names"""
+        mask = 0
+        for name in names:
+            mask |= 1 << self.intern(name)
+        return mask
+
+    def names_of(self, mask: int) -> List[str]:
+        """Return the treatment names in a bitmask, in ID order"""
+        names = []
+        treatment_id = 0
+        while mask:
+            if mask & 1:
+                names.append(self._names[treatment_id])
+            mask >>= 1
+            treatment_id += 1
+        return names
+
+    def applied_mask(self, treatments: Iterable[Dict]) -> int:
+        """
+        Return the bitmask of treatment records.
+
+        Accepts the treatment dicts passed between simulation modules, named
+        by either "name" or "treatment".
+        """
+        mask = 0
+        for treatment in treatments:
+            if isinstance(treatment, dict):
+                name = treatment.get("name") or treatment.get("treatment")
+                if name:
+                    mask |= 1 << self.intern(name)
+        return mask
+
+
+# Shared catalog so IDs agree across modifiers, protocols and the utility model
+_catalog = TreatmentCatalog()
+
+
+def get_treatment_catalog() -> TreatmentCatalog:
+    """Get the process-wide treatment catalog"""
+    return _catalog
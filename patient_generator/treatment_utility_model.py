@@ -8,16 +8,28 @@ based on medical appropriateness, urgency, effectiveness, and resource availabil
 
 from dataclasses import dataclass, field
 from datetime import datetime
-import json
 import logging
 import math
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 import numpy as np
 
+from .reference_data import load_reference
+from .treatment_catalog import get_treatment_catalog
+
 logger = logging.getLogger(__name__)
 
+# Rows for resource levels outside the precomputed defaults memoized per table
+MAX_DERIVED_ROWS = 1024
+
+# Treatment matrix, masks and utility rows are built once per protocols file and
+# shared by every model (the bridge creates one per patient). An entry is reused
+# while the reference registry hands out the same parsed protocols.
+_shared_tables: Dict[str, Tuple[Any, Tuple[Any, ...]]] = {}
+_shared_tables_lock = threading.Lock()
+
 
 @dataclass
 class TreatmentOption:
@@ -33,6 +45,20 @@ class TreatmentOption:
     effectiveness: float = 0.8
 
 
+@dataclass
+class _UtilityRow:
+    """Time-independent weighted utility terms for one injury, severity and facility."""
+
+    names: List[str]
+    appropriateness: np.ndarray
+    effectiveness: np.ndarray
+    availability: np.ndarray
+    capability: np.ndarray
+    golden_hour: np.ndarray
+    max_minutes: np.ndarray
+    decay_rates: np.ndarray
+
+
 class TreatmentUtilityModel:
     """
     Probabilistic treatment selection using multi-attribute utility scoring.
@@ -60,20 +86,61 @@ class TreatmentUtilityModel:
     # Softmax temperature for treatment selection
     TEMPERATURE = 0.5
 
+    # Effectiveness modifiers by injury severity
+    SEVERITY_MODIFIERS = {
+        "Severe": 0.9,  # High effectiveness needed
+        "Moderate to severe": 0.85,
+        "Moderate": 0.8,
+        "Mild to moderate": 0.75,
+        "Mild": 0.7,
+    }
+
     def __init__(self, config_path: Optional[Path] = None):
         """Initialize treatment utility model with configuration."""
         self.config_path = config_path or Path(__file__).parent / "treatment_protocols.json"
         self.protocols: Dict[str, Any] = {}
         self.treatment_matrix: Dict[str, Dict[str, float]] = {}
         self.facility_capabilities: Dict[str, List[str]] = {}
+        self.catalog = get_treatment_catalog()
+        self.facility_capability_masks: Dict[str, int] = {}
+        self.contraindication_masks: Dict[str, int] = {}
+        self.utility_rows: Dict[Tuple[str, str, str, int], Optional[_UtilityRow]] = {}
+        self._utility_row_limit = MAX_DERIVED_ROWS
         self._load_protocols()
-        self._build_treatment_matrix()
+        self._share_protocol_tables()
+
+    def _share_protocol_tables(self) -> None:
+        """Use the tables for this protocols version, building them if no model has yet"""
+        path = str(Path(self.config_path).resolve())
+        with _shared_tables_lock:
+            cached = _shared_tables.get(path)
+            if cached is not None and cached[0] is self.protocols:
+                (
+                    self.treatment_matrix,
+                    self.contraindication_masks,
+                    self.facility_capability_masks,
+                    self.utility_rows,
+                    self._utility_row_limit,
+                ) = cached[1]
+                return
+            self._build_treatment_matrix()
+            self._precompute_utility_rows()
+            self._utility_row_limit = len(self.utility_rows) + MAX_DERIVED_ROWS
+            _shared_tables[path] = (
+                self.protocols,
+                (
+                    self.treatment_matrix,
+                    self.contraindication_masks,
+                    self.facility_capability_masks,
+                    self.utility_rows,
+                    self._utility_row_limit,
+                ),
+            )
 
     def _load_protocols(self) -> None:
         """Load treatment protocols from JSON configuration."""
         try:
-            with open(self.config_path) as f:
-                self.protocols = json.load(f)
+            self.protocols = load_reference(self.config_path)
 
             # Extract facility capabilities
             self.facility_capabilities = {
@@ -96,6 +163,13 @@ class TreatmentUtilityModel:
 
         for snomed_code, protocol in matrix.items():
             self.treatment_matrix[snomed_code] = protocol.get("utility_scores", {})
+            self.contraindication_masks[snomed_code] = self.catalog.mask_of(
+                protocol.get("contraindicated_treatments", [])
+            )
+
+        # "all" grants every treatment, which -1 does for any catalog bit
+        for facility, treatments in self.facility_capabilities.items():
+            self.facility_capability_masks[facility] = -1 if "all" in treatments else self.catalog.mask_of(treatments)
 
     def _get_default_protocols(self) -> Dict[str, Any]:
         """Return minimal default protocols as fallback."""
@@ -175,9 +249,7 @@ class TreatmentUtilityModel:
                 return scores[treatment]
 
         # Check if treatment is contraindicated
-        protocol = self.protocols.get("treatment_appropriateness_matrix", {}).get(injury_code, {})
-        contraindicated = protocol.get("contraindicated_treatments", [])
-        if treatment in contraindicated:
+        if self.contraindication_masks.get(injury_code, 0) & self.catalog.bit_of(treatment):
             return 0.0
 
         # Default score for unknown combinations
@@ -203,17 +275,8 @@ class TreatmentUtilityModel:
 
     def _get_effectiveness(self, treatment: str, severity: str) -> float:
         """Get treatment effectiveness based on severity."""
-        # Severity modifiers
-        severity_modifiers = {
-            "Severe": 0.9,  # High effectiveness needed
-            "Moderate to severe": 0.85,
-            "Moderate": 0.8,
-            "Mild to moderate": 0.75,
-            "Mild": 0.7,
-        }
-
         base_effectiveness = 0.8  # Default effectiveness
-        severity_modifier = severity_modifiers.get(severity, 0.8)
+        severity_modifier = self.SEVERITY_MODIFIERS.get(severity, 0.8)
 
         # Some treatments are more effective for severe cases
         if treatment in ["tourniquet", "blood_transfusion", "damage_control_surgery"]:
@@ -244,134 +307,253 @@ class TreatmentUtilityModel:
 
     def _check_facility_capability(self, treatment: str, facility: str) -> float:
         """Check if facility can provide treatment (binary)."""
-        available_treatments = self.facility_capabilities.get(facility, [])
-
         # Check if treatment is available or 'all' is specified
-        if treatment in available_treatments or "all" in available_treatments:
+        if self.facility_capability_masks.get(facility, 0) & self.catalog.bit_of(treatment):
             return 1.0
 
         return 0.0
 
-    def select_treatments(
-        self,
-        injury_code: str,
-        severity: str,
-        facility: str,
-        time_elapsed_minutes: int = 0,
-        available_resources: Optional[Dict[str, int]] = None,
-        max_treatments: int = 3,
-    ) -> List[Dict[str, Any]]:
+    def _get_utility_row(
+        self, injury_code: str, severity: str, facility: str, available_resources: Dict[str, int]
+    ) -> Optional[_UtilityRow]:
         """
-        Select treatments using softmax probability distribution.
+        Get the cached time-independent utility row for an injury at a facility.
 
-        Args:
-            injury_code: SNOMED code for injury
-            severity: Injury severity
-            facility: Current facility
-            time_elapsed_minutes: Time since injury
-            available_resources: Available resources
-            max_treatments: Maximum number of treatments to select
-
-        Returns:
-            List of selected treatments with metadata
+        Returns None when the injury has no candidate treatments at the facility.
         """
-        available_resources = available_resources or {"supplies": 100}
+        supplies = available_resources.get("supplies", 0)
+        key = (injury_code, severity, facility, supplies)
+        if key in self.utility_rows:
+            return self.utility_rows[key]
 
-        # First, get recommended treatments for this specific injury
         protocol = self.protocols.get("treatment_appropriateness_matrix", {}).get(injury_code, {})
         primary_treatments = protocol.get("primary_treatments", {}).get(facility, [])
 
-        # If we have specific treatments for this injury, use those
-        if primary_treatments:
-            possible_treatments = primary_treatments
-        else:
-            # Otherwise, get all possible treatments for this facility
-            possible_treatments = self.facility_capabilities.get(facility, [])
+        # Use the injury's recommended treatments, otherwise everything the facility offers
+        possible_treatments = primary_treatments or self.facility_capabilities.get(facility, [])
+
+        row = None
+        if possible_treatments:
+            contraindicated = self.contraindication_masks.get(injury_code, 0)
+            names = [
+                treatment
+                for treatment in possible_treatments
+                if treatment != "all" and not contraindicated & self.catalog.bit_of(treatment)
+            ]
+            golden_hour = self.protocols.get("urgency_parameters", {}).get("golden_hour_treatments", {})
+            row = _UtilityRow(
+                names=names,
+                appropriateness=np.array(
+                    [self.WEIGHTS["appropriateness"] * self._get_appropriateness_score(t, injury_code) for t in names]
+                ),
+                effectiveness=np.array(
+                    [self.WEIGHTS["effectiveness"] * self._get_effectiveness(t, severity) for t in names]
+                ),
+                availability=np.array(
+                    [self.WEIGHTS["availability"] * self._calculate_availability(t, available_resources) for t in names]
+                ),
+                capability=np.array(
+                    [self.WEIGHTS["capability"] * self._check_facility_capability(t, facility) for t in names]
+                ),
+                golden_hour=np.array([t in golden_hour for t in names], dtype=bool),
+                max_minutes=np.array([golden_hour.get(t, {}).get("max_minutes", 60) for t in names], dtype=float),
+                decay_rates=np.array([golden_hour.get(t, {}).get("decay_rate", 0.02) for t in names], dtype=float),
+            )
+
+        if len(self.utility_rows) < self._utility_row_limit:
+            self.utility_rows[key] = row
+        return row
+
+    def _precompute_utility_rows(self) -> None:
+        """Build utility rows for every known injury, severity and facility."""
+        default_resources = {"supplies": 100}
+        for injury_code in self.protocols.get("treatment_appropriateness_matrix", {}):
+            for severity in self.SEVERITY_MODIFIERS:
+                for facility in self.facility_capabilities:
+                    self._get_utility_row(injury_code, severity, facility, default_resources)
+
+    def _row_utilities(self, row: _UtilityRow, time_elapsed_minutes: np.ndarray) -> np.ndarray:
+        """
+        Combine a cached row with urgency for one or more elapsed times.
+
+        Terms are added in the same order as calculate_utility.
 
-        # Check for contraindicated treatments
-        contraindicated = protocol.get("contraindicated_treatments", [])
+        Args:
+            row: Cached utility row
+            time_elapsed_minutes: Array of elapsed minutes, shape (n, 1) or scalar
 
-        if not possible_treatments:
-            # Fallback to default treatment
+        Returns:
+            Utilities clamped to [0, 1], one row per elapsed time
+        """
+        minutes = np.asarray(time_elapsed_minutes, dtype=float)
+        urgency = np.where(
+            row.golden_hour,
+            np.where(minutes <= row.max_minutes, np.exp(-row.decay_rates * minutes), 0.2),
+            0.8,
+        )
+        utility = row.appropriateness + self.WEIGHTS["urgency"] * urgency
+        utility = utility + row.effectiveness
+        utility = utility + row.availability
+        utility = utility + row.capability
+        return np.clip(utility, 0.0, 1.0)
+
+    def _fallback_treatments(self, injury_code: str, facility: str, has_candidates: bool) -> List[Dict[str, Any]]:
+        """Treatment used when the utility model has nothing viable to select."""
+        if not has_candidates:
             default = self.protocols.get("default_fallbacks", {}).get(facility, "basic_bandage")
             return [{"name": default, "utility_score": 0.5, "applied_at": datetime.now()}]
 
-        # Calculate utilities for possible treatments
-        treatment_utilities = []
-        for treatment in possible_treatments:
-            if treatment == "all":  # Skip meta-indicator
-                continue
+        # No viable treatments, use injury-appropriate fallback
+        if "45170000" in injury_code:  # Psychological stress
+            return [{"name": "psychological_first_aid", "utility_score": 0.5, "applied_at": datetime.now()}]
+        if "62315008" in injury_code:  # Diarrhea
+            return [{"name": "oral_rehydration", "utility_score": 0.5, "applied_at": datetime.now()}]
+        default = self.protocols.get("default_fallbacks", {}).get(facility, "supportive_care")
+        return [{"name": default, "utility_score": 0.3, "applied_at": datetime.now()}]
 
-            # Skip contraindicated treatments
-            if treatment in contraindicated:
-                continue
+    def _select_from_row(
+        self,
+        row: _UtilityRow,
+        injury_code: str,
+        facility: str,
+        time_elapsed_minutes: np.ndarray,
+        max_treatments: int,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Sample treatments from one utility row for one or more patients.
 
-            utility = self.calculate_utility(
-                treatment, injury_code, severity, facility, time_elapsed_minutes, available_resources
-            )
+        Softmax sampling without replacement, P(treatment) = exp(utility/τ) / Σ exp(utilities/τ),
+        is done with Gumbel top-k: perturb utility/τ with Gumbel noise and keep
+        the k largest. This is the same distribution as sequential softmax
+        draws, but vectorizes over patients.
 
-            # Only consider treatments with positive utility
-            if utility > 0.2:  # Threshold for minimum viability
-                treatment_utilities.append({"name": treatment, "utility": utility})
+        Args:
+            row: Cached utility row
+            injury_code: SNOMED code for injury (for fallbacks)
+            facility: Current facility
+            time_elapsed_minutes: Elapsed minutes, one per patient
+            max_treatments: Maximum number of treatments per patient
+
+        Returns:
+            Selected treatments per patient
+        """
+        utilities = self._row_utilities(row, time_elapsed_minutes[:, np.newaxis])
 
-        if not treatment_utilities:
-            # No viable treatments, use injury-appropriate fallback
-            if "45170000" in injury_code:  # Psychological stress
-                return [{"name": "psychological_first_aid", "utility_score": 0.5, "applied_at": datetime.now()}]
-            if "62315008" in injury_code:  # Diarrhea
-                return [{"name": "oral_rehydration", "utility_score": 0.5, "applied_at": datetime.now()}]
-            default = self.protocols.get("default_fallbacks", {}).get(facility, "supportive_care")
-            return [{"name": default, "utility_score": 0.3, "applied_at": datetime.now()}]
+        # Only consider treatments with positive utility
+        viable = utilities > 0.2  # Threshold for minimum viability
 
-        # Apply softmax to convert utilities to probabilities
-        selected = self._softmax_selection(treatment_utilities, max_treatments)
+        noise = np.random.gumbel(size=utilities.shape)  # noqa: NPY002
+        keys = np.where(viable, utilities / self.TEMPERATURE + noise, -np.inf)
+        order = np.argsort(-keys, axis=1)[:, :max_treatments]
+        counts = np.minimum(viable.sum(axis=1), max_treatments)
 
-        # Format results
         results = []
-        for treatment in selected:
+        for patient_index, patient_utilities in enumerate(utilities):
+            if not viable[patient_index].any():
+                results.append(self._fallback_treatments(injury_code, facility, has_candidates=True))
+                continue
+
+            # Sort by utility (highest first)
+            chosen = sorted(
+                order[patient_index, : counts[patient_index]], key=lambda i: patient_utilities[i], reverse=True
+            )
             results.append(
-                {
-                    "name": treatment["name"],
-                    "utility_score": round(treatment["utility"], 3),
-                    "applied_at": datetime.now(),
-                    "facility": facility,
-                }
+                [
+                    {
+                        "name": row.names[i],
+                        "utility_score": round(float(patient_utilities[i]), 3),
+                        "applied_at": datetime.now(),
+                        "facility": facility,
+                    }
+                    for i in chosen
+                ]
             )
-
         return results
 
-    def _softmax_selection(
-        self, treatment_utilities: List[Dict[str, Any]], max_selections: int
+    def select_treatments(
+        self,
+        injury_code: str,
+        severity: str,
+        facility: str,
+        time_elapsed_minutes: int = 0,
+        available_resources: Optional[Dict[str, int]] = None,
+        max_treatments: int = 3,
     ) -> List[Dict[str, Any]]:
         """
         Select treatments using softmax probability distribution.
 
-        P(treatment) = exp(utility/τ) / Σ exp(utilities/τ)
+        Args:
+            injury_code: SNOMED code for injury
+            severity: Injury severity
+            facility: Current facility
+            time_elapsed_minutes: Time since injury
+            available_resources: Available resources
+            max_treatments: Maximum number of treatments to select
+
+        Returns:
+            List of selected treatments with metadata
         """
-        if not treatment_utilities:
-            return []
+        available_resources = available_resources or {"supplies": 100}
 
-        # Extract utilities
-        utilities = np.array([t["utility"] for t in treatment_utilities])
+        row = self._get_utility_row(injury_code, severity, facility, available_resources)
+        if row is None:
+            return self._fallback_treatments(injury_code, facility, has_candidates=False)
 
-        # Apply softmax with temperature
-        exp_utilities = np.exp(utilities / self.TEMPERATURE)
-        probabilities = exp_utilities / np.sum(exp_utilities)
+        minutes = np.array([time_elapsed_minutes], dtype=float)
+        return self._select_from_row(row, injury_code, facility, minutes, max_treatments)[0]
 
-        # Select treatments probabilistically
-        n_selections = min(max_selections, len(treatment_utilities))
+    def select_treatments_batch(
+        self,
+        injury_codes: Sequence[str],
+        severities: Sequence[str],
+        facility: str,
+        time_elapsed_minutes: Optional[Sequence[int]] = None,
+        *,
+        available_resources: Optional[Dict[str, int]] = None,
+        max_treatments: int = 3,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Select treatments for many patients at one facility.
 
-        # Use numpy's random choice with probabilities
-        indices = np.random.choice(  # noqa: NPY002
-            len(treatment_utilities), size=min(n_selections, len(treatment_utilities)), replace=False, p=probabilities
-        )
+        Patients sharing an injury and severity are scored together as one
+        (patients x treatments) matrix.
+
+        Args:
+            injury_codes: SNOMED code per patient
+            severities: Injury severity per patient
+            facility: Facility all patients are at
+            time_elapsed_minutes: Time since injury per patient (default 0)
+            available_resources: Available resources
+            max_treatments: Maximum number of treatments per patient
 
-        selected = [treatment_utilities[i] for i in indices]
+        Returns:
+            Selected treatments per patient, in input order
+        """
+        if len(injury_codes) != len(severities):
+            msg = "injury_codes and severities must have the same length"
+            raise ValueError(msg)
 
-        # Sort by utility (highest first)
-        selected.sort(key=lambda x: x["utility"], reverse=True)
+        available_resources = available_resources or {"supplies": 100}
+        if time_elapsed_minutes is None:
+            minutes = np.zeros(len(injury_codes))
+        else:
+            minutes = np.asarray(time_elapsed_minutes, dtype=float)
+
+        groups: Dict[Tuple[str, str], List[int]] = {}
+        for position, key in enumerate(zip(injury_codes, severities)):
+            groups.setdefault(key, []).append(position)
+
+        results: List[List[Dict[str, Any]]] = [[] for _ in injury_codes]
+        for (injury_code, severity), positions in groups.items():
+            row = self._get_utility_row(injury_code, severity, facility, available_resources)
+            if row is None:
+                selections = [self._fallback_treatments(injury_code, facility, has_candidates=False) for _ in positions]
+            else:
+                selections = self._select_from_row(row, injury_code, facility, minutes[positions], max_treatments)
+            for position, selected in zip(positions, selections):
+                results[position] = selected
 
-        return selected
+        return results
 
     def get_treatment_for_snomed(self, snomed_code: str, facility: str = "POI") -> List[str]:
         """
@@ -397,10 +579,7 @@ class TreatmentUtilityModel:
             Tuple of (is_valid, reason)
         """
         # Check contraindications
-        protocol = self.protocols.get("treatment_appropriateness_matrix", {}).get(injury_code, {})
-        contraindicated = protocol.get("contraindicated_treatments", [])
-
-        if treatment in contraindicated:
+        if self.contraindication_masks.get(injury_code, 0) & self.catalog.bit_of(treatment):
             return False, f"Treatment {treatment} is contraindicated for {injury_code}"
 
         # Check facility capability
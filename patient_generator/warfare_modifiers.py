@@ -15,6 +15,8 @@ from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 
+from .alias_sampler import AliasSampler
+
 
 @dataclass
 class WarfarePattern:
@@ -30,6 +32,25 @@ class WarfarePattern:
     environmental_factors: Dict[str, Any]  # Additional modifiers
 
 
+@dataclass
+class InjuryBatch:
+    """Injuries for a batch of casualties from one scenario, one entry per casualty"""
+
+    scenario: str
+    primary: np.ndarray  # Primary SNOMED code per casualty
+    additional: Dict[int, List[str]]  # Correlated injuries, only for rows that have them
+    severities: np.ndarray
+    polytrauma: np.ndarray
+    mass_casualty: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.primary)
+
+    def injuries(self, row: int) -> List[str]:
+        """Return the full injury code list for one casualty"""
+        return [self.primary[row], *self.additional.get(row, ())]
+
+
 class WarfareModifiers:
     """
     Manages warfare-specific injury patterns and modifiers.
@@ -44,6 +65,10 @@ class WarfareModifiers:
     def __init__(self):
         """Initialize warfare patterns based on military medical data."""
         self.patterns = self._define_warfare_patterns()
+        # One alias table per pattern, built here instead of looked up on every draw
+        self.injury_samplers = {
+            scenario: AliasSampler.from_dict(pattern.injury_distribution) for scenario, pattern in self.patterns.items()
+        }
         self.injury_correlations = self._define_injury_correlations()
         self.body_regions = self._define_body_regions()
 
@@ -244,9 +269,7 @@ class WarfareModifiers:
             injuries.extend(base_injuries)
         else:
             # Weight selection by distribution
-            injury_codes = list(pattern.injury_distribution.keys())
-            probabilities = list(pattern.injury_distribution.values())
-            primary_injury = np.random.choice(injury_codes, p=probabilities)  # noqa: NPY002
+            primary_injury = self.injury_samplers.get(scenario, self.injury_samplers["mixed"]).sample()
             injuries.append(primary_injury)
 
         # Add correlated injuries for polytrauma
@@ -268,17 +291,95 @@ class WarfareModifiers:
         modified_severity = min(10, max(1, modified_severity))
 
         # Build metadata
-        metadata = {
+        mass_casualty = random.random() < pattern.mass_casualty_probability
+        metadata = self.build_injury_metadata(scenario, is_polytrauma, len(injuries), mass_casualty)
+
+        return injuries, modified_severity, metadata
+
+    def get_injuries_for_scenario_batch(self, scenario: str, count: int) -> InjuryBatch:
+        """
+        Generate injuries for many casualties of one scenario at once.
+
+        Batched equivalent of get_injuries_for_scenario. Polytrauma flags,
+        primary injuries, severities and mass-casualty flags are drawn as
+        arrays, and correlated injuries are picked per primary injury with
+        one random permutation matrix. Metadata dicts are left to the caller
+        (see build_injury_metadata) so they are only built for patients that
+        are actually materialized.
+
+        Args:
+            scenario: Type of warfare (artillery, urban, ied, etc.)
+            count: Number of casualties
+
+        Returns:
+            InjuryBatch with one entry per casualty
+        """
+        pattern = self.patterns.get(scenario, self.patterns["mixed"])
+
+        is_polytrauma = np.random.random(count) < pattern.polytrauma_rate  # noqa: NPY002
+        sampler = self.injury_samplers.get(scenario, self.injury_samplers["mixed"])
+        primary_index = sampler.draw_indices(count)
+        primary = np.array(sampler.items, dtype=object)[primary_index]
+
+        # Add 1-3 correlated injuries for polytrauma cases
+        additional: Dict[int, List[str]] = {}
+        polytrauma_rows = np.flatnonzero(is_polytrauma)
+        num_additional = np.minimum(3, np.random.poisson(1.5, len(polytrauma_rows)))  # noqa: NPY002
+        polytrauma_primaries = primary_index[polytrauma_rows]
+        for item_index, code in enumerate(sampler.items):
+            correlated = self.injury_correlations.get(code)
+            if not correlated:
+                continue
+            selected = polytrauma_primaries == item_index
+            rows = polytrauma_rows[selected]
+            extras = np.minimum(num_additional[selected], len(correlated))
+            # Each row of argsorted uniforms is a random permutation of the correlated injuries
+            permutations = np.argsort(np.random.random((len(rows), len(correlated))), axis=1)  # noqa: NPY002
+            picks = np.array(correlated, dtype=object)[permutations]
+            for extra in range(1, len(correlated) + 1):
+                with_extra = extras == extra
+                additional.update(zip(rows[with_extra].tolist(), picks[with_extra, :extra].tolist()))
+
+        # Calculate severity (1-10 scale)
+        base_severity = np.random.randint(3, 9, count) + 2 * is_polytrauma  # noqa: NPY002
+        severities = np.clip((base_severity * pattern.severity_modifier).astype(int), 1, 10)
+
+        mass_casualty = np.random.random(count) < pattern.mass_casualty_probability  # noqa: NPY002
+
+        return InjuryBatch(
+            scenario=scenario,
+            primary=primary,
+            additional=additional,
+            severities=severities,
+            polytrauma=is_polytrauma,
+            mass_casualty=mass_casualty,
+        )
+
+    def build_injury_metadata(
+        self, scenario: str, polytrauma: bool, injury_count: int, mass_casualty: bool
+    ) -> Dict[str, Any]:
+        """
+        Build the injury metadata dict attached to a patient.
+
+        Args:
+            scenario: Type of warfare
+            polytrauma: Whether the casualty has multiple injuries
+            injury_count: Number of injury codes
+            mass_casualty: Whether the casualty is part of a mass-casualty event
+
+        Returns:
+            Metadata dictionary
+        """
+        pattern = self.patterns.get(scenario, self.patterns["mixed"])
+        return {
             "warfare_type": scenario,
-            "polytrauma": is_polytrauma,
-            "injury_count": len(injuries),
+            "polytrauma": polytrauma,
+            "injury_count": injury_count,
             "environmental_factors": pattern.environmental_factors,
-            "mass_casualty": random.random() < pattern.mass_casualty_probability,
+            "mass_casualty": mass_casualty,
             "mortality_modifier": pattern.mortality_modifier,
         }
 
-        return injuries, modified_severity, metadata
-
     def get_scenario_modifiers(self, scenario: str) -> Dict[str, Any]:
         """
         Get modifiers for a specific warfare scenario.
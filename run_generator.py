@@ -56,23 +56,6 @@ def create_config_from_args(args, config_data=None):
     )
 
 
-class MockDatabase:
-    """Mock database that returns our CLI configuration."""
-
-    def __init__(self, config):
-        self.config = config
-
-
-class MockRepository:
-    """Mock repository that returns our CLI configuration."""
-
-    def __init__(self, db):
-        self.config = db.config
-
-    def get_configuration(self, config_id):
-        return self.config
-
-
 def parse_arguments():
     """Parse command line arguments"""
     parser = argparse.ArgumentParser(description="Generate patient data for military medical exercises")
@@ -205,15 +188,8 @@ def main():
     print(f"Compression: {'Enabled' if use_compression else 'Disabled'}")
     print(f"Encryption: {'Enabled' if use_encryption else 'Disabled'}")
 
-    # Create mock database with our config
-    mock_db = MockDatabase(config)
-
-    # Create ConfigurationManager with mock database
-    config_manager = ConfigurationManager(database_instance=mock_db)
-
-    # Monkey-patch the repository to return our config
-    config_manager._repository = MockRepository(mock_db)
-    config_manager._active_configuration = config
+    # The CLI configuration is used directly; no database is needed
+    config_manager = ConfigurationManager(configuration=config)
 
     # Create nationality provider
     nationality_provider = NationalityDataProvider()
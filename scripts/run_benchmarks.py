@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Generation engine benchmark CLI.
+
+Runs the micro-benchmarks and macro scenarios in-process against an in-memory
+configuration, prints throughput and peak RSS, and optionally stores the
+report as a baseline or compares it with one. In compare mode the exit status
+is 1 when any benchmark regressed beyond the thresholds; without a baseline
+the run is stored as one. Run it from the repository root, where the
+simulation modules find their data files.
+
+Usage:
+    python scripts/run_benchmarks.py --save-baseline
+    python scripts/run_benchmarks.py --compare
+    python scripts/run_benchmarks.py --group macro --sizes 1000,10000,100000 --output bench.json
+    python scripts/run_benchmarks.py --filter micro.to_dict --rounds 20
+"""
+
+import argparse
+from pathlib import Path
+import sys
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from benchmarks.suite import (
+    DEFAULT_BASELINE_PATH,
+    DEFAULT_MACRO_SIZES,
+    MAX_RSS_GROWTH,
+    MAX_SLOWDOWN,
+    build_suite,
+    compare_results,
+    format_comparison,
+    load_report,
+    run_suite,
+    save_report,
+)
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Benchmark the patient generation engine")
+    parser.add_argument(
+        "--group", choices=["micro", "macro", "all"], default="all", help="Benchmarks to run (default: all)"
+    )
+    parser.add_argument(
+        "--sizes",
+        type=str,
+        default=",".join(str(size) for size in DEFAULT_MACRO_SIZES),
+        help="Comma-separated patient counts for macro scenarios (default: %(default)s)",
+    )
+    parser.add_argument("--filter", type=str, help="Only run benchmarks whose name contains this text")
+    parser.add_argument("--rounds", type=int, help="Override the number of timed rounds")
+    parser.add_argument("--seed", type=int, default=0, help="Seed applied before every round (default: 0)")
+    parser.add_argument("--output", type=str, help="Optional path for the report as JSON")
+    parser.add_argument(
+        "--save-baseline",
+        nargs="?",
+        const=DEFAULT_BASELINE_PATH,
+        help=f"Store the report as a baseline (default path: {DEFAULT_BASELINE_PATH})",
+    )
+    parser.add_argument(
+        "--compare",
+        nargs="?",
+        const=DEFAULT_BASELINE_PATH,
+        help=f"Compare with a baseline and fail on regressions (default path: {DEFAULT_BASELINE_PATH})",
+    )
+    parser.add_argument(
+        "--max-slowdown",
+        type=float,
+        default=MAX_SLOWDOWN,
+        help="Allowed throughput loss as a fraction (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--max-rss-growth",
+        type=float,
+        default=MAX_RSS_GROWTH,
+        help="Allowed peak-RSS growth as a fraction (default: %(default)s)",
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+
+    groups = ("micro", "macro") if args.group == "all" else (args.group,)
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    suite = build_suite(groups=groups, sizes=sizes, name_filter=args.filter, rounds=args.rounds)
+    if not suite:
+        print("No benchmarks selected")
+        sys.exit(2)
+
+    # Read the baseline first so an unreadable file fails before the benchmarks run.
+    # Throughput and RSS depend on the machine, so no baseline is committed: the
+    # first comparison on a checkout records one instead.
+    baseline = None
+    if args.compare:
+        if Path(args.compare).exists():
+            baseline = load_report(args.compare)
+        else:
+            print(f"No baseline at {args.compare}; this run will be stored as the baseline")
+            args.save_baseline = args.save_baseline or args.compare
+
+    def report_progress(result):
+        print(f"{result.name:<44} {result.ops_per_second:>12.1f} ops/s  {result.peak_rss_bytes / 1024 / 1024:>8.1f} MB")
+
+    report = run_suite(suite, seed=args.seed, progress_callback=report_progress)
+
+    if args.output:
+        save_report(report, args.output)
+        print(f"Report written to {args.output}")
+    if args.save_baseline:
+        save_report(report, args.save_baseline)
+        print(f"Baseline written to {args.save_baseline}")
+
+    if baseline is not None:
+        comparisons = compare_results(report, baseline, args.max_slowdown, args.max_rss_growth)
+        print()
+        print(format_comparison(comparisons))
+        regressions = [comparison for comparison in comparisons if comparison.regressed]
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed against {args.compare}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
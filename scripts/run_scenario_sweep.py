@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Monte-Carlo scenario sweep CLI.
+
+Runs replicates of the temporal casualty scenario across a parameter grid and
+prints a summary table with 95% confidence intervals. No per-patient output
+is written.
+
+Usage:
+    python scripts/run_scenario_sweep.py --grid '{"intensity": ["medium", "high"]}' --replicates 50
+    python scripts/run_scenario_sweep.py --grid grid.json --patients 10000 --workers 8 --output sweep.json
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+import sys
+
+# Add parent directory to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from patient_generator.scenario_sweep import SWEEPABLE_PARAMETERS, ScenarioSweepRunner
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Run a Monte-Carlo sweep over casualty scenarios")
+    parser.add_argument(
+        "--grid",
+        type=str,
+        default="{}",
+        help=f"Parameter grid as JSON or a path to a JSON file. Keys: {', '.join(SWEEPABLE_PARAMETERS)}",
+    )
+    parser.add_argument("--replicates", type=int, default=10, help="Replicates per scenario (default: 10)")
+    parser.add_argument("--patients", type=int, help="Patients per replicate (default: injuries.json)")
+    parser.add_argument("--workers", type=int, default=0, help="Worker processes (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=0, help="Base seed for reproducible sweeps (default: 0)")
+    parser.add_argument("--output", type=str, help="Optional path for the summary rows as JSON")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+
+    grid_source = args.grid
+    if os.path.exists(grid_source):
+        with open(grid_source) as f:
+            grid_source = f.read()
+    parameter_grid = json.loads(grid_source)
+
+    runner = ScenarioSweepRunner(
+        parameter_grid=parameter_grid,
+        replicates=args.replicates,
+        total_patients=args.patients,
+        max_workers=args.workers or None,
+        base_seed=args.seed,
+    )
+
+    def report_progress(completed: int, total: int):
+        print(f"\r{completed}/{total} replicates", end="", flush=True)
+
+    result = runner.run(progress_callback=report_progress)
+    print()
+    print(result.format_table())
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result.summary_rows(), f, indent=2)
+        print(f"Summary written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,141 +1,147 @@
 """
 Metrics collection middleware for API requests.
 Part of EPIC-003: Production Scalability Improvements - Phase 2
+
+Implemented as plain ASGI middleware so streamed responses pass straight
+through: no extra task or memory channel per request, and the body messages
+can be observed to time the first byte and the end of the stream.
 """
 
+import re
 import time
-from typing import Callable, List
-
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-
-from src.core.metrics import get_metrics_collector, request_count, request_duration
-
-
-class MetricsMiddleware(BaseHTTPMiddleware):
-    """Middleware to automatically collect request metrics."""
-
-    def __init__(self, app):
-        super().__init__(app)
-        self.metrics = get_metrics_collector()
+from typing import Any, Dict, List, Optional, Pattern, Tuple
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        """
-        Process request and collect metrics.
-
-        Args:
-            request: The incoming request
-            call_next: The next middleware or endpoint
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-        Returns:
-            The response
-        """
-        # Skip metrics endpoint to avoid recursion
-        if request.url.path == "/metrics":
-            return await call_next(request)
-
-        # Start timing
-        start_time = time.time()
-
-        # Extract method and path
-        method = request.method
-        path = request.url.path
-
-        # Normalize path for metrics (replace IDs with placeholders)
-        # This prevents metric explosion from unique IDs
-        normalized_path = self._normalize_path(path)
-
-        # Initialize response status
-        status_code = 500
-
-        try:
-            # Process request
-            response = await call_next(request)
-            status_code = response.status_code
+from src.core.metrics import (
+    request_count,
+    request_duration,
+    response_first_byte,
+    response_size,
+    response_stream_duration,
+)
 
-            # Add response time header
-            response.headers["X-Response-Time"] = f"{(time.time() - start_time) * 1000:.2f}ms"
+UNMATCHED_ROUTE = "<unmatched>"  # single label for paths no route serves
+ROUTE_CACHE_SIZE = 4096  # distinct concrete paths remembered per template table
 
-            return response
+_PATH_PARAM = re.compile(r"{([^}:]+)(?::[^}]+)?}")
 
-        except Exception as e:
-            # Log error and re-raise
-            if hasattr(e, "status_code"):
-                status_code = e.status_code
-            raise
 
-        finally:
-            # Record metrics
-            duration = time.time() - start_time
-            request_count.labels(method=method, endpoint=normalized_path, status=str(status_code)).inc()
-            request_duration.labels(endpoint=normalized_path, method=method).observe(duration)
+class RouteTemplates:
+    """
+    Precompiled lookup from request paths to route templates.
 
-    def _normalize_path(self, path: str) -> str:
-        """
-        Normalize path by replacing dynamic segments with placeholders.
+    Built once from the application's routes. Parameterless paths resolve
+    with a dict lookup; parameterized ones try each route's compiled regex in
+    registration order, mirroring how the router itself picks a route.
+    Templates use ``:name`` placeholders, e.g. ``/api/v1/jobs/:job_id``.
+    """
 
-        Args:
-            path: The original path
+    def __init__(self, routes: List[Any]):
+        self.route_count = len(routes)
+        self._static: Dict[str, Tuple[int, str]] = {}
+        self._dynamic: List[Tuple[int, Pattern, str]] = []
+        self._resolved: Dict[str, str] = {}
 
-        Returns:
-            Normalized path
-        """
-        # Split path into segments
-        segments = path.split("/")
-        normalized_segments: List[str] = []
-
-        for i, segment in enumerate(segments):
-            # Skip empty segments
-            if not segment:
-                normalized_segments.append(segment)
+        for index, route in enumerate(routes):
+            path_format = getattr(route, "path_format", None)
+            path_regex = getattr(route, "path_regex", None)
+            if path_format is None or path_regex is None:
                 continue
-
-            # Check if segment looks like an ID (UUID, numeric, or job ID)
-            if self._is_id_segment(segment):
-                # Use placeholder based on previous segment
-                if i > 0:
-                    prev_segment = segments[i - 1]
-                    if prev_segment == "jobs":
-                        normalized_segments.append(":job_id")
-                    elif prev_segment == "configurations":
-                        normalized_segments.append(":configuration_id")
-                    elif prev_segment == "downloads":
-                        normalized_segments.append(":download_id")
-                    else:
-                        normalized_segments.append(":id")
-                else:
-                    normalized_segments.append(":id")
+            template = _PATH_PARAM.sub(r":\1", path_format)
+            if template == path_format:
+                self._static.setdefault(path_format, (index, template))
             else:
-                normalized_segments.append(segment)
-
-        return "/".join(normalized_segments)
+                self._dynamic.append((index, path_regex, template))
 
-    def _is_id_segment(self, segment: str) -> bool:
+    def resolve(self, path: str) -> str:
         """
-        Check if a path segment looks like an ID.
+        Map a concrete request path to its route template.
 
         Args:
-            segment: Path segment to check
+            path: Request path without query string
 
         Returns:
-            True if segment appears to be an ID
+            The route template, or UNMATCHED_ROUTE
         """
-        # Check if it's a UUID (with or without hyphens)
-        if len(segment) in [32, 36] and all(c in "0123456789abcdef-" for c in segment.lower()):
-            return True
-
-        # Check if it's numeric
-        if segment.isdigit():
-            return True
-
-        # Check if it's a job ID format (e.g., job_123456)
-        if segment.startswith("job_") and segment[4:].replace("_", "").isdigit():
-            return True
+        template = self._resolved.get(path)
+        if template is not None:
+            return template
+
+        static = self._static.get(path)
+        limit = static[0] if static is not None else self.route_count
+        template = static[1] if static is not None else UNMATCHED_ROUTE
+        for index, path_regex, candidate in self._dynamic:
+            if index > limit:
+                break
+            if path_regex.match(path):
+                template = candidate
+                break
+
+        if len(self._resolved) < ROUTE_CACHE_SIZE:
+            self._resolved[path] = template
+        return template
+
+
+class MetricsMiddleware:
+    """Middleware to automatically collect request metrics."""
 
-        # Check if it's a file ID format (e.g., file_123)
-        if segment.startswith("file_") and segment[5:].replace("_", "").isdigit():
-            return True
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self._templates: Optional[RouteTemplates] = None
+
+    def _route_template(self, scope: Scope) -> str:
+        routes = getattr(scope.get("app"), "routes", None)
+        if routes is None:
+            return UNMATCHED_ROUTE
+        # Rebuilt only if routes were added after the first request
+        if self._templates is None or self._templates.route_count != len(routes):
+            self._templates = RouteTemplates(routes)
+        return self._templates.resolve(scope["path"])
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        # Skip the metrics endpoint to avoid recursion, and non-HTTP traffic
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        endpoint = self._route_template(scope)
+        start_time = time.perf_counter()
+        status_code = 500
+        headers_sent_at: Optional[float] = None
+        first_byte_at: Optional[float] = None
+        body_bytes = 0
+
+        async def send_with_metrics(message: Message):
+            nonlocal status_code, headers_sent_at, first_byte_at, body_bytes
+            if message["type"] == "http.response.start":
+                headers_sent_at = time.perf_counter()
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("X-Response-Time", f"{(headers_sent_at - start_time) * 1000:.2f}ms")
+            elif message["type"] == "http.response.body":
+                size = len(message.get("body", b""))
+                if size:
+                    body_bytes += size
+                    if first_byte_at is None:
+                        first_byte_at = time.perf_counter()
+            await send(message)
 
-        # Check for generic ID pattern (contains letters, numbers, and hyphens)
-        # but must have at least one number
-        return "-" in segment and any(c.isdigit() for c in segment)
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        except Exception as e:
+            if headers_sent_at is None and hasattr(e, "status_code"):
+                status_code = e.status_code
+            raise
+        finally:
+            finished_at = time.perf_counter()
+            # Request duration keeps its meaning of time until the response headers
+            duration = (headers_sent_at if headers_sent_at is not None else finished_at) - start_time
+            request_count.labels(method=method, endpoint=endpoint, status=str(status_code)).inc()
+            request_duration.labels(endpoint=endpoint, method=method).observe(duration)
+            if first_byte_at is not None:
+                response_first_byte.labels(endpoint=endpoint, method=method).observe(first_byte_at - start_time)
+            response_stream_duration.labels(endpoint=endpoint, method=method).observe(finished_at - start_time)
+            response_size.labels(endpoint=endpoint, method=method).observe(body_bytes)
@@ -7,6 +7,7 @@ from .requests import (
     ConfigurationUpdateRequest,
     ConfigurationValidationRequest,
     GenerationRequest,
+    TimerSettingsRequest,
 )
 from .responses import (
     ConfigurationListResponse,
@@ -16,9 +17,12 @@ from .responses import (
     ErrorResponse,
     GenerationResponse,
     HealthCheckResponse,
+    JobProfileResponse,
     JobProgressDetails,
     JobResponse,
     JobStatus,
+    StackSampleResponse,
+    TimerSettingsResponse,
     ValidationResponse,
     VisualizationDataResponse,
 )
@@ -36,10 +40,14 @@ __all__ = [
     "GenerationRequest",
     "GenerationResponse",
     "HealthCheckResponse",
+    "JobProfileResponse",
     "JobProgressDetails",
     "JobResponse",
     # Response models
     "JobStatus",
+    "StackSampleResponse",
+    "TimerSettingsRequest",
+    "TimerSettingsResponse",
     "ValidationResponse",
     "VisualizationDataResponse",
 ]
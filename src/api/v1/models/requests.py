@@ -3,7 +3,7 @@ Standardized API request models with comprehensive validation.
 All endpoints should use these request models for consistent input validation.
 """
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional
 
 from pydantic import BaseModel, Field, field_validator, model_validator
 
@@ -229,3 +229,13 @@ class ConfigurationValidationRequest(BaseModel):
                 "strict": True,
             }
         }
+
+
+class TimerSettingsRequest(BaseModel):
+    """Request model for changing pipeline stage timers."""
+
+    mode: Optional[Literal["off", "stages", "all"]] = Field(
+        default=None, description="Timer mode: off, stages or all (all also times simulation hot paths)"
+    )
+
+    sample_every: Optional[int] = Field(default=None, ge=1, description="Time every Nth call of each stage")
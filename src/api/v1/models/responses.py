@@ -41,6 +41,93 @@ class JobResponse(BaseModel):
         json_encoders = {datetime: lambda v: v.isoformat()}
 
 
+class JobStageTiming(BaseModel):
+    """Time a job spent in one pipeline stage."""
+
+    seconds: float = Field(..., description="Wall time spent in the stage")
+    calls: int = Field(..., description="Timed calls (patients covered, for stages timed in bulk)")
+    seconds_per_patient: float = Field(..., description="Stage time divided by patients generated")
+    share: float = Field(..., description="Fraction of the total time of the top-level pipeline stages")
+    histogram: Dict[str, int] = Field(
+        default_factory=dict, description="Cumulative per-call counts keyed by upper bound in seconds"
+    )
+
+
+class JobResourceSample(BaseModel):
+    """One resource sample taken while a job ran."""
+
+    t: float = Field(..., description="Seconds since the job started")
+    rss_mb: float = Field(..., description="Process resident memory in MB")
+    cpu_percent: float = Field(..., description="Process CPU usage since the previous sample")
+    patients: int = Field(..., description="Patients generated so far")
+    patients_per_second: float = Field(..., description="Throughput since the previous sample")
+
+
+class JobBatchingTelemetry(BaseModel):
+    """Batch sizes a job chose from its memory budget."""
+
+    budget_mb: float = Field(..., description="Process memory budget in MB")
+    bytes_per_patient: int = Field(..., description="Memory retained per patient, measured or estimated")
+    bytes_per_patient_measured: bool = Field(..., description="Whether bytes_per_patient has been measured")
+    shared_measurements: int = Field(0, description="Batches left unmeasured because another generation run was active")
+    batches: int = Field(..., description="Batches sized so far")
+    batch_sizes: List[int] = Field(default_factory=list, description="Most recent batch sizes, recorded on change")
+    current_batch_size: Optional[int] = Field(None, description="Size of the latest batch")
+    smallest_batch_size: Optional[int] = Field(None, description="Smallest batch size chosen")
+    largest_batch_size: Optional[int] = Field(None, description="Largest batch size chosen")
+    peak_rss_mb: float = Field(..., description="Peak process resident memory seen while sizing batches")
+    peak_pressure: float = Field(..., description="Peak RSS as a fraction of the budget")
+    backpressure_waits: int = Field(0, description="Times generation waited for memory to drain")
+    backpressure_seconds: float = Field(0.0, description="Total time spent waiting for memory")
+
+
+class JobProfileResponse(BaseModel):
+    """Resource profile of a running or recently finished job."""
+
+    job_id: str = Field(..., description="Unique job identifier")
+    status: str = Field(..., description="Job status when the profile was last updated")
+    started_at: datetime = Field(..., description="Profiling start timestamp")
+    finished_at: Optional[datetime] = Field(None, description="Profiling end timestamp")
+    runtime_seconds: float = Field(..., description="Job runtime so far")
+    patients: int = Field(..., description="Patients generated")
+    patients_per_second: float = Field(..., description="Average throughput")
+    peak_rss_mb: float = Field(..., description="Peak process resident memory in MB")
+    stages: Dict[str, JobStageTiming] = Field(default_factory=dict, description="Time per pipeline stage")
+    batching: Optional[JobBatchingTelemetry] = Field(None, description="Memory-budgeted batch sizing")
+    samples_dropped: int = Field(0, description="Oldest samples dropped from the ring buffer")
+    samples: List[JobResourceSample] = Field(default_factory=list, description="Resource samples, oldest first")
+
+
+class HotFrame(BaseModel):
+    """A frame found on top of sampled stacks."""
+
+    frame: str = Field(..., description="Frame as module:function")
+    samples: int = Field(..., description="Samples with this frame on top of the stack")
+    share: float = Field(..., description="Fraction of all samples")
+
+
+class StackSampleResponse(BaseModel):
+    """Result of sampling the stacks of a running job."""
+
+    job_id: str = Field(..., description="Unique job identifier")
+    started_at: datetime = Field(..., description="Sampling start timestamp")
+    duration_seconds: float = Field(..., description="Time spent sampling; shorter if the job ended")
+    interval_seconds: float = Field(..., description="Time between samples")
+    ticks: int = Field(..., description="Sampling rounds taken")
+    samples: int = Field(..., description="Stacks recorded across all sampled threads")
+    distinct_stacks: int = Field(..., description="Distinct stacks recorded")
+    collapsed_stacks_file: str = Field(..., description="Collapsed stack file, usable with flamegraph tools")
+    hot_frames: List[HotFrame] = Field(default_factory=list, description="Frames with the most self time")
+
+
+class TimerSettingsResponse(BaseModel):
+    """Pipeline stage timer settings."""
+
+    mode: str = Field(..., description="Timer mode: off, stages or all")
+    sample_every: int = Field(..., description="Every Nth call of each stage is timed")
+    hot_paths_installed: bool = Field(..., description="Whether simulation hot-path timers are currently installed")
+
+
 class GenerationResponse(BaseModel):
     """Standardized response model for patient generation endpoint."""
 
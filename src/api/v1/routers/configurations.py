@@ -14,7 +14,11 @@ from patient_generator.database import ConfigurationRepository, Database
 from patient_generator.nationality_data import NationalityDataProvider
 from patient_generator.schemas_config import ConfigurationTemplateCreate, ConfigurationTemplateDB, FrontDefinition
 from src.api.v1.dependencies.database import get_database
-from src.core.cache_utils import cache_configuration_template, get_cached_configuration, invalidate_configuration_cache
+from src.core.cache_utils import (
+    cache_configuration_template,
+    get_configuration_template,
+    invalidate_configuration_cache,
+)
 from src.core.security_enhanced import verify_api_key
 
 # Initialize router (prefix will be added by main app)
@@ -48,22 +52,13 @@ async def get_configuration(
     request: Request, config_id: str, db: Database = Depends(get_database)
 ) -> ConfigurationTemplateDB:
     """Get a specific configuration template, checking cache first."""
-    # Try to get from cache first
-    cached_config = await get_cached_configuration(config_id)
-    if cached_config:
-        # Return cached configuration (already validated)
-        return ConfigurationTemplateDB(**cached_config)
-
     repo = ConfigurationRepository(db)
-    config = repo.get_configuration(config_id)
+    config_data = await get_configuration_template(config_id, lambda: repo.get_configuration(config_id))
 
-    if not config:
+    if config_data is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Configuration {config_id} not found")
 
-    # Cache the configuration for future requests
-    await cache_configuration_template(config_id, config.dict())
-
-    return config
+    return ConfigurationTemplateDB(**config_data)
 
 
 @router.put("/{config_id}", response_model=ConfigurationTemplateDB)
@@ -88,7 +83,7 @@ async def update_configuration(
     await invalidate_configuration_cache(config_id)
 
     # Cache the updated configuration
-    await cache_configuration_template(config_id, updated.dict())
+    await cache_configuration_template(config_id, updated.model_dump(mode="json"))
 
     return updated
 
@@ -10,18 +10,30 @@ from pathlib import Path
 import shutil
 import tempfile
 import traceback
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from fastapi.security import HTTPBearer
 
+from patient_generator.config_manager import inline_configuration
 from patient_generator.database import ConfigurationRepository, Database
-from patient_generator.schemas_config import ConfigurationTemplateCreate
+from patient_generator.schemas_config import ConfigurationTemplateCreate, ConfigurationTemplateDB
 from src.api.v1.dependencies.database import get_database
 from src.api.v1.dependencies.services import get_job_service, get_patient_generation_service
 from src.api.v1.models import ErrorResponse, GenerationRequest, GenerationResponse
-from src.core.security_enhanced import verify_api_key
-from src.domain.models.job import JobStatus
+from src.core.cache_utils import get_configuration_template
+from src.core.job_events import get_job_broadcaster
+from src.core.job_profile import get_job_profiler
+from src.core.progress import ProgressReporter
+from src.core.security_enhanced import (
+    APIKeyContext,
+    enforce_patient_quota,
+    record_patients,
+    refund_patient_quota,
+    verify_api_key,
+    verify_api_key_context,
+)
+from src.domain.models.job import JobProgressDetails, JobStatus
 from src.domain.services.job_service import JobService
 from src.domain.services.patient_generation_service import AsyncPatientGenerationService, GenerationContext
 
@@ -74,7 +86,7 @@ security = HTTPBearer()
 async def generate_patients(
     request: GenerationRequest,
     background_tasks: BackgroundTasks,
-    current_user: str = Depends(verify_api_key),
+    api_key_context: APIKeyContext = Depends(verify_api_key_context),
     job_service: JobService = Depends(get_job_service),
     generation_service: AsyncPatientGenerationService = Depends(get_patient_generation_service),
     db_session=Depends(get_database),
@@ -85,6 +97,13 @@ async def generate_patients(
     This endpoint creates a background job for patient generation and returns
     immediately with job tracking information.
     """
+    # Patients known up front are charged once the request is validated; a
+    # stored configuration without an override is charged by its job
+    requested = request.total_patients
+    if requested is None and request.configuration:
+        requested = request.configuration.get("total_patients")
+    charged_patients = 0
+
     try:
         # Validate configuration source
         config_dict: Dict[str, Any] = {}
@@ -110,11 +129,23 @@ async def generate_patients(
 
         config_dict.update(update_dict)
 
+        if requested is not None:
+            await enforce_patient_quota(api_key_context, int(requested))
+            charged_patients = int(requested)
+
         # Create job
         job = await job_service.create_job(config=config_dict)
 
         # Start background generation
-        background_tasks.add_task(_run_generation_task, job.job_id, config_dict, generation_service, job_service)
+        background_tasks.add_task(
+            _run_generation_task,
+            job.job_id,
+            config_dict,
+            generation_service,
+            job_service,
+            api_key_context=api_key_context,
+            charged_patients=charged_patients,
+        )
 
         # Estimate duration based on configuration
         estimated_duration = _estimate_generation_duration(config_dict)
@@ -126,9 +157,14 @@ async def generate_patients(
             estimated_duration=estimated_duration,
         )
 
+    except HTTPException:
+        await refund_patient_quota(api_key_context, charged_patients)
+        raise
     except ValueError as e:
+        await refund_patient_quota(api_key_context, charged_patients)
         raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
     except Exception as e:
+        await refund_patient_quota(api_key_context, charged_patients)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to create generation job: {e!s}"
         )
@@ -169,7 +205,13 @@ def _estimate_generation_duration(config: Dict[str, Any]) -> int:
 
 
 async def _run_generation_task(
-    job_id: str, config: Dict[str, Any], generation_service: AsyncPatientGenerationService, job_service: JobService
+    job_id: str,
+    config: Dict[str, Any],
+    generation_service: AsyncPatientGenerationService,
+    job_service: JobService,
+    *,
+    api_key_context: Optional[APIKeyContext] = None,
+    charged_patients: int = 0,
 ) -> None:
     """
     Background task to run patient generation.
@@ -179,10 +221,16 @@ async def _run_generation_task(
         config: Generation configuration
         generation_service: Patient generation service
         job_service: Job management service
+        api_key_context: Key the job was requested with; generated patients are counted against it
+        charged_patients: Patients already charged to the key's daily quota; refunded if the job fails
     """
     # Initialize flag for temporal configuration tracking
     temporal_config_present = False
 
+    # Resource samples and stage timings for the job profile endpoint
+    job_profiler = get_job_profiler()
+    profile = job_profiler.start(job_id)
+
     try:
         # Update job status to running
         await job_service.update_job_status(job_id, JobStatus.RUNNING)
@@ -190,6 +238,7 @@ async def _run_generation_task(
         # Create output directory
         output_dir = Path(tempfile.gettempdir()) / "medical_patients" / f"job_{job_id}"
         output_dir.mkdir(parents=True, exist_ok=True)
+        profile.output_directory = output_dir
 
         # Handle temporal configuration if present
         # Check both root level and nested configuration object
@@ -257,17 +306,17 @@ async def _run_generation_task(
             logger.info("Temporal config written - warfare: %s, base_date: %s", active_warfare, temporal_injuries_config["base_date"])
 
         # Handle configuration source
-        db_instance = Database.get_instance()
-        config_repo = ConfigurationRepository(db_instance)
-
         if "configuration_id" in config:
-            # Use existing configuration from database
-            config_template = config_repo.get_configuration(config["configuration_id"])
-            if not config_template:
-                error_msg = f"Configuration {config['configuration_id']} not found"
+            # Use existing configuration, served from the cache when possible
+            config_id = config["configuration_id"]
+            config_repo = ConfigurationRepository(Database.get_instance())
+            config_data = await get_configuration_template(config_id, lambda: config_repo.get_configuration(config_id))
+            if config_data is None:
+                error_msg = f"Configuration {config_id} not found"
                 raise ValueError(error_msg)
+            config_template = ConfigurationTemplateDB(**config_data)
         else:
-            # Create configuration template for database
+            # Inline configuration: held in memory only, never written to the database
             # Use injury_mix if available (temporal), otherwise injury_distribution (legacy)
             injury_dist = inner_config.get("injury_mix") or inner_config.get(
                 "injury_distribution", {"Disease": 0.52, "Non-Battle Injury": 0.33, "Battle Injury": 0.15}
@@ -281,21 +330,17 @@ async def _run_generation_task(
                 front_configs=inner_config.get("front_configs", []),
                 facility_configs=inner_config.get("facility_configs", []),
             )
-
-            # Save to database
-            config_template = config_repo.create_configuration(config_create)
+            config_template = inline_configuration(config_create)
 
         # Override total_patients: root-level config (from request.total_patients) wins
         # over anything set inside the inline configuration object.
         override_total = config.get("total_patients") or inner_config.get("total_patients")
         if override_total is not None:
-            # Create a copy of the config template with overridden total_patients
-            config_dict = (
-                config_template.dict() if hasattr(config_template, "dict") else config_template.__dict__.copy()
-            )
-            config_dict["total_patients"] = override_total
-            # Convert back to the same type as config_template
-            config_template = type(config_template)(**config_dict)
+            config_template = config_template.model_copy(update={"total_patients": override_total})
+
+        if api_key_context is not None and not charged_patients:
+            await enforce_patient_quota(api_key_context, config_template.total_patients)
+            charged_patients = config_template.total_patients
 
         # Create generation context
         generation_context = GenerationContext(
@@ -305,25 +350,42 @@ async def _run_generation_task(
             encryption_password=config.get("encryption_password"),
             output_formats=config.get("output_formats", ["json"]),
             use_compression=config.get("use_compression", False),
+            stage_times=profile.stage_times,
+            memory_budget=profile.memory_budget,
         )
 
-        # Progress callback
-        async def progress_callback(progress_data: Dict[str, Any]) -> None:
-            progress = progress_data.get("progress", 0)
+        # Progress is reported per patient but published (job store, cache,
+        # pub/sub) by the reporter at most every 1% / 4 times per second
+        async def publish_progress(progress_data: Dict[str, Any]) -> None:
             # Cap progress at 1.0 (100%) to prevent validation errors
-            progress = min(progress, 1.0)
-            progress_percent = int(progress * 100)
-            await job_service.update_job_progress(job_id, progress_percent)
+            progress_percent = int(min(progress_data.get("progress", 0), 1.0) * 100)
+            details = JobProgressDetails(
+                current_phase=progress_data.get("current_phase", "generating_patients"),
+                phase_description=progress_data.get("phase_description", ""),
+                phase_progress=progress_percent,
+                total_patients=progress_data.get("total_patients"),
+                processed_patients=progress_data.get("processed_patients"),
+            )
+            await job_service.update_job_progress(job_id, progress_percent, details)
 
-        # Run generation
-        result = await generation_service.generate_patients(generation_context, progress_callback)
+        progress_reporter = ProgressReporter(publish_progress)
 
-        # Clean up temporary configuration from database after generation (only if we created it)
-        if "configuration_id" not in config:
-            try:
-                config_repo.delete_configuration(config_template.id)
-            except Exception as e:
-                logger.warning("Could not clean up temporary configuration %s: %s", config_template.id, e)
+        async def progress_callback(progress_data: Dict[str, Any]) -> None:
+            progress_reporter.report(progress_data)
+
+        # Finished patients feed the live event stream when anyone listens
+        broadcaster = get_job_broadcaster()
+
+        def patient_callback(patient_data: Dict[str, Any]) -> None:
+            profile.record_patients()
+            broadcaster.offer_patient(job_id, patient_data)
+
+        # Run generation
+        try:
+            result = await generation_service.generate_patients(generation_context, progress_callback, patient_callback)
+        finally:
+            await progress_reporter.aclose()
+            broadcaster.close_job(job_id)
 
         # Restore original injuries.json if we modified it
         if temporal_config_present:
@@ -343,10 +405,18 @@ async def _run_generation_task(
             job_id=job_id,
             output_directory=str(output_dir),
             result_files=result.get("output_files", []),
-            summary={"total_patients": result.get("patient_count", 0)},
+            summary={
+                "total_patients": result.get("patient_count", 0),
+                "stage_timings": profile.stage_breakdown(),
+                "batching": profile.memory_budget.telemetry(),
+            },
         )
 
+        if api_key_context is not None:
+            record_patients(api_key_context, result.get("patient_count", 0))
+
         # Mark job as completed
+        job_profiler.finish(job_id, JobStatus.COMPLETED.value)
         await job_service.update_job_status(job_id, JobStatus.COMPLETED)
 
     except Exception as e:
@@ -366,7 +436,11 @@ async def _run_generation_task(
             except Exception as cleanup_error:
                 logger.error("Failed to restore injuries.json: %s", cleanup_error)
 
+        if api_key_context is not None:
+            await refund_patient_quota(api_key_context, charged_patients)
+
         # Mark job as failed
+        job_profiler.finish(job_id, JobStatus.FAILED.value)
         await job_service.update_job_status(job_id, JobStatus.FAILED, error=str(e))
         logger.error("Generation task failed for job %s: %s", job_id, e)
         logger.debug("Traceback: %s", traceback.format_exc())
@@ -6,6 +6,7 @@ Part of EPIC-003: Production Scalability Improvements
 from datetime import datetime
 import os
 import platform
+import sys
 from typing import Any, Dict
 
 from fastapi import APIRouter, HTTPException
@@ -13,6 +14,7 @@ from fastapi.responses import JSONResponse
 import psutil
 
 from src.core.job_resource_manager import get_resource_manager
+from src.core.startup import get_startup_profiler
 from src.infrastructure.database_pool import get_pool
 
 router = APIRouter(prefix="/api/v1/health", tags=["health"])
@@ -183,6 +185,20 @@ async def liveness_probe():
     return {"status": "alive"}
 
 
+@router.get("/startup")
+async def startup_report():
+    """
+    Startup timing report.
+
+    Returns per-module import times, lifespan step timings, seconds from
+    process start to ready, and whether the simulation stack has been loaded
+    (it is imported lazily on the first generation request).
+    """
+    report = get_startup_profiler().report()
+    report["generation_stack_loaded"] = "patient_generator.flow_simulator" in sys.modules
+    return report
+
+
 @router.get("/ready")
 async def readiness_probe():
     """
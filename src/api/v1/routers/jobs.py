@@ -5,18 +5,24 @@ Provides endpoints for listing, retrieving, and managing patient generation jobs
 
 import json
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from src.api.v1.dependencies.services import get_job_service
-from src.api.v1.models import DeleteResponse, ErrorResponse, JobResponse
+from src.api.v1.models import DeleteResponse, ErrorResponse, JobProfileResponse, JobResponse, StackSampleResponse
 from src.api.v1.models.responses import JobProgressDetails
+from src.core.cache_utils import get_cached_job_status, job_status_payload
 from src.core.exceptions import JobNotFoundError
-from src.core.security_enhanced import verify_api_key
+from src.core.job_events import TERMINAL_JOB_STATUSES, get_job_broadcaster
+from src.core.job_profile import get_job_profiler
+from src.core.security_enhanced import APIKeyContext, verify_admin_api_key, verify_api_key
+from src.core.stack_sampler import STACK_SAMPLE_MAX_SECONDS, sample_job_stacks
 from src.domain.services.job_service import JobService
 
+JOB_EVENTS_HEARTBEAT = 15.0  # seconds of silence before a keep-alive is sent
+
 # Router configuration with v1 prefix and standardized responses
 router = APIRouter(
     prefix="/jobs",
@@ -133,6 +139,193 @@ async def get_job_results(
         )
 
 
+@router.get(
+    "/{job_id}/profile",
+    response_model=JobProfileResponse,
+    summary="Get Job Resource Profile",
+    description="""
+    Resource profile of a running or recently finished job: RSS, CPU and
+    throughput samples (a bounded ring buffer taken every 0.5 s) and the time
+    spent per pipeline stage.
+
+    Profiles are held in memory by the process that ran the job and only the
+    most recent jobs are kept.
+    """,
+    response_description="Resource samples and per-stage timings",
+)
+async def get_job_profile(job_id: str) -> JobProfileResponse:
+    """Get the resource profile of a job run by this process."""
+    profile = get_job_profiler().get(job_id)
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"No profile for job {job_id}")
+    return JobProfileResponse(**profile.to_dict())
+
+
+@router.post(
+    "/{job_id}/profile/stacks",
+    response_model=StackSampleResponse,
+    summary="Sample Job Stacks",
+    description="""
+    Sample the Python stacks of a running job for a number of seconds (admin only).
+
+    Covers the event loop, the asyncio.to_thread workers and the patient flow
+    simulator's worker pools. Stacks are written in collapsed format, for
+    flamegraph tools, to the "profiles" folder of the job's output directory,
+    and the frames with the most self time are returned. Sampling stops early
+    when the job ends; one session runs at a time.
+    """,
+    response_description="Sampling summary and the path of the collapsed stack file",
+)
+async def sample_job_profile_stacks(
+    job_id: str,
+    seconds: float = Query(10.0, gt=0, le=STACK_SAMPLE_MAX_SECONDS, description="Seconds to sample"),
+    interval_ms: float = Query(10.0, ge=1, le=1000, description="Milliseconds between samples"),
+    include_idle: bool = Query(False, description="Keep samples of threads waiting for work"),
+    _: APIKeyContext = Depends(verify_admin_api_key),
+) -> StackSampleResponse:
+    """Attach a stack sampler to a job running in this process."""
+    profile = get_job_profiler().get(job_id)
+    if profile is None or profile.status != "running" or profile.output_directory is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"No running job {job_id} in this process")
+    try:
+        result = await sample_job_stacks(
+            job_id,
+            profile.output_directory,
+            seconds,
+            lambda: profile.status == "running",
+            interval=interval_ms / 1000,
+            include_idle=include_idle,
+        )
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return StackSampleResponse(**result)
+
+
+@router.get(
+    "/{job_id}/events",
+    response_class=StreamingResponse,
+    summary="Stream Job Events",
+    description="""
+    Follow a job with Server-Sent Events instead of polling.
+
+    The stream starts with a `status` event holding the current job status,
+    then sends `progress`, `phase` and `status` events as the job advances and
+    ends once the job has completed, failed or been cancelled. With
+    `patients_every` set, about one finished patient per that many patients
+    is sent as a `patient` event while the job runs.
+    """,
+    responses={
+        200: {
+            "description": "Server-Sent Events stream",
+            "content": {
+                "text/event-stream": {
+                    "schema": {"type": "string"},
+                    "example": 'event: progress\ndata: {"id": "...", "status": "running", "progress": 40}\n\n',
+                }
+            },
+        }
+    },
+)
+async def stream_job_events(
+    job_id: str,
+    patients_every: int = Query(0, ge=0, description="Send about every Nth finished patient (0 disables the feed)"),
+    job_service: JobService = Depends(get_job_service),
+) -> StreamingResponse:
+    """Stream a job's status, progress and optional patient feed as Server-Sent Events."""
+    if await _load_job_status(job_id, job_service) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job {job_id} not found")
+
+    async def event_stream() -> AsyncIterator[str]:
+        async for item in _job_events(job_id, job_service, patients_every):
+            if item is None:
+                yield ": keep-alive\n\n"
+                continue
+            name, data = item
+            yield f"event: {name}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/{job_id}/ws")
+async def job_events_websocket(
+    websocket: WebSocket,
+    job_id: str,
+    patients_every: int = Query(0, ge=0),
+    job_service: JobService = Depends(get_job_service),
+) -> None:
+    """Same events as ``/{job_id}/events``, as JSON messages over a WebSocket."""
+    if await _load_job_status(job_id, job_service) is None:
+        await websocket.close(code=4404, reason=f"Job {job_id} not found")
+        return
+
+    await websocket.accept()
+    try:
+        async for item in _job_events(job_id, job_service, patients_every):
+            if item is None:
+                await websocket.send_json({"event": "heartbeat"})
+                continue
+            name, data = item
+            await websocket.send_json({"event": name, "data": data})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+
+
+async def _load_job_status(job_id: str, job_service: JobService) -> Optional[Dict[str, Any]]:
+    """Current job status from this process, or from the shared cache for jobs on other replicas."""
+    try:
+        return job_status_payload(await job_service.get_job(job_id))
+    except JobNotFoundError:
+        return await get_cached_job_status(job_id)
+
+
+async def _job_events(
+    job_id: str, job_service: JobService, patients_every: int
+) -> AsyncIterator[Optional[Tuple[str, Dict[str, Any]]]]:
+    """
+    Yield (event name, data) for a job until it finishes; None marks an idle heartbeat.
+
+    The subscription is opened before the snapshot is read, so no update
+    between the two is lost. A progress event that enters a new phase is
+    renamed ``phase``.
+    """
+    async with get_job_broadcaster().subscribe(job_id, patients_every) as subscription:
+        job_status = await _load_job_status(job_id, job_service)
+        if job_status is None:
+            return
+        yield "status", job_status
+
+        while job_status["status"] not in TERMINAL_JOB_STATUSES:
+            event = await subscription.get(timeout=JOB_EVENTS_HEARTBEAT)
+            if event is None:
+                # Re-read the status so a missed final event cannot leave the stream open
+                latest = await _load_job_status(job_id, job_service)
+                if latest is not None and latest["status"] != job_status["status"]:
+                    job_status = latest
+                    yield "status", latest
+                else:
+                    yield None
+                continue
+
+            name, data = event["event"], event["data"]
+            if name == "patient":
+                yield name, data
+                continue
+            if name == "progress" and _current_phase(data) != _current_phase(job_status):
+                name = "phase"
+            job_status = data
+            yield name, data
+
+
+def _current_phase(job_status: Dict[str, Any]) -> Optional[str]:
+    details = job_status.get("progress_details") or {}
+    return details.get("current_phase")
+
+
 @router.delete(
     "/{job_id}",
     response_model=DeleteResponse,
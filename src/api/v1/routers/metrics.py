@@ -3,10 +3,13 @@ Prometheus metrics endpoint.
 Part of EPIC-003: Production Scalability Improvements - Phase 2
 """
 
-from fastapi import APIRouter, Response
+from fastapi import APIRouter, Depends, Response
 from prometheus_client import CONTENT_TYPE_LATEST
 
+from patient_generator.performance import configure_timers, timer_settings
+from src.api.v1.models import TimerSettingsRequest, TimerSettingsResponse
 from src.core.metrics import get_metrics_collector
+from src.core.security_enhanced import APIKeyContext, verify_admin_api_key
 
 router = APIRouter(tags=["metrics"])
 
@@ -34,3 +37,22 @@ async def get_metrics():
             "Expires": "0",
         },
     )
+
+
+@router.get("/metrics/timers", response_model=TimerSettingsResponse)
+async def get_timer_settings(_: APIKeyContext = Depends(verify_admin_api_key)) -> TimerSettingsResponse:
+    """Current pipeline stage timer settings (admin only)."""
+    return TimerSettingsResponse(**timer_settings())
+
+
+@router.put("/metrics/timers", response_model=TimerSettingsResponse)
+async def update_timer_settings(
+    request: TimerSettingsRequest, _: APIKeyContext = Depends(verify_admin_api_key)
+) -> TimerSettingsResponse:
+    """
+    Switch pipeline stage timers at runtime (admin only).
+
+    Changes apply to jobs started afterwards. Mode "off" removes all timing,
+    "stages" times the pipeline stages, "all" also times simulation hot paths.
+    """
+    return TimerSettingsResponse(**configure_timers(request.mode, request.sample_every))
@@ -5,12 +5,12 @@ Provides endpoints for listing and using pre-configured exercise scenarios.
 
 import json
 import logging
-import os
 from typing import Any, Dict, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel, Field
 
+from patient_generator.reference_data import load_reference, strip_comments
 from src.api.v1.models import ErrorResponse
 from src.core.security_enhanced import verify_api_key
 
@@ -71,19 +71,11 @@ class PresetConfigResponse(BaseModel):
 
 
 def _load_presets() -> Dict[str, Any]:
-    """Load presets from JSON file."""
-    presets_path = os.path.join(
-        os.path.dirname(__file__),
-        "..", "..", "..", "..",
-        "patient_generator", "scenario_presets.json"
-    )
-    presets_path = os.path.normpath(presets_path)
+    """Load presets from the reference data registry (parsed once, reloaded on change)."""
+    presets_path = "scenario_presets.json"
 
     try:
-        with open(presets_path) as f:
-            data = json.load(f)
-            # Filter out comment fields
-            return {k: v for k, v in data.items() if not k.startswith("_")}
+        return load_reference(presets_path, strip_comments)
     except FileNotFoundError:
         logger.error("Presets file not found at %s", presets_path)
         return {"presets": {}, "categories": {}, "difficulty_levels": {}}
@@ -3,22 +3,28 @@ Streaming patient generation endpoint for memory-efficient large-scale generatio
 Part of EPIC-003: Production Scalability Improvements - Phase 3
 """
 
-import asyncio
-import gc
-import json
 from pathlib import Path
 import tempfile
-from typing import AsyncIterator, Optional
+from typing import Any, AsyncIterator, Dict, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
 from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer
 
+from patient_generator.config_manager import inline_configuration
 from patient_generator.database import ConfigurationRepository, Database
-from patient_generator.schemas_config import ConfigurationTemplateCreate
+from patient_generator.schemas_config import ConfigurationTemplateCreate, ConfigurationTemplateDB
 from src.api.v1.dependencies.services import get_patient_generation_service
 from src.api.v1.models.responses import StreamingPatientResponse
-from src.core.security_enhanced import verify_api_key
+from src.core.cache_utils import get_configuration_template
+from src.core.security_enhanced import (
+    APIKeyContext,
+    enforce_patient_quota,
+    record_patients,
+    refund_patient_quota,
+    verify_api_key_context,
+)
+from src.core.stream_encoding import STREAM_MEDIA_TYPES, encode_patient_stream, negotiate_content_encoding
 from src.domain.services.patient_generation_service import (
     AsyncPatientGenerationService,
     GenerationContext,
@@ -33,103 +39,93 @@ security = HTTPBearer()
 
 
 async def generate_patients_stream(
-    config_id: str,
+    config_template: ConfigurationTemplateDB,
     patient_count: int,
     batch_size: int = 100,
+    *,
     generation_service: AsyncPatientGenerationService = None,
+    output_format: str = "json",
+    content_encoding: Optional[str] = None,
+    api_key_context: Optional[APIKeyContext] = None,
+    charged_patients: int = 0,
 ) -> AsyncIterator[bytes]:
     """
-    Generate patients as a streaming JSON response.
+    Generate patients as a streaming JSON or NDJSON response.
 
-    This generator yields JSON data in chunks to minimize memory usage.
-    Each batch of patients is generated, serialized, and yielded before
-    moving to the next batch.
+    Patients are serialized compactly and sent in ~64 KB chunks (or every
+    ``batch_size`` patients, whichever comes first), compressed on the fly
+    when ``content_encoding`` is set. The server's flow control paces
+    generation: the next chunk is only produced once the previous one has
+    been handed to the client.
 
     Args:
-        config_id: Configuration ID to use
+        config_template: Configuration to generate from
         patient_count: Total number of patients to generate
-        batch_size: Number of patients per batch
+        batch_size: Maximum number of patients per chunk
         generation_service: Patient generation service instance
+        output_format: "json" or "ndjson"
+        content_encoding: "gzip", "br" or None
+        api_key_context: API key the stream is generated for; streamed patients are recorded against it
+        charged_patients: Patients already charged to the key's daily quota; the part never streamed
+            (failure or client disconnect) is refunded
 
     Yields:
-        JSON bytes for streaming response
+        Encoded bytes for the streaming response
     """
-    # Start JSON array
-    yield b'{\n  "patients": [\n'
-
-    # Get configuration from database
-    db_instance = Database.get_instance()
-    config_repo = ConfigurationRepository(db_instance)
-
-    config_template = config_repo.get_configuration(config_id)
-    if not config_template:
-        # Handle error in stream
-        yield b']\n, "error": "Configuration not found"\n}'
-        return
-
-    # Override patient count if specified
-    if patient_count:
-        config_template.total_patients = patient_count
-
-    # Create generation context
-    output_dir = Path(tempfile.gettempdir()) / "medical_patients" / f"stream_{config_id}"
-    output_dir.mkdir(parents=True, exist_ok=True)
-
-    context = GenerationContext(
-        config=config_template,
-        job_id=f"stream_{config_id}",
-        output_directory=str(output_dir),
-        output_formats=["json"],  # Only JSON for streaming
-        use_compression=False,  # No compression for streaming
-    )
-
-    # Initialize the generation pipeline
     assert generation_service is not None, "Generation service is required"
-    generation_service._initialize_pipeline(config_id)
-
-    # Track progress
-    first_patient = True
+    config_template = config_template.model_copy(update={"total_patients": patient_count})
     patients_generated = 0
 
-    try:
-        # Generate patients in batches
-        if not hasattr(generation_service, "pipeline") or generation_service.pipeline is None:
-            yield b']\n, "error": "Generation service not initialized"\n}'
-            return
-        async for _patient, patient_data in generation_service.pipeline.generate(context):
-            # Add comma separator if not first patient
-            if not first_patient:
-                yield b",\n"
-            else:
-                first_patient = False
-
-            # Serialize patient data
-            patient_json = json.dumps(patient_data, indent=4)
-            # Indent for array formatting
-            indented_json = "\n".join(f"    {line}" for line in patient_json.split("\n"))
-            yield indented_json.encode("utf-8")
-
-            patients_generated += 1
+    async def patients() -> AsyncIterator[Dict[str, Any]]:
+        nonlocal patients_generated
+        # Create generation context
+        output_dir = Path(tempfile.gettempdir()) / "medical_patients" / f"stream_{config_template.id}"
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        context = GenerationContext(
+            config=config_template,
+            job_id=f"stream_{config_template.id}",
+            output_directory=str(output_dir),
+            output_formats=["json"],  # Only JSON for streaming
+            use_compression=False,  # Compression is applied to the stream itself
+        )
 
-            # Force garbage collection every batch_size patients
-            if patients_generated % batch_size == 0:
-                gc.collect()
+        # Initialize the generation pipeline
+        generation_service._initialize_pipeline(config_template)
 
-                # Small delay to prevent overwhelming the system
-                await asyncio.sleep(0.01)
+        async for _patient, patient_data in generation_service.pipeline.generate(context):
+            yield patient_data
+            patients_generated += 1
 
             # Stop if we've generated enough patients
             if patients_generated >= patient_count:
                 break
 
-    except Exception as e:
-        # Include error in response
-        error_msg = f"Error during generation: {e!s}"
-        yield f'\n  ],\n  "error": "{error_msg}",\n  "patients_generated": {patients_generated}\n}}'.encode()
-        return
-
-    # Close JSON array
-    yield f'\n  ],\n  "total_patients": {patients_generated}\n}}'.encode()
+    try:
+        async for chunk in encode_patient_stream(
+            patients(), output_format, content_encoding, max_patients_per_chunk=batch_size
+        ):
+            yield chunk
+    finally:
+        if api_key_context is not None:
+            record_patients(api_key_context, patients_generated)
+            await refund_patient_quota(api_key_context, charged_patients - patients_generated)
+
+
+def _stream_headers(
+    patient_count: int, batch_size: int, output_format: str, content_encoding: Optional[str]
+) -> Dict[str, str]:
+    headers = {
+        "Cache-Control": "no-cache",
+        "X-Content-Type-Options": "nosniff",
+        "X-Patient-Count": str(patient_count),
+        "X-Batch-Size": str(batch_size),
+        "X-Stream-Format": output_format,
+        "Vary": "Accept-Encoding",
+    }
+    if content_encoding:
+        headers["Content-Encoding"] = content_encoding
+    return headers
 
 
 @router.get(
@@ -142,7 +138,9 @@ async def generate_patients_stream(
     This endpoint streams patients as they are generated, allowing clients to process
     large datasets without loading everything into memory at once.
 
-    The response is a JSON object with a 'patients' array that is streamed incrementally.
+    The response is a JSON object with a 'patients' array that is streamed incrementally,
+    or one patient per line with `format=ndjson`. Send `Accept-Encoding: gzip` (or `br`)
+    to receive the stream compressed.
     """,
     responses={
         200: {
@@ -156,7 +154,8 @@ async def generate_patients_stream(
                         ],
                         "total_patients": 100,
                     },
-                }
+                },
+                "application/x-ndjson": {"schema": {"type": "string"}},
             },
         }
     },
@@ -164,16 +163,22 @@ async def generate_patients_stream(
 async def stream_patients(
     configuration_id: str = Query(..., description="Configuration ID to use for generation"),
     count: Optional[int] = Query(None, description="Override patient count (uses config default if not specified)"),
-    batch_size: int = Query(100, description="Number of patients per batch (affects memory usage)"),
-    current_user: str = Depends(verify_api_key),
+    batch_size: int = Query(100, description="Maximum number of patients per chunk (affects memory usage)"),
+    output_format: str = Query("json", alias="format", pattern="^(json|ndjson)$", description="json or ndjson"),
+    *,
+    accept_encoding: Optional[str] = Header(None),
+    api_key_context: APIKeyContext = Depends(verify_api_key_context),
     generation_service: AsyncPatientGenerationService = Depends(get_patient_generation_service),
 ) -> StreamingResponse:
     """
     Stream patient generation with minimal memory footprint.
 
-    Returns a streaming JSON response where patients are generated and sent
-    in batches to minimize server memory usage.
+    Returns a streaming JSON (or NDJSON) response where patients are generated
+    and sent in chunks to minimize server memory usage. The stream is gzip or
+    brotli encoded when the client accepts it. The patients are charged to the
+    key's daily quota up front; any the stream does not deliver are refunded.
     """
+    charged_patients = 0
     try:
         # Validate batch size
         if batch_size < 1 or batch_size > 1000:
@@ -185,11 +190,14 @@ async def stream_patients(
         db_instance = Database.get_instance()
         config_repo = ConfigurationRepository(db_instance)
 
-        config_template = config_repo.get_configuration(configuration_id)
-        if not config_template:
+        config_data = await get_configuration_template(
+            configuration_id, lambda: config_repo.get_configuration(configuration_id)
+        )
+        if config_data is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail=f"Configuration '{configuration_id}' not found"
             )
+        config_template = ConfigurationTemplateDB(**config_data)
 
         # Use provided count or configuration default
         patient_count = count if count is not None else config_template.total_patients
@@ -200,30 +208,35 @@ async def stream_patients(
                 status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Patient count must be at least 1"
             )
 
+        await enforce_patient_quota(api_key_context, patient_count)
+        charged_patients = patient_count
+
         # Warm up caches before streaming
         await generation_service.cached_demographics.warm_cache()
         await generation_service.cached_medical.warm_cache()
 
         # Create streaming response
+        content_encoding = negotiate_content_encoding(accept_encoding)
         return StreamingResponse(
             generate_patients_stream(
-                config_id=configuration_id,
+                config_template=config_template,
                 patient_count=patient_count,
                 batch_size=batch_size,
                 generation_service=generation_service,
+                output_format=output_format,
+                content_encoding=content_encoding,
+                api_key_context=api_key_context,
+                charged_patients=charged_patients,
             ),
-            media_type="application/json",
-            headers={
-                "Cache-Control": "no-cache",
-                "X-Content-Type-Options": "nosniff",
-                "X-Patient-Count": str(patient_count),
-                "X-Batch-Size": str(batch_size),
-            },
+            media_type=STREAM_MEDIA_TYPES[output_format],
+            headers=_stream_headers(patient_count, batch_size, output_format, content_encoding),
         )
 
     except HTTPException:
+        await refund_patient_quota(api_key_context, charged_patients)
         raise
     except Exception as e:
+        await refund_patient_quota(api_key_context, charged_patients)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to start streaming generation: {e!s}"
         )
@@ -251,20 +264,27 @@ async def stream_patients(
                         ],
                         "total_patients": 100,
                     },
-                }
+                },
+                "application/x-ndjson": {"schema": {"type": "string"}},
             },
         }
     },
 )
 async def stream_patients_with_config(
     config: dict,
-    batch_size: int = Query(100, description="Number of patients per batch"),
-    current_user: str = Depends(verify_api_key),
+    batch_size: int = Query(100, description="Maximum number of patients per chunk"),
+    output_format: str = Query("json", alias="format", pattern="^(json|ndjson)$", description="json or ndjson"),
+    *,
+    accept_encoding: Optional[str] = Header(None),
+    api_key_context: APIKeyContext = Depends(verify_api_key_context),
     generation_service: AsyncPatientGenerationService = Depends(get_patient_generation_service),
 ) -> StreamingResponse:
     """
     Stream patient generation with inline configuration.
+
+    Charged to the key's daily patient quota like the GET endpoint.
     """
+    charged_patients = 0
     try:
         # Validate batch size
         if batch_size < 1 or batch_size > 1000:
@@ -272,11 +292,7 @@ async def stream_patients_with_config(
                 status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Batch size must be between 1 and 1000"
             )
 
-        # Create temporary configuration
-        db_instance = Database.get_instance()
-        config_repo = ConfigurationRepository(db_instance)
-
-        # Extract configuration data
+        # Inline configuration: held in memory only, never written to the database
         inner_config = config.get("configuration", config)
         injury_dist = inner_config.get("injury_mix") or inner_config.get(
             "injury_distribution", {"Disease": 0.52, "Non-Battle Injury": 0.33, "Battle Injury": 0.15}
@@ -290,49 +306,37 @@ async def stream_patients_with_config(
             front_configs=inner_config.get("front_configs", []),
             facility_configs=inner_config.get("facility_configs", []),
         )
+        config_template = inline_configuration(config_create)
 
-        # Save temporary configuration
-        config_template = config_repo.create_configuration(config_create)
-
-        try:
-            # Warm up caches
-            await generation_service.cached_demographics.warm_cache()
-            await generation_service.cached_medical.warm_cache()
-
-            # Create streaming response
-            return StreamingResponse(
-                generate_patients_stream(
-                    config_id=config_template.id,
-                    patient_count=config_template.total_patients,
-                    batch_size=batch_size,
-                    generation_service=generation_service,
-                ),
-                media_type="application/json",
-                headers={
-                    "Cache-Control": "no-cache",
-                    "X-Content-Type-Options": "nosniff",
-                    "X-Patient-Count": str(config_template.total_patients),
-                    "X-Batch-Size": str(batch_size),
-                },
-            )
+        await enforce_patient_quota(api_key_context, config_template.total_patients)
+        charged_patients = config_template.total_patients
 
-        finally:
-            # Schedule cleanup of temporary configuration
-            # This will happen after response is sent
-            async def cleanup():
-                await asyncio.sleep(5)  # Give time for streaming to start
-                try:
-                    config_repo.delete_configuration(config_template.id)
-                except Exception as e:
-                    print(f"Warning: Could not clean up temporary configuration {config_template.id}: {e}")
+        # Warm up caches
+        await generation_service.cached_demographics.warm_cache()
+        await generation_service.cached_medical.warm_cache()
 
-            # Store reference to avoid task being garbage collected
-            # The task will run independently and clean up after streaming
-            asyncio.create_task(cleanup())  # noqa: RUF006
+        # Create streaming response
+        content_encoding = negotiate_content_encoding(accept_encoding)
+        return StreamingResponse(
+            generate_patients_stream(
+                config_template=config_template,
+                patient_count=config_template.total_patients,
+                batch_size=batch_size,
+                generation_service=generation_service,
+                output_format=output_format,
+                content_encoding=content_encoding,
+                api_key_context=api_key_context,
+                charged_patients=charged_patients,
+            ),
+            media_type=STREAM_MEDIA_TYPES[output_format],
+            headers=_stream_headers(config_template.total_patients, batch_size, output_format, content_encoding),
+        )
 
     except HTTPException:
+        await refund_patient_quota(api_key_context, charged_patients)
         raise
     except Exception as e:
+        await refund_patient_quota(api_key_context, charged_patients)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to start streaming generation: {e!s}"
         )
@@ -0,0 +1,389 @@
+"""
+Two-tier API key cache and write-behind usage counters.
+
+Authentication looks a key up in a small in-process TTL LRU, then in Redis,
+and only queries Postgres when both miss. Usage is counted in memory and
+written back in batches, so an authenticated request normally does no
+database work at all.
+"""
+
+import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+import hashlib
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Set, Tuple
+import uuid
+
+from sqlalchemy import DateTime
+
+from src.core.cache import get_cache_service
+from src.core.metrics import get_metrics_collector
+from src.domain.models.api_key import APIKey
+
+logger = logging.getLogger(__name__)
+
+# Cache TTL constants
+API_KEY_LOCAL_TTL = 30  # seconds a key stays in the in-process tier
+API_KEY_NEGATIVE_TTL = 5  # seconds an unknown key is remembered as invalid
+API_KEY_RECORD_TTL = 120  # seconds a key record stays in Redis
+API_KEY_CACHE_SIZE = 1024
+USAGE_FLUSH_INTERVAL = 5.0  # seconds between usage write-backs
+
+CACHE_TYPE = "api_key"
+REDIS_CACHE_TYPE = "api_key_redis"
+
+
+def api_key_to_record(api_key: APIKey) -> Dict[str, Any]:
+    """
+    JSON-safe column values of an API key.
+
+    The key itself is left out, so secrets are never written to Redis; it is
+    restored from the header value on lookup.
+    """
+    record = {}
+    for column in APIKey.__table__.columns:
+        if column.key == "key":
+            continue
+        value = getattr(api_key, column.key)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif isinstance(value, uuid.UUID):
+            value = str(value)
+        record[column.key] = value
+    return record
+
+
+def api_key_from_record(api_key: str, record: Dict[str, Any]) -> APIKey:
+    """Build a detached APIKey from a cached record."""
+    values = {}
+    for column in APIKey.__table__.columns:
+        if column.key not in record:
+            continue
+        value = record[column.key]
+        if value is not None and isinstance(column.type, DateTime):
+            value = datetime.fromisoformat(value)
+        elif value is not None and column.key == "id":
+            value = uuid.UUID(value)
+        values[column.key] = value
+    return APIKey(key=api_key, **values)
+
+
+class APIKeyCache:
+    """
+    In-process TTL LRU in front of Redis for API key records.
+
+    Every hit returns a fresh detached APIKey, so request handlers can adjust
+    counters on it without touching the cached record. Changes made through
+    APIKeyRepository invalidate both tiers; changes made by another process
+    without Redis (e.g. the CLI) take effect once the entries expire.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = API_KEY_CACHE_SIZE,
+        ttl: float = API_KEY_LOCAL_TTL,
+        negative_ttl: float = API_KEY_NEGATIVE_TTL,
+        redis_ttl: int = API_KEY_RECORD_TTL,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.redis_ttl = redis_ttl
+        self._entries: OrderedDict[str, Tuple[float, Optional[Dict[str, Any]]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._tasks: Set[asyncio.Task] = set()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _hash(api_key: str) -> str:
+        return hashlib.sha256(api_key.encode()).hexdigest()
+
+    @staticmethod
+    def _redis_key(key_hash: str) -> str:
+        return f"apikey:{key_hash}:record"
+
+    def _get_local(self, key_hash: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        with self._lock:
+            entry = self._entries.get(key_hash)
+            if entry is None:
+                return False, None
+            expires_at, record = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key_hash]
+                return False, None
+            self._entries.move_to_end(key_hash)
+            return True, record
+
+    def _put_local(self, key_hash: str, record: Optional[Dict[str, Any]]):
+        ttl = self.ttl if record is not None else self.negative_ttl
+        with self._lock:
+            self._entries[key_hash] = (time.monotonic() + ttl, record)
+            self._entries.move_to_end(key_hash)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                get_metrics_collector().record_cache_eviction(CACHE_TYPE, "lru")
+
+    async def get(self, api_key: str, loader: Callable[[], Optional[APIKey]]) -> Optional[APIKey]:
+        """
+        Look up an API key, calling ``loader`` only if both tiers miss.
+
+        Args:
+            api_key: Raw key from the request header
+            loader: Synchronous database lookup returning the key or None
+
+        Returns:
+            Detached APIKey, or None if the loader found no usable key
+        """
+        key_hash = self._hash(api_key)
+        metrics = get_metrics_collector()
+
+        found, record = self._get_local(key_hash)
+        if found:
+            self.hits += 1
+            metrics.record_cache_hit(CACHE_TYPE)
+            return api_key_from_record(api_key, record) if record is not None else None
+        self.misses += 1
+        metrics.record_cache_miss(CACHE_TYPE)
+
+        cache = get_cache_service()
+        if cache is not None:
+            record = await cache.get(self._redis_key(key_hash))
+            if isinstance(record, dict):
+                metrics.record_cache_hit(REDIS_CACHE_TYPE)
+                self._put_local(key_hash, record)
+                return api_key_from_record(api_key, record)
+            metrics.record_cache_miss(REDIS_CACHE_TYPE)
+
+        key_record = loader()
+        record = api_key_to_record(key_record) if key_record is not None else None
+        self._put_local(key_hash, record)
+        if record is None:
+            return None
+        if cache is not None:
+            await cache.set(self._redis_key(key_hash), record, ttl=self.redis_ttl)
+        return api_key_from_record(api_key, record)
+
+    def invalidate(self, api_key: Optional[str] = None):
+        """
+        Drop one key (or every key) from the local tier and delete it from Redis.
+
+        Safe to call from synchronous code: the Redis delete is scheduled on
+        the running event loop, if there is one. Without a loop the Redis
+        entry simply expires after ``redis_ttl``.
+        """
+        with self._lock:
+            if api_key is None:
+                self._entries.clear()
+                return
+            key_hash = self._hash(api_key)
+            self._entries.pop(key_hash, None)
+
+        cache = get_cache_service()
+        if cache is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(cache.delete(self._redis_key(key_hash)))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def evict(self, api_keys: Iterable[str]):
+        """Drop keys from the local tier and wait until Redis has deleted them."""
+        key_hashes = [self._hash(api_key) for api_key in api_keys]
+        with self._lock:
+            for key_hash in key_hashes:
+                self._entries.pop(key_hash, None)
+
+        cache = get_cache_service()
+        if cache is None:
+            return
+        for key_hash in key_hashes:
+            await cache.delete(self._redis_key(key_hash))
+
+
+@dataclass
+class UsageDelta:
+    """Usage recorded for one key since the last flush."""
+
+    requests: int = 0
+    patients: int = 0
+    last_used_at: Optional[datetime] = field(default_factory=datetime.utcnow)
+
+
+class UsageBuffer:
+    """
+    Write-behind usage counters.
+
+    Requests and generated patients are summed per key in memory and written
+    with one UPDATE per key on flush. The UPDATE adds to the stored values, so
+    several API processes can flush concurrently without losing counts.
+
+    Cached key records loaded before a flush do not contain the flushed
+    usage, so it keeps counting in pending() until settle() has evicted those
+    records; otherwise daily counters would drop back after every flush.
+    """
+
+    def __init__(self):
+        self._pending: Dict[str, UsageDelta] = {}
+        self._flushed: Dict[str, UsageDelta] = {}  # written, but possibly missing from cached records
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def record(self, api_key: str, requests: int = 1, patients: int = 0):
+        """Count usage for a key; it reaches the database on the next flush."""
+        with self._lock:
+            delta = self._pending.get(api_key)
+            if delta is None:
+                delta = self._pending[api_key] = UsageDelta()
+            delta.requests += requests
+            delta.patients += patients
+            delta.last_used_at = datetime.utcnow()
+
+    def pending(self, api_key: str) -> UsageDelta:
+        """Usage recorded for a key that cached records of it may not contain yet."""
+        total = UsageDelta(last_used_at=None)
+        with self._lock:
+            for delta in (self._pending.get(api_key), self._flushed.get(api_key)):
+                if delta is not None:
+                    _add_usage(total, delta)
+        return total
+
+    def drain(self) -> Dict[str, UsageDelta]:
+        """Take all pending usage, leaving the buffer empty; it counts as flushed until settled."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            for api_key, delta in pending.items():
+                _add_usage(self._flushed.setdefault(api_key, UsageDelta(last_used_at=None)), delta)
+        return pending
+
+    def restore(self, deltas: Dict[str, UsageDelta]):
+        """Put drained usage back, e.g. after a failed flush."""
+        with self._lock:
+            self._forget_flushed(deltas)
+            for api_key, delta in deltas.items():
+                current = self._pending.get(api_key)
+                if current is None:
+                    self._pending[api_key] = delta
+                    continue
+                _add_usage(current, delta)
+
+    async def settle(self, cache: "APIKeyCache"):
+        """Evict the cached records of flushed keys, then stop counting their flushed usage."""
+        with self._lock:
+            flushed = {
+                api_key: _add_usage(UsageDelta(last_used_at=None), delta) for api_key, delta in self._flushed.items()
+            }
+        if not flushed:
+            return
+        await cache.evict(flushed)
+        with self._lock:
+            self._forget_flushed(flushed)
+
+    def _forget_flushed(self, deltas: Dict[str, UsageDelta]):
+        # Caller holds the lock
+        for api_key, delta in deltas.items():
+            flushed = self._flushed.get(api_key)
+            if flushed is None:
+                continue
+            flushed.requests -= delta.requests
+            flushed.patients -= delta.patients
+            if flushed.requests <= 0 and flushed.patients <= 0:
+                del self._flushed[api_key]
+
+    def flush(self, session_factory: Callable[[], Any]) -> int:
+        """
+        Write pending usage to the database in one transaction.
+
+        Args:
+            session_factory: SQLAlchemy sessionmaker for the API key database
+
+        Returns:
+            Number of keys updated
+        """
+        from src.domain.repositories.api_key_repository import APIKeyRepository
+
+        deltas = self.drain()
+        if not deltas:
+            return 0
+        try:
+            with session_factory() as db:
+                APIKeyRepository(db).apply_usage_batch(deltas)
+        except Exception:
+            self.restore(deltas)
+            raise
+        return len(deltas)
+
+
+def _add_usage(total: UsageDelta, delta: UsageDelta) -> UsageDelta:
+    total.requests += delta.requests
+    total.patients += delta.patients
+    if total.last_used_at is None or (delta.last_used_at is not None and delta.last_used_at > total.last_used_at):
+        total.last_used_at = delta.last_used_at
+    return total
+
+
+async def _settle_usage(buffer: UsageBuffer):
+    try:
+        await buffer.settle(get_api_key_cache())
+    except Exception as e:
+        logger.error("Failed to refresh cached API keys after a usage flush: %s", e)
+
+
+def _flush_usage(buffer: UsageBuffer, session_factory: Callable[[], Any]):
+    try:
+        flushed = buffer.flush(session_factory)
+        if flushed:
+            logger.debug("Flushed API key usage for %d keys", flushed)
+    except Exception as e:
+        logger.error("Failed to flush API key usage: %s", e)
+
+
+async def run_usage_flusher(session_factory: Callable[[], Any], interval: float = USAGE_FLUSH_INTERVAL):
+    """Flush buffered usage every ``interval`` seconds, and once more when cancelled."""
+    buffer = get_usage_buffer()
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            await asyncio.to_thread(_flush_usage, buffer, session_factory)
+            await _settle_usage(buffer)
+    except asyncio.CancelledError:
+        await asyncio.to_thread(_flush_usage, buffer, session_factory)
+        await _settle_usage(buffer)
+        raise
+
+
+_api_key_cache: Optional[APIKeyCache] = None
+_usage_buffer: Optional[UsageBuffer] = None
+
+
+def get_api_key_cache() -> APIKeyCache:
+    """Get the global API key cache instance."""
+    global _api_key_cache
+    if _api_key_cache is None:
+        _api_key_cache = APIKeyCache()
+    return _api_key_cache
+
+
+def get_usage_buffer() -> UsageBuffer:
+    """Get the global usage buffer instance."""
+    global _usage_buffer
+    if _usage_buffer is None:
+        _usage_buffer = UsageBuffer()
+    return _usage_buffer
+
+
+def invalidate_api_key(api_key: str):
+    """Drop a key from both cache tiers after it changed in the database."""
+    get_api_key_cache().invalidate(api_key)
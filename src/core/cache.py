@@ -3,10 +3,10 @@
 This module provides a centralized caching layer using Redis for improved performance.
 """
 
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 import json
 import logging
-from typing import Any, Optional
+from typing import Any, AsyncIterator, List, Optional
 
 import redis.asyncio as redis
 from redis.exceptions import RedisError
@@ -83,6 +83,30 @@ class CacheService:
             logger.error(f"Cache get error for key {key}: {e}")
             return None
 
+    async def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        """Get several values in one round trip (MGET).
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Cached values in key order, None for missing keys (all None on error)
+        """
+        try:
+            async with self._get_client() as client:
+                values = await client.mget(keys)
+        except RedisError as e:
+            logger.error(f"Cache mget error for keys {keys}: {e}")
+            return [None] * len(keys)
+
+        results = []
+        for value in values:
+            if value is not None:
+                with suppress(json.JSONDecodeError):
+                    value = json.loads(value)
+            results.append(value)
+        return results
+
     async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
         """Set a value in the cache.
 
@@ -124,6 +148,22 @@ class CacheService:
             logger.error(f"Cache delete error for key {key}: {e}")
             return False
 
+    async def incr(self, key: str) -> Optional[int]:
+        """Atomically increment an integer counter (created at 0, no expiry).
+
+        Args:
+            key: Counter key
+
+        Returns:
+            The new value, or None on error
+        """
+        try:
+            async with self._get_client() as client:
+                return await client.incr(key)
+        except RedisError as e:
+            logger.error(f"Cache incr error for key {key}: {e}")
+            return None
+
     async def invalidate_pattern(self, pattern: str) -> int:
         """Invalidate all keys matching a pattern.
 
@@ -186,6 +226,69 @@ class CacheService:
             logger.error(f"Cache TTL error for key {key}: {e}")
             return -2
 
+    async def publish(self, channel: str, message: Any) -> int:
+        """Publish a message on a pub/sub channel.
+
+        Args:
+            channel: Channel name
+            message: Message (will be JSON serialized if not string)
+
+        Returns:
+            Number of subscribers that received the message (0 on error)
+        """
+        try:
+            async with self._get_client() as client:
+                if not isinstance(message, str):
+                    message = json.dumps(message)
+                return await client.publish(channel, message)
+        except RedisError as e:
+            logger.error(f"Cache publish error for channel {channel}: {e}")
+            return 0
+
+    async def subscribe(self, *channels: str) -> AsyncIterator[Any]:
+        """Yield messages published on pub/sub channels until the consumer stops.
+
+        Args:
+            channels: Channel names
+
+        Yields:
+            Messages, JSON decoded where possible
+
+        Raises:
+            RedisError: If the subscription connection fails
+        """
+        async with self._get_client() as client:
+            pubsub = client.pubsub()
+            try:
+                await pubsub.subscribe(*channels)
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    try:
+                        yield json.loads(message["data"])
+                    except json.JSONDecodeError:
+                        yield message["data"]
+            finally:
+                await pubsub.reset()
+
+    async def eval_script(self, script: str, keys: List[str], args: List[Any]) -> Any:
+        """Run a Lua script atomically (EVALSHA, loading the script on first use).
+
+        Args:
+            script: Lua source
+            keys: Redis keys the script touches
+            args: Script arguments
+
+        Returns:
+            The script's reply
+
+        Raises:
+            RedisError: If Redis is unreachable or the script fails; callers
+                decide how to degrade
+        """
+        async with self._get_client() as client:
+            return await client.register_script(script)(keys=keys, args=args)
+
     async def health_check(self) -> bool:
         """Check if Redis is accessible.
 
@@ -11,7 +11,7 @@ import functools
 import hashlib
 import json
 import logging
-from typing import Any, Callable, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 from config import get_settings
 from src.core.cache import get_cache_service
@@ -191,28 +191,19 @@ async def get_cached_api_key_limits(api_key: str) -> Optional[Dict[str, Any]]:
         return None
 
 
-async def cache_job_status(job: Job) -> None:
-    """
-    Cache job status information.
+def job_progress_channel(job_id: str) -> str:
+    """Pub/sub channel carrying status and progress updates for a job."""
+    return f"job:{job_id}:progress"
 
-    Args:
-        job: The job object to cache
-    """
-    cache = get_cache_service()
-    if not cache:
-        return
 
-    cache_key = f"job:{job.job_id}:status"
+def job_patients_channel(job_id: str) -> str:
+    """Pub/sub channel carrying the sampled live feed of a job's finished patients."""
+    return f"job:{job_id}:patients"
 
-    # Determine TTL based on job status
-    if job.status in [JobStatus.PENDING, JobStatus.RUNNING]:
-        ttl = JOB_STATUS_TTL
-    elif job.status == JobStatus.COMPLETED:
-        ttl = 3600  # 1 hour for completed jobs
-    else:
-        ttl = 1800  # 30 minutes for failed/cancelled jobs
 
-    job_data = {
+def job_status_payload(job: Job) -> Dict[str, Any]:
+    """JSON-safe job status, as cached and published."""
+    return {
         "id": job.job_id,
         "status": job.status.value,
         "progress": job.progress,
@@ -232,8 +223,30 @@ async def cache_job_status(job: Job) -> None:
         else None,
     }
 
+
+async def cache_job_status(job: Job) -> None:
+    """
+    Cache job status information.
+
+    Args:
+        job: The job object to cache
+    """
+    cache = get_cache_service()
+    if not cache:
+        return
+
+    cache_key = f"job:{job.job_id}:status"
+
+    # Determine TTL based on job status
+    if job.status in [JobStatus.PENDING, JobStatus.RUNNING]:
+        ttl = JOB_STATUS_TTL
+    elif job.status == JobStatus.COMPLETED:
+        ttl = 3600  # 1 hour for completed jobs
+    else:
+        ttl = 1800  # 30 minutes for failed/cancelled jobs
+
     try:
-        await cache.set(cache_key, job_data, ttl=ttl)
+        await cache.set(cache_key, job_status_payload(job), ttl=ttl)
         logger.debug(f"Cached job status for {job.job_id} with TTL {ttl}s")
     except Exception as e:
         logger.error(f"Failed to cache job status: {e}")
@@ -285,23 +298,57 @@ async def invalidate_job_cache(job_id: str) -> None:
         logger.error(f"Failed to invalidate job cache: {e}")
 
 
-async def cache_configuration_template(config_id: str, config_data: Dict[str, Any]) -> None:
+def _configuration_keys(config_id: str) -> List[str]:
+    """Cache key of a configuration template and of its cache version counter."""
+    return [f"config:{config_id}", f"config:{config_id}:version"]
+
+
+async def get_configuration_cache_version(config_id: str) -> int:
+    """
+    Current cache version of a configuration template.
+
+    The version is bumped on every invalidation. Read it before loading a
+    configuration from the database and cache the result under that version,
+    so a load that raced with an update can never be served afterwards.
+
+    Args:
+        config_id: The configuration ID
+
+    Returns:
+        Cache version (0 if the configuration was never invalidated or there is no cache)
+    """
+    cache = get_cache_service()
+    if not cache:
+        return 0
+
+    version = await cache.get(_configuration_keys(config_id)[1])
+    return int(version or 0)
+
+
+async def cache_configuration_template(
+    config_id: str, config_data: Dict[str, Any], version: Optional[int] = None
+) -> None:
     """
     Cache configuration template data.
 
     Args:
         config_id: The configuration ID
-        config_data: The configuration data to cache
+        config_data: The JSON-safe configuration data to cache
+        version: Cache version read before config_data was loaded; defaults
+            to the current version
     """
     cache = get_cache_service()
     if not cache:
         return
 
-    cache_key = f"config:{config_id}"
+    if version is None:
+        version = await get_configuration_cache_version(config_id)
 
     try:
-        await cache.set(cache_key, config_data, ttl=CONFIGURATION_TTL)
-        logger.debug(f"Cached configuration template {config_id}")
+        await cache.set(
+            _configuration_keys(config_id)[0], {"version": version, "data": config_data}, ttl=CONFIGURATION_TTL
+        )
+        logger.debug(f"Cached configuration template {config_id} (version {version})")
     except Exception as e:
         logger.error(f"Failed to cache configuration template: {e}")
 
@@ -310,32 +357,64 @@ async def get_cached_configuration(config_id: str) -> Optional[Dict[str, Any]]:
     """
     Get cached configuration template.
 
+    The entry and the version counter are read in one round trip; an entry
+    cached under an older version is treated as a miss.
+
     Args:
         config_id: The configuration ID
 
     Returns:
-        Cached configuration data or None if not found
+        Cached configuration data or None if not found or stale
     """
     cache = get_cache_service()
     if not cache:
         return None
 
-    cache_key = f"config:{config_id}"
-
     try:
-        data = await cache.get(cache_key)
-        if data:
-            logger.debug(f"Cache hit for configuration {config_id}")
-        return data
+        entry, version = await cache.get_many(_configuration_keys(config_id))
+        if not isinstance(entry, dict) or "data" not in entry:
+            return None
+        if entry.get("version") != int(version or 0):
+            logger.debug(f"Stale cached configuration {config_id}")
+            return None
+        logger.debug(f"Cache hit for configuration {config_id}")
+        return entry["data"]
     except Exception as e:
         logger.error(f"Failed to get cached configuration: {e}")
         return None
 
 
+async def get_configuration_template(config_id: str, loader: Callable[[], Optional[Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Read-through lookup of a configuration template.
+
+    Args:
+        config_id: The configuration ID
+        loader: Synchronous database lookup returning the template model or None
+
+    Returns:
+        JSON-safe configuration data, or None if the configuration does not exist
+    """
+    cached = await get_cached_configuration(config_id)
+    if cached is not None:
+        return cached
+
+    version = await get_configuration_cache_version(config_id)
+    config = loader()
+    if config is None:
+        return None
+    config_data = config.model_dump(mode="json")
+    await cache_configuration_template(config_id, config_data, version)
+    return config_data
+
+
 async def invalidate_configuration_cache(config_id: str) -> None:
     """
     Invalidate cached configuration template.
 
+    Bumps the configuration's cache version, so entries cached by loads that
+    were still in flight are ignored as well.
+
     Args:
         config_id: The configuration ID to invalidate
     """
@@ -343,9 +422,10 @@ async def invalidate_configuration_cache(config_id: str) -> None:
     if not cache:
         return
 
-    cache_key = f"config:{config_id}"
+    cache_key, version_key = _configuration_keys(config_id)
 
     try:
+        await cache.incr(version_key)
         await cache.delete(cache_key)
         logger.debug(f"Invalidated configuration cache for {config_id}")
     except Exception as e:
@@ -0,0 +1,236 @@
+"""
+Live job events for push subscribers.
+
+Status changes, throttled progress and an optional sampled feed of finished
+patients are fanned out to bounded per-subscriber queues. Without Redis the
+broadcaster delivers events in process. With Redis, events go through the
+job's pub/sub channels and one relay per job and process delivers them to
+local subscribers, so a client can follow a job running on any replica.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional, Set
+
+from redis.exceptions import RedisError
+
+from src.core.cache import get_cache_service
+from src.core.cache_utils import job_patients_channel, job_progress_channel, job_status_payload
+from src.domain.models.job import Job
+
+logger = logging.getLogger(__name__)
+
+JOB_EVENT_QUEUE_SIZE = 256  # events buffered per subscriber before the oldest are dropped
+PATIENT_FEED_SAMPLE = 10  # every Nth finished patient is published over Redis
+PATIENT_FEED_PROBE_INTERVAL = 1.0  # seconds the Redis feed pauses after nobody received it
+
+TERMINAL_JOB_STATUSES = frozenset({"completed", "failed", "cancelled"})
+
+
+class JobSubscription:
+    """
+    One subscriber's queue of events for a job.
+
+    The queue is bounded: a subscriber that falls behind loses its oldest
+    events, never the newest, so the final status always arrives. Patient
+    events are thinned to roughly one per ``patients_every`` patients.
+    """
+
+    def __init__(
+        self,
+        broadcaster: "JobEventBroadcaster",
+        job_id: str,
+        patients_every: int = 0,
+        maxsize: int = JOB_EVENT_QUEUE_SIZE,
+    ):
+        self.broadcaster = broadcaster
+        self.job_id = job_id
+        self.patients_every = patients_every
+        self.dropped = 0
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self._patient_credit = 0
+
+    async def __aenter__(self) -> "JobSubscription":
+        self.broadcaster._add(self)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.broadcaster._remove(self)
+
+    def deliver(self, event: Dict[str, Any]):
+        """Queue an event without blocking the publisher."""
+        if event["event"] == "patient":
+            if not self.patients_every:
+                return
+            # Each event stands for ``sample`` patients of the job
+            self._patient_credit += event.get("sample", 1)
+            if self._patient_credit < self.patients_every:
+                return
+            self._patient_credit -= self.patients_every
+
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self._queue.get_nowait()
+            self._queue.put_nowait(event)
+            self.dropped += 1
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Wait for the next event.
+
+        Args:
+            timeout: Seconds to wait; None waits indefinitely
+
+        Returns:
+            The event, or None if the timeout expired first
+        """
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class JobEventBroadcaster:
+    """Fans job events out to subscribers, in process or through Redis pub/sub."""
+
+    def __init__(
+        self,
+        queue_size: int = JOB_EVENT_QUEUE_SIZE,
+        patient_sample: int = PATIENT_FEED_SAMPLE,
+        probe_interval: float = PATIENT_FEED_PROBE_INTERVAL,
+    ):
+        self.queue_size = queue_size
+        self.patient_sample = patient_sample
+        self.probe_interval = probe_interval
+        self._subscribers: Dict[str, Set[JobSubscription]] = {}
+        self._relays: Dict[str, asyncio.Task] = {}
+        self._patient_seq: Dict[str, int] = {}
+        self._feed_paused_until: Dict[str, float] = {}
+        self._feed_tasks: Dict[str, asyncio.Task] = {}
+
+    def subscribe(self, job_id: str, patients_every: int = 0) -> JobSubscription:
+        """
+        Subscribe to a job's events; use as ``async with``.
+
+        Args:
+            job_id: Job to follow
+            patients_every: Receive about one finished patient per this many
+                patients (0 disables the patient feed)
+        """
+        return JobSubscription(self, job_id, patients_every, self.queue_size)
+
+    def subscriber_count(self, job_id: str) -> int:
+        """Number of subscribers following a job in this process."""
+        return len(self._subscribers.get(job_id, ()))
+
+    def _add(self, subscription: JobSubscription):
+        subscribers = self._subscribers.setdefault(subscription.job_id, set())
+        subscribers.add(subscription)
+        cache = get_cache_service()
+        if cache is not None and subscription.job_id not in self._relays:
+            self._relays[subscription.job_id] = asyncio.get_running_loop().create_task(self._relay(subscription.job_id))
+
+    def _remove(self, subscription: JobSubscription):
+        subscribers = self._subscribers.get(subscription.job_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.job_id]
+            relay = self._relays.pop(subscription.job_id, None)
+            if relay is not None:
+                relay.cancel()
+
+    def _deliver(self, job_id: str, event: Dict[str, Any]):
+        for subscription in tuple(self._subscribers.get(job_id, ())):
+            subscription.deliver(event)
+
+    async def _relay(self, job_id: str):
+        """Deliver events published by any replica to this process's subscribers."""
+        cache = get_cache_service()
+        try:
+            async for event in cache.subscribe(job_progress_channel(job_id), job_patients_channel(job_id)):
+                if isinstance(event, dict):
+                    self._deliver(job_id, event)
+        except RedisError as e:
+            logger.warning("Job event relay for %s stopped: %s", job_id, e)
+
+    async def publish(self, job_id: str, event: Dict[str, Any]):
+        """
+        Publish a status or progress event.
+
+        Args:
+            job_id: Job the event belongs to
+            event: Event with "event" (type) and "data" keys
+        """
+        cache = get_cache_service()
+        if cache is None:
+            self._deliver(job_id, event)
+            return
+        # Local subscribers receive it back through the relay
+        await cache.publish(job_progress_channel(job_id), event)
+
+    def offer_patient(self, job_id: str, patient: Dict[str, Any]):
+        """
+        Offer a finished patient to the live feed; called once per patient.
+
+        Costs a counter increment when nobody is listening. In process, a
+        patient is only queued for subscribers that asked for the feed. Over
+        Redis, every ``patient_sample``-th patient is published, one publish
+        at a time; when a publish reaches no subscriber the feed pauses for
+        ``probe_interval`` seconds.
+        """
+        seq = self._patient_seq.get(job_id, 0) + 1
+        self._patient_seq[job_id] = seq
+
+        cache = get_cache_service()
+        if cache is None:
+            if any(subscription.patients_every for subscription in self._subscribers.get(job_id, ())):
+                self._deliver(job_id, {"event": "patient", "seq": seq, "sample": 1, "data": patient})
+            return
+
+        if seq % self.patient_sample or self._feed_paused_until.get(job_id, 0.0) > time.monotonic():
+            return
+        task = self._feed_tasks.get(job_id)
+        if task is not None and not task.done():
+            return
+        event = {"event": "patient", "seq": seq, "sample": self.patient_sample, "data": patient}
+        self._feed_tasks[job_id] = asyncio.get_running_loop().create_task(self._publish_patient(job_id, event))
+
+    async def _publish_patient(self, job_id: str, event: Dict[str, Any]):
+        cache = get_cache_service()
+        if cache is None:
+            return
+        receivers = await cache.publish(job_patients_channel(job_id), event)
+        if not receivers:
+            self._feed_paused_until[job_id] = time.monotonic() + self.probe_interval
+
+    def close_job(self, job_id: str):
+        """Forget a finished job's feed state."""
+        self._patient_seq.pop(job_id, None)
+        self._feed_paused_until.pop(job_id, None)
+        self._feed_tasks.pop(job_id, None)
+
+
+_job_broadcaster: Optional[JobEventBroadcaster] = None
+
+
+def get_job_broadcaster() -> JobEventBroadcaster:
+    """Get the global job event broadcaster instance."""
+    global _job_broadcaster
+    if _job_broadcaster is None:
+        _job_broadcaster = JobEventBroadcaster()
+    return _job_broadcaster
+
+
+async def publish_job_status(job: Job, event: str = "progress"):
+    """
+    Publish a job's status to its live subscribers.
+
+    Args:
+        job: The job whose status changed
+        event: "status" for status changes, "progress" for progress updates
+    """
+    await get_job_broadcaster().publish(job.job_id, {"event": event, "data": job_status_payload(job)})
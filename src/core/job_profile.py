@@ -0,0 +1,245 @@
+"""
+Per-job resource profiles.
+
+While a job runs, one sampler task records process RSS, CPU and throughput
+every half second into a bounded ring buffer per job, and the pipeline adds
+the time it spends in each stage. Profiles are kept for a few recent jobs and
+served by the job profile endpoint. Prometheus only receives aggregates when a
+job finishes, so the number of series does not grow with the number of jobs.
+"""
+
+import asyncio
+from collections import OrderedDict, deque
+from contextlib import suppress
+from datetime import datetime
+import logging
+import time
+from typing import TYPE_CHECKING, Any, Deque, Dict, List, Optional, Tuple
+
+import psutil
+
+from patient_generator.memory_budget import MemoryBudgetController
+from patient_generator.performance import STAGE_TIME_BUCKETS, StageTimes, get_monitor, new_stage_times
+from src.core.metrics import get_metrics_collector
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+JOB_PROFILE_SAMPLE_INTERVAL = 0.5  # seconds between resource samples
+JOB_PROFILE_MAX_SAMPLES = 600  # ring buffer per job (5 minutes at the default interval)
+JOB_PROFILE_RETAINED_JOBS = 50  # finished profiles kept for the profile endpoint
+
+# Top-level pipeline stages: their per-patient cost is exported per job, and
+# every stage's share is relative to their total (hot-path calls nest inside them)
+PIPELINE_STAGES = ("creation", "flow", "medical_bridge", "conditions", "demographics", "serialization", "io")
+
+# (seconds since start, rss bytes, cpu percent, patients so far, patients per second)
+ResourceSample = Tuple[float, int, float, int, float]
+
+
+def _histogram(buckets: List[int]) -> Dict[str, int]:
+    # Cumulative counts keyed by upper bound, as in Prometheus histograms
+    histogram = {}
+    total = 0
+    for bound, count in zip((*STAGE_TIME_BUCKETS, "+Inf"), buckets):
+        total += count
+        histogram[str(bound)] = total
+    return histogram
+
+
+class JobProfile:
+    """Resource samples and stage timings of one job."""
+
+    def __init__(self, job_id: str, max_samples: int = JOB_PROFILE_MAX_SAMPLES):
+        self.job_id = job_id
+        self.status = "running"
+        self.started_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+        # None when pipeline timers are switched off
+        self.stage_times: Optional[StageTimes] = new_stage_times()
+        # Sizes the job's generation and write batches; reports the sizes chosen
+        self.memory_budget = MemoryBudgetController()
+        # Where on-demand stack samples are written, once the job has created it
+        self.output_directory: Optional[Path] = None
+        self.patients = 0
+        self.peak_rss_bytes = 0
+        self.samples_taken = 0
+        self.samples: Deque[ResourceSample] = deque(maxlen=max_samples)
+        self._start = time.monotonic()
+        self._end: Optional[float] = None
+        self._last_sample = (self._start, 0)
+
+    def record_patients(self, count: int = 1):
+        """Count patients finished by the job."""
+        self.patients += count
+
+    def add_sample(self, rss_bytes: int, cpu_percent: float):
+        """Append a resource sample; the oldest one drops out once the buffer is full."""
+        now = time.monotonic()
+        last_time, last_patients = self._last_sample
+        elapsed = now - last_time
+        rate = (self.patients - last_patients) / elapsed if elapsed > 0 else 0.0
+        self._last_sample = (now, self.patients)
+        self.peak_rss_bytes = max(self.peak_rss_bytes, rss_bytes)
+        self.samples_taken += 1
+        self.samples.append((now - self._start, rss_bytes, cpu_percent, self.patients, rate))
+
+    def finish(self, status: str):
+        """Freeze the profile once the job has ended."""
+        self.status = status
+        self.finished_at = datetime.utcnow()
+        self._end = time.monotonic()
+
+    @property
+    def runtime_seconds(self) -> float:
+        """Seconds the job has been running, or ran in total."""
+        return (self._end if self._end is not None else time.monotonic()) - self._start
+
+    @property
+    def patients_per_second(self) -> float:
+        """Average throughput over the job's runtime."""
+        runtime = self.runtime_seconds
+        return self.patients / runtime if runtime > 0 else 0.0
+
+    def stage_breakdown(self) -> Dict[str, Dict[str, Any]]:
+        """Time per stage, with per-patient cost, share of pipeline time and a per-call histogram."""
+        if self.stage_times is None:
+            return {}
+        stages = self.stage_times.snapshot()
+        total = sum(stages[stage]["seconds"] for stage in PIPELINE_STAGES if stage in stages)
+        for stage in stages.values():
+            stage["seconds_per_patient"] = stage["seconds"] / self.patients if self.patients else 0.0
+            stage["share"] = stage["seconds"] / total if total > 0 else 0.0
+            stage["histogram"] = _histogram(stage.pop("buckets"))
+        return stages
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the profile for the API."""
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "runtime_seconds": round(self.runtime_seconds, 3),
+            "patients": self.patients,
+            "patients_per_second": round(self.patients_per_second, 2),
+            "peak_rss_mb": round(self.peak_rss_bytes / 1024 / 1024, 1),
+            "stages": self.stage_breakdown(),
+            "batching": self.memory_budget.telemetry(),
+            "samples_dropped": self.samples_taken - len(self.samples),
+            "samples": [
+                {
+                    "t": round(t, 3),
+                    "rss_mb": round(rss / 1024 / 1024, 1),
+                    "cpu_percent": cpu,
+                    "patients": patients,
+                    "patients_per_second": round(rate, 2),
+                }
+                for t, rss, cpu, patients, rate in self.samples
+            ],
+        }
+
+
+class JobProfiler:
+    """Keeps the profiles of running and recently finished jobs."""
+
+    def __init__(
+        self,
+        sample_interval: float = JOB_PROFILE_SAMPLE_INTERVAL,
+        max_samples: int = JOB_PROFILE_MAX_SAMPLES,
+        retained_jobs: int = JOB_PROFILE_RETAINED_JOBS,
+    ):
+        self.sample_interval = sample_interval
+        self.max_samples = max_samples
+        self.retained_jobs = retained_jobs
+        self._active: Dict[str, JobProfile] = {}
+        self._finished: OrderedDict[str, JobProfile] = OrderedDict()
+        self._process = psutil.Process()
+        self._sampler: Optional[asyncio.Task] = None
+
+    def start(self, job_id: str) -> JobProfile:
+        """
+        Start profiling a job; returns the existing profile if already started.
+
+        Must be called from the event loop that runs the job.
+        """
+        profile = self._active.get(job_id)
+        if profile is not None:
+            return profile
+
+        profile = JobProfile(job_id, self.max_samples)
+        self._active[job_id] = profile
+        if self._sampler is None or self._sampler.done():
+            self._process.cpu_percent(None)  # the first reading only sets the baseline
+            self._sampler = asyncio.get_running_loop().create_task(self._sample_loop())
+        return profile
+
+    def finish(self, job_id: str, status: str) -> Optional[JobProfile]:
+        """
+        Stop profiling a job and export its aggregates to Prometheus.
+
+        Args:
+            job_id: Job that ended
+            status: Final job status
+
+        Returns:
+            The finished profile, or None if the job was not being profiled
+        """
+        profile = self._active.pop(job_id, None)
+        if profile is None:
+            return None
+
+        self.sample(profile)
+        profile.finish(status)
+        self._finished[job_id] = profile
+        while len(self._finished) > self.retained_jobs:
+            self._finished.popitem(last=False)
+
+        if not self._active and self._sampler is not None:
+            self._sampler.cancel()
+            self._sampler = None
+
+        if profile.stage_times is not None:
+            get_monitor().record_stage_times(profile.stage_times)
+        stages = profile.stage_breakdown()
+        get_metrics_collector().record_job_profile(
+            profile.peak_rss_bytes,
+            profile.patients_per_second,
+            {stage: stages[stage]["seconds_per_patient"] for stage in PIPELINE_STAGES if stage in stages},
+        )
+        return profile
+
+    def get(self, job_id: str) -> Optional[JobProfile]:
+        """Profile of a running or recently finished job."""
+        return self._active.get(job_id) or self._finished.get(job_id)
+
+    def sample(self, *profiles: JobProfile):
+        """Take one resource sample for the given profiles, or all running ones."""
+        try:
+            rss = self._process.memory_info().rss
+            cpu = self._process.cpu_percent(None)
+        except psutil.Error as e:
+            logger.debug("Resource sample failed: %s", e)
+            return
+        for profile in profiles or tuple(self._active.values()):
+            profile.add_sample(rss, cpu)
+
+    async def _sample_loop(self):
+        # One psutil reading per tick is shared by all running jobs
+        with suppress(asyncio.CancelledError):
+            while self._active:
+                await asyncio.sleep(self.sample_interval)
+                self.sample()
+
+
+_job_profiler: Optional[JobProfiler] = None
+
+
+def get_job_profiler() -> JobProfiler:
+    """Get the global job profiler instance."""
+    global _job_profiler
+    if _job_profiler is None:
+        _job_profiler = JobProfiler()
+    return _job_profiler
@@ -12,6 +12,7 @@ from typing import Any, Dict, Optional
 import psutil
 
 from src.core.exceptions import ResourceLimitExceeded
+from src.core.job_profile import get_job_profiler
 from src.core.metrics import get_metrics_collector
 
 
@@ -20,7 +21,8 @@ class JobResourceManager:
     Manages resource limits and monitoring for background jobs.
 
     Features:
-    - Memory limits per job
+    - Memory limits per job, enforced after a grace period in which the
+      generation pipeline's memory budget can shrink batches and drain
     - CPU time limits
     - Job timeout enforcement
     - Resource usage tracking
@@ -34,6 +36,8 @@ class JobResourceManager:
         self.max_cpu_seconds = int(os.environ.get("JOB_MAX_CPU_SECONDS", "300"))  # 5 minutes
         self.max_runtime_seconds = int(os.environ.get("JOB_MAX_RUNTIME_SECONDS", "600"))  # 10 minutes
         self.check_interval_seconds = 5  # Check resources every 5 seconds
+        # Consecutive over-limit checks tolerated before a job is failed
+        self.memory_grace_checks = int(os.environ.get("JOB_MEMORY_GRACE_CHECKS", "3"))
 
         # Batch processing configuration
         self.batch_size = int(os.environ.get("JOB_BATCH_SIZE", "100"))
@@ -69,15 +73,20 @@ class JobResourceManager:
             "process": process,
             "cancelled": False,
             "exception": None,
+            "memory_over_limit_checks": 0,
         }
 
-        # Start resource monitoring task
+        # Start resource monitoring task; telemetry is sampled into the job profile
         monitor_task = asyncio.create_task(self._monitor_job_resources(job_id))
+        job_profiler = get_job_profiler()
+        job_profiler.start(job_id)
+        profile_status = "failed"
 
         try:
             # Track job start
             self._metrics.track_job_started(job_id)
             yield
+            profile_status = "completed"
 
         finally:
             # Cancel monitoring
@@ -85,6 +94,11 @@ class JobResourceManager:
             with suppress(asyncio.CancelledError):
                 await monitor_task
 
+            job_info = self._active_jobs.get(job_id)
+            if job_info is not None and job_info.get("exception"):
+                profile_status = "failed"
+            job_profiler.finish(job_id, profile_status)
+
             # Clean up tracking
             if job_id in self._active_jobs:
                 job_info = self._active_jobs.pop(job_id)
@@ -123,8 +137,17 @@ class JobResourceManager:
                 memory_info = process.memory_info()
                 memory_mb = memory_info.rss / 1024 / 1024
                 if memory_mb > self.max_memory_mb:
-                    error_message = f"Job {job_id} exceeded memory limit: {memory_mb:.1f}MB > {self.max_memory_mb}MB"
-                    raise ResourceLimitExceeded(error_message)
+                    # Batches shrink and generation backs off under pressure, so
+                    # only a sustained overrun fails the job
+                    job_info["memory_over_limit_checks"] += 1
+                    if job_info["memory_over_limit_checks"] > self.memory_grace_checks:
+                        error_message = (
+                            f"Job {job_id} exceeded memory limit: {memory_mb:.1f}MB > {self.max_memory_mb}MB "
+                            f"for {job_info['memory_over_limit_checks']} consecutive checks"
+                        )
+                        raise ResourceLimitExceeded(error_message)
+                else:
+                    job_info["memory_over_limit_checks"] = 0
 
                 # Check CPU time
                 cpu_times = process.cpu_times()
@@ -137,10 +160,6 @@ class JobResourceManager:
                     )
                     raise ResourceLimitExceeded(error_message)
 
-                # Record metrics
-                self._metrics.track_resource_usage("job_memory_mb", memory_mb, {"job_id": job_id})
-                self._metrics.track_resource_usage("job_cpu_seconds", cpu_seconds, {"job_id": job_id})
-
                 # Wait before next check
                 await asyncio.sleep(self.check_interval_seconds)
 
@@ -193,6 +212,8 @@ class JobResourceManager:
                 "memory_mb": memory_info.rss / 1024 / 1024,
                 "cpu_seconds": (cpu_times.user + cpu_times.system)
                 - (job_info["start_cpu"].user + job_info["start_cpu"].system),
+                "memory_pressure": memory_info.rss / 1024 / 1024 / self.max_memory_mb,
+                "memory_over_limit_checks": job_info.get("memory_over_limit_checks", 0),
                 "cancelled": job_info.get("cancelled", False),
             }
         except psutil.NoSuchProcess:
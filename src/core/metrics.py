@@ -8,7 +8,10 @@ import time
 from typing import Dict, Optional
 
 from prometheus_client import Counter, Gauge, Histogram, generate_latest
-from prometheus_client.core import CollectorRegistry
+from prometheus_client.core import CollectorRegistry, HistogramMetricFamily
+
+from patient_generator.performance import STAGE_TIME_BUCKETS, get_monitor
+from patient_generator.reference_data import ReferenceDataRegistry, get_reference_registry
 
 # Create a custom registry to avoid conflicts
 registry = CollectorRegistry()
@@ -26,6 +29,31 @@ request_duration = Histogram(
     buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
 )
 
+# Response timing for streamed bodies: first body byte, last body byte and size
+response_first_byte = Histogram(
+    "api_response_first_byte_seconds",
+    "Time from request start to the first response body byte",
+    ["endpoint", "method"],
+    registry=registry,
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+response_stream_duration = Histogram(
+    "api_response_stream_duration_seconds",
+    "Time from request start until the response body was fully sent",
+    ["endpoint", "method"],
+    registry=registry,
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0),
+)
+
+response_size = Histogram(
+    "api_response_size_bytes",
+    "Response body bytes sent",
+    ["endpoint", "method"],
+    registry=registry,
+    buckets=(1024, 10 * 1024, 100 * 1024, 1024**2, 10 * 1024**2, 100 * 1024**2, 1024**3),
+)
+
 # Database metrics
 db_connections_active = Gauge("db_connections_active", "Number of active database connections", registry=registry)
 
@@ -76,6 +104,29 @@ job_status_changes = Counter(
     "job_status_changes_total", "Total number of job status changes", ["from_status", "to_status"], registry=registry
 )
 
+# Per-job resource profiles, aggregated over jobs (no per-job series)
+job_peak_memory = Histogram(
+    "job_peak_memory_bytes",
+    "Peak process RSS observed while a job ran",
+    registry=registry,
+    buckets=(64 * 1024**2, 128 * 1024**2, 256 * 1024**2, 512 * 1024**2, 1024**3, 2 * 1024**3, 4 * 1024**3),
+)
+
+job_throughput = Histogram(
+    "job_patients_per_second",
+    "Patients generated per second of job runtime",
+    registry=registry,
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500),
+)
+
+job_stage_seconds_per_patient = Histogram(
+    "job_stage_seconds_per_patient",
+    "Mean time per patient spent in a pipeline stage, observed once per job",
+    ["stage"],
+    registry=registry,
+    buckets=(0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5),
+)
+
 # System resource metrics
 memory_usage_bytes = Gauge(
     "process_memory_usage_bytes",
@@ -95,6 +146,35 @@ cache_evictions = Counter(
     "cache_evictions_total", "Total number of cache evictions", ["cache_type", "reason"], registry=registry
 )
 
+cache_reloads = Counter("cache_reloads_total", "Total number of cache reloads", ["cache_type"], registry=registry)
+
+REFERENCE_DATA_CACHE_TYPE = "reference_data"
+
+
+class PipelineStageCollector:
+    """
+    Exports the per-call stage histograms accumulated by the performance monitor.
+
+    Jobs merge their stage times into the monitor when they finish, so
+    scrapes read totals instead of every timed call touching Prometheus.
+    """
+
+    def collect(self):
+        family = HistogramMetricFamily(
+            "pipeline_stage_seconds", "Time per call of pipeline stages and simulation hot paths", labels=["stage"]
+        )
+        for stage, data in get_monitor().stage_times.snapshot().items():
+            cumulative = 0
+            buckets = []
+            for bound, count in zip((*map(str, STAGE_TIME_BUCKETS), "+Inf"), data["buckets"]):
+                cumulative += count
+                buckets.append((bound, cumulative))
+            family.add_metric([stage], buckets, data["seconds"])
+        yield family
+
+
+registry.register(PipelineStageCollector())
+
 
 class MetricsCollector:
     """Central metrics collector for the application."""
@@ -236,6 +316,17 @@ class MetricsCollector:
             # Could add a specific job CPU metric if needed
             pass
 
+    def record_job_profile(
+        self, peak_memory_bytes: int, patients_per_second: float, stage_seconds_per_patient: Dict[str, float]
+    ):
+        """Record a finished job's resource profile into the aggregate histograms."""
+        if peak_memory_bytes:
+            job_peak_memory.observe(peak_memory_bytes)
+        if patients_per_second:
+            job_throughput.observe(patients_per_second)
+        for stage, seconds in stage_seconds_per_patient.items():
+            job_stage_seconds_per_patient.labels(stage=stage).observe(seconds)
+
     def track_generation_error(self, error_type: str):
         """Track generation errors."""
         generation_errors.labels(error_type=error_type).inc()
@@ -276,6 +367,23 @@ class MetricsCollector:
         """Record a cache eviction."""
         cache_evictions.labels(cache_type=cache_type, reason=reason).inc()
 
+    def record_cache_reload(self, cache_type: str):
+        """Record a cache entry reloaded because its source changed."""
+        cache_reloads.labels(cache_type=cache_type).inc()
+
+    def observe_reference_data(self, reference_registry: ReferenceDataRegistry):
+        """Export hit/miss/reload events of a reference data registry."""
+        recorders = {
+            "hit": self.record_cache_hit,
+            "miss": self.record_cache_miss,
+            "reload": self.record_cache_reload,
+        }
+
+        def _on_event(event: str, _path: str):
+            recorders[event](REFERENCE_DATA_CACHE_TYPE)
+
+        reference_registry.add_listener(_on_event)
+
     def get_metrics(self) -> bytes:
         """
         Get current metrics in Prometheus format.
@@ -295,4 +403,5 @@ def get_metrics_collector() -> MetricsCollector:
     global _metrics_collector
     if _metrics_collector is None:
         _metrics_collector = MetricsCollector()
+        _metrics_collector.observe_reference_data(get_reference_registry())
     return _metrics_collector
@@ -0,0 +1,113 @@
+"""
+Coalesced progress reporting for generation jobs.
+
+The generation loop reports progress after every patient. ProgressReporter
+keeps only the latest report, decides cheaply whether it is worth publishing
+(a percentage step, capped at a maximum rate) and hands it to an async sink
+from a background task, so the loop never waits on the job store or Redis.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_MIN_STEP = 0.01  # publish after at least 1% more progress...
+PROGRESS_MAX_RATE = 4.0  # ...but no more than 4 times per second
+PROGRESS_HEARTBEAT = 2.0  # seconds after which unchanged percentages are republished
+
+ProgressSink = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class ProgressReporter:
+    """
+    Throttles progress reports and publishes them off the hot loop.
+
+    ``report`` is synchronous and only compares a few numbers. Reports that
+    pass the thresholds are published by a single background task; if the
+    sink is slow, newer reports replace older unpublished ones, so at most
+    one write is in flight and the newest state always wins. Phase changes
+    and completion are always published.
+    """
+
+    def __init__(
+        self,
+        sink: ProgressSink,
+        min_step: float = PROGRESS_MIN_STEP,
+        max_rate: float = PROGRESS_MAX_RATE,
+        heartbeat: float = PROGRESS_HEARTBEAT,
+    ):
+        self.sink = sink
+        self.min_step = min_step
+        self.min_interval = 1.0 / max_rate if max_rate > 0 else 0.0
+        self.heartbeat = heartbeat
+        self._pending: Optional[Dict[str, Any]] = None
+        self._latest: Optional[Dict[str, Any]] = None
+        self._last_sent: Optional[Dict[str, Any]] = None
+        self._last_progress = -1.0
+        self._last_phase: Optional[str] = None
+        self._last_time = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self.reported = 0
+        self.published = 0
+
+    def report(self, progress_data: Dict[str, Any]) -> None:
+        """
+        Offer a progress report; publishes it only if it crosses a threshold.
+
+        Args:
+            progress_data: Report with at least "progress" (0.0-1.0) and
+                optionally "current_phase"
+        """
+        self.reported += 1
+        self._latest = progress_data
+        progress = min(float(progress_data.get("progress", 0.0)), 1.0)
+        phase = progress_data.get("current_phase")
+        now = time.monotonic()
+        elapsed = now - self._last_time
+
+        if phase != self._last_phase or (progress >= 1.0 > self._last_progress):
+            due = True
+        elif elapsed < self.min_interval:
+            due = False
+        else:
+            due = progress - self._last_progress >= self.min_step or elapsed >= self.heartbeat
+        if not due:
+            return
+
+        self._last_progress = progress
+        self._last_phase = phase
+        self._last_time = now
+        self._pending = progress_data
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._drain())
+
+    async def _drain(self):
+        while self._pending is not None:
+            data, self._pending = self._pending, None
+            try:
+                await self.sink(data)
+                self._last_sent = data
+                self.published += 1
+            except Exception as e:
+                # Progress is best effort; generation carries on
+                logger.warning("Failed to publish progress: %s", e)
+
+    async def aclose(self, final: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Publish the final (or last throttled) report and wait for the sink.
+
+        Args:
+            final: Report to publish last; defaults to the newest report if it
+                was throttled
+        """
+        if self._task is not None:
+            await self._task
+        if final is None and self._latest is not self._last_sent:
+            final = self._latest
+        if final is not None:
+            self._pending = final
+            await self._drain()
+        logger.debug("Progress: %d reports, %d published", self.reported, self.published)
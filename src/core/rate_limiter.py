@@ -0,0 +1,266 @@
+"""
+Distributed rate limiting keyed by API key.
+
+Limits are sliding-window counters kept in Redis and updated by a Lua script,
+so every replica enforces the same counts. Each process also leases a few
+tokens at a time into a local bucket, so checks for busy keys usually need
+no Redis round trip; a lease is only ever taken from the shared window, so
+replicas can under-admit by the unused part of their leases but never
+over-admit. Without Redis, limits fall back to per-process windows.
+"""
+
+from dataclasses import dataclass
+import hashlib
+import logging
+import time
+from typing import Dict, List, Optional
+
+from redis.exceptions import RedisError
+
+from src.core.cache import get_cache_service
+
+logger = logging.getLogger(__name__)
+
+LEASE_FRACTION = 0.05  # share of a limit a process may hold locally
+MAX_LEASE = 50
+SYNC_INTERVAL = 1.0  # seconds before a local bucket must be refreshed from Redis
+
+# Sliding-window counter: the previous fixed window is weighted by how much of
+# it still overlaps the sliding window. Grants ``want`` units if they fit,
+# otherwise just ``cost``, otherwise nothing.
+SLIDING_WINDOW_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local limit = tonumber(ARGV[1])
+local cost = tonumber(ARGV[2])
+local want = tonumber(ARGV[3])
+local window = tonumber(ARGV[4])
+local index = math.floor(now / window)
+local elapsed = now - index * window
+local current_key = KEYS[1] .. ':' .. index
+local current = tonumber(redis.call('GET', current_key) or '0')
+local previous = tonumber(redis.call('GET', KEYS[1] .. ':' .. (index - 1)) or '0')
+local available = math.floor(limit - (previous * (window - elapsed) / window + current))
+local granted = 0
+if available >= want then
+  granted = want
+elseif available >= cost then
+  granted = cost
+end
+if granted > 0 then
+  redis.call('INCRBY', current_key, granted)
+  redis.call('PEXPIRE', current_key, window * 2)
+end
+return {granted, math.max(available - granted, 0), window - elapsed}
+"""
+
+# Gives back units charged by SLIDING_WINDOW_SCRIPT, from the current window
+# first; returns the units that could not be given back.
+REFUND_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local amount = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local index = math.floor(now / window)
+for _, i in ipairs({index, index - 1}) do
+  local key = KEYS[1] .. ':' .. i
+  local taken = math.min(tonumber(redis.call('GET', key) or '0'), amount)
+  if taken > 0 then
+    redis.call('DECRBY', key, taken)
+    amount = amount - taken
+  end
+end
+return amount
+"""
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """A named sliding window."""
+
+    name: str
+    window_seconds: int
+    lease: bool = True
+
+
+REQUESTS_PER_MINUTE = RateLimit("requests_per_minute", 60)
+# Generation requests are rare and large; they always go to Redis
+PATIENTS_PER_DAY = RateLimit("patients_per_day", 86400, lease=False)
+
+
+@dataclass
+class RateLimitDecision:
+    """Outcome of a rate limit check."""
+
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_after: float  # seconds until the current window rolls over
+
+
+class _Bucket:
+    """Locally held tokens, or a remembered denial (denied_cost > 0), valid until expires_at."""
+
+    __slots__ = ("denied_cost", "expires_at", "limit", "remaining", "reset_at", "tokens")
+
+    def __init__(
+        self, tokens: int, remaining: int, limit: int, expires_at: float, *, reset_at: float, denied_cost: int = 0
+    ):
+        self.tokens = tokens
+        self.remaining = remaining
+        self.limit = limit
+        self.expires_at = expires_at
+        self.reset_at = reset_at
+        self.denied_cost = denied_cost
+
+
+class RateLimiter:
+    """Sliding-window limiter shared through Redis, with a local token bucket fast path."""
+
+    def __init__(
+        self, lease_fraction: float = LEASE_FRACTION, max_lease: int = MAX_LEASE, sync_interval: float = SYNC_INTERVAL
+    ):
+        self.lease_fraction = lease_fraction
+        self.max_lease = max_lease
+        self.sync_interval = sync_interval
+        self._buckets: Dict[str, _Bucket] = {}
+        self._windows: Dict[str, List[int]] = {}
+        self.local_hits = 0
+        self.redis_checks = 0
+
+    @staticmethod
+    def _key(api_key: str, rate_limit: RateLimit) -> str:
+        # Hash tag keeps a key's windows in one Redis Cluster slot
+        return f"ratelimit:{{{hashlib.sha256(api_key.encode()).hexdigest()[:32]}}}:{rate_limit.name}"
+
+    def _lease_size(self, rate_limit: RateLimit, limit: int) -> int:
+        if not rate_limit.lease:
+            return 0
+        return min(self.max_lease, int(limit * self.lease_fraction))
+
+    async def hit(self, api_key: str, rate_limit: RateLimit, limit: int, cost: int = 1) -> RateLimitDecision:
+        """
+        Consume ``cost`` units of a key's window if they fit.
+
+        Args:
+            api_key: Key the window belongs to
+            rate_limit: Which window to charge
+            limit: Units allowed per window
+            cost: Units this call consumes
+
+        Returns:
+            RateLimitDecision with remaining units and time to reset
+        """
+        key = self._key(api_key, rate_limit)
+        now = time.monotonic()
+
+        bucket = self._buckets.get(key)
+        if bucket is not None and (bucket.limit != limit or bucket.expires_at <= now):
+            bucket = None
+        if bucket is not None:
+            reset_after = max(bucket.reset_at - now, 0.0)
+            if bucket.tokens >= cost:
+                bucket.tokens -= cost
+                self.local_hits += 1
+                return RateLimitDecision(True, limit, bucket.remaining + bucket.tokens, reset_after)
+            if bucket.denied_cost and cost >= bucket.denied_cost:
+                # Denied moments ago; do not ask Redis again until the next sync
+                self.local_hits += 1
+                return RateLimitDecision(False, limit, 0, reset_after)
+
+        cache = get_cache_service()
+        if cache is None:
+            return self._local_hit(key, rate_limit, limit, cost)
+
+        lease = self._lease_size(rate_limit, limit)
+        window_ms = rate_limit.window_seconds * 1000
+        try:
+            granted, remaining, reset_ms = await cache.eval_script(
+                SLIDING_WINDOW_SCRIPT, [key], [limit, cost, cost + lease, window_ms]
+            )
+        except RedisError as e:
+            logger.warning("Rate limit check fell back to local window: %s", e)
+            return self._local_hit(key, rate_limit, limit, cost)
+        self.redis_checks += 1
+
+        granted, remaining = int(granted), int(remaining)
+        reset_after = int(reset_ms) / 1000
+        if not granted:
+            expires_at = now + min(self.sync_interval, reset_after)
+            self._buckets[key] = _Bucket(0, 0, limit, expires_at, reset_at=now + reset_after, denied_cost=cost)
+            return RateLimitDecision(False, limit, 0, reset_after)
+
+        tokens = granted - cost
+        if bucket is not None:
+            # Keep what is left of an overlapping lease
+            tokens += bucket.tokens
+        if tokens:
+            self._buckets[key] = _Bucket(tokens, remaining, limit, now + self.sync_interval, reset_at=now + reset_after)
+        else:
+            self._buckets.pop(key, None)
+        return RateLimitDecision(True, limit, remaining + tokens, reset_after)
+
+    async def refund(self, api_key: str, rate_limit: RateLimit, cost: int):
+        """
+        Give back units charged by hit(), e.g. for work that was never done.
+
+        Args:
+            api_key: Key the window belongs to
+            rate_limit: Which window was charged
+            cost: Units to give back
+        """
+        key = self._key(api_key, rate_limit)
+        # A remembered denial may no longer hold
+        self._buckets.pop(key, None)
+
+        cache = get_cache_service()
+        if cache is not None:
+            try:
+                await cache.eval_script(REFUND_SCRIPT, [key], [cost, rate_limit.window_seconds * 1000])
+                return
+            except RedisError as e:
+                logger.warning("Rate limit refund fell back to local window: %s", e)
+
+        state = self._windows.get(key)
+        if state is None:
+            return
+        for slot in (1, 2):
+            taken = min(state[slot], cost)
+            state[slot] -= taken
+            cost -= taken
+
+    def _local_hit(self, key: str, rate_limit: RateLimit, limit: int, cost: int) -> RateLimitDecision:
+        """Same sliding-window counter as the Lua script, kept in this process."""
+        window = rate_limit.window_seconds
+        now = time.time()
+        index = int(now // window)
+        elapsed = now - index * window
+
+        state = self._windows.get(key)
+        if state is None or state[0] < index - 1:
+            state = [index, 0, 0]
+        elif state[0] == index - 1:
+            state = [index, 0, state[1]]
+        self._windows[key] = state
+
+        available = int(limit - (state[2] * (window - elapsed) / window + state[1]))
+        if available < cost:
+            return RateLimitDecision(False, limit, max(available, 0), window - elapsed)
+        state[1] += cost
+        return RateLimitDecision(True, limit, available - cost, window - elapsed)
+
+    def reset(self):
+        """Forget local buckets and fallback windows"""
+        self._buckets.clear()
+        self._windows.clear()
+
+
+_rate_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Get the global rate limiter instance."""
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = RateLimiter()
+    return _rate_limiter
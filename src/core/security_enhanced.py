@@ -6,21 +6,30 @@ and legacy compatibility with the existing single API key system.
 """
 
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 import os
+import secrets
 from typing import Any, Dict, Optional
 
-from fastapi import Depends, Header, HTTPException
+from fastapi import Depends, Header, HTTPException, Response
 from sqlalchemy import create_engine
 from sqlalchemy.orm import Session as SQLAlchemySession, sessionmaker
 
-from src.core.cache_utils import cache_api_key_limits
+from config import get_settings
+from src.core.api_key_cache import get_api_key_cache, get_usage_buffer
+from src.core.rate_limiter import PATIENTS_PER_DAY, REQUESTS_PER_MINUTE, RateLimitDecision, get_rate_limiter
 from src.domain.models.api_key import DEMO_API_KEY_CONFIG, APIKey
 from src.domain.repositories.api_key_repository import APIKeyRepository
 
+settings = get_settings()
+
 # Legacy single API key support (backward compatibility)
 LEGACY_API_KEY = os.getenv("API_KEY", "CHANGE_ME_IN_PRODUCTION_DO_NOT_USE_DEFAULT")
 
+# Key for operational endpoints (timers, stack sampling). Unset disables the
+# virtual admin key; the legacy key is served to the frontend and never admin.
+ADMIN_API_KEY: Optional[str] = os.getenv("ADMIN_API_KEY") or None
+
 # Public demo key - hardcoded for easy access
 DEMO_API_KEY: str = str(DEMO_API_KEY_CONFIG["key"])
 
@@ -68,6 +77,7 @@ class APIKeyContext:
     api_key: APIKey
     is_demo: bool = False
     is_legacy: bool = False
+    rate_limit_limit: Optional[int] = None
     rate_limit_remaining: Optional[int] = None
     rate_limit_reset: Optional[datetime] = None
 
@@ -111,6 +121,11 @@ class APIKeyContext:
                 },
             )
 
+    @property
+    def is_admin(self) -> bool:
+        """Whether the key may use operational endpoints (ADMIN_API_KEY, or database keys flagged "admin")."""
+        return bool((self.api_key.key_metadata or {}).get("admin"))
+
     def check_usability(self) -> None:
         """
         Verify API key is active and not expired.
@@ -143,6 +158,9 @@ class APIKeyContext:
             "X-Daily-Usage": str(self.api_key.daily_requests),
         }
 
+        if self.rate_limit_limit is not None:
+            headers["X-RateLimit-Limit"] = str(self.rate_limit_limit)
+
         if self.rate_limit_remaining is not None:
             headers["X-RateLimit-Remaining"] = str(self.rate_limit_remaining)
 
@@ -151,6 +169,16 @@ class APIKeyContext:
 
         return headers
 
+    def get_rate_limit_headers(self) -> Dict[str, str]:
+        """Get only the X-RateLimit-* headers (empty if no limit was checked)."""
+        return {name: value for name, value in self.get_response_headers().items() if name.startswith("X-RateLimit-")}
+
+    def apply_rate_limit(self, decision: RateLimitDecision) -> None:
+        """Record the outcome of a rate limit check for the response headers."""
+        self.rate_limit_limit = decision.limit
+        self.rate_limit_remaining = decision.remaining
+        self.rate_limit_reset = datetime.now(timezone.utc) + timedelta(seconds=decision.reset_after)
+
     def _seconds_until_daily_reset(self) -> int:
         """Calculate seconds until daily counters reset."""
         now = datetime.utcnow()
@@ -183,6 +211,30 @@ def create_legacy_api_key() -> APIKey:
     )
 
 
+def create_admin_api_key() -> APIKey:
+    """
+    Create a virtual APIKey for ADMIN_API_KEY.
+
+    Returns:
+        APIKey instance representing the admin key
+    """
+    return APIKey(
+        key=ADMIN_API_KEY,
+        name="Admin API Key",
+        email=None,
+        is_active=True,
+        is_demo=False,
+        max_patients_per_request=10000,
+        max_requests_per_day=None,  # Unlimited
+        max_requests_per_minute=1000,
+        max_requests_per_hour=10000,
+        total_requests=0,
+        total_patients_generated=0,
+        daily_requests=0,
+        key_metadata={"admin": True},
+    )
+
+
 def create_demo_api_key() -> APIKey:
     """
     Create a virtual APIKey for the demo key.
@@ -207,15 +259,135 @@ def create_demo_api_key() -> APIKey:
     )
 
 
+def apply_pending_usage(api_key: APIKey) -> APIKey:
+    """
+    Bring a cached key's counters up to date for this process.
+
+    Resets daily counters left over from a previous day and adds usage that
+    is still buffered, so limit checks and usage headers see it before the
+    next flush.
+    """
+    if api_key.needs_daily_reset():
+        api_key.reset_daily_counters()
+    pending = get_usage_buffer().pending(api_key.key)
+    api_key.total_requests += pending.requests
+    api_key.daily_requests += pending.requests
+    api_key.total_patients_generated += pending.patients
+    if pending.last_used_at is not None:
+        api_key.last_used_at = pending.last_used_at
+    return api_key
+
+
+def record_request(context: "APIKeyContext") -> None:
+    """Count a request against a database-backed key (written back in batches)."""
+    if context.is_legacy or context.api_key.id is None:
+        return
+    get_usage_buffer().record(context.api_key.key)
+    context.api_key.total_requests += 1
+    context.api_key.daily_requests += 1
+
+
+def record_patients(context: "APIKeyContext", count: int) -> None:
+    """Count patients generated for a database-backed key (written back in batches)."""
+    if context.is_legacy or context.api_key.id is None or count <= 0:
+        return
+    get_usage_buffer().record(context.api_key.key, requests=0, patients=count)
+    context.api_key.total_patients_generated += count
+
+
+async def enforce_request_rate(context: APIKeyContext, response: Optional[Response] = None) -> None:
+    """
+    Charge one request against the key's per-minute window.
+
+    Args:
+        context: Validated API key context
+        response: Response to receive the X-RateLimit-* headers, if any
+
+    Raises:
+        HTTPException: 429 if the per-minute limit is exhausted
+    """
+    if context.is_legacy or not settings.RATE_LIMIT_ENABLED:
+        return
+
+    limit = context.api_key.max_requests_per_minute
+    decision = await get_rate_limiter().hit(context.api_key.key, REQUESTS_PER_MINUTE, limit)
+    context.apply_rate_limit(decision)
+    if not decision.allowed:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Rate limit exceeded ({limit} requests per minute)",
+            headers={
+                **context.get_rate_limit_headers(),
+                "X-Limit-Type": REQUESTS_PER_MINUTE.name,
+                "Retry-After": str(max(1, int(decision.reset_after + 0.999))),
+            },
+        )
+    if response is not None:
+        response.headers.update(context.get_rate_limit_headers())
+
+
+async def enforce_patient_quota(context: APIKeyContext, requested: int) -> None:
+    """
+    Check the per-request patient limit and charge the daily patient quota.
+
+    Args:
+        context: Validated API key context
+        requested: Number of patients the request will generate
+
+    Raises:
+        HTTPException: 400 if over the per-request limit, 429 if the daily quota is exhausted
+    """
+    context.check_patient_limit(requested)
+
+    limit = context.api_key.max_patients_per_day
+    if context.is_legacy or limit is None or not settings.RATE_LIMIT_ENABLED:
+        return
+
+    decision = await get_rate_limiter().hit(context.api_key.key, PATIENTS_PER_DAY, limit, cost=requested)
+    if not decision.allowed:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Daily patient quota exceeded ({limit} patients per day, {decision.remaining} remaining)",
+            headers={
+                "X-Limit-Type": PATIENTS_PER_DAY.name,
+                "X-Limit-Value": str(limit),
+                "X-Requested": str(requested),
+                "Retry-After": str(max(1, int(decision.reset_after + 0.999))),
+            },
+        )
+
+
+async def refund_patient_quota(context: APIKeyContext, charged: int) -> None:
+    """
+    Give back patients charged by enforce_patient_quota() when no patients were generated.
+
+    Args:
+        context: API key context the quota was charged to
+        charged: Number of patients charged
+    """
+    limit = context.api_key.max_patients_per_day
+    if context.is_legacy or limit is None or not settings.RATE_LIMIT_ENABLED or charged <= 0:
+        return
+    await get_rate_limiter().refund(context.api_key.key, PATIENTS_PER_DAY, charged)
+
+
 async def verify_api_key_context(
-    api_key: Optional[str] = Header(None, alias="X-API-Key"), db: SQLAlchemySession = Depends(get_sqlalchemy_session)
+    api_key: Optional[str] = Header(None, alias="X-API-Key"),
+    db: SQLAlchemySession = Depends(get_sqlalchemy_session),
+    response: Response = None,
 ) -> APIKeyContext:
     """
     Enhanced API key verification with context and legacy support.
 
+    Keys are served from the two-tier API key cache; the database is only
+    queried when neither the process nor Redis has the key. Usage is counted
+    in memory and flushed to the database in batches. The per-minute request
+    limit is enforced through the shared rate limiter.
+
     Args:
         api_key: API key from X-API-Key header
         db: Database session
+        response: Injected response, receives the X-RateLimit-* headers
 
     Returns:
         APIKeyContext with validated key and metadata
@@ -229,10 +401,6 @@ async def verify_api_key_context(
             status_code=401, detail="Missing API Key", headers={"X-Key-Status": "missing", "WWW-Authenticate": "ApiKey"}
         )
 
-    # Try to get cached limits first
-    # TODO: Implement cached limits usage in future optimization
-    # cached_limits = await get_cached_api_key_limits(api_key)
-
     try:
         repo = APIKeyRepository(db)
     except Exception:
@@ -246,20 +414,18 @@ async def verify_api_key_context(
     if api_key == DEMO_API_KEY:
         try:
             # For demo key, try to get from database or create virtual
-            demo_key = repo.get_by_key(DEMO_API_KEY)
-            if not demo_key:
-                # Create virtual demo key for immediate use
-                # In production, this should be pre-created in the database
-                demo_key = create_demo_api_key()
+            # In production, this should be pre-created in the database
+            demo_key = await get_api_key_cache().get(
+                api_key, lambda: repo.get_by_key(DEMO_API_KEY) or create_demo_api_key()
+            )
 
-            context = APIKeyContext(api_key=demo_key, is_demo=True, is_legacy=False)
+            context = APIKeyContext(api_key=apply_pending_usage(demo_key), is_demo=True, is_legacy=False)
 
             # Check if demo key is usable
             context.check_usability()
+            await enforce_request_rate(context, response)
 
-            # Cache the limits for future requests
-            await cache_api_key_limits(api_key, context.get_limits_info())
-
+            record_request(context)
             return context
         except HTTPException:
             # Re-raise HTTP exceptions as-is
@@ -269,33 +435,31 @@ async def verify_api_key_context(
                 status_code=500, detail="Error processing demo API key", headers={"X-Error-Type": "demo_key_error"}
             )
 
+    # Check for the admin key; it never doubles as the (publicly served) legacy key
+    if ADMIN_API_KEY and ADMIN_API_KEY != LEGACY_API_KEY and secrets.compare_digest(api_key, ADMIN_API_KEY):
+        return APIKeyContext(api_key=create_admin_api_key(), is_demo=False, is_legacy=False)
+
     # Check for legacy API key (backward compatibility)
     if api_key == LEGACY_API_KEY:
         legacy_key = create_legacy_api_key()
-        context = APIKeyContext(api_key=legacy_key, is_demo=False, is_legacy=True)
-
-        # Cache the limits for future requests
-        await cache_api_key_limits(api_key, context.get_limits_info())
-
-        return context
+        return APIKeyContext(api_key=legacy_key, is_demo=False, is_legacy=True)
 
     # Look up key in database
     try:
-        key_record = repo.get_active_key(api_key)
+        key_record = await get_api_key_cache().get(api_key, lambda: repo.get_active_key(api_key))
         if not key_record:
             raise HTTPException(
                 status_code=401, detail="Invalid or inactive API key", headers={"X-Key-Status": "invalid"}
             )
 
         # Create context with database key
-        context = APIKeyContext(api_key=key_record, is_demo=key_record.is_demo, is_legacy=False)
+        context = APIKeyContext(api_key=apply_pending_usage(key_record), is_demo=key_record.is_demo, is_legacy=False)
 
         # Verify key is usable
         context.check_usability()
+        await enforce_request_rate(context, response)
 
-        # Cache the limits for future requests
-        await cache_api_key_limits(api_key, context.get_limits_info())
-
+        record_request(context)
         return context
     except HTTPException:
         # Re-raise HTTP exceptions as-is
@@ -309,7 +473,9 @@ async def verify_api_key_context(
 
 
 async def verify_api_key_optional(
-    api_key: Optional[str] = Header(None, alias="X-API-Key"), db: SQLAlchemySession = Depends(get_sqlalchemy_session)
+    api_key: Optional[str] = Header(None, alias="X-API-Key"),
+    db: SQLAlchemySession = Depends(get_sqlalchemy_session),
+    response: Response = None,
 ) -> Optional[APIKeyContext]:
     """
     Optional API key verification for endpoints that support both authenticated and unauthenticated access.
@@ -325,12 +491,32 @@ async def verify_api_key_optional(
         return None
 
     try:
-        return await verify_api_key_context(api_key, db)
-    except HTTPException:
-        # For optional verification, invalid keys are treated as no key
+        return await verify_api_key_context(api_key, db, response)
+    except HTTPException as e:
+        # Rate limits still apply; otherwise invalid keys are treated as no key
+        if e.status_code == 429:
+            raise
         return None
 
 
+async def verify_admin_api_key(context: APIKeyContext = Depends(verify_api_key_context)) -> APIKeyContext:
+    """
+    API key verification for operational endpoints.
+
+    Args:
+        context: Validated API key context
+
+    Returns:
+        The context, if the key is an admin key
+
+    Raises:
+        HTTPException: 403 if the key is valid but not an admin key
+    """
+    if not context.is_admin:
+        raise HTTPException(status_code=403, detail="Admin API key required", headers={"X-Key-Status": "forbidden"})
+    return context
+
+
 # Legacy function for backward compatibility
 async def verify_api_key_legacy(api_key: str = Header(..., alias="X-API-Key")) -> str:
     """
@@ -382,17 +568,16 @@ def get_api_key_info(context: APIKeyContext) -> Dict[str, Any]:
 
 # Backward compatibility: Provide the old verify_api_key signature
 # that returns a string instead of APIKeyContext
-async def verify_api_key(
-    api_key: Optional[str] = Header(None, alias="X-API-Key"), db: SQLAlchemySession = Depends(get_sqlalchemy_session)
-) -> str:
+async def verify_api_key(context: APIKeyContext = Depends(verify_api_key_context)) -> str:
     """
     Backward-compatible API key verification that returns a string.
 
     This wrapper maintains compatibility with existing code that expects
-    verify_api_key to return a string instead of APIKeyContext.
+    verify_api_key to return a string instead of APIKeyContext. The context
+    is resolved as a dependency, so a request that also depends on
+    verify_api_key_context (directly or through verify_admin_api_key) is
+    verified, rate limited and counted once.
     """
-    # Call the enhanced function that returns context
-    context = await verify_api_key_context(api_key, db)
     # Return the API key string for backward compatibility
     return context.api_key.key
 
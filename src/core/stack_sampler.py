@@ -0,0 +1,220 @@
+"""
+On-demand stack sampling for running jobs.
+
+A sampler thread reads the Python stacks of the threads doing generation work
+every few milliseconds with sys._current_frames() and counts each distinct
+stack. Nothing is installed in the sampled code: jobs pay for the stack walks
+only while a sampling session runs. Results are written as collapsed stacks
+("role;module:function;... count"), the input format of flamegraph.pl,
+speedscope and similar tools.
+
+Sampled threads are the event loop thread, the default executor threads behind
+asyncio.to_thread and the PatientFlowSimulator worker pools. Stacks are
+collected per process, so jobs running concurrently in the same process share
+one profile. A process-pool worker would run its own StackSampler and its
+counts would be merged into the parent's with merge().
+"""
+
+import asyncio
+from collections import Counter
+from datetime import datetime
+import logging
+from pathlib import Path
+import sys
+import threading
+import time
+from types import CodeType, FrameType
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+from patient_generator.performance import FLOW_WORKER_THREAD_PREFIX
+
+logger = logging.getLogger(__name__)
+
+STACK_SAMPLE_INTERVAL = 0.01  # seconds between samples (100 Hz)
+STACK_SAMPLE_MAX_SECONDS = 60.0  # longest sampling session
+STACK_SAMPLE_MAX_DEPTH = 128  # frames kept per stack, innermost first
+TO_THREAD_PREFIX = "asyncio_"  # default executor threads used by asyncio.to_thread
+
+# Innermost frames of threads waiting for work; such samples are dropped
+IDLE_FRAMES = frozenset(
+    {
+        "selectors:select",
+        "concurrent.futures.thread:_worker",
+        "threading:wait",
+        "queue:get",
+    }
+)
+
+_session_lock = threading.Lock()
+
+
+class StackSampler:
+    """Counts the stacks of generation threads, sampled at a fixed interval."""
+
+    def __init__(
+        self,
+        loop_thread_id: Optional[int] = None,
+        interval: float = STACK_SAMPLE_INTERVAL,
+        include_idle: bool = False,
+    ):
+        self.loop_thread_id = loop_thread_id
+        self.interval = interval
+        self.include_idle = include_idle
+        self.counts: Counter = Counter()
+        self.ticks = 0
+        self.duration = 0.0
+        self._labels: Dict[CodeType, str] = {}
+
+    def _thread_roles(self) -> Dict[int, str]:
+        # Pools come and go with each simulation call, so threads are listed every tick
+        roles = {}
+        for thread in threading.enumerate():
+            if thread.ident is None:
+                continue
+            if thread.ident == self.loop_thread_id:
+                roles[thread.ident] = "event-loop"
+            elif thread.name.startswith(FLOW_WORKER_THREAD_PREFIX):
+                roles[thread.ident] = "flow-worker"
+            elif thread.name.startswith(TO_THREAD_PREFIX):
+                roles[thread.ident] = "to-thread"
+        return roles
+
+    def _label(self, frame: FrameType) -> str:
+        code = frame.f_code
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{frame.f_globals.get('__name__', '?')}:{code.co_name}"
+        return label
+
+    def sample(self):
+        """Record the current stack of every sampled thread."""
+        frames = sys._current_frames()
+        self.ticks += 1
+        for ident, role in self._thread_roles().items():
+            frame = frames.get(ident)
+            if frame is None:
+                continue
+            stack: List[str] = []
+            while frame is not None and len(stack) < STACK_SAMPLE_MAX_DEPTH:
+                stack.append(self._label(frame))
+                frame = frame.f_back
+            if not self.include_idle and stack[0] in IDLE_FRAMES:
+                continue
+            stack.append(role)
+            self.counts[";".join(reversed(stack))] += 1
+
+    def run(self, duration: float, should_stop: Optional[Callable[[], bool]] = None):
+        """
+        Sample until the duration elapses or should_stop() returns True.
+
+        Args:
+            duration: Seconds to sample
+            should_stop: Checked every tick, e.g. whether the job has ended
+        """
+        start = time.monotonic()
+        deadline = start + duration
+        while time.monotonic() < deadline and not (should_stop is not None and should_stop()):
+            self.sample()
+            time.sleep(self.interval)
+        self.duration = time.monotonic() - start
+
+    async def run_async(self, duration: float, should_stop: Optional[Callable[[], bool]] = None):
+        """Run the sampler on its own thread and wait for it without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        done = loop.create_future()
+
+        def target():
+            try:
+                self.run(duration, should_stop)
+            except Exception as e:
+                loop.call_soon_threadsafe(done.set_exception, e)
+            else:
+                loop.call_soon_threadsafe(done.set_result, None)
+
+        threading.Thread(target=target, name="stack-sampler", daemon=True).start()
+        await done
+
+    def merge(self, counts: Mapping[str, int]):
+        """Add collapsed stack counts from another sampler, e.g. a worker process."""
+        self.counts.update(counts)
+
+    def hot_frames(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Frames with the most samples on top of the stack (self time)."""
+        leaves: Counter = Counter()
+        for stack, count in self.counts.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        total = sum(leaves.values())
+        return [
+            {"frame": frame, "samples": count, "share": count / total} for frame, count in leaves.most_common(limit)
+        ]
+
+    def write_collapsed(self, path: Path) -> Path:
+        """Write the stacks in collapsed format, most frequent first."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            for stack, count in self.counts.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+
+async def sample_job_stacks(
+    job_id: str,
+    output_dir: Path,
+    duration: float,
+    is_running: Callable[[], bool],
+    *,
+    interval: float = STACK_SAMPLE_INTERVAL,
+    include_idle: bool = False,
+) -> Dict[str, Any]:
+    """
+    Sample the stacks of a running job and write them under its output directory.
+
+    Must be called from the event loop that runs the job. Only one session
+    runs at a time, since every session samples the whole process.
+
+    Args:
+        job_id: Job being sampled
+        output_dir: Job output directory; the file goes to its "profiles" folder
+        duration: Seconds to sample, at most STACK_SAMPLE_MAX_SECONDS
+        is_running: Returns False once the job has ended, which stops sampling early
+        interval: Seconds between samples
+        include_idle: Keep samples of threads waiting for work
+
+    Returns:
+        Summary of the session with the path of the collapsed stack file
+
+    Raises:
+        ValueError: If the duration or interval is out of range
+        RuntimeError: If another sampling session is running
+    """
+    if not 0 < duration <= STACK_SAMPLE_MAX_SECONDS:
+        msg = f"Duration must be between 0 and {STACK_SAMPLE_MAX_SECONDS} seconds"
+        raise ValueError(msg)
+    if interval <= 0:
+        msg = "Interval must be positive"
+        raise ValueError(msg)
+    if not _session_lock.acquire(blocking=False):
+        msg = "A stack sampling session is already running"
+        raise RuntimeError(msg)
+
+    try:
+        started_at = datetime.utcnow()
+        sampler = StackSampler(threading.get_ident(), interval, include_idle)
+        await sampler.run_async(duration, lambda: not is_running())
+        path = output_dir / "profiles" / f"stacks_{started_at:%Y%m%dT%H%M%S}.collapsed"
+        await asyncio.to_thread(sampler.write_collapsed, path)
+    finally:
+        _session_lock.release()
+
+    logger.info("Sampled job %s for %.1fs: %d stack samples", job_id, sampler.duration, sum(sampler.counts.values()))
+    return {
+        "job_id": job_id,
+        "started_at": started_at,
+        "duration_seconds": round(sampler.duration, 3),
+        "interval_seconds": interval,
+        "ticks": sampler.ticks,
+        "samples": sum(sampler.counts.values()),
+        "distinct_stacks": len(sampler.counts),
+        "collapsed_stacks_file": str(path),
+        "hot_frames": sampler.hot_frames(),
+    }
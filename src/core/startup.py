@@ -0,0 +1,98 @@
+"""
+Startup profiling for the API process.
+
+Records how long each tracked module import and each lifespan step takes,
+and when the application became ready, so cold-start regressions are
+visible from the health router instead of only in container logs.
+"""
+
+from contextlib import contextmanager
+import importlib
+import logging
+import os
+import sys
+import threading
+import time
+from types import ModuleType
+from typing import Any, Dict, Iterator, Optional
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+
+class StartupProfiler:
+    """Collects import and lifespan step timings for one process."""
+
+    def __init__(self):
+        try:
+            self.process_started_at = psutil.Process(os.getpid()).create_time()
+        except Exception:
+            self.process_started_at = time.time()
+        self.imports: Dict[str, float] = {}
+        self.steps: Dict[str, float] = {}
+        self.ready_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def import_module(self, name: str) -> ModuleType:
+        """
+        Import a module, recording its import time if it was not loaded yet.
+
+        Args:
+            name: Dotted module name
+
+        Returns:
+            The imported module
+        """
+        if name in sys.modules:
+            return sys.modules[name]
+
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.imports[name] = elapsed
+        logger.debug("Imported %s in %.1f ms", name, elapsed * 1000)
+        return module
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[None]:
+        """Time a named startup step (recorded even if the step raises)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.steps[name] = elapsed
+            logger.info("Startup step %s took %.1f ms", name, elapsed * 1000)
+
+    def mark_ready(self):
+        """Record the moment the application finished its startup sequence."""
+        self.ready_at = time.time()
+        logger.info("Application ready %.2f s after process start", self.ready_at - self.process_started_at)
+
+    def report(self) -> Dict[str, Any]:
+        """Startup report: per-module import and per-step times in milliseconds."""
+        with self._lock:
+            imports = dict(self.imports)
+            steps = dict(self.steps)
+        return {
+            "ready": self.ready_at is not None,
+            "seconds_to_ready": (
+                round(self.ready_at - self.process_started_at, 3) if self.ready_at is not None else None
+            ),
+            "imports_ms": {name: round(seconds * 1000, 2) for name, seconds in imports.items()},
+            "steps_ms": {name: round(seconds * 1000, 2) for name, seconds in steps.items()},
+        }
+
+
+_startup_profiler: Optional[StartupProfiler] = None
+
+
+def get_startup_profiler() -> StartupProfiler:
+    """Get the global startup profiler instance."""
+    global _startup_profiler
+    if _startup_profiler is None:
+        _startup_profiler = StartupProfiler()
+    return _startup_profiler
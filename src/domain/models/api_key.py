@@ -9,7 +9,7 @@ This module defines the SQLAlchemy model for API keys that support:
 """
 
 from datetime import datetime
-from typing import Any, Dict, Type
+from typing import Any, Dict, Optional, Type
 import uuid
 
 from sqlalchemy import JSON, Boolean, Column, DateTime, Integer, String
@@ -108,6 +108,14 @@ class APIKey(Base):
         """Check if the requested number of patients is within the key's limit."""
         return requested_patients <= self.max_patients_per_request
 
+    @property
+    def max_patients_per_day(self) -> Optional[int]:
+        """Daily patient quota from key metadata (None = unlimited); demo keys default to the demo config."""
+        value = (self.key_metadata or {}).get("max_patients_per_day")
+        if value is None and self.is_demo:
+            value = DEMO_API_KEY_CONFIG["max_patients_per_day"]
+        return int(value) if value is not None else None
+
     def check_daily_limit(self) -> bool:
         """Check if the key is within its daily request limit."""
         if self.max_requests_per_day is None:
@@ -196,4 +204,5 @@ DEMO_API_KEY_CONFIG = {
     "max_requests_per_day": 100,
     "max_requests_per_minute": 10,
     "max_requests_per_hour": 50,
+    "max_patients_per_day": 1000,
 }
@@ -10,10 +10,11 @@ from datetime import datetime, timedelta
 import secrets
 from typing import Any, Dict, List, Optional
 
-from sqlalchemy import and_, desc, or_
+from sqlalchemy import and_, case, desc, or_
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from src.core.api_key_cache import UsageDelta, invalidate_api_key
 from src.domain.models.api_key import DEMO_API_KEY_CONFIG, APIKey
 
 
@@ -78,7 +79,6 @@ class APIKeyRepository:
             self.db.add(api_key)
             self.db.commit()
             self.db.refresh(api_key)
-            return api_key
         except IntegrityError:
             self.db.rollback()
             # Extremely rare case of key collision - retry once
@@ -86,7 +86,9 @@ class APIKeyRepository:
             self.db.add(api_key)
             self.db.commit()
             self.db.refresh(api_key)
-            return api_key
+
+        invalidate_api_key(api_key.key)
+        return api_key
 
     def get_by_key(self, api_key: str) -> Optional[APIKey]:
         """
@@ -210,6 +212,37 @@ class APIKeyRepository:
         api_key.updated_at = datetime.utcnow()
         self.db.commit()
 
+    def apply_usage_batch(self, deltas: Dict[str, UsageDelta]) -> None:
+        """
+        Add buffered usage to several keys in one transaction.
+
+        Counters are incremented in SQL rather than read and written back, so
+        concurrent flushes from several processes are safe. Daily counters
+        restart if the key was last reset before today (UTC).
+
+        Args:
+            deltas: Usage per API key string, as collected by UsageBuffer
+        """
+        now = datetime.utcnow()
+        start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        needs_reset = or_(APIKey.last_reset_at.is_(None), APIKey.last_reset_at < start_of_day)
+
+        for key, delta in deltas.items():
+            self.db.query(APIKey).filter(APIKey.key == key).update(
+                {
+                    APIKey.total_requests: APIKey.total_requests + delta.requests,
+                    APIKey.total_patients_generated: APIKey.total_patients_generated + delta.patients,
+                    APIKey.daily_requests: case(
+                        (needs_reset, delta.requests), else_=APIKey.daily_requests + delta.requests
+                    ),
+                    APIKey.last_reset_at: case((needs_reset, now), else_=APIKey.last_reset_at),
+                    APIKey.last_used_at: delta.last_used_at,
+                    APIKey.updated_at: now,
+                },
+                synchronize_session=False,
+            )
+        self.db.commit()
+
     def deactivate_key(self, key_id: str) -> bool:
         """
         Deactivate an API key.
@@ -225,6 +258,7 @@ class APIKeyRepository:
             api_key.is_active = False
             api_key.updated_at = datetime.utcnow()
             self.db.commit()
+            invalidate_api_key(api_key.key)
             return True
         return False
 
@@ -243,6 +277,7 @@ class APIKeyRepository:
             api_key.is_active = True
             api_key.updated_at = datetime.utcnow()
             self.db.commit()
+            invalidate_api_key(api_key.key)
             return True
         return False
 
@@ -258,8 +293,10 @@ class APIKeyRepository:
         """
         api_key = self.get_by_id(key_id) or self.get_by_key(key_id)
         if api_key:
+            key = api_key.key
             self.db.delete(api_key)
             self.db.commit()
+            invalidate_api_key(key)
             return True
         return False
 
@@ -299,6 +336,7 @@ class APIKeyRepository:
 
         api_key.updated_at = datetime.utcnow()
         self.db.commit()
+        invalidate_api_key(api_key.key)
         return True
 
     def extend_expiration(self, key_id: str, days: int) -> bool:
@@ -323,6 +361,7 @@ class APIKeyRepository:
 
         api_key.updated_at = datetime.utcnow()
         self.db.commit()
+        invalidate_api_key(api_key.key)
         return True
 
     def get_usage_stats(self, days: int = 30) -> Dict[str, Any]:
@@ -381,6 +420,8 @@ class APIKeyRepository:
             for key in expired_keys:
                 self.db.delete(key)
             self.db.commit()
+            for key in expired_keys:
+                invalidate_api_key(key.key)
 
         return key_names
 
@@ -411,4 +452,5 @@ class APIKeyRepository:
         self.db.add(demo_key)
         self.db.commit()
         self.db.refresh(demo_key)
+        invalidate_api_key(demo_key.key)
         return demo_key
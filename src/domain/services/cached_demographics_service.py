@@ -2,11 +2,11 @@
 
 import json
 import logging
-import os
 from typing import Any, Dict
 
 from config import get_settings
 from patient_generator.demographics import DemographicsGenerator
+from patient_generator.reference_data import load_reference
 from src.core.cache import get_cache_service
 
 logger = logging.getLogger(__name__)
@@ -62,15 +62,8 @@ class CachedDemographicsService:
         Returns:
             Demographics data dictionary
         """
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        # Navigate to patient_generator directory
-        patient_gen_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(base_dir))), "patient_generator")
-        json_path = os.path.join(patient_gen_dir, "demographics.json")
-
         try:
-            with open(json_path, encoding="utf-8") as f:
-                data = json.load(f)
-                return data.get("NATO_NATIONS", {})
+            return load_reference("demographics.json").get("NATO_NATIONS", {})
         except (FileNotFoundError, json.JSONDecodeError) as e:
             logger.error(f"Error loading demographics data: {e}")
             return {}
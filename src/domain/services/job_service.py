@@ -13,6 +13,7 @@ import zipfile
 from config import get_settings
 from src.core.cache_utils import cache_job_status
 from src.core.exceptions import InvalidOperationError, StorageError
+from src.core.job_events import publish_job_status
 from src.domain.models.job import Job, JobProgressDetails, JobStatus
 from src.domain.repositories.job_repository import JobRepositoryInterface
 
@@ -54,8 +55,9 @@ class JobService:
 
         await self.repository.update(job)
 
-        # Update cache with new status
+        # Update cache with new status and notify live subscribers
         await cache_job_status(job)
+        await publish_job_status(job, "status")
 
     async def update_job_progress(
         self, job_id: str, progress: int, progress_details: Optional[JobProgressDetails] = None
@@ -69,8 +71,9 @@ class JobService:
 
         await self.repository.update(job)
 
-        # Update cache with new progress
+        # Update cache with new progress and notify live subscribers
         await cache_job_status(job)
+        await publish_job_status(job)
 
     async def set_job_results(
         self, job_id: str, output_directory: str, result_files: List[str], summary: Optional[Dict[str, Any]] = None
@@ -125,6 +128,10 @@ class JobService:
         job.error = "Job cancelled by user"
 
         await self.repository.update(job)
+
+        # Update cache with new status and notify live subscribers
+        await cache_job_status(job)
+        await publish_job_status(job, "status")
         return job
 
     async def cleanup_job_files(self, job_id: str) -> None:
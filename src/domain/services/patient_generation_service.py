@@ -4,13 +4,14 @@ Async patient generation service for stream-based processing.
 
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from dataclasses import dataclass
 import gzip
 import json
 import os
 import sys
 import tempfile
-from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
 
 # Compatibility for Python < 3.9
 if sys.version_info >= (3, 9):
@@ -24,18 +25,38 @@ else:
             return await loop.run_in_executor(executor, func, *args, **kwargs)
 
 
-from patient_generator.config_manager import ConfigurationManager
 from patient_generator.database import Database
 from patient_generator.demographics import DemographicsGenerator
-from patient_generator.flow_simulator import PatientFlowSimulator
-from patient_generator.formatter import OutputFormatter
 from patient_generator.medical import MedicalConditionGenerator
+from patient_generator.memory_budget import MemoryBudgetController
 from patient_generator.patient import Patient
+from patient_generator.performance import StageTimes, current_stage_times
 from patient_generator.schemas_config import ConfigurationTemplateDB
 from src.core.metrics import get_metrics_collector
+from src.core.startup import get_startup_profiler
 from src.domain.services.cached_demographics_service import CachedDemographicsService
 from src.domain.services.cached_medical_service import CachedMedicalService
 
+if TYPE_CHECKING:
+    from patient_generator.flow_simulator import PatientFlowSimulator
+    from patient_generator.formatter import OutputFormatter
+
+# The simulation stack (numpy, flow simulator, medical models, output
+# formatters) is imported on the first generation request, or by the
+# optional pre-warm hook, so the API process starts without it.
+GENERATION_STACK_MODULES = (
+    "patient_generator.flow_simulator",
+    "patient_generator.formatter",
+    "src.domain.services.pipeline_pool",
+)
+
+
+def load_generation_stack() -> None:
+    """Import the simulation stack, recording import times in the startup report."""
+    profiler = get_startup_profiler()
+    for module in GENERATION_STACK_MODULES:
+        profiler.import_module(module)
+
 
 @dataclass
 class GenerationContext:
@@ -47,10 +68,20 @@ class GenerationContext:
     encryption_password: Optional[str] = None
     output_formats: Optional[List[str]] = None
     use_compression: bool = False
+    stage_times: Optional[StageTimes] = None
+    memory_budget: Optional[MemoryBudgetController] = None
 
     def __post_init__(self):
         if self.output_formats is None:
             self.output_formats = ["json"]
+        if self.memory_budget is None:
+            self.memory_budget = MemoryBudgetController()
+
+    def stage(self, name: str, calls: int = 1):
+        """Time a block against a pipeline stage when the job is profiled."""
+        if self.stage_times is None:
+            return nullcontext()
+        return self.stage_times.time(name, calls)
 
 
 class PatientGenerationPipeline:
@@ -58,10 +89,10 @@ class PatientGenerationPipeline:
 
     def __init__(
         self,
-        flow_simulator: PatientFlowSimulator,
+        flow_simulator: "PatientFlowSimulator",
         demographics_generator: DemographicsGenerator,
         medical_generator: MedicalConditionGenerator,
-        output_formatter: OutputFormatter,
+        output_formatter: "OutputFormatter",
     ):
         self.flow_simulator = flow_simulator
         self.demographics_generator = demographics_generator
@@ -80,16 +111,19 @@ class PatientGenerationPipeline:
         patient_count = 0
         async for patient in self._generate_base_patients(context):
             # Stage 2: Add medical conditions FIRST (needed for flow simulation)
-            patient = await self._add_medical_conditions(patient, context)
+            with context.stage("conditions"):
+                patient = await self._add_medical_conditions(patient, context)
 
             # Stage 3: Run flow simulation with medical conditions available
             await to_thread(self.flow_simulator._simulate_patient_flow_single, patient)
 
             # Stage 4: Add demographics (can be done after flow simulation)
-            patient = await self._add_demographics(patient, context)
+            with context.stage("demographics"):
+                patient = await self._add_demographics(patient, context)
 
             # Yield for streaming processing
-            patient_dict = patient.to_dict()
+            with context.stage("serialization"):
+                patient_dict = patient.to_dict()
             yield patient, patient_dict
 
             patient_count += 1
@@ -110,9 +144,14 @@ class PatientGenerationPipeline:
 
     async def _initialize_generators(self, context: GenerationContext) -> None:
         """Initialize generators with configuration."""
+        # Creation and flow stages are timed inside the (per-job) simulator
+        self.flow_simulator.stage_times = context.stage_times
+
         # Update patient count
         if hasattr(self.flow_simulator, "total_patients_to_generate"):
             self.flow_simulator.total_patients_to_generate = context.config.total_patients
+            # The pooled stack was sized for whichever job built it
+            self.flow_simulator.batch_size = self.flow_simulator.batch_size_for(context.config.total_patients)
             print(f"🔧 Updated flow simulator patient count to: {context.config.total_patients}")
 
         # Inject front_configs directly from the in-memory config so API-provided
@@ -145,38 +184,57 @@ class PatientGenerationPipeline:
     async def _generate_base_patients(self, context: GenerationContext) -> AsyncIterator[Patient]:
         """Generate base patients - check for temporal vs legacy generation."""
 
-        # Check if temporal configuration exists by calling the flow simulator's decision logic
-        try:
-            # Use the flow simulator's generate_casualty_flow method which handles temporal vs legacy decision
-            patients = await to_thread(self.flow_simulator.generate_casualty_flow)
-
-            # Yield patients one by one for streaming
-            for patient in patients:
-                yield patient
-
-        except Exception as e:
-            print(f"Error in bulk generation, falling back to individual patient creation: {e}")
-
-            # Fallback to individual patient creation if bulk generation fails
-            batch_size = min(100, context.config.total_patients)
-            total = context.config.total_patients
-
-            for start in range(0, total, batch_size):
-                end = min(start + batch_size, total)
-
-                # Generate batch asynchronously
-                tasks = [self._create_patient_async(i, context) for i in range(start, end)]
-
-                patients = await asyncio.gather(*tasks)
-
-                for patient in patients:
-                    yield patient
+        memory_budget = context.memory_budget
+        next_batch_size = memory_budget.batch_size()
+        generated = 0
+
+        # RSS growth is only attributed to this job while no other job generates
+        with memory_budget.running():
+            # Check if temporal configuration exists by calling the flow simulator's decision logic
+            try:
+                # The flow simulator handles the temporal vs legacy decision and creates
+                # patients in batches sized from the memory measured so far
+                batches = self.flow_simulator.iter_casualty_batches(lambda remaining: min(next_batch_size, remaining))
+                while True:
+                    checkpoint = memory_budget.checkpoint()
+                    patients = await to_thread(next, batches, None)
+                    if patients is None:
+                        break
+                    memory_budget.observe_since(len(patients), checkpoint)
+                    generated += len(patients)
+
+                    # Yield patients one by one for streaming, dropping each from the
+                    # batch so written patients can be freed
+                    patients.reverse()
+                    while patients:
+                        yield patients.pop()
+                    next_batch_size = await memory_budget.throttle()
+
+            except Exception as e:
+                print(f"Error in bulk generation, falling back to individual patient creation: {e}")
+
+                # Fallback to individual patient creation for the patients not yet generated
+                total = context.config.total_patients
+                start = generated
+
+                while start < total:
+                    end = start + context.memory_budget.batch_size(limit=total - start)
+
+                    # Generate batch asynchronously
+                    tasks = [self._create_patient_async(i, context) for i in range(start, end)]
+
+                    patients = await asyncio.gather(*tasks)
+
+                    for patient in patients:
+                        yield patient
+                    start = end
 
     async def _create_patient_async(self, patient_id: int, context: GenerationContext) -> Patient:
         """Create a single patient asynchronously with complete flow simulation."""
         # Create patient using the flow simulator's method
         # The flow simulator already has access to the config via config_manager
-        patient = await to_thread(self.flow_simulator._create_initial_patient, patient_id)
+        with context.stage("creation"):
+            patient = await to_thread(self.flow_simulator._create_initial_patient, patient_id)
 
         # NOTE: Flow simulation moved to after medical conditions are set
         # so that medical bridge has conditions to work with
@@ -254,33 +312,44 @@ class AsyncPatientGenerationService:
         self.cached_demographics = CachedDemographicsService()
         self.cached_medical = CachedMedicalService()
 
-    def _initialize_pipeline(self, config_id: str):
-        """Initialize the generation pipeline with required components."""
-        # Initialize configuration manager
-        self.config_manager = ConfigurationManager(database_instance=self.db)
-        self.config_manager.load_configuration(config_id)
+    def _initialize_pipeline(self, config: ConfigurationTemplateDB):
+        """Initialize the generation pipeline from a warm, pooled generator stack."""
+        load_generation_stack()
+        from patient_generator.formatter import OutputFormatter
+        from src.domain.services.pipeline_pool import get_pipeline_pool
 
-        # Initialize components with config manager
         # Enable medical simulation for enhanced realistic patient data
-        import os
-
         os.environ["ENABLE_MEDICAL_SIMULATION"] = "true"
         os.environ["ENABLE_TREATMENT_UTILITY_MODEL"] = "true"
         os.environ["ENABLE_MARKOV_CHAIN"] = "true"
         os.environ["ENABLE_WARFARE_MODIFIERS"] = "true"
 
+        # The pool rebuilds only when the configuration or static files change;
+        # every job gets its own forked simulator on top of the shared stack.
+        self.config_manager, flow_simulator = get_pipeline_pool().checkout(config, database_instance=self.db)
+
         # Use cached services' generators
         self.pipeline = PatientGenerationPipeline(
-            flow_simulator=PatientFlowSimulator(self.config_manager),
+            flow_simulator=flow_simulator,
             demographics_generator=self.cached_demographics.get_demographics_generator(),
             medical_generator=self.cached_medical._get_condition_generator(),
             output_formatter=OutputFormatter(),
         )
 
     async def generate_patients(
-        self, context: GenerationContext, progress_callback: Optional[Callable] = None
+        self,
+        context: GenerationContext,
+        progress_callback: Optional[Callable] = None,
+        patient_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
     ) -> Dict[str, Any]:
-        """Generate patients and save to files."""
+        """Generate patients and save to files.
+
+        ``patient_callback`` is called synchronously with each patient's data
+        once it has been written, e.g. to feed live subscribers.
+
+        Patients are generated in batches sized by the context's memory budget;
+        between batches generation waits while memory is short.
+        """
         metrics = get_metrics_collector()
 
         # Track generation with metrics
@@ -291,7 +360,7 @@ class AsyncPatientGenerationService:
             await self.cached_medical.warm_cache()
 
             # Initialize pipeline with configuration
-            self._initialize_pipeline(context.config.id)
+            self._initialize_pipeline(context.config)
 
         # Ensure output directory exists
         os.makedirs(context.output_directory, exist_ok=True)
@@ -323,6 +392,8 @@ class AsyncPatientGenerationService:
                 output_files[format] = temp_file.name
                 output_streams[format] = temp_file
 
+        # Hot-path timers, when enabled, record into this job's stage times
+        stage_times_token = current_stage_times.set(context.stage_times)
         try:
             # Initialize formatter
             formatter = self.pipeline.output_formatter
@@ -338,15 +409,19 @@ class AsyncPatientGenerationService:
                     stream = output_streams[format]
 
                     if format == "json":
-                        # Handle JSON array formatting
-                        if not first_patient:
-                            stream.write(",")
-
                         # Use patient_data from generator (compact JSON, no indentation)
-                        json.dump(patient_data, stream, separators=(",", ":"))
+                        with context.stage("serialization"):
+                            encoded = json.dumps(patient_data, separators=(",", ":"))
+
+                        # Handle JSON array formatting
+                        with context.stage("io"):
+                            if not first_patient:
+                                stream.write(",")
+                            stream.write(encoded)
                     elif format == "xml":
                         # Use formatter for XML
-                        await to_thread(formatter.format_xml, [patient_data], stream)
+                        with context.stage("serialization"):
+                            await to_thread(formatter.format_xml, [patient_data], stream)
                     elif format == "csv":
                         # CSV format - write header on first patient
                         if first_patient:
@@ -371,18 +446,22 @@ class AsyncPatientGenerationService:
 
                 first_patient = False
 
-            # Close temporary files properly
-            for format, temp_file in temp_files.items():
-                if format == "json":
-                    temp_file.write("\n]")  # Close JSON array
-                temp_file.close()
+                if patient_callback is not None:
+                    patient_callback(patient_data)
 
-            # Finalize files
-            final_files = await self._finalize_files(output_files, context, patient_count)
+            with context.stage("io", calls=0):
+                # Close temporary files properly
+                for format, temp_file in temp_files.items():
+                    if format == "json":
+                        temp_file.write("\n]")  # Close JSON array
+                    temp_file.close()
+
+                # Finalize files
+                final_files = await self._finalize_files(output_files, context, patient_count)
 
-            # Apply compression if needed
-            if context.use_compression:
-                final_files = await self._compress_files(final_files)
+                # Apply compression if needed
+                if context.use_compression:
+                    final_files = await self._compress_files(final_files)
 
             # Apply encryption if needed
             if context.encryption_password:
@@ -403,6 +482,9 @@ class AsyncPatientGenerationService:
                     os.unlink(temp_file.name)
             raise e
 
+        finally:
+            current_stage_times.reset(stage_times_token)
+
     async def _finalize_files(
         self, output_files: Dict[str, str], context: GenerationContext, patient_count: int
     ) -> Dict[str, str]:
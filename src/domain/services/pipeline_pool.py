@@ -0,0 +1,190 @@
+"""Pool of warm patient generation stacks keyed by configuration version."""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+import logging
+import os
+from pathlib import Path
+import threading
+from typing import Dict, Hashable, Optional, Sequence, Tuple
+
+import patient_generator
+from patient_generator.config_manager import ConfigurationManager
+from patient_generator.database import Database
+from patient_generator.flow_simulator import PatientFlowSimulator
+from patient_generator.schemas_config import ConfigurationTemplateDB
+from src.core.metrics import get_metrics_collector
+
+logger = logging.getLogger(__name__)
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(patient_generator.__file__))
+
+# Reference files read while a generation stack is built. Editing any of them
+# changes the pool key, so the next job rebuilds instead of reusing old data.
+STATIC_FILES = (
+    "fronts_config.json",
+    "simulation_parameters.json",
+    "injuries.json",
+    "warfare_patterns.json",
+    "evacuation_transit_times.json",
+    "transition_matrices.json",
+    "treatment_protocols.json",
+)
+
+# Feature switches PatientFlowSimulator reads when it is built; toggling one
+# changes the pool key as well.
+FEATURE_FLAGS = (
+    "ENABLE_MEDICAL_SIMULATION",
+    "ENABLE_TREATMENT_UTILITY_MODEL",
+    "ENABLE_MARKOV_CHAIN",
+    "ENABLE_WARFARE_MODIFIERS",
+)
+
+DEFAULT_POOL_SIZE = 8
+CACHE_TYPE = "pipeline_pool"
+
+
+@dataclass(frozen=True)
+class PipelineStack:
+    """Fully initialized, shared generation stack for one configuration version."""
+
+    key: Tuple[Hashable, ...]
+    config_manager: ConfigurationManager
+    flow_simulator: PatientFlowSimulator
+
+
+class PipelinePool:
+    """
+    Bounded LRU pool of initialized generation stacks.
+
+    Stacks are keyed by (config_id, config updated_at, newest static-file
+    mtime, feature flags). Checking one out returns a forked simulator, so
+    jobs share the loaded models while keeping their own patients and front
+    overrides. The shared models and the ConfigurationManager are not
+    modified by generation (tests/test_pipeline_pool.py checks this).
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_POOL_SIZE, static_paths: Optional[Sequence[str]] = None):
+        self.maxsize = maxsize
+        self.static_paths = (
+            list(static_paths) if static_paths is not None else [os.path.join(PACKAGE_DIR, f) for f in STATIC_FILES]
+        )
+        self._stacks: OrderedDict[Tuple[Hashable, ...], PipelineStack] = OrderedDict()
+        self._lock = threading.Lock()
+        # One lock per key being built, so cold builds of different keys run in parallel
+        self._build_locks: Dict[Tuple[Hashable, ...], threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._stacks)
+
+    def _static_mtime(self) -> int:
+        """Newest modification time (ns) across the static reference files."""
+        newest = 0
+        for path in self.static_paths:
+            try:
+                newest = max(newest, Path(path).stat().st_mtime_ns)
+            except OSError:
+                continue
+        return newest
+
+    def key_for(self, config: ConfigurationTemplateDB) -> Tuple[Hashable, ...]:
+        """Pool key for a configuration in the current on-disk state."""
+        flags = tuple(os.environ.get(flag, "").lower() for flag in FEATURE_FLAGS)
+        return (config.id, config.updated_at, self._static_mtime(), flags)
+
+    def checkout(
+        self, config: ConfigurationTemplateDB, database_instance: Optional[Database] = None
+    ) -> Tuple[ConfigurationManager, PatientFlowSimulator]:
+        """
+        Return the stack for a configuration, building it on first use.
+
+        Args:
+            config: Configuration template the job runs with
+            database_instance: Database handed to a newly built ConfigurationManager
+
+        Returns:
+            Tuple of (shared ConfigurationManager, per-job PatientFlowSimulator)
+        """
+        key = self.key_for(config)
+
+        stack = self._get(key)
+        if stack is not None:
+            return stack.config_manager, stack.flow_simulator.fork()
+
+        with self._lock:
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+        # Concurrent jobs for a cold key wait for one stack instead of each
+        # loading the reference data themselves; other keys are not held up.
+        with build_lock:
+            stack = self._get(key)
+            if stack is not None:
+                return stack.config_manager, stack.flow_simulator.fork()
+            with self._lock:
+                self.misses += 1
+            get_metrics_collector().record_cache_miss(CACHE_TYPE)
+            try:
+                stack = self._build(key, config, database_instance)
+                self._add(key, stack)
+            finally:
+                with self._lock:
+                    self._build_locks.pop(key, None)
+
+        return stack.config_manager, stack.flow_simulator.fork()
+
+    def _get(self, key: Tuple[Hashable, ...]) -> Optional[PipelineStack]:
+        """Pooled stack for a key, counted as a hit; misses are counted by the build."""
+        with self._lock:
+            stack = self._stacks.get(key)
+            if stack is None:
+                return None
+            self._stacks.move_to_end(key)
+            self.hits += 1
+            get_metrics_collector().record_cache_hit(CACHE_TYPE)
+            return stack
+
+    def _add(self, key: Tuple[Hashable, ...], stack: PipelineStack):
+        metrics = get_metrics_collector()
+        with self._lock:
+            # An older version of the same configuration is never reused
+            for stale in [k for k in self._stacks if k[0] == key[0]]:
+                del self._stacks[stale]
+                metrics.record_cache_eviction(CACHE_TYPE, "stale")
+            self._stacks[key] = stack
+            while len(self._stacks) > self.maxsize:
+                self._stacks.popitem(last=False)
+                metrics.record_cache_eviction(CACHE_TYPE, "lru")
+
+    def _build(
+        self, key: Tuple[Hashable, ...], config: ConfigurationTemplateDB, database_instance: Optional[Database]
+    ) -> PipelineStack:
+        logger.info("Building generation stack for configuration %s", config.id)
+        config_manager = ConfigurationManager(
+            database_instance=database_instance,
+            static_fronts_config_path=os.path.join(PACKAGE_DIR, "fronts_config.json"),
+            configuration=config,
+        )
+        return PipelineStack(
+            key=key, config_manager=config_manager, flow_simulator=PatientFlowSimulator(config_manager)
+        )
+
+    def invalidate(self, config_id: Optional[str] = None):
+        """Drop the stacks for one configuration, or every stack if no id is given"""
+        with self._lock:
+            if config_id is None:
+                self._stacks.clear()
+                return
+            for key in [key for key in self._stacks if key[0] == config_id]:
+                del self._stacks[key]
+
+
+_pipeline_pool: Optional[PipelinePool] = None
+
+
+def get_pipeline_pool() -> PipelinePool:
+    """Get the global pipeline pool instance."""
+    global _pipeline_pool
+    if _pipeline_pool is None:
+        _pipeline_pool = PipelinePool()
+    return _pipeline_pool
@@ -3,7 +3,8 @@ Main application entry point.
 Creates and configures the FastAPI application.
 """
 
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 import logging
 
 from fastapi import FastAPI, HTTPException
@@ -19,27 +20,35 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from config import get_settings
+from patient_generator.reference_snapshot import ensure_snapshot
 from src.api.v1.middleware.metrics import MetricsMiddleware
-from src.api.v1.routers import (
-    configurations,
-    downloads,
-    generation,
-    health,
-    jobs,
-    metrics,
-    presets,
-    streaming,
-    visualizations,
-)
+from src.core import security_enhanced
+from src.core.api_key_cache import run_usage_flusher
 from src.core.cache import close_cache, get_cache_service, initialize_cache
 from src.core.error_handlers import (
     http_exception_handler,
     request_validation_exception_handler,
     validation_exception_handler,
 )
+from src.core.startup import get_startup_profiler
 from src.domain.repositories.api_key_repository import APIKeyRepository
+from src.domain.services.patient_generation_service import load_generation_stack
 from src.infrastructure.database_pool import close_pool
 
+startup_profiler = get_startup_profiler()
+
+# Routers are imported through the startup profiler so their cost shows up in
+# /api/v1/health/startup. None of them import the simulation stack.
+configurations = startup_profiler.import_module("src.api.v1.routers.configurations")
+downloads = startup_profiler.import_module("src.api.v1.routers.downloads")
+generation = startup_profiler.import_module("src.api.v1.routers.generation")
+health = startup_profiler.import_module("src.api.v1.routers.health")
+jobs = startup_profiler.import_module("src.api.v1.routers.jobs")
+metrics = startup_profiler.import_module("src.api.v1.routers.metrics")
+presets = startup_profiler.import_module("src.api.v1.routers.presets")
+streaming = startup_profiler.import_module("src.api.v1.routers.streaming")
+visualizations = startup_profiler.import_module("src.api.v1.routers.visualizations")
+
 # Get settings
 settings = get_settings()
 
@@ -48,6 +57,33 @@ logging.basicConfig(level=logging.INFO if not settings.DEBUG else logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 
+def _ensure_demo_key():
+    """Create the demo API key if missing, reusing the API-key session factory when configured."""
+    session_factory = security_enhanced.SessionLocal
+    engine = None
+    if session_factory is None:
+        engine = create_engine(settings.DATABASE_URL.replace("+asyncpg", ""))
+        session_factory = sessionmaker(bind=engine)
+
+    try:
+        with session_factory() as db:
+            repo = APIKeyRepository(db)
+            demo_key = repo.create_demo_key_if_not_exists()
+            logger.info(f"Demo API key ensured: {demo_key.name}")
+    finally:
+        if engine is not None:
+            engine.dispose()
+
+
+async def _prewarm_generation_stack():
+    """Import the simulation stack off the event loop so the first job starts warm."""
+    try:
+        with startup_profiler.step("prewarm_generation_stack"):
+            await asyncio.to_thread(load_generation_stack)
+    except Exception as e:
+        logger.error("Failed to pre-warm generation stack: %s", e)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager."""
@@ -56,36 +92,51 @@ async def lifespan(app: FastAPI):
 
     # Initialize cache if enabled
     if settings.CACHE_ENABLED:
-        try:
-            await initialize_cache(settings.REDIS_URL, settings.CACHE_TTL)
-            logger.info("Redis cache initialized")
-        except Exception as e:
-            logger.error("Failed to initialize Redis cache: %s", e)
-            logger.warning("Application will continue without caching")
-            # Disable caching for this session to prevent further errors
-            settings.CACHE_ENABLED = False
+        with startup_profiler.step("cache"):
+            try:
+                await initialize_cache(settings.REDIS_URL, settings.CACHE_TTL)
+                logger.info("Redis cache initialized")
+            except Exception as e:
+                logger.error("Failed to initialize Redis cache: %s", e)
+                logger.warning("Application will continue without caching")
+                # Disable caching for this session to prevent further errors
+                settings.CACHE_ENABLED = False
+
+    # Seed reference data from the compiled snapshot (rebuilt if stale)
+    with startup_profiler.step("reference_snapshot"):
+        _snapshot, seeded = ensure_snapshot()
+    logger.info("Reference data snapshot loaded (%d tables)", seeded)
 
     # Ensure demo API key exists
     try:
-        # We need to create a sync context for the database operation
-        engine = create_engine(settings.DATABASE_URL.replace("+asyncpg", ""))
-        session_local = sessionmaker(bind=engine)
-
-        with session_local() as db:
-            repo = APIKeyRepository(db)
-            demo_key = repo.create_demo_key_if_not_exists()
-            logger.info(f"Demo API key ensured: {demo_key.name}")
-
-        engine.dispose()
+        with startup_profiler.step("demo_api_key"):
+            await asyncio.to_thread(_ensure_demo_key)
     except Exception as e:
         logger.error(f"Failed to ensure demo API key: {e}")
         # Non-critical error - application can continue
 
+    # Write buffered API key usage back to the database in batches
+    if security_enhanced.SessionLocal is not None:
+        app.state.usage_flusher = asyncio.create_task(run_usage_flusher(security_enhanced.SessionLocal))
+
+    # Optional: load the simulation stack in the background (readiness does not wait for it)
+    if settings.PREWARM_GENERATION_STACK:
+        app.state.prewarm_task = asyncio.create_task(_prewarm_generation_stack())
+
+    startup_profiler.mark_ready()
+
     yield
 
     # Shutdown
     logger.info("Shutting down application...")
 
+    # Stop the usage flusher; it writes pending usage once more on the way out
+    usage_flusher = getattr(app.state, "usage_flusher", None)
+    if usage_flusher is not None:
+        usage_flusher.cancel()
+        with suppress(asyncio.CancelledError):
+            await usage_flusher
+
     # Close database connection pool
     try:
         close_pool()
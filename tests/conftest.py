@@ -7,6 +7,10 @@ import os
 from fastapi.testclient import TestClient
 import pytest
 
+# In-process API tests reuse the demo key far more often than its per-minute
+# limit allows; the limiter itself is covered in test_rate_limiter.py
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
 
 def pytest_addoption(parser):
     """Add custom command line options"""
@@ -0,0 +1,105 @@
+"""Tests for the alias-method sampler and its cache"""
+
+import random
+
+import numpy as np
+import pytest
+
+from patient_generator import flow_simulator
+from patient_generator.alias_sampler import AliasSampler, SamplerCache
+from patient_generator.config_manager import inline_configuration
+from patient_generator.schemas_config import ConfigurationTemplateCreate
+from patient_generator.warfare_modifiers import WarfareModifiers
+
+
+def test_scalar_draws_follow_weights():
+    """Single draws match the normalized weights"""
+    weights = {"T1": 0.2, "T2": 0.5, "T3": 0.3}
+    sampler = AliasSampler.from_dict(weights)
+    random.seed(0)
+    n = 20000
+    counts = dict.fromkeys(weights, 0)
+    for _ in range(n):
+        counts[sampler.sample()] += 1
+    for key, weight in weights.items():
+        assert counts[key] / n == pytest.approx(weight, abs=0.02)
+
+
+def test_batch_draws_return_arrays():
+    """Batch draws are NumPy arrays with the right frequencies"""
+    sampler = AliasSampler(["a", "b", "c"], [1.0, 3.0, 6.0])
+    np.random.seed(0)  # noqa: NPY002
+    draws = sampler.draw(30000)
+    assert isinstance(draws, np.ndarray)
+    assert draws.shape == (30000,)
+    assert np.mean(draws == "c") == pytest.approx(0.6, abs=0.02)
+    assert np.mean(draws == "a") == pytest.approx(0.1, abs=0.02)
+
+
+def test_non_positive_weights_are_dropped():
+    """Zero and negative weights never get drawn; an empty sampler returns None"""
+    sampler = AliasSampler(["never", "always", "negative"], [0.0, 2.0, -1.0])
+    assert sampler.items == ["always"]
+    assert {sampler.sample() for _ in range(50)} == {"always"}
+
+    empty = AliasSampler(["a"], [0.0])
+    assert not empty
+    assert empty.sample() is None
+    with pytest.raises(ValueError, match="no positive weights"):
+        empty.draw(3)
+    with pytest.raises(ValueError, match="weights"):
+        AliasSampler(["a", "b"], [1.0])
+
+
+def test_cache_reuses_tables_per_version():
+    """Equal distributions share one table until their version changes"""
+    cache = SamplerCache(maxsize=2)
+    first = cache.get({"x": 1.0, "y": 2.0}, version=("cfg", 1))
+    assert cache.get({"x": 1.0, "y": 2.0}, version=("cfg", 1)) is first
+    assert cache.get({"x": 1.0, "y": 2.0}, version=("cfg", 2)) is not first
+    assert cache.hits == 1
+    assert cache.misses == 2
+
+    cache.invalidate(("cfg", 2))
+    assert len(cache) == 1
+    cache.get({"z": 1.0})
+    cache.get({"w": 1.0})
+    assert len(cache) == 2
+
+
+def test_warfare_injuries_come_from_pattern():
+    """Scenario injuries are drawn from the pattern's distribution"""
+    modifiers = WarfareModifiers()
+    random.seed(1)
+    for _ in range(20):
+        injuries, _severity, _metadata = modifiers.get_injuries_for_scenario("artillery")
+        assert injuries[0] in modifiers.patterns["artillery"].injury_distribution
+    assert modifiers.injury_samplers["artillery"].items == list(modifiers.patterns["artillery"].injury_distribution)
+
+
+def test_simulator_resolves_each_distribution_once(monkeypatch):
+    """Per-patient draws reuse the resolved samplers instead of the cache lookup"""
+    config = inline_configuration(
+        ConfigurationTemplateCreate(
+            name="Sampler resolution",
+            total_patients=50,
+            injury_distribution={"Disease": 0.5, "Non-Battle Injury": 0.3, "Battle Injury": 0.2},
+            front_configs=[],
+            facility_configs=[],
+        )
+    )
+    manager = flow_simulator.ConfigurationManager(configuration=config)
+    simulator = flow_simulator.PatientFlowSimulator(manager)
+
+    lookups = []
+    real_get_sampler = flow_simulator.get_sampler
+    monkeypatch.setattr(flow_simulator, "get_sampler", lambda *args: lookups.append(args) or real_get_sampler(*args))
+    for patient_id in range(50):
+        simulator._create_initial_patient(patient_id)
+
+    assert 0 < len(lookups) <= len(simulator._samplers)
+    assert len(simulator._samplers) < 50
+
+    # Replacing a distribution resolves it again
+    simulator.injury_distribution = {"Disease": 1.0}
+    assert simulator._create_initial_patient(99).injury_type == "Disease"
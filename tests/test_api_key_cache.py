@@ -0,0 +1,141 @@
+"""Tests for the API key cache and write-behind usage counters"""
+
+from datetime import datetime, timedelta, timezone
+import uuid
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.core import security_enhanced
+from src.core.api_key_cache import APIKeyCache, UsageBuffer, api_key_to_record
+from src.core.security_enhanced import APIKeyContext, record_patients
+from src.domain.models.api_key import APIKey, Base
+from src.domain.repositories.api_key_repository import APIKeyRepository
+
+
+@pytest.fixture()
+def session_factory():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+@pytest.mark.asyncio()
+async def test_keys_are_loaded_once_and_served_detached():
+    """The loader runs on a miss only; hits are fresh copies without the secret in the record"""
+    cache = APIKeyCache(negative_ttl=60)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return APIKey(key="sk_live_cached", name="Cached", max_requests_per_day=10, expires_at=datetime(2030, 1, 1, tzinfo=timezone.utc))
+
+    first = await cache.get("sk_live_cached", loader)
+    second = await cache.get("sk_live_cached", loader)
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert first is not second
+    assert second.key == "sk_live_cached"
+    assert second.expires_at == datetime(2030, 1, 1, tzinfo=timezone.utc)
+
+    second.daily_requests += 5
+    assert (await cache.get("sk_live_cached", loader)).daily_requests == 0
+    assert "key" not in api_key_to_record(first)
+
+    # Unknown keys are remembered briefly so bad keys do not reach the database
+    assert await cache.get("sk_live_unknown", lambda: calls.append(1)) is None
+    assert await cache.get("sk_live_unknown", lambda: calls.append(1)) is None
+    assert len(calls) == 2
+
+    cache.invalidate("sk_live_cached")
+    await cache.get("sk_live_cached", loader)
+    assert len(calls) == 3
+
+
+def test_usage_is_flushed_in_one_batch(session_factory):
+    """Buffered usage is added to the stored counters; a stale day restarts the daily count"""
+    with session_factory() as db:
+        repo = APIKeyRepository(db)
+        current = repo.create_api_key(name="Current")
+        stale = repo.create_api_key(name="Stale")
+        stale.daily_requests = 40
+        stale.last_reset_at = datetime.utcnow() - timedelta(days=2)
+        db.commit()
+        current_key, stale_key = current.key, stale.key
+
+    buffer = UsageBuffer()
+    for _ in range(3):
+        buffer.record(current_key)
+    buffer.record(stale_key, patients=25)
+    assert buffer.pending(current_key).requests == 3
+
+    assert buffer.flush(session_factory) == 2
+    assert len(buffer) == 0
+    assert buffer.flush(session_factory) == 0
+
+    with session_factory() as db:
+        repo = APIKeyRepository(db)
+        current = repo.get_by_key(current_key)
+        stale = repo.get_by_key(stale_key)
+        assert (current.total_requests, current.daily_requests) == (3, 3)
+        assert (stale.total_requests, stale.daily_requests, stale.total_patients_generated) == (1, 1, 25)
+        assert current.last_used_at is not None
+
+
+def test_failed_flush_keeps_usage(session_factory):
+    """Usage drained for a failed flush is merged back with newer usage"""
+    buffer = UsageBuffer()
+    buffer.record("sk_live_a")
+
+    def broken_factory():
+        msg = "database unavailable"
+        raise RuntimeError(msg)
+
+    with pytest.raises(RuntimeError, match="unavailable"):
+        buffer.flush(broken_factory)
+    buffer.record("sk_live_a", patients=5)
+
+    pending = buffer.pending("sk_live_a")
+    assert (pending.requests, pending.patients) == (2, 5)
+
+
+@pytest.mark.asyncio()
+async def test_flushed_usage_counts_until_cached_records_are_evicted(session_factory):
+    """Daily usage does not drop back between a flush and the reload of the cached key"""
+    with session_factory() as db:
+        key = APIKeyRepository(db).create_api_key(name="Cached usage").key
+
+    def loader():
+        with session_factory() as db:
+            return APIKeyRepository(db).get_active_key(key)
+
+    cache = APIKeyCache()
+    buffer = UsageBuffer()
+    assert (await cache.get(key, loader)).daily_requests == 0
+    buffer.record(key)
+    buffer.record(key)
+
+    assert buffer.flush(session_factory) == 1
+    assert len(buffer) == 0
+    assert buffer.pending(key).requests == 2  # the cached record predates the flush
+
+    await buffer.settle(cache)
+    assert buffer.pending(key).requests == 0
+    assert (await cache.get(key, loader)).daily_requests == 2
+
+
+def test_generated_patients_are_buffered(monkeypatch):
+    """Patients generated for database keys are counted; the legacy key is not"""
+    buffer = UsageBuffer()
+    monkeypatch.setattr(security_enhanced, "get_usage_buffer", lambda: buffer)
+    api_key = APIKey(key="sk_live_patients", name="Patients")
+    api_key.id = uuid.uuid4()
+
+    record_patients(APIKeyContext(api_key=api_key), 40)
+    record_patients(APIKeyContext(api_key=APIKey(key="legacy", name="Legacy"), is_legacy=True), 10)
+
+    assert buffer.pending("sk_live_patients").patients == 40
+    assert buffer.pending("legacy").patients == 0
+    assert api_key.total_patients_generated == 40
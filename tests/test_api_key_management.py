@@ -6,11 +6,18 @@ models, repository, and security components.
 """
 
 from datetime import datetime, timedelta
+from unittest.mock import MagicMock
 
 from fastapi import HTTPException
 import pytest
 
-from src.core.security_enhanced import DEMO_API_KEY, APIKeyContext
+from src.core import security_enhanced
+from src.core.security_enhanced import (
+    DEMO_API_KEY,
+    APIKeyContext,
+    verify_admin_api_key,
+    verify_api_key_context,
+)
 from src.domain.models.api_key import DEMO_API_KEY_CONFIG, APIKey
 
 
@@ -335,6 +342,25 @@ class TestSecurityIntegration:
         assert limits_info["total_usage"] == 150
         assert limits_info["daily_usage"] == 25
 
+    @pytest.mark.asyncio()
+    async def test_legacy_key_is_not_admin(self, monkeypatch):
+        """Test that only ADMIN_API_KEY, never the public legacy key, reaches admin endpoints."""
+        monkeypatch.setattr(security_enhanced, "LEGACY_API_KEY", "legacy_test_key")
+        monkeypatch.setattr(security_enhanced, "ADMIN_API_KEY", "admin_test_key")
+
+        legacy = await verify_api_key_context("legacy_test_key", MagicMock(), None)
+        assert legacy.is_legacy
+        with pytest.raises(HTTPException) as exc_info:
+            await verify_admin_api_key(legacy)
+        assert exc_info.value.status_code == 403
+
+        admin = await verify_api_key_context("admin_test_key", MagicMock(), None)
+        assert await verify_admin_api_key(admin) is admin
+
+        # An admin key equal to the legacy key grants nothing
+        monkeypatch.setattr(security_enhanced, "ADMIN_API_KEY", "legacy_test_key")
+        assert not (await verify_api_key_context("legacy_test_key", MagicMock(), None)).is_admin
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -0,0 +1,89 @@
+"""Tests for the generation engine benchmark suite"""
+
+import pytest
+
+from benchmarks.suite import (
+    BENCHMARK_FORMAT_VERSION,
+    Benchmark,
+    _setup_macro,
+    build_suite,
+    compare_results,
+    load_report,
+    run_benchmark,
+    run_suite,
+    save_report,
+)
+
+pytestmark = pytest.mark.unit
+
+
+def _report(ops_per_second, peak_rss_mb, name="micro.to_dict"):
+    return {
+        "version": BENCHMARK_FORMAT_VERSION,
+        "benchmarks": [{"name": name, "ops_per_second": ops_per_second, "peak_rss_mb": peak_rss_mb}],
+    }
+
+
+def test_suite_selection():
+    """Macro scenarios vary one switch at a time from the reference scenario"""
+    names = [benchmark.name for benchmark in build_suite(sizes=(1000, 10000))]
+
+    assert "micro.select_treatments" in names
+    assert "macro.1000.temporal.medsim.json" in names
+    assert "macro.10000.legacy.medsim.json" in names
+    assert "macro.10000.temporal.nomedsim.json" in names
+    assert "macro.1000.temporal.medsim.xml" in names
+    assert len([name for name in names if name.startswith("macro.")]) == 10
+
+    suite = build_suite(groups=("micro",), name_filter="facility", rounds=2)
+    assert [(benchmark.name, benchmark.rounds) for benchmark in suite] == [("micro.get_next_facility", 2)]
+
+
+def test_compare_flags_throughput_and_rss_regressions():
+    """Only slowdowns or RSS growth beyond the thresholds count as regressions"""
+    baseline = _report(1000.0, 100.0)
+
+    assert not compare_results(_report(950.0, 105.0), baseline)[0].regressed
+    slower = compare_results(_report(800.0, 100.0), baseline)[0]
+    assert slower.regressed
+    assert slower.throughput_change == pytest.approx(-0.2)
+    assert compare_results(_report(1000.0, 150.0), baseline)[0].reasons == ["peak RSS +50.0%"]
+    assert compare_results(_report(800.0, 100.0), baseline, max_slowdown=0.25)[0].reasons == []
+
+    new = compare_results(_report(10.0, 100.0, name="micro.new"), baseline)[0]
+    assert not new.regressed
+    assert new.baseline_ops_per_second is None
+
+
+def test_micro_benchmark_report_round_trip(tmp_path):
+    """A micro-benchmark run is stored and reloaded as a baseline"""
+    report = run_suite(build_suite(groups=("micro",), name_filter="get_next_facility", rounds=2))
+    entry = report["benchmarks"][0]
+    assert entry["rounds"] == 2
+    assert entry["ops_per_second"] > 0
+    assert entry["peak_rss_mb"] > 0
+
+    path = tmp_path / "baselines" / "baseline.json"
+    save_report(report, str(path))
+    assert not compare_results(report, load_report(str(path)))[0].regressed
+
+    path.write_text('{"version": 0}')
+    with pytest.raises(ValueError, match="Unsupported benchmark report version"):
+        load_report(str(path))
+
+
+def test_macro_scenario_runs_in_memory():
+    """A legacy, simulation-free CSV run needs no database"""
+    benchmark = Benchmark(
+        "macro.test",
+        "macro",
+        lambda: _setup_macro(20, temporal=False, medical_simulation=False, output_format="csv"),
+        20,
+        rounds=1,
+        warmup=0,
+    )
+
+    result = run_benchmark(benchmark)
+
+    assert len(result.times) == 1
+    assert result.ops_per_second > 0
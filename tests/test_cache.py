@@ -66,3 +66,62 @@ class TestCache:
 
             # Service should still be created but operations will fail
             assert service is not None
+
+
+class _DictCache:
+    """In-memory stand-in for the CacheService calls used by the configuration cache"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def get_many(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    async def set(self, key, value, ttl=None):
+        self.data[key] = value
+        return True
+
+    async def delete(self, key):
+        return self.data.pop(key, None) is not None
+
+    async def incr(self, key):
+        self.data[key] = self.data.get(key, 0) + 1
+        return self.data[key]
+
+
+@pytest.mark.asyncio()
+async def test_configuration_cache_is_version_aware(monkeypatch):
+    """Loads that raced with an update are never served once the update invalidated them"""
+    from src.core import cache_utils
+
+    cache = _DictCache()
+    monkeypatch.setattr(cache_utils, "get_cache_service", lambda: cache)
+    loads = []
+
+    class _Config:
+        def __init__(self, name):
+            self.name = name
+
+        def model_dump(self, mode=None):
+            return {"name": self.name}
+
+    def loader():
+        loads.append(1)
+        return _Config("v1")
+
+    assert await cache_utils.get_configuration_template("cfg", loader) == {"name": "v1"}
+    assert await cache_utils.get_configuration_template("cfg", loader) == {"name": "v1"}
+    assert len(loads) == 1
+
+    # A reader loaded the old row, then an update invalidated it before the reader cached it
+    version = await cache_utils.get_configuration_cache_version("cfg")
+    await cache_utils.invalidate_configuration_cache("cfg")
+    await cache_utils.cache_configuration_template("cfg", {"name": "v1"}, version)
+    assert await cache_utils.get_cached_configuration("cfg") is None
+
+    await cache_utils.cache_configuration_template("cfg", {"name": "v2"})
+    assert await cache_utils.get_cached_configuration("cfg") == {"name": "v2"}
+    assert await cache_utils.get_configuration_template("missing", lambda: None) is None
@@ -0,0 +1,104 @@
+"""Tests for columnar cohort construction from casualty timelines"""
+
+from datetime import datetime, timedelta, timezone
+import json
+import os
+import random
+
+import numpy as np
+
+from patient_generator.cohort import COHORT_CHUNK_SIZE, expand_timeline, group_indices
+from patient_generator.flow_simulator import PatientFlowSimulator
+from patient_generator.scenario_sweep import _build_config_manager
+from patient_generator.temporal_generator import CasualtyEvent, CasualtyTimeline
+
+WARFARE_PATTERNS_PATH = os.path.join(os.path.dirname(__file__), "..", "patient_generator", "warfare_patterns.json")
+INJURY_MIX = {"Disease": 0.5, "Non-Battle Injury": 0.3, "Battle Injury": 0.2}
+
+
+def _timeline():
+    base = datetime(2025, 6, 1, 6, 0, tzinfo=timezone.utc)
+    return [
+        CasualtyEvent(
+            timestamp=base + timedelta(days=day, hours=hour),
+            patient_count=count,
+            warfare_type=warfare_type,
+            event_id=f"evt-{day}-{hour}",
+            is_mass_casualty=count > 5,
+            environmental_factors=["night_operations"] if hour > 12 else [],
+        )
+        for day, hour, count, warfare_type in [
+            (0, 1, 3, "conventional"),
+            (0, 14, 8, "artillery"),
+            (1, 2, 1, "urban"),
+            (2, 5, 6, "conventional"),
+        ]
+    ]
+
+
+def test_expand_timeline_and_limit():
+    """Each patient maps to its event; the limit truncates the expansion"""
+    assert expand_timeline([2, 0, 3]).tolist() == [0, 0, 2, 2, 2]
+    assert expand_timeline([2, 0, 3], limit=3).tolist() == [0, 0, 2]
+    assert len(expand_timeline([])) == 0
+
+
+def test_group_indices_combines_columns():
+    """Rows are grouped by the tuple of column values"""
+    first = np.array(["a", "b", "a", "a"], dtype=object)
+    second = np.array(["x", "x", "y", "x"], dtype=object)
+    groups = group_indices(first, second)
+    assert {key: rows.tolist() for key, rows in groups.items()} == {
+        ("a", "x"): [0, 3],
+        ("b", "x"): [1],
+        ("a", "y"): [2],
+    }
+    assert group_indices(np.array([], dtype=object)) == {}
+
+
+def test_patients_carry_event_and_drawn_attributes():
+    """Materialized patients get event data plus attributes from the batched draws"""
+    simulator = PatientFlowSimulator(_build_config_manager(18, INJURY_MIX))
+    timeline = _timeline()
+    random.seed(3)
+    np.random.seed(3)  # noqa: NPY002
+
+    patients = list(simulator.iter_patients_from_timeline(timeline, INJURY_MIX))
+    assert [p.id for p in patients] == list(range(18))
+    assert [p.casualty_event_id for p in patients[:4]] == ["evt-0-1"] * 3 + ["evt-0-14"]
+    assert patients[3].is_mass_casualty
+    assert patients[3].environmental_conditions == ["night_operations"]
+    assert {p.day_of_injury for p in patients} == {"Day 1", "Day 2", "Day 3"}
+
+    for patient in patients:
+        assert patient.triage_category in {"T1", "T2", "T3"}
+        assert patient.gender in {"male", "female"}
+        assert patient.body_part
+        assert patient.treatment_history[0]["facility"] == "POI"
+        if simulator.warfare_modifiers:
+            assert patient.primary_conditions
+            assert patient.injury_metadata["injury_count"] == len(patient.primary_conditions)
+            assert 1 <= patient.severity <= 10
+
+    limited = list(simulator.iter_patients_from_timeline(timeline, INJURY_MIX, limit=5))
+    assert len(limited) == 5
+
+
+def test_cohort_is_reproducible_per_seed():
+    """The same seeds give the same cohort"""
+    simulator = PatientFlowSimulator(_build_config_manager(18, INJURY_MIX))
+    timeline = CasualtyTimeline.from_events(_timeline())
+    event_index = expand_timeline(timeline.patient_counts)
+    with open(WARFARE_PATTERNS_PATH) as f:
+        warfare_patterns = json.load(f)
+
+    cohorts = []
+    for _ in range(2):
+        random.seed(11)
+        np.random.seed(11)  # noqa: NPY002
+        cohorts.append(simulator.build_cohort(timeline, event_index, INJURY_MIX, warfare_patterns))
+
+    first, second = cohorts
+    assert len(first) == len(event_index) < COHORT_CHUNK_SIZE
+    for column in ("injury_types", "triage_categories", "body_parts", "genders", "fronts", "nationalities"):
+        assert getattr(first, column).tolist() == getattr(second, column).tolist()
@@ -1,5 +1,11 @@
 """Tests for Deterioration Calculator"""
 
+import json
+from pathlib import Path
+import time
+
+import pytest
+
 from medical_simulation.deterioration_calculator import DeteriorationCalculator
 
 
@@ -130,3 +136,70 @@ if __name__ == "__main__":
     print("✅ Intervention points test passed")
 
     print("\n✅ All deterioration calculator tests passed!")
+
+
+def test_rate_table_matches_direct_calculation():
+    """Table lookups agree with the step-by-step calculation"""
+    calc = DeteriorationCalculator()
+    conditions = ["extreme_cold", "night_operations"]
+    mask = calc.environment_mask(conditions)
+
+    for injury_type, severities in calc.deterioration_model.items():
+        for severity in severities:
+            for triage in ["T1", "T2", "T3", "T4", None]:
+                for hemorrhage in (False, True):
+                    injuries = [{"condition": "arterial bleeding"}] if hemorrhage else None
+                    expected = calc.apply_triage_multiplier(
+                        calc.calculate_base_deterioration(injury_type, severity, injuries), triage
+                    )
+                    expected = calc.apply_environmental_factors(expected, conditions)
+                    assert calc.get_deterioration_rate(injury_type, severity, triage, hemorrhage, mask) == (
+                        pytest.approx(expected)
+                    )
+
+
+def test_rate_table_memoizes_unknown_profiles():
+    """Profiles outside the deterioration model fall back to the default rate"""
+    calc = DeteriorationCalculator()
+    assert calc.environment_mask(["unknown_condition"]) == 0
+    assert calc.get_deterioration_rate("Unknown", "Severe", "T1") == pytest.approx(5.0 * 1.2)
+    assert ("Unknown", "Severe", "T1", False, 0) in calc._rate_table
+
+
+def test_compound_rates_precomputed_for_pairs():
+    """Paired injuries come from the compound table and match the derivation"""
+    calc = DeteriorationCalculator()
+    pair = (("Battle Injury", "Severe"), ("Disease", "Moderate"))
+    assert pair in calc._compound_rates
+
+    injuries = [{"type": t, "severity": s} for t, s in pair]
+    assert calc.calculate_compound_deterioration(injuries) == calc._derive_compound(pair)
+    assert calc.calculate_compound_deterioration(injuries * 2) == pytest.approx(calc._derive_compound(pair * 2))
+
+
+def test_rate_tables_are_built_once_and_shared():
+    """One calculator is created per simulated patient, so construction must not rebuild the tables"""
+    first = DeteriorationCalculator()
+    start = time.perf_counter()
+    calculators = [DeteriorationCalculator() for _ in range(200)]
+    elapsed = time.perf_counter() - start
+
+    assert all(calc._rate_table is first._rate_table for calc in calculators)
+    assert all(calc._compound_rates is first._compound_rates for calc in calculators)
+    assert elapsed < 0.5  # about 2s when every calculator built its own tables
+
+
+def test_rate_tables_follow_config_changes(tmp_path):
+    """A changed injuries config gets its own tables"""
+    config = json.loads(Path("patient_generator/injuries.json").read_text())
+    path = tmp_path / "injuries.json"
+    path.write_text(json.dumps(config))
+    before = DeteriorationCalculator(str(path))
+
+    config["deterioration_model"]["Battle Injury"]["Severe"]["deterioration_rate"] = 42
+    path.write_text(json.dumps(config))
+    after = DeteriorationCalculator(str(path))
+
+    assert after._rate_table is not before._rate_table
+    assert before.get_deterioration_rate("Battle Injury", "Severe") == pytest.approx(5.0)
+    assert after.get_deterioration_rate("Battle Injury", "Severe") == pytest.approx(42.0)
@@ -0,0 +1,77 @@
+"""Tests for diagnostic session lifecycle and HMM transition sampling"""
+
+import numpy as np
+import pytest
+
+from medical_simulation.patient_flow_orchestrator import PatientFlowOrchestrator
+from patient_generator.diagnostic_uncertainty import MAX_HISTORY_PER_PATIENT, DiagnosticUncertaintyEngine
+
+
+def test_sessions_open_and_release():
+    """Progression opens a session; release drops it"""
+    engine = DiagnosticUncertaintyEngine()
+    engine.update_diagnosis_with_progression("p1", "19130008", "Role1")
+    engine.update_diagnosis_with_progression("p2", "19130008", "Role1")
+    assert engine.active_sessions == 2
+
+    confidence = engine.get_diagnostic_confidence("p1")
+    assert confidence["confidence"] == engine.facility_accuracy["Role1"]
+    assert confidence["hmm_state"] in engine.hmm_states
+
+    assert engine.release_session("p1").patient_id == "p1"
+    assert engine.release_session("p1") is None
+    engine.reset_patient_state("p2")
+    assert engine.active_sessions == 0
+
+
+def test_history_is_bounded():
+    """A session keeps only the most recent diagnostic updates"""
+    engine = DiagnosticUncertaintyEngine()
+    for _ in range(MAX_HISTORY_PER_PATIENT + 5):
+        engine.update_diagnosis_with_progression("p1", "19130008", "Role2")
+    assert len(engine.get_diagnostic_confidence("p1")["diagnostic_history"]) == MAX_HISTORY_PER_PATIENT
+
+
+def test_transition_table_is_cumulative():
+    """Each CDF row ends at 1 and matches the configured probabilities"""
+    engine = DiagnosticUncertaintyEngine()
+    transitions = engine.hmm_params["transition_probabilities"]
+    for row_index, state in enumerate(engine.hmm_states):
+        expected = np.cumsum([transitions[state][s] for s in engine.hmm_states])
+        assert engine.transition_cdf[row_index] == pytest.approx(expected / expected[-1])
+        assert engine.transition_cdf[row_index, -1] == 1.0
+
+
+def test_batch_sampling_matches_transition_probabilities():
+    """Batch draws from one state follow its transition row"""
+    engine = DiagnosticUncertaintyEngine()
+    np.random.seed(0)  # noqa: NPY002
+    n = 20000
+    samples = engine.sample_hmm_transitions([0] * n)
+    frequencies = np.bincount(samples, minlength=len(engine.hmm_states)) / n
+
+    row = engine.hmm_params["transition_probabilities"][engine.hmm_states[0]]
+    for index, state in enumerate(engine.hmm_states):
+        assert frequencies[index] == pytest.approx(row[state], abs=0.02)
+
+    engine.open_session("p1")
+    engine.open_session("p2")
+    engine.advance_hmm_states(["p1", "p2", "missing"])
+    assert {engine.open_session(pid).current_state for pid in ("p1", "p2")} <= set(engine.hmm_states)
+
+
+def test_orchestrator_releases_session_on_terminal_state():
+    """Death and discharge release the patient's diagnostic session"""
+    orchestrator = PatientFlowOrchestrator()
+    if not orchestrator.diagnostic_engine:
+        pytest.skip("Diagnostic uncertainty engine unavailable")
+    engine = orchestrator.diagnostic_engine
+
+    for pid in ("dead", "rtd"):
+        orchestrator.initialize_patient(pid, "Battle Injury", "Severe")
+        engine.update_diagnosis_with_progression(pid, "19130008", "Role1")
+    assert engine.active_sessions == 2
+
+    orchestrator.handle_patient_death("dead", "hemorrhage")
+    orchestrator.handle_patient_discharge("rtd", "recovered")
+    assert engine.active_sessions == 0
@@ -0,0 +1,86 @@
+"""Tests for the closed-form hemorrhage blood volume integrator"""
+
+import pytest
+
+from patient_generator.hemorrhage import BodyRegion, HemorrhageModel
+from patient_generator.hemorrhage.integration import INITIAL_BLOOD_VOLUME_ML, HemorrhageIntegration
+
+
+def _stepped_timeline(profile, duration, tourniquet_time=None):
+    """Reference minute-by-minute integration"""
+    volume = INITIAL_BLOOD_VOLUME_ML
+    timeline = []
+    for minute in range(duration):
+        if tourniquet_time is not None and minute >= tourniquet_time and profile.controllable:
+            rate = profile.blood_loss_ml_per_min * 0.05
+        else:
+            rate = profile.blood_loss_ml_per_min * (1 + profile.k * minute / 60)
+        volume = max(0, volume - rate)
+        timeline.append((minute, volume, rate))
+        if volume <= 0:
+            break
+    return timeline
+
+
+@pytest.fixture()
+def leg_wound():
+    return HemorrhageModel.calculate_hemorrhage_profile(
+        injury_code="262574004", body_region=BodyRegion.RIGHT_LEG, severity="Severe"
+    )
+
+
+@pytest.fixture()
+def chest_wound():
+    return HemorrhageModel.calculate_hemorrhage_profile(
+        injury_code="262574004", body_region=BodyRegion.CHEST, severity="Severe"
+    )
+
+
+@pytest.mark.parametrize("tourniquet_time", [None, 4, 7.5])
+def test_timeline_matches_stepped_integration(leg_wound, chest_wound, tourniquet_time):
+    """Closed form reproduces the per-minute model, including early termination"""
+    integration = HemorrhageIntegration()
+    for profile in (leg_wound, chest_wound):
+        expected = _stepped_timeline(profile, 600, tourniquet_time)
+        timeline = integration.calculate_blood_volume_timeline(profile, 600, tourniquet_time)
+
+        assert len(timeline) == len(expected)
+        for point, (minute, volume, rate) in zip(timeline, expected):
+            assert point["minute"] == minute
+            assert point["blood_volume_ml"] == pytest.approx(volume, abs=1e-6)
+            assert point["blood_loss_rate"] == pytest.approx(rate)
+
+
+def test_timeline_downsampling_and_status(leg_wound):
+    """Downsampled timelines keep every Nth minute and report clinical status"""
+    integration = HemorrhageIntegration()
+    full = integration.calculate_blood_volume_timeline(leg_wound, 60, tourniquet_time=2)
+    sparse = integration.calculate_blood_volume_timeline(leg_wound, 60, tourniquet_time=2, step_minutes=10)
+
+    assert [p["minute"] for p in sparse] == [0, 10, 20, 30, 40, 50]
+    assert sparse[1]["blood_volume_ml"] == pytest.approx(full[10]["blood_volume_ml"])
+    assert full[0]["status"] == "stable"
+
+
+def test_exsanguination_times_and_volumes(leg_wound, chest_wound):
+    """Exsanguination falls inside the minute where the stepped model hits zero"""
+    integration = HemorrhageIntegration()
+    profiles = [leg_wound, chest_wound, leg_wound]
+    tourniquets = [None, None, 2]
+    times = integration.calculate_exsanguination_times(profiles, tourniquets)
+
+    for profile, tourniquet_time, time in zip(profiles, tourniquets, times):
+        last_minute, last_volume, _ = _stepped_timeline(profile, 100000, tourniquet_time)[-1]
+        assert last_volume == 0
+        assert last_minute <= time <= last_minute + 1
+
+    # A tourniquet on a limb buys time; the torso wound is unaffected by one
+    assert times[2] > times[0]
+    assert integration.calculate_exsanguination_times([chest_wound], [1])[0] == pytest.approx(times[1])
+
+    volumes = integration.calculate_blood_volumes(profiles, [0, 1, times[0], 10000], tourniquets)
+    assert volumes.shape == (3, 4)
+    assert volumes[0, 0] == INITIAL_BLOOD_VOLUME_ML
+    assert volumes[0, 1] == pytest.approx(INITIAL_BLOOD_VOLUME_ML - leg_wound.blood_loss_ml_per_min)
+    assert volumes[0, 2] == pytest.approx(0, abs=1e-6)
+    assert (volumes[:, 3] == 0).all()
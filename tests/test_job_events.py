@@ -0,0 +1,99 @@
+"""Tests for live job events and the push endpoints' event stream"""
+
+import asyncio
+
+import pytest
+
+from src.api.v1.routers.jobs import _job_events
+from src.core import job_events
+from src.core.job_events import JobEventBroadcaster
+from src.domain.models.job import JobProgressDetails, JobStatus
+from src.domain.repositories.job_repository import InMemoryJobRepository
+from src.domain.services.job_service import JobService
+
+
+class _PubSubCache:
+    """Stands in for CacheService.publish, reporting a fixed number of receivers."""
+
+    def __init__(self, receivers: int):
+        self.receivers = receivers
+        self.published = []
+
+    async def publish(self, channel, message):
+        self.published.append((channel, message))
+        return self.receivers
+
+
+@pytest.mark.asyncio()
+async def test_events_fan_out_and_patients_are_sampled():
+    """Every subscriber gets each event; the patient feed is thinned per subscriber"""
+    broadcaster = JobEventBroadcaster(queue_size=4)
+
+    async with broadcaster.subscribe("job-1") as plain, broadcaster.subscribe("job-1", patients_every=3) as feed:
+        assert broadcaster.subscriber_count("job-1") == 2
+        await broadcaster.publish("job-1", {"event": "progress", "data": {"progress": 10}})
+        for i in range(7):
+            broadcaster.offer_patient("job-1", {"id": i})
+
+        assert (await plain.get(timeout=0.1))["data"] == {"progress": 10}
+        assert await plain.get(timeout=0.01) is None
+        assert (await feed.get(timeout=0.1))["event"] == "progress"
+        assert [(await feed.get(timeout=0.1))["seq"] for _ in range(2)] == [3, 6]
+
+        # A subscriber that falls behind keeps the newest events
+        for progress in range(6):
+            await broadcaster.publish("job-1", {"event": "progress", "data": {"progress": progress}})
+        assert plain.dropped == 2
+        assert [(await plain.get(timeout=0.1))["data"]["progress"] for _ in range(4)] == [2, 3, 4, 5]
+
+    assert broadcaster.subscriber_count("job-1") == 0
+
+
+@pytest.mark.asyncio()
+async def test_redis_patient_feed_pauses_without_listeners(monkeypatch):
+    """Over Redis only every Nth patient is published, and not at all while nobody listens"""
+    cache = _PubSubCache(receivers=0)
+    monkeypatch.setattr(job_events, "get_cache_service", lambda: cache)
+    broadcaster = JobEventBroadcaster(patient_sample=5, probe_interval=60)
+
+    for i in range(50):
+        broadcaster.offer_patient("job-2", {"id": i})
+        await asyncio.sleep(0)
+
+    assert len(cache.published) == 1
+    channel, event = cache.published[0]
+    assert channel == "job:job-2:patients"
+    assert (event["seq"], event["sample"]) == (5, 5)
+    broadcaster.close_job("job-2")
+
+
+@pytest.mark.asyncio()
+async def test_job_events_follow_a_job_to_completion():
+    """The stream starts with a snapshot, names phase changes and ends with the final status"""
+    service = JobService(InMemoryJobRepository())
+    job = await service.create_job({"total_patients": 10})
+
+    received = []
+
+    async def follow():
+        async for item in _job_events(job.job_id, service, patients_every=0):
+            received.append(item)
+
+    def details(phase, progress):
+        return JobProgressDetails(current_phase=phase, phase_description=phase, phase_progress=progress)
+
+    follower = asyncio.create_task(follow())
+    await asyncio.sleep(0)
+    try:
+        await service.update_job_status(job.job_id, JobStatus.RUNNING)
+        await service.update_job_progress(job.job_id, 10, details("initializing", 50))
+        await service.update_job_progress(job.job_id, 20, details("initializing", 100))
+        await service.update_job_progress(job.job_id, 60, details("generating_patients", 50))
+        await service.update_job_status(job.job_id, JobStatus.COMPLETED)
+        await asyncio.wait_for(follower, timeout=1)
+    finally:
+        follower.cancel()
+
+    assert [name for name, _ in received] == ["status", "status", "phase", "progress", "phase", "status"]
+    assert received[0][1]["status"] == "pending"
+    assert received[-1][1]["status"] == "completed"
@@ -0,0 +1,54 @@
+"""Tests for per-job resource profiles"""
+
+import pytest
+
+from src.core.job_profile import JobProfiler
+from src.core.metrics import registry
+
+pytestmark = pytest.mark.unit
+
+
+def _stage_observations(stage):
+    return registry.get_sample_value("job_stage_seconds_per_patient_count", {"stage": stage}) or 0
+
+
+@pytest.mark.asyncio()
+async def test_profile_ring_buffer_and_stage_breakdown():
+    """Samples are bounded per job and stage times are reported per patient"""
+    profiler = JobProfiler(sample_interval=60, max_samples=3, retained_jobs=2)
+    profile = profiler.start("job-1")
+    assert profiler.start("job-1") is profile
+
+    for _ in range(5):
+        profile.record_patients(10)
+        profiler.sample()
+    profile.stage_times.add("flow", 0.3, calls=50)
+    profile.stage_times.add("io", 0.1, calls=50)
+
+    data = profile.to_dict()
+    assert [sample["patients"] for sample in data["samples"]] == [30, 40, 50]
+    assert data["samples_dropped"] == 2
+    assert data["peak_rss_mb"] > 0
+    assert data["stages"]["flow"]["seconds_per_patient"] == pytest.approx(0.3 / 50)
+    assert data["stages"]["flow"]["share"] == pytest.approx(0.75)
+
+
+@pytest.mark.asyncio()
+async def test_finished_profiles_export_aggregates_only():
+    """Finishing a job feeds stage histograms and keeps only the most recent profiles"""
+    profiler = JobProfiler(sample_interval=60, retained_jobs=2)
+    flow_before = _stage_observations("flow")
+
+    for job_id in ("job-a", "job-b", "job-c"):
+        profile = profiler.start(job_id)
+        profile.record_patients(4)
+        profile.stage_times.add("flow", 0.2, calls=4)
+        profile.stage_times.add("custom_step", 0.1)
+        assert profiler.finish(job_id, "completed").status == "completed"
+
+    assert profiler.finish("job-c", "completed") is None
+    assert profiler.get("job-a") is None
+    assert profiler.get("job-c").to_dict()["finished_at"] is not None
+    assert _stage_observations("flow") == flow_before + 3
+    assert _stage_observations("custom_step") == 0
+    assert profiler._sampler is None
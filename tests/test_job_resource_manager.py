@@ -11,6 +11,7 @@ from unittest.mock import MagicMock, patch
 import pytest
 
 from src.core.exceptions import ResourceLimitExceeded
+from src.core.job_profile import get_job_profiler
 from src.core.job_resource_manager import JobResourceManager, get_resource_manager
 
 
@@ -68,6 +69,7 @@ class TestJobResourceManager:
         """Test memory limit enforcement."""
         job_id = "test-job-memory"
         resource_manager.max_memory_mb = 0.001  # Impossibly low limit
+        resource_manager.memory_grace_checks = 0
 
         with pytest.raises(ResourceLimitExceeded) as exc_info:
             async with resource_manager.track_job(job_id):
@@ -76,6 +78,19 @@ class TestJobResourceManager:
 
         assert "exceeded memory limit" in str(exc_info.value)
 
+    @pytest.mark.asyncio()
+    async def test_memory_limit_grace_period(self, resource_manager):
+        """Test that a job over the memory limit runs on during the grace period."""
+        job_id = "test-job-memory-grace"
+        resource_manager.max_memory_mb = 0.001
+        resource_manager.memory_grace_checks = 100
+
+        async with resource_manager.track_job(job_id):
+            await asyncio.sleep(0.25)
+            status = resource_manager.get_job_status(job_id)
+            assert status["memory_over_limit_checks"] >= 2
+            assert status["memory_pressure"] > 1
+
     def test_cancel_job(self, resource_manager):
         """Test job cancellation."""
         job_id = "test-job-cancel"
@@ -223,8 +238,8 @@ class TestJobResourceMetrics:
         resource_manager._metrics.track_job_started.assert_called_once_with(job_id)
         resource_manager._metrics.track_job_completed.assert_called_once()
 
-        # Check resource usage metrics
-        resource_manager._metrics.track_resource_usage.assert_called()
-        calls = resource_manager._metrics.track_resource_usage.call_args_list
-        assert any(call[0][0] == "job_memory_mb" for call in calls)
-        assert any(call[0][0] == "job_cpu_seconds" for call in calls)
+        # Resource usage goes to the job profile, not to per-job Prometheus series
+        resource_manager._metrics.track_resource_usage.assert_not_called()
+        profile = get_job_profiler().get(job_id)
+        assert profile.status == "completed"
+        assert profile.samples
@@ -0,0 +1,190 @@
+"""Tests for memory-budget-driven batch sizing"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from patient_generator import memory_budget
+from patient_generator.memory_budget import MemoryBudgetController, memory_budget_bytes
+from patient_generator.patient import Patient
+from patient_generator.schemas_config import ConfigurationTemplateDB
+from src.domain.services.patient_generation_service import GenerationContext, PatientGenerationPipeline
+from src.domain.services.pipeline_pool import PipelinePool
+
+pytestmark = pytest.mark.unit
+
+MB = 1024 * 1024
+
+
+def _controller(headroom_bytes: int, **kwargs) -> MemoryBudgetController:
+    # A budget whose soft limit lies headroom_bytes above the current RSS
+    rss = MemoryBudgetController(budget_bytes=1).rss()
+    return MemoryBudgetController(budget_bytes=int((rss + headroom_bytes) / memory_budget.SOFT_LIMIT), **kwargs)
+
+
+def _config(total_patients: int) -> ConfigurationTemplateDB:
+    now = datetime(2025, 6, 1, 12, 0, tzinfo=timezone.utc)
+    return ConfigurationTemplateDB(
+        id="memory-budget",
+        name="Memory budget",
+        total_patients=total_patients,
+        injury_distribution={"Disease": 0.5, "Non-Battle Injury": 0.3, "Battle Injury": 0.2},
+        front_configs=[],
+        facility_configs=[],
+        created_at=now,
+        updated_at=now,
+    )
+
+
+def test_budget_is_the_job_memory_limit(monkeypatch):
+    """The budget is the limit JobResourceManager enforces, with the same default"""
+    monkeypatch.setenv("JOB_MAX_MEMORY_MB", "256")
+    assert memory_budget_bytes() == 256 * MB
+
+    monkeypatch.delenv("JOB_MAX_MEMORY_MB")
+    monkeypatch.setenv("PATIENT_GENERATOR_MAX_MEMORY", "4096")
+    assert memory_budget_bytes() == 512 * MB
+
+
+def test_measured_bytes_per_patient_size_batches():
+    """Measurements replace the estimate, and batches follow the remaining headroom"""
+    budget = _controller(100 * MB)
+    assert budget.batch_size() == memory_budget.MAX_BATCH_SIZE
+
+    budget.observe(100, 0)  # no growth carries no information
+    assert not budget.measured
+    budget.observe(100, 100 * 1024 * 1024)
+    assert budget.bytes_per_patient == MB
+    budget.observe(100, 300 * 1024 * 1024)
+    assert budget.bytes_per_patient == 2 * MB
+
+    assert 40 <= budget.batch_size() <= 50
+    assert budget.batch_size(limit=7) == 7
+
+    telemetry = budget.telemetry()
+    assert telemetry["bytes_per_patient_measured"]
+    assert telemetry["batches"] == 3
+    assert telemetry["batch_sizes"][0] == memory_budget.MAX_BATCH_SIZE
+    assert telemetry["smallest_batch_size"] == 7
+    assert telemetry["largest_batch_size"] == memory_budget.MAX_BATCH_SIZE
+
+
+@pytest.mark.asyncio()
+async def test_backpressure_waits_then_continues_at_minimum(monkeypatch):
+    """Over the budget generation waits briefly, then carries on with small batches"""
+    monkeypatch.setattr(memory_budget, "BACKPRESSURE_MAX_WAIT", 0.1)
+    monkeypatch.setattr(memory_budget, "BACKPRESSURE_INTERVAL", 0.01)
+    budget = MemoryBudgetController(budget_bytes=MB)
+
+    assert await budget.throttle() == memory_budget.MIN_BATCH_SIZE
+    assert budget.throttle_sync() == memory_budget.MIN_BATCH_SIZE
+
+    telemetry = budget.telemetry()
+    assert telemetry["backpressure_waits"] == 2
+    assert telemetry["backpressure_seconds"] >= 0.2
+    assert telemetry["peak_pressure"] > 1
+
+    relaxed = _controller(100 * MB)
+    assert await relaxed.throttle() == memory_budget.MAX_BATCH_SIZE
+    assert relaxed.backpressure_waits == 0
+
+
+def test_concurrent_runs_do_not_measure_each_other(monkeypatch):
+    """RSS growth is only attributed to a run that was alone for the whole batch"""
+    rss = [0]
+    first, second = MemoryBudgetController(budget_bytes=1024 * MB), MemoryBudgetController(budget_bytes=1024 * MB)
+    for budget in (first, second):
+        monkeypatch.setattr(budget, "rss", lambda: rss[0])
+
+    with first.running():
+        checkpoint = first.checkpoint()
+        with second.running():
+            rss[0] += 100 * MB
+        first.observe_since(100, checkpoint)
+        assert not first.measured
+
+        checkpoint = first.checkpoint()
+        rss[0] += 100 * MB
+        first.observe_since(100, checkpoint)
+
+    assert first.bytes_per_patient == MB
+    assert first.telemetry()["shared_measurements"] == 1
+
+
+def test_simulator_generates_in_requested_batches(monkeypatch):
+    """Temporal and legacy generation both yield batches of the size asked for"""
+    pool = PipelinePool()
+    _, simulator = pool.checkout(_config(25))
+    requested = []
+
+    def batch_size(remaining):
+        requested.append(remaining)
+        return 10
+
+    batches = list(simulator.iter_casualty_batches(batch_size))
+    assert [len(batch) for batch in batches] == [10, 10, 5]
+    assert requested == [25, 15, 5]
+    assert [patient.id for batch in batches for patient in batch] == list(range(25))
+    assert all(patient.injury_timestamp is not None for batch in batches for patient in batch)
+
+    monkeypatch.setattr(simulator, "_load_injuries_config", dict)
+    batches = list(simulator.iter_casualty_batches(lambda _remaining: 7))
+    assert [len(batch) for batch in batches] == [7, 7, 7, 4]
+
+
+class _RecordingBudget(MemoryBudgetController):
+    """Budget that records the calls generation makes between batches."""
+
+    def __init__(self):
+        super().__init__(budget_bytes=1024 * MB)
+        self.calls = []
+
+    def batch_size(self, limit=None):
+        return 8
+
+    def observe_since(self, patients, checkpoint):
+        self.calls.append(("observe", patients))
+
+    async def throttle(self):
+        self.calls.append(("throttle",))
+        return 5
+
+
+class _BatchSimulator:
+    def __init__(self, total):
+        self.total = total
+        self.requested = []
+
+    def iter_casualty_batches(self, batch_size):
+        next_id = 0
+        while next_id < self.total:
+            size = min(batch_size(self.total - next_id), self.total - next_id)
+            self.requested.append(size)
+            yield [Patient(i) for i in range(next_id, next_id + size)]
+            next_id += size
+
+
+@pytest.mark.asyncio()
+async def test_base_patients_are_generated_in_budget_sized_batches(tmp_path):
+    """Each batch is measured and followed by a throttle that sizes the next one"""
+    simulator = _BatchSimulator(20)
+    budget = _RecordingBudget()
+    pipeline = PatientGenerationPipeline(simulator, None, None, None)
+    context = GenerationContext(
+        config=_config(20), job_id="batches", output_directory=str(tmp_path), memory_budget=budget
+    )
+
+    patients = [patient async for patient in pipeline._generate_base_patients(context)]
+
+    assert [patient.id for patient in patients] == list(range(20))
+    assert simulator.requested == [8, 5, 5, 2]
+    assert budget.calls == [
+        ("observe", 8),
+        ("throttle",),
+        ("observe", 5),
+        ("throttle",),
+        ("observe", 5),
+        ("throttle",),
+        ("observe", 2),
+        ("throttle",),
+    ]
@@ -0,0 +1,68 @@
+"""Tests for the ASGI metrics middleware"""
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+import pytest
+
+from src.api.v1.middleware.metrics import UNMATCHED_ROUTE, MetricsMiddleware, RouteTemplates
+from src.core.metrics import registry
+
+pytestmark = pytest.mark.unit
+
+
+def _build_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/metrics-test/jobs/summary")
+    async def summary():
+        return {"ok": True}
+
+    @app.get("/metrics-test/jobs/{job_id}")
+    async def job(job_id: str):
+        return {"job_id": job_id}
+
+    @app.get("/metrics-test/stream")
+    async def stream():
+        async def body():
+            for _ in range(4):
+                yield b"x" * 1000
+
+        return StreamingResponse(body(), media_type="application/octet-stream")
+
+    return app
+
+
+def _sample(name, endpoint, **labels):
+    return registry.get_sample_value(name, {"endpoint": endpoint, "method": "GET", **labels}) or 0
+
+
+def test_paths_resolve_to_route_templates():
+    """Concrete paths resolve to their route template; unknown paths share one label"""
+    app = _build_app()
+    templates = RouteTemplates(app.routes)
+
+    assert templates.resolve("/metrics-test/jobs/summary") == "/metrics-test/jobs/summary"
+    assert templates.resolve("/metrics-test/jobs/3f2a-77") == "/metrics-test/jobs/:job_id"
+    assert templates.resolve("/nowhere/1") == UNMATCHED_ROUTE
+
+
+def test_streamed_response_timing_and_size():
+    """A streamed body is measured to its last byte and its size is recorded per route"""
+    client = TestClient(_build_app())
+    endpoint = "/metrics-test/stream"
+    requests_before = _sample("api_requests_total", endpoint, status="200")
+    bytes_before = _sample("api_response_size_bytes_sum", endpoint)
+
+    response = client.get(endpoint)
+
+    assert response.status_code == 200
+    assert response.headers["X-Response-Time"].endswith("ms")
+    assert _sample("api_requests_total", endpoint, status="200") == requests_before + 1
+    assert _sample("api_response_size_bytes_sum", endpoint) == bytes_before + 4000
+    assert _sample("api_response_first_byte_seconds_count", endpoint) >= 1
+    assert _sample("api_response_stream_duration_seconds_count", endpoint) >= 1
+
+    client.get("/metrics-test/jobs/job-42")
+    assert _sample("api_requests_total", "/metrics-test/jobs/:job_id", status="200") >= 1
@@ -0,0 +1,203 @@
+"""Tests for the warm generation pipeline pool"""
+
+from datetime import datetime, timezone
+import os
+import pickle
+import threading
+
+import pytest
+
+from patient_generator.config_manager import inline_configuration
+from patient_generator.schemas_config import ConfigurationTemplateCreate, ConfigurationTemplateDB
+from src.domain.services.patient_generation_service import GenerationContext, PatientGenerationPipeline
+from src.domain.services.pipeline_pool import PipelinePool
+
+
+def _config(config_id="cfg-a", updated_at=None, total_patients=25):
+    now = datetime(2025, 6, 1, 12, 0, tzinfo=timezone.utc)
+    return ConfigurationTemplateDB(
+        id=config_id,
+        name=f"Config {config_id}",
+        total_patients=total_patients,
+        injury_distribution={"Disease": 0.5, "Non-Battle Injury": 0.3, "Battle Injury": 0.2},
+        front_configs=[],
+        facility_configs=[],
+        created_at=now,
+        updated_at=updated_at or now,
+    )
+
+
+def test_checkout_reuses_stack_with_separate_job_state():
+    """Jobs share loaded models but not patients or front overrides"""
+    pool = PipelinePool()
+    manager, first = pool.checkout(_config())
+    same_manager, second = pool.checkout(_config())
+
+    assert same_manager is manager
+    assert (pool.hits, pool.misses) == (1, 1)
+    assert first is not second
+    assert first.evacuation_manager is second.evacuation_manager
+    assert first.warfare_modifiers is second.warfare_modifiers
+
+    first.patients.append("patient")
+    first.front_distribution["override"] = 1.0
+    first.total_patients_to_generate = 3
+    assert second.patients == []
+    assert "override" not in second.front_distribution
+    assert second.total_patients_to_generate == 25
+
+
+def test_new_config_version_replaces_old_stack():
+    """Updating a configuration rebuilds its stack and drops the old one"""
+    pool = PipelinePool()
+    manager, _ = pool.checkout(_config())
+    updated = _config(updated_at=datetime(2025, 6, 2, tzinfo=timezone.utc), total_patients=40)
+    new_manager, simulator = pool.checkout(updated)
+
+    assert new_manager is not manager
+    assert simulator.total_patients_to_generate == 40
+    assert len(pool) == 1
+
+
+@pytest.mark.asyncio()
+async def test_forks_size_batches_for_their_own_job(tmp_path):
+    """A job reusing a stack built for a small job gets the batch size for its own total"""
+    pool = PipelinePool()
+    _, small_job = pool.checkout(_config(total_patients=20))
+    _, large_job = pool.checkout(_config(total_patients=6000))
+    assert large_job.batch_size == small_job.batch_size == large_job.batch_size_for(20)
+
+    context = GenerationContext(config=_config(total_patients=6000), job_id="large", output_directory=str(tmp_path))
+    await PatientGenerationPipeline(large_job, None, None, None)._initialize_generators(context)
+
+    assert large_job.total_patients_to_generate == 6000
+    assert large_job.batch_size == large_job.batch_size_for(6000) != small_job.batch_size
+
+
+def test_static_file_change_and_lru_eviction(tmp_path):
+    """Touching a static file changes the key; the pool stays within its size"""
+    static_file = tmp_path / "fronts_config.json"
+    static_file.write_text("{}")
+    pool = PipelinePool(maxsize=2, static_paths=[str(static_file), str(tmp_path / "missing.json")])
+
+    key = pool.key_for(_config())
+    stat = static_file.stat()
+    os.utime(static_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert pool.key_for(_config()) != key
+
+    for config_id in ("a", "b", "c"):
+        pool.checkout(_config(config_id))
+    assert len(pool) == 2
+    pool.invalidate("c")
+    assert len(pool) == 1
+
+
+def test_identical_inline_configurations_share_a_stack():
+    """Inline configurations stay in memory and differ only by content, not by job"""
+
+    def inline(total_patients, injury_distribution):
+        return inline_configuration(
+            ConfigurationTemplateCreate(
+                name="Inline",
+                total_patients=total_patients,
+                injury_distribution=injury_distribution,
+                front_configs=[],
+                facility_configs=[],
+            )
+        )
+
+    mix = {"Disease": 0.5, "Non-Battle Injury": 0.3, "Battle Injury": 0.2}
+    first, second = inline(10, mix), inline(500, mix)
+    other = inline(10, {"Disease": 1.0})
+    assert first.id == second.id != other.id
+
+    pool = PipelinePool()
+    manager, _ = pool.checkout(first)
+    same_manager, _ = pool.checkout(second)
+    assert same_manager is manager
+    assert manager.get_active_configuration() is first
+    assert manager._repository is None
+    pool.checkout(other)
+    assert (pool.hits, pool.misses) == (1, 2)
+
+
+def test_feature_flags_are_part_of_the_key(monkeypatch):
+    """Toggling a model switch builds a new stack instead of reusing one built without it"""
+    pool = PipelinePool()
+    monkeypatch.setenv("ENABLE_MARKOV_CHAIN", "true")
+    _, with_chain = pool.checkout(_config())
+    monkeypatch.setenv("ENABLE_MARKOV_CHAIN", "false")
+    _, without_chain = pool.checkout(_config())
+
+    assert with_chain.markov_chain is not None
+    assert without_chain.markov_chain is None
+    assert (pool.hits, pool.misses) == (0, 2)
+
+
+def test_cold_builds_lock_per_key(monkeypatch):
+    """Different keys build in parallel; concurrent jobs for one key share a single build"""
+    pool = PipelinePool()
+    build = pool._build
+    both_building = threading.Barrier(2, timeout=10)
+    built = []
+
+    def rendezvous_build(key, config, database_instance):
+        built.append(key[0])
+        if key[0] != "same":
+            both_building.wait()  # times out if the other key's build is held up
+        return build(key, config, database_instance)
+
+    monkeypatch.setattr(pool, "_build", rendezvous_build)
+
+    def run(config_ids):
+        threads = [threading.Thread(target=pool.checkout, args=(_config(config_id),)) for config_id in config_ids]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    run(["a", "b"])
+    assert sorted(built) == ["a", "b"]
+    assert not both_building.broken
+
+    run(["same"] * 4)
+    assert built.count("same") == 1
+    assert (pool.hits, pool.misses) == (3, 3)
+
+
+def _snapshot(obj, skip=()):
+    return pickle.dumps({name: value for name, value in vars(obj).items() if name not in skip})
+
+
+def test_generation_leaves_shared_components_unchanged():
+    """Forks share models by reference, so generating must not modify them"""
+    pool = PipelinePool()
+    manager, _ = pool.checkout(_config(total_patients=20))
+    (stack,) = pool._stacks.values()
+    base = stack.flow_simulator
+    models = {
+        "evacuation_manager": ((), base.evacuation_manager),
+        "markov_chain": ((), base.markov_chain),
+        "warfare_modifiers": ((), base.warfare_modifiers),
+        # utility_rows is a deterministic memo and the catalog is append-only
+        "treatment_model": (("utility_rows", "catalog"), base.treatment_model),
+    }
+    # The job-owned fields are replaced on every fork
+    simulator_skip = ("patients", "front_configs", "front_distribution", *models, "config_manager")
+    before = {name: _snapshot(model, skip) for name, (skip, model) in models.items() if model is not None}
+    simulator_before = _snapshot(base, simulator_skip)
+
+    forks = [pool.checkout(_config(total_patients=20))[1] for _ in range(2)]
+    cohorts = []
+    threads = [threading.Thread(target=lambda f=fork: cohorts.append(f.generate_casualty_flow())) for fork in forks]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [len(cohort) for cohort in cohorts] == [20, 20]
+    assert base.patients == []
+    assert {name: _snapshot(model, skip) for name, (skip, model) in models.items() if model is not None} == before
+    assert _snapshot(base, simulator_skip) == simulator_before
+    assert manager.get_active_configuration() is stack.config_manager.get_active_configuration()
+    assert manager.get_active_configuration().total_patients == 20
@@ -0,0 +1,72 @@
+"""Tests for coalesced progress reporting"""
+
+import asyncio
+
+import pytest
+
+from src.core.progress import ProgressReporter
+
+
+def _report(processed, total=10_000, phase="generating_patients"):
+    return {"progress": processed / total, "processed_patients": processed, "current_phase": phase}
+
+
+@pytest.mark.asyncio()
+async def test_per_patient_reports_are_coalesced():
+    """10k per-patient reports publish about once per percent, ending with the final count"""
+    published = []
+
+    async def sink(data):
+        published.append(data["processed_patients"])
+
+    reporter = ProgressReporter(sink, max_rate=0)
+    for processed in range(1, 10_001):
+        reporter.report(_report(processed))
+        await asyncio.sleep(0)
+    await reporter.aclose()
+
+    assert reporter.reported == 10_000
+    assert 95 <= len(published) <= 102
+    assert published == sorted(published)
+    assert published[-1] == 10_000
+
+
+@pytest.mark.asyncio()
+async def test_slow_sink_keeps_one_write_in_flight():
+    """While the sink is busy newer reports replace older ones; phase changes always publish"""
+    published = []
+    release = asyncio.Event()
+
+    async def sink(data):
+        await release.wait()
+        published.append((data["current_phase"], data["processed_patients"]))
+
+    reporter = ProgressReporter(sink, max_rate=0)
+    reporter.report(_report(0, phase="initializing"))
+    await asyncio.sleep(0)
+    for processed in range(100, 1001, 100):
+        reporter.report(_report(processed))
+    release.set()
+    await reporter.aclose(final=_report(1000, phase="completed"))
+
+    assert published == [("initializing", 0), ("generating_patients", 1000), ("completed", 1000)]
+
+
+@pytest.mark.asyncio()
+async def test_rate_cap_and_sink_errors():
+    """Reports inside the rate window are held back; sink failures do not propagate"""
+    calls = []
+
+    async def failing_sink(data):
+        calls.append(data["processed_patients"])
+        msg = "redis down"
+        raise ConnectionError(msg)
+
+    reporter = ProgressReporter(failing_sink, max_rate=1)
+    for processed in range(0, 5000, 1000):
+        reporter.report(_report(processed))
+    await reporter.aclose()
+
+    # The first report publishes; the rest fall inside one second and only the last is flushed
+    assert calls == [0, 4000]
+    assert reporter.published == 0
@@ -0,0 +1,186 @@
+"""Tests for the API key rate limiter"""
+
+from unittest.mock import AsyncMock, MagicMock
+
+from fastapi import BackgroundTasks, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+import pytest
+
+from src.api.v1.models import GenerationRequest
+from src.api.v1.routers import jobs
+from src.api.v1.routers.generation import generate_patients
+from src.api.v1.routers.streaming import stream_patients_with_config
+from src.core import rate_limiter as rate_limiter_module, security_enhanced
+from src.core.rate_limiter import PATIENTS_PER_DAY, REFUND_SCRIPT, REQUESTS_PER_MINUTE, RateLimiter
+from src.core.security_enhanced import (
+    APIKeyContext,
+    enforce_patient_quota,
+    enforce_request_rate,
+    refund_patient_quota,
+    verify_api_key_context,
+)
+from src.domain.models.api_key import APIKey
+
+
+class _ScriptCache:
+    """Shared window store applying the sliding-window script's grant rules within one window"""
+
+    def __init__(self):
+        self.counts = {}
+        self.calls = 0
+
+    async def eval_script(self, script, keys, args):
+        self.calls += 1
+        if script == REFUND_SCRIPT:
+            refunded = min(self.counts.get(keys[0], 0), args[0])
+            self.counts[keys[0]] = self.counts.get(keys[0], 0) - refunded
+            return args[0] - refunded
+        limit, cost, want, window_ms = args
+        used = self.counts.get(keys[0], 0)
+        available = limit - used
+        granted = want if available >= want else cost if available >= cost else 0
+        self.counts[keys[0]] = used + granted
+        return [granted, max(available - granted, 0), window_ms]
+
+
+@pytest.mark.asyncio()
+async def test_leases_serve_most_checks_locally_without_over_admitting(monkeypatch):
+    """Two replicas sharing Redis admit exactly the limit, mostly from their local buckets"""
+    cache = _ScriptCache()
+    monkeypatch.setattr(rate_limiter_module, "get_cache_service", lambda: cache)
+    replicas = [RateLimiter(lease_fraction=0.1, sync_interval=60), RateLimiter(lease_fraction=0.1, sync_interval=60)]
+
+    admitted = 0
+    for i in range(150):
+        decision = await replicas[i % 2].hit("sk_live_shared", REQUESTS_PER_MINUTE, 100)
+        admitted += decision.allowed
+        assert 0 <= decision.remaining <= 100
+
+    assert admitted <= 100
+    assert admitted >= 100 - 2 * 10
+    assert cache.calls < 150 / 3
+    assert sum(limiter.local_hits for limiter in replicas) > 100
+
+    # Large costs skip the lease and are all-or-nothing
+    decision = await replicas[0].hit("sk_live_shared", PATIENTS_PER_DAY, 1000, cost=600)
+    assert (decision.allowed, decision.remaining) == (True, 400)
+    assert not (await replicas[1].hit("sk_live_shared", PATIENTS_PER_DAY, 1000, cost=500)).allowed
+
+    # A refund frees the shared units and drops the refunding replica's remembered denial
+    assert not (await replicas[0].hit("sk_live_shared", PATIENTS_PER_DAY, 1000, cost=500)).allowed
+    await replicas[0].refund("sk_live_shared", PATIENTS_PER_DAY, 600)
+    assert (await replicas[0].hit("sk_live_shared", PATIENTS_PER_DAY, 1000, cost=500)).allowed
+
+
+@pytest.mark.asyncio()
+async def test_limits_are_enforced_with_headers_without_redis(monkeypatch):
+    """Without Redis the limiter falls back to a per-process window and still sets headers"""
+    monkeypatch.setattr(rate_limiter_module, "get_cache_service", lambda: None)
+    monkeypatch.setattr(security_enhanced, "get_rate_limiter", lambda: limiter)
+    monkeypatch.setattr(security_enhanced.settings, "RATE_LIMIT_ENABLED", True)
+    limiter = RateLimiter()
+
+    key = APIKey(
+        key="sk_live_local", name="Local", max_requests_per_minute=2, key_metadata={"max_patients_per_day": 30}
+    )
+    context = APIKeyContext(api_key=key)
+    for expected_remaining in (1, 0):
+        await enforce_request_rate(context)
+        assert context.get_response_headers()["X-RateLimit-Remaining"] == str(expected_remaining)
+    assert context.get_response_headers()["X-RateLimit-Limit"] == "2"
+
+    with pytest.raises(HTTPException) as exc_info:
+        await enforce_request_rate(context)
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.headers["X-RateLimit-Remaining"] == "0"
+    assert int(exc_info.value.headers["Retry-After"]) >= 1
+
+    await enforce_patient_quota(context, 20)
+    with pytest.raises(HTTPException) as exc_info:
+        await enforce_patient_quota(context, 20)
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.headers["X-Limit-Type"] == "patients_per_day"
+
+    await refund_patient_quota(context, 20)
+    await enforce_patient_quota(context, 20)
+
+
+@pytest.mark.asyncio()
+async def test_patient_quota_is_refunded_when_the_job_is_not_created(monkeypatch):
+    """Patients are charged after validation and given back if the job cannot be created"""
+    monkeypatch.setattr(rate_limiter_module, "get_cache_service", lambda: None)
+    monkeypatch.setattr(security_enhanced, "get_rate_limiter", lambda: limiter)
+    monkeypatch.setattr(security_enhanced.settings, "RATE_LIMIT_ENABLED", True)
+    limiter = RateLimiter()
+    context = APIKeyContext(
+        api_key=APIKey(key="sk_live_refund", name="Refund", key_metadata={"max_patients_per_day": 30})
+    )
+    job_service = AsyncMock()
+    job_service.create_job.side_effect = RuntimeError("job store unavailable")
+    request = GenerationRequest(configuration={"name": "Refund", "total_patients": 20})
+
+    for _ in range(2):
+        with pytest.raises(HTTPException) as exc_info:
+            await generate_patients(request, BackgroundTasks(), context, job_service, None, None)
+        assert exc_info.value.status_code == 500
+    assert (await limiter.hit("sk_live_refund", PATIENTS_PER_DAY, 30, cost=30)).allowed
+
+
+@pytest.mark.asyncio()
+async def test_streamed_patients_are_charged_and_the_undelivered_rest_refunded(monkeypatch):
+    """Streaming charges the daily quota up front and refunds patients the stream never produced"""
+    monkeypatch.setattr(rate_limiter_module, "get_cache_service", lambda: None)
+    monkeypatch.setattr(security_enhanced, "get_rate_limiter", lambda: limiter)
+    monkeypatch.setattr(security_enhanced.settings, "RATE_LIMIT_ENABLED", True)
+    limiter = RateLimiter()
+    context = APIKeyContext(
+        api_key=APIKey(key="sk_live_stream", name="Stream", key_metadata={"max_patients_per_day": 10})
+    )
+
+    async def generate(_context):
+        for patient_id in range(5):
+            yield MagicMock(), {"id": patient_id}
+
+    service = MagicMock()
+    service.cached_demographics.warm_cache = AsyncMock()
+    service.cached_medical.warm_cache = AsyncMock()
+    service.pipeline.generate = generate
+
+    async def stream(total_patients):
+        return await stream_patients_with_config(
+            {"name": "Stream", "total_patients": total_patients},
+            100,
+            "ndjson",
+            accept_encoding=None,
+            api_key_context=context,
+            generation_service=service,
+        )
+
+    with pytest.raises(HTTPException) as exc_info:
+        await stream(11)
+    assert exc_info.value.status_code == 429
+
+    response = await stream(8)
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    assert len(body.splitlines()) == 5
+
+    # 8 charged, 3 never generated and refunded
+    assert (await limiter.hit("sk_live_stream", PATIENTS_PER_DAY, 10, cost=5)).allowed
+    assert not (await limiter.hit("sk_live_stream", PATIENTS_PER_DAY, 10, cost=1)).allowed
+
+
+def test_job_routes_verify_the_key_once_per_request():
+    """The router-level key check and the admin check share one verification"""
+    calls = []
+
+    async def verify():
+        calls.append(1)
+        return APIKeyContext(api_key=APIKey(key="sk_live_admin", name="Admin", key_metadata={"admin": True}))
+
+    app = FastAPI()
+    app.include_router(jobs.router)
+    app.dependency_overrides[verify_api_key_context] = verify
+
+    response = TestClient(app).post("/jobs/missing-job/profile/stacks", params={"seconds": 1})
+    assert response.status_code == 404
+    assert len(calls) == 1
@@ -0,0 +1,65 @@
+"""Tests for the reference data registry"""
+
+import copy
+import json
+import os
+import pickle
+
+import pytest
+
+from patient_generator.reference_data import FrozenDict, FrozenList, ReferenceDataRegistry, strip_comments, thaw
+
+
+def _write(path, data, mtime_bump=0):
+    path.write_text(json.dumps(data))
+    if mtime_bump:
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + mtime_bump))
+
+
+def test_files_are_parsed_once_and_frozen(tmp_path):
+    """Repeat lookups return the same read-only view"""
+    _write(tmp_path / "table.json", {"_comment": "notes", "rates": [1, 2], "nested": {"a": 1}})
+    registry = ReferenceDataRegistry(base_dir=str(tmp_path))
+
+    data = registry.get("table.json", strip_comments)
+    assert registry.get("table.json", strip_comments) is data
+    assert (registry.misses, registry.hits) == (1, 1)
+    assert "_comment" not in data
+    assert isinstance(data["rates"], FrozenList)
+    assert isinstance(data["nested"], FrozenDict)
+
+    with pytest.raises(TypeError, match="read-only"):
+        data["rates"].append(3)
+    with pytest.raises(TypeError, match="read-only"):
+        data["nested"]["a"] = 2
+
+    mutable = registry.get_mutable("table.json", strip_comments)
+    mutable["nested"]["a"] = 2
+    assert data["nested"]["a"] == 1
+    assert copy.deepcopy(data) == thaw(data)
+    assert pickle.loads(pickle.dumps(data)) == data
+    assert json.loads(json.dumps(data)) == thaw(data)
+
+
+def test_changed_files_are_reloaded(tmp_path):
+    """A content change reloads the file; a bare touch keeps the parsed view"""
+    path = tmp_path / "table.json"
+    _write(path, {"value": 1})
+    events = []
+    registry = ReferenceDataRegistry(base_dir=str(tmp_path))
+    registry.add_listener(lambda event, _path: events.append(event))
+
+    first = registry.get("table.json")
+    _write(path, {"value": 1}, mtime_bump=1_000_000_000)
+    assert registry.get("table.json") is first
+
+    _write(path, {"value": 22}, mtime_bump=2_000_000_000)
+    assert registry.get("table.json")["value"] == 22
+    assert events == ["miss", "hit", "reload"]
+    assert registry.reloads == 1
+
+    registry.invalidate("table.json")
+    assert len(registry) == 0
+    with pytest.raises(FileNotFoundError):
+        registry.get("missing.json")
@@ -0,0 +1,75 @@
+"""Tests for the compiled reference data snapshot"""
+
+import json
+import os
+
+import pytest
+
+from patient_generator.reference_data import ReferenceDataRegistry
+from patient_generator.reference_snapshot import (
+    SNAPSHOT_TABLES,
+    SnapshotError,
+    build_snapshot,
+    ensure_snapshot,
+    load_snapshot,
+)
+
+
+@pytest.fixture()
+def sources(tmp_path):
+    for index, name in enumerate(SNAPSHOT_TABLES):
+        (tmp_path / name).write_text(json.dumps({"table": name, "values": [index, index + 0.5], "nested": {"k": None}}))
+    return tmp_path
+
+
+def test_snapshot_round_trips_tables(sources, tmp_path):
+    """Tables read back from the mmapped snapshot equal the JSON sources"""
+    path = str(tmp_path / "snapshot.bin")
+    build_snapshot(path, base_dir=str(sources))
+    snapshot = load_snapshot(path)
+
+    assert set(snapshot.tables) == set(SNAPSHOT_TABLES)
+    assert snapshot.tables["injuries.json"] == json.loads((sources / "injuries.json").read_text())
+    assert not snapshot.is_stale(str(sources))
+
+    registry = ReferenceDataRegistry(base_dir=str(sources))
+    assert snapshot.seed(registry, str(sources)) == len(SNAPSHOT_TABLES)
+    assert registry.get("warfare_patterns.json")["table"] == "warfare_patterns.json"
+    assert (registry.hits, registry.misses) == (1, 0)
+
+
+def test_corrupt_snapshot_is_rejected_and_rebuilt(sources, tmp_path):
+    """A damaged file fails its checksum; ensure_snapshot rebuilds it"""
+    path = tmp_path / "snapshot.bin"
+    build_snapshot(str(path), base_dir=str(sources))
+    data = bytearray(path.read_bytes())
+    data[-1] ^= 0xFF
+    path.write_bytes(bytes(data))
+
+    with pytest.raises(SnapshotError, match="checksum"):
+        load_snapshot(str(path))
+    with pytest.raises(SnapshotError):
+        load_snapshot(str(tmp_path / "missing.bin"))
+
+    snapshot, seeded = ensure_snapshot(str(path), ReferenceDataRegistry(base_dir=str(sources)), str(sources))
+    assert seeded == len(SNAPSHOT_TABLES)
+    assert load_snapshot(str(path)).tables == snapshot.tables
+
+
+def test_stale_snapshot_is_rebuilt(sources, tmp_path):
+    """Changing a source invalidates the snapshot; touching it does not"""
+    path = str(tmp_path / "snapshot.bin")
+    build_snapshot(path, base_dir=str(sources))
+    source = sources / "injuries.json"
+
+    stat = source.stat()
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert not load_snapshot(path).is_stale(str(sources))
+
+    source.write_text(json.dumps({"table": "changed"}))
+    assert load_snapshot(path).is_stale(str(sources))
+
+    registry = ReferenceDataRegistry(base_dir=str(sources))
+    ensure_snapshot(path, registry, str(sources))
+    assert load_snapshot(path).tables["injuries.json"] == {"table": "changed"}
+    assert registry.get("injuries.json") == {"table": "changed"}
@@ -0,0 +1,140 @@
+"""Tests for the Monte-Carlo scenario sweep runner"""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from patient_generator.patient import Patient
+from patient_generator.scenario_sweep import (
+    OUTCOMES,
+    ReplicateAccumulator,
+    ReplicateAggregate,
+    ScenarioSweepRunner,
+    classify_outcome,
+)
+
+
+def _patient_with_timeline(events, current_status="POI", final_status=None):
+    patient = Patient(1)
+    patient.final_status = final_status
+    patient.injury_timestamp = datetime(2025, 6, 1, 2, 0, tzinfo=timezone.utc)
+    patient.movement_timeline = events
+    patient.current_status = current_status
+    return patient
+
+
+def test_outcome_classification():
+    """Deaths at POI are KIA, deaths after reaching a role are DOW"""
+    kia = _patient_with_timeline([{"event_type": "kia", "facility": "POI", "hours_since_injury": 0.5}])
+    dow = _patient_with_timeline(
+        [
+            {"event_type": "arrival", "facility": "Role1", "hours_since_injury": 1.0},
+            {"event_type": "kia", "facility": "Role1", "hours_since_injury": 3.0},
+        ]
+    )
+    rtd = _patient_with_timeline([{"event_type": "rtd", "facility": "Role2", "hours_since_injury": 9.0}])
+    bridge_dow = _patient_with_timeline([], current_status="DOW")
+
+    assert classify_outcome(kia) == "KIA"
+    assert classify_outcome(dow) == "DOW"
+    assert classify_outcome(rtd) == "RTD"
+    assert classify_outcome(bridge_dow) == "DOW"
+    assert classify_outcome(_patient_with_timeline([])) == "Remains_Role4"
+
+
+def test_final_status_decides_the_outcome():
+    """The recorded final status wins over the timeline; the timeline only places a death"""
+    died_at_role = [
+        {"event_type": "arrival", "facility": "Role2", "hours_since_injury": 4.0},
+        {"event_type": "kia", "facility": "Role2", "hours_since_injury": 6.0},
+    ]
+    rtd_event = [{"event_type": "rtd", "facility": "Role1", "hours_since_injury": 2.0}]
+
+    assert classify_outcome(_patient_with_timeline(died_at_role, final_status="KIA")) == "DOW"
+    assert classify_outcome(_patient_with_timeline([], final_status="KIA")) == "KIA"
+    assert classify_outcome(_patient_with_timeline(rtd_event, final_status="Remains_Role4")) == "Remains_Role4"
+    assert classify_outcome(_patient_with_timeline([], current_status="Role3", final_status="RTD")) == "RTD"
+
+
+def test_accumulator_tracks_time_to_role_and_peak_occupancy():
+    """Overlapping stays at the same role raise peak occupancy"""
+    base = datetime(2025, 6, 1, tzinfo=timezone.utc)
+    accumulator = ReplicateAccumulator(ReplicateAggregate(0, 0, 0), base)
+
+    for _ in range(3):
+        accumulator.add_patient(
+            _patient_with_timeline(
+                [
+                    {"event_type": "arrival", "facility": "POI", "hours_since_injury": 0.0},
+                    {"event_type": "arrival", "facility": "Role1", "hours_since_injury": 1.5},
+                    {"event_type": "transit_start", "facility": "Role1", "hours_since_injury": 5.0},
+                    {"event_type": "arrival", "facility": "Role2", "hours_since_injury": 6.0},
+                    {"event_type": "rtd", "facility": "Role2", "hours_since_injury": 20.0},
+                ]
+            )
+        )
+
+    aggregate = accumulator.finalize()
+    assert aggregate.patients == 3
+    assert aggregate.outcome_counts["RTD"] == 3
+    assert aggregate.peak_occupancy["Role1"] == 3
+    assert aggregate.peak_occupancy["Role2"] == 3
+    assert aggregate.peak_occupancy["Role3"] == 0
+    assert aggregate.mean_time_to_role("Role1") == pytest.approx(1.5)
+    assert aggregate.mean_time_to_role("Role3") is None
+    assert sum(aggregate.time_to_role_histograms["Role2"]) == 3
+
+
+def test_grid_expansion_and_validation():
+    """Grid expands to the cartesian product and rejects unknown keys"""
+    runner = ScenarioSweepRunner(
+        {"intensity": ["medium", "high"], "warfare_types": [["conventional"], ["artillery", "drone"]]},
+        replicates=2,
+        total_patients=10,
+    )
+    scenarios, labels = runner.scenarios()
+    assert len(scenarios) == 4
+    assert scenarios[1]["warfare_types"]["artillery"] is True
+    assert scenarios[1]["warfare_types"]["conventional"] is False
+    assert "warfare_types=artillery+drone" in labels[1]
+    assert len(runner.replicate_specs(scenarios)) == 8
+    assert len({spec.seed for spec in runner.replicate_specs(scenarios)}) == 8
+
+    with pytest.raises(ValueError, match="Unsupported sweep parameter"):
+        ScenarioSweepRunner({"not_a_parameter": [1]})
+    with pytest.raises(ValueError, match="Unknown option"):
+        ScenarioSweepRunner({"warfare_types": [["laser"]]}).scenarios()
+
+
+def test_replicate_seeds_do_not_collide():
+    """Seeds stay distinct past 10007 replicates and do not depend on the replicate count"""
+    runner = ScenarioSweepRunner({"intensity": ["medium", "high"]}, replicates=10_010, total_patients=10)
+    scenarios, _ = runner.scenarios()
+    specs = runner.replicate_specs(scenarios)
+    assert len({spec.seed for spec in specs}) == len(specs) == 20_020
+
+    fewer = ScenarioSweepRunner({"intensity": ["medium", "high"]}, replicates=3, total_patients=10)
+    assert [spec.seed for spec in fewer.replicate_specs(scenarios)] == [
+        spec.seed for spec in specs if spec.replicate_index < 3
+    ]
+
+
+def test_sweep_run_is_reproducible():
+    """Same seed gives the same aggregates inline and across worker processes"""
+    grid = {"intensity": ["medium", "high"]}
+    inline = ScenarioSweepRunner(grid, replicates=2, total_patients=60, max_workers=1, base_seed=7).run()
+    pooled = ScenarioSweepRunner(grid, replicates=2, total_patients=60, max_workers=2, base_seed=7).run()
+
+    assert len(inline.aggregates) == 4
+    assert [a.outcome_counts for a in inline.aggregates] == [a.outcome_counts for a in pooled.aggregates]
+
+    rows = inline.summary_rows()
+    assert len(rows) == 2
+    for row in rows:
+        assert row["replicates"] == 2
+        assert row["patients_mean"] == 60
+        assert sum(row[f"{outcome}_rate"] for outcome in OUTCOMES) == pytest.approx(1.0)
+
+    table = inline.format_table()
+    assert "intensity=medium" in table
+    assert "4 replicates, 240 patients" in table
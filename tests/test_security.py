@@ -2,16 +2,25 @@
 Tests for security utilities with enhanced API key system.
 """
 
-from unittest.mock import AsyncMock, Mock, patch
+from unittest.mock import Mock, patch
 
 from fastapi import HTTPException
 import pytest
 from sqlalchemy.orm import Session
 
+from src.core.api_key_cache import get_api_key_cache
 from src.core.security_enhanced import DEMO_API_KEY, verify_api_key, verify_api_key_context
 from src.domain.models.api_key import APIKey
 
 
+@pytest.fixture(autouse=True)
+def _empty_api_key_cache():
+    """Each test looks its key up through the mocked repository"""
+    get_api_key_cache().invalidate()
+    yield
+    get_api_key_cache().invalidate()
+
+
 @pytest.mark.asyncio()
 async def test_verify_api_key_with_demo_key():
     """Test API key verification with demo key."""
@@ -32,7 +41,7 @@ async def test_verify_api_key_with_demo_key():
         mock_repo = MockRepo.return_value
         mock_repo.get_by_key.return_value = mock_demo_key
 
-        result = await verify_api_key(api_key=DEMO_API_KEY, db=mock_db)
+        result = await verify_api_key(await verify_api_key_context(api_key=DEMO_API_KEY, db=mock_db))
         assert result == DEMO_API_KEY
 
 
@@ -43,7 +52,7 @@ async def test_verify_api_key_missing():
     mock_db = Mock(spec=Session)
 
     with pytest.raises(HTTPException) as exc_info:
-        await verify_api_key(api_key=None, db=mock_db)
+        await verify_api_key(await verify_api_key_context(api_key=None, db=mock_db))
 
     assert exc_info.value.status_code == 401
     assert exc_info.value.detail == "Missing API Key"
@@ -61,7 +70,7 @@ async def test_verify_api_key_invalid():
         mock_repo.get_by_key.return_value = None
 
         with pytest.raises(HTTPException) as exc_info:
-            await verify_api_key(api_key="invalid-key-12345", db=mock_db)
+            await verify_api_key(await verify_api_key_context(api_key="invalid-key-12345", db=mock_db))
 
         assert exc_info.value.status_code == 401
 
@@ -85,13 +94,12 @@ async def test_verify_api_key_context_with_demo_key():
     mock_db = Mock(spec=Session)
 
     with patch("src.core.security_enhanced.APIKeyRepository") as MockRepo:
-        with patch("src.core.security_enhanced.cache_api_key_limits", new_callable=AsyncMock):
-            mock_repo = MockRepo.return_value
-            mock_repo.get_by_key.return_value = mock_demo_key
+        mock_repo = MockRepo.return_value
+        mock_repo.get_by_key.return_value = mock_demo_key
 
-            context = await verify_api_key_context(api_key=DEMO_API_KEY, db=mock_db)
-            assert context.api_key.key == DEMO_API_KEY
-            assert context.is_demo is True
+        context = await verify_api_key_context(api_key=DEMO_API_KEY, db=mock_db)
+        assert context.api_key.key == DEMO_API_KEY
+        assert context.is_demo is True
 
 
 @pytest.mark.asyncio()
@@ -101,6 +109,5 @@ async def test_verify_api_key_legacy_key():
     mock_db = Mock(spec=Session)
 
     with patch("src.core.security_enhanced.LEGACY_API_KEY", "test-legacy-key"):
-        with patch("src.core.security_enhanced.cache_api_key_limits", new_callable=AsyncMock):
-            result = await verify_api_key(api_key="test-legacy-key", db=mock_db)
-            assert result == "test-legacy-key"
+        result = await verify_api_key(await verify_api_key_context(api_key="test-legacy-key", db=mock_db))
+        assert result == "test-legacy-key"
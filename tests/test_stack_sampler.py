@@ -0,0 +1,69 @@
+"""Tests for on-demand job stack sampling"""
+
+import asyncio
+import threading
+
+import pytest
+
+from patient_generator.performance import FLOW_WORKER_THREAD_PREFIX
+from src.core import stack_sampler
+from src.core.stack_sampler import StackSampler, sample_job_stacks
+
+pytestmark = pytest.mark.unit
+
+
+def _spin(stop: threading.Event):
+    while not stop.is_set():
+        sum(range(100))
+
+
+@pytest.fixture()
+def flow_worker():
+    stop = threading.Event()
+    worker = threading.Thread(target=_spin, args=(stop,), name=f"{FLOW_WORKER_THREAD_PREFIX}_0", daemon=True)
+    idle = threading.Thread(target=stop.wait, name="asyncio_0", daemon=True)
+    worker.start()
+    idle.start()
+    yield
+    stop.set()
+    worker.join()
+    idle.join()
+
+
+def test_sampler_attributes_stacks_to_worker_roles(flow_worker):
+    """Busy pool threads are sampled with their role; idle threads and other threads are not"""
+    sampler = StackSampler()
+    for _ in range(5):
+        sampler.sample()
+
+    assert sampler.ticks == 5
+    assert sampler.counts
+    assert all(stack.startswith("flow-worker;threading:") for stack in sampler.counts)
+    assert any(stack.endswith(f"{__name__}:_spin") for stack in sampler.counts)
+    assert sampler.hot_frames(1)[0]["frame"] == f"{__name__}:_spin"
+
+    sampler.merge({"flow-worker;worker:simulate": 3})
+    assert sampler.counts["flow-worker;worker:simulate"] == 3
+
+
+@pytest.mark.asyncio()
+async def test_job_session_writes_collapsed_stacks(flow_worker, tmp_path):
+    """A session writes collapsed stacks under the job directory and stops when the job ends"""
+    polls = iter(range(1000))
+    result = await sample_job_stacks("job-1", tmp_path, 30, lambda: next(polls) < 5, interval=0.001)
+
+    lines = (tmp_path / "profiles").glob("*.collapsed")
+    content = next(lines).read_text().splitlines()
+    assert result["duration_seconds"] < 30
+    assert result["samples"] == sum(int(line.rsplit(" ", 1)[1]) for line in content)
+    assert result["collapsed_stacks_file"].startswith(str(tmp_path))
+
+    with pytest.raises(ValueError, match="Duration"):
+        await sample_job_stacks("job-1", tmp_path, 0, lambda: True)
+
+    assert stack_sampler._session_lock.acquire(blocking=False)
+    try:
+        with pytest.raises(RuntimeError, match="already running"):
+            await asyncio.wait_for(sample_job_stacks("job-1", tmp_path, 1, lambda: True), 5)
+    finally:
+        stack_sampler._session_lock.release()
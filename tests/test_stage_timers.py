@@ -0,0 +1,96 @@
+"""Tests for pipeline stage timers"""
+
+import pytest
+
+from patient_generator import performance
+from patient_generator.patient import Patient
+from patient_generator.performance import (
+    STAGE_TIME_BUCKETS,
+    PerformanceMonitor,
+    StageTimes,
+    configure_timers,
+    current_stage_times,
+    new_stage_times,
+    timer_settings,
+)
+from src.core.metrics import registry
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture()
+def restore_timer_settings():
+    settings = timer_settings()
+    yield
+    configure_timers(settings["mode"], settings["sample_every"])
+
+
+def test_stage_times_histogram_and_merge():
+    """Calls land in per-call buckets and merging adds totals and buckets"""
+    times = StageTimes()
+    times.add("flow", 0.002)
+    times.add("creation", 0.5, calls=100)  # 5 ms per patient
+    other = StageTimes()
+    other.add("flow", 20.0)
+
+    times.merge(other)
+    snapshot = times.snapshot()
+
+    assert snapshot["flow"]["seconds"] == pytest.approx(20.002)
+    assert snapshot["flow"]["calls"] == 2
+    assert snapshot["flow"]["buckets"][STAGE_TIME_BUCKETS.index(0.005)] == 1
+    assert snapshot["flow"]["buckets"][-1] == 1
+    assert snapshot["creation"]["buckets"][STAGE_TIME_BUCKETS.index(0.005)] == 100
+
+
+def test_sampled_timers_scale_to_every_call():
+    """With sampling, one call in N is timed and counted N times"""
+    times = StageTimes(sample_every=4)
+    for _ in range(8):
+        with times.time("to_dict"):
+            pass
+
+    assert times.snapshot()["to_dict"]["calls"] == 8
+
+
+def test_timer_modes_and_hot_paths(restore_timer_settings):
+    """'all' wraps hot paths for the current job only; leaving it restores the originals"""
+    original = Patient.__dict__["to_dict"]
+
+    configure_timers("off")
+    assert new_stage_times() is None
+
+    configure_timers("all", sample_every=1)
+    times = new_stage_times()
+    assert timer_settings()["hot_paths_installed"]
+    assert Patient.__dict__["to_dict"] is not original
+
+    Patient(1).to_dict()
+    assert times.snapshot() == {}
+    token = current_stage_times.set(times)
+    try:
+        Patient(2).to_dict()
+    finally:
+        current_stage_times.reset(token)
+    assert times.snapshot()["to_dict"]["calls"] == 1
+
+    configure_timers("stages")
+    assert Patient.__dict__["to_dict"] is original
+    assert not timer_settings()["hot_paths_installed"]
+
+    with pytest.raises(ValueError, match="Unknown timer mode"):
+        configure_timers("verbose")
+
+
+def test_monitor_totals_are_exported(monkeypatch):
+    """Finished job stage times reach the pipeline_stage_seconds histogram"""
+    monitor = PerformanceMonitor()
+    monkeypatch.setattr(performance, "_global_monitor", monitor)
+    times = StageTimes()
+    times.add("serialization", 0.003, calls=3)
+    monitor.record_stage_times(times)
+
+    labels = {"stage": "serialization"}
+    assert registry.get_sample_value("pipeline_stage_seconds_count", labels) == 3
+    assert registry.get_sample_value("pipeline_stage_seconds_sum", labels) == pytest.approx(0.003)
+    assert registry.get_sample_value("pipeline_stage_seconds_bucket", {**labels, "le": "0.001"}) == 3
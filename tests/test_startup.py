@@ -0,0 +1,51 @@
+"""Tests for the API startup profiler"""
+
+from pathlib import Path
+import subprocess
+import sys
+
+import pytest
+
+from src.core.startup import StartupProfiler
+
+
+def test_import_and_step_timings_are_reported():
+    """New imports and lifespan steps are timed; already-loaded modules are not"""
+    profiler = StartupProfiler()
+    assert profiler.report()["ready"] is False
+
+    profiler.import_module("json")
+    sys.modules.pop("colorsys", None)
+    module = profiler.import_module("colorsys")
+    assert module is sys.modules["colorsys"]
+
+    with profiler.step("cache"):
+        pass
+    msg = "boom"
+    with pytest.raises(RuntimeError, match=msg), profiler.step("demo_api_key"):
+        raise RuntimeError(msg)
+    profiler.mark_ready()
+
+    report = profiler.report()
+    assert report["ready"] is True
+    assert report["seconds_to_ready"] >= 0
+    assert set(report["imports_ms"]) == {"colorsys"}
+    assert set(report["steps_ms"]) == {"cache", "demo_api_key"}
+
+
+def test_api_import_does_not_load_simulation_stack():
+    """Importing the API app leaves the simulation stack and numpy unloaded"""
+    from src.domain.services.patient_generation_service import GENERATION_STACK_MODULES
+
+    heavy_modules = ["numpy", *GENERATION_STACK_MODULES]
+    script = f"import sys, src.main; print(sorted(m for m in {heavy_modules!r} if m in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=Path(__file__).parent.parent,
+        capture_output=True,
+        text=True,
+        timeout=120,
+        check=True,
+    )
+
+    assert result.stdout.strip().splitlines()[-1] == "[]"
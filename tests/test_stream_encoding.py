@@ -0,0 +1,63 @@
+"""Tests for the coalescing, compressing patient stream encoder"""
+
+import json
+import zlib
+
+import pytest
+
+from src.core.stream_encoding import encode_patient_stream, negotiate_content_encoding, supported_encodings
+
+
+async def _patients(count, fail_after=None):
+    for i in range(count):
+        if fail_after is not None and i == fail_after:
+            msg = "pipeline broke"
+            raise RuntimeError(msg)
+        yield {"id": i, "name": f"Patient {i}", "timeline": [{"event": "arrival", "facility": "Role1"}] * 20}
+
+
+async def _collect(stream):
+    return [chunk async for chunk in stream]
+
+
+@pytest.mark.asyncio()
+async def test_json_stream_is_compact_and_coalesced():
+    """Patients are written in large chunks and the document parses as before"""
+    chunks = await _collect(encode_patient_stream(_patients(2000), chunk_size=64 * 1024))
+    body = b"".join(chunks)
+
+    document = json.loads(body)
+    assert document["total_patients"] == 2000
+    assert [patient["id"] for patient in document["patients"]] == list(range(2000))
+    assert b"\n" not in body
+    assert all(len(chunk) >= 64 * 1024 for chunk in chunks[:-1])
+    assert len(chunks) == len(body) // (64 * 1024) + 1
+
+    # A patient cap keeps slow generations flowing
+    chunks = await _collect(encode_patient_stream(_patients(10), max_patients_per_chunk=4))
+    assert len(chunks) == 3
+
+
+@pytest.mark.asyncio()
+async def test_ndjson_gzip_stream_decodes_incrementally():
+    """Each compressed chunk can be decoded on arrival; failures end the stream with an error line"""
+    decompressor = zlib.decompressobj(31)
+    lines = []
+    async for chunk in encode_patient_stream(_patients(50, fail_after=30), "ndjson", "gzip", max_patients_per_chunk=10):
+        lines.extend(decompressor.decompress(chunk).splitlines())
+        if len(lines) == 10:
+            assert json.loads(lines[-1])["id"] == 9
+    assert decompressor.eof
+
+    records = [json.loads(line) for line in lines]
+    assert [record["id"] for record in records[:-1]] == list(range(30))
+    assert records[-1] == {"error": "Error during generation: pipeline broke", "patients_generated": 30}
+
+
+def test_content_encoding_negotiation():
+    """Quality values are honoured and unsupported encodings fall back to identity"""
+    assert negotiate_content_encoding(None) is None
+    assert negotiate_content_encoding("identity") is None
+    assert negotiate_content_encoding("gzip;q=0, deflate") is None
+    assert negotiate_content_encoding("deflate, gzip;q=0.5") == "gzip"
+    assert negotiate_content_encoding("*") == supported_encodings()[0]
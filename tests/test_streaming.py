@@ -244,56 +244,3 @@ class TestStreamingEndpoint:
                 assert "patients" in response_data
                 assert len(response_data["patients"]) == 3
                 assert response_data["total_patients"] == 3
-
-    @patch("src.api.v1.routers.streaming.verify_api_key")
-    @patch("src.api.v1.routers.streaming.Database")
-    @patch("src.api.v1.routers.streaming.gc")
-    def test_streaming_garbage_collection(self, mock_gc, mock_db_class, mock_verify, client, mock_config):
-        """Test that garbage collection is called during streaming."""
-        # Setup mocks
-        mock_verify.return_value = "test-user"
-
-        # Mock database
-        mock_db = MagicMock()
-        mock_db_class.get_instance.return_value = mock_db
-
-        # Mock repository
-        mock_repo = MagicMock()
-        mock_repo.get_configuration.return_value = mock_config
-
-        with patch("src.api.v1.routers.streaming.ConfigurationRepository", return_value=mock_repo):
-            # Mock generation service
-            with patch("src.api.v1.routers.streaming.get_patient_generation_service") as mock_gen_service:
-                # Create mock service
-                mock_service = AsyncMock()
-                mock_gen_service.return_value = mock_service
-
-                # Mock cached services
-                mock_service.cached_demographics = AsyncMock()
-                mock_service.cached_medical = AsyncMock()
-
-                # Mock pipeline generation (enough to trigger GC)
-                async def mock_generate(context):
-                    for i in range(150):  # More than batch_size
-                        mock_patient = MagicMock()
-                        patient_data = {"id": i + 1, "name": f"Patient {i + 1}"}
-                        yield mock_patient, patient_data
-
-                mock_pipeline = MagicMock()
-                mock_pipeline.generate = mock_generate
-                mock_service.pipeline = mock_pipeline
-                mock_service._initialize_pipeline = MagicMock()
-
-                # Make request with batch_size=100
-                response = client.get(
-                    "/api/v1/streaming/generate",
-                    params={"configuration_id": "test-config-123", "count": 150, "batch_size": 100},
-                    headers={"Authorization": "Bearer test-token"},
-                )
-
-                # Check response
-                assert response.status_code == 200
-
-                # Verify garbage collection was called
-                assert mock_gc.collect.called
-                assert mock_gc.collect.call_count >= 1  # Should be called at least once
@@ -0,0 +1,128 @@
+"""Tests for columnar casualty timeline generation"""
+
+from datetime import date, datetime, timedelta, timezone
+import os
+import random
+
+import numpy as np
+import pytest
+
+from patient_generator.temporal_generator import CasualtyEvent, CasualtyTimeline, TemporalPatternGenerator
+
+WARFARE_PATTERNS_PATH = os.path.join(os.path.dirname(__file__), "..", "patient_generator", "warfare_patterns.json")
+ALL_WARFARE = {
+    "conventional": True,
+    "artillery": True,
+    "urban": True,
+    "guerrilla": True,
+    "drone": True,
+    "naval": True,
+}
+
+
+@pytest.fixture()
+def generator():
+    random.seed(5)
+    np.random.seed(5)  # noqa: NPY002
+    return TemporalPatternGenerator(WARFARE_PATTERNS_PATH)
+
+
+def _generate(generator, total_patients=2000, days=8, environmental_conditions=None, special_events=None):
+    return generator.generate_timeline(
+        days=days,
+        total_patients=total_patients,
+        active_warfare_types=ALL_WARFARE,
+        intensity="high",
+        tempo="sustained",
+        environmental_conditions=environmental_conditions or {},
+        special_events=special_events or {},
+        base_date="2025-06-01",
+    )
+
+
+def test_timeline_is_sorted_and_exact(generator):
+    """Events are in time order, inside the scenario window, and sum to the requested count"""
+    timeline = _generate(generator, special_events={"mass_casualty": True, "major_offensive": True, "ambush": True})
+    assert isinstance(timeline, CasualtyTimeline)
+    assert timeline.total_patients == 2000
+    assert np.all(np.diff(timeline.offsets) >= 0)
+    assert timeline.offsets.min() >= 0
+    assert timeline.offsets.max() < 8 * 86400
+    assert set(timeline.warfare_types.tolist()) <= set(ALL_WARFARE) | {"mixed"}
+
+
+def test_events_are_built_lazily_with_unique_ids(generator):
+    """Indexing and iteration yield CasualtyEvent objects with derived, unique IDs"""
+    timeline = _generate(generator, environmental_conditions={"fog": True})
+    events = list(timeline)
+    assert len(events) == len(timeline)
+    assert all(isinstance(event, CasualtyEvent) for event in events)
+    assert len({event.event_id for event in events}) == len(events)
+    assert timeline.base_datetime.date() == date(2025, 6, 1)
+    assert events[0].timestamp == timeline.base_datetime + timedelta(seconds=int(timeline.offsets[0]))
+    assert events[-1].event_id == timeline[-1].event_id
+    assert events[0].environmental_factors == ["fog"]
+    assert [event.event_id for event in timeline[:3]] == [event.event_id for event in events[:3]]
+
+    for event in events:
+        prefix = "MC_" if event.is_mass_casualty else "IND_"
+        assert event.event_id.startswith("SE_" if event.special_event_type else prefix)
+
+
+def test_from_events_round_trips():
+    """Existing event lists convert to columns without losing data"""
+    base = datetime(2025, 6, 1, 6, 0, tzinfo=timezone.utc)
+    events = [
+        CasualtyEvent(base, 3, "urban", False, "evt-a", ["rain"]),
+        CasualtyEvent(base + timedelta(minutes=90), 12, "mixed", True, "evt-b", [], "ambush"),
+    ]
+    timeline = CasualtyTimeline.from_events(events)
+    assert list(timeline) == events
+    assert CasualtyTimeline.from_events(timeline) is timeline
+    assert timeline.patient_counts.tolist() == [3, 12]
+    with pytest.raises(IndexError, match="out of range"):
+        timeline[2]
+
+
+def test_hourly_counts_sum_exactly(generator):
+    """Every temporal pattern allocates exactly the requested casualties across 24 hours"""
+    for warfare_type in ALL_WARFARE:
+        counts = generator._generate_hourly_counts(warfare_type, 997, day=0)
+        assert counts.shape == (24,)
+        assert counts.sum() == 997
+        assert counts.min() >= 0
+
+
+def test_event_synthesis_preserves_cell_totals(generator):
+    """Mass casualty and small-group events add up to each cell's hourly count"""
+    hourly = np.zeros((2, 24), dtype=np.int64)
+    hourly[0, 3] = 40
+    hourly[1, 10] = 7
+    offsets, counts, warfare, mass = generator._synthesize_events(
+        np.array([0, 2]), np.array([0, 1]), hourly, ["artillery", "conventional"], {}
+    )
+    assert counts.sum() == 47
+    day0 = (offsets >= 3 * 3600) & (offsets < 4 * 3600)
+    day2 = (offsets >= 2 * 86400 + 10 * 3600) & (offsets < 2 * 86400 + 11 * 3600)
+    assert counts[day0].sum() == 40
+    assert counts[day2].sum() == 7
+    assert set(warfare[day0].tolist()) == {0}
+    assert counts[~mass].max() <= 3
+    assert mass.sum() <= 2
+
+
+def test_events_get_their_own_condition_lists(generator):
+    """Changing one event's conditions leaves the other events alone"""
+    timeline = _generate(generator, environmental_conditions={"fog": True})
+    first, second = timeline[0], timeline[1]
+    first.environmental_factors.append("rain")
+    assert second.environmental_factors == ["fog"]
+    assert timeline[0].environmental_factors == ["fog"]
+
+
+def test_empty_timeline():
+    """An empty event list gives an empty timeline with no timestamps"""
+    timeline = CasualtyTimeline.from_events([])
+    assert len(timeline) == 0
+    assert timeline.total_patients == 0
+    assert len(timeline.timestamps) == 0
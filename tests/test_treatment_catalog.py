@@ -0,0 +1,86 @@
+"""Tests for the interned treatment catalog and the bitmask paths built on it"""
+
+from medical_simulation.patient_flow_orchestrator import PatientFlowOrchestrator
+from medical_simulation.treatment_modifiers import TreatmentModifiers
+from medical_simulation.treatment_protocols import FacilityLevel, TreatmentProtocolManager
+from patient_generator.treatment_catalog import TreatmentCatalog, get_treatment_catalog
+from patient_generator.treatment_utility_model import TreatmentUtilityModel
+
+
+def test_interning_is_stable():
+    """Names get one ID each and masks round-trip in ID order"""
+    catalog = TreatmentCatalog()
+    assert catalog.intern("tourniquet") == 0
+    assert catalog.intern("iv_fluids") == 1
+    assert catalog.intern("tourniquet") == 0
+    assert catalog.id_of("morphine") is None
+    assert "morphine" not in catalog
+
+    mask = catalog.mask_of(["iv_fluids", "tourniquet"])
+    assert mask == 0b11
+    assert catalog.names_of(mask) == ["tourniquet", "iv_fluids"]
+    assert catalog.applied_mask([{"name": "iv_fluids"}, {"treatment": "morphine"}, "ignored"]) == 0b110
+    assert len(catalog) == 3
+
+
+def test_catalog_is_shared():
+    """Modifiers, protocols and the utility model use the same IDs"""
+    assert TreatmentModifiers().catalog is get_treatment_catalog()
+    assert TreatmentProtocolManager().catalog is get_treatment_catalog()
+    assert TreatmentUtilityModel().catalog is get_treatment_catalog()
+
+
+def test_best_deterioration_modifier_matches_lookup():
+    """Bitmask lookup picks the lowest modifier among applied treatments"""
+    tm = TreatmentModifiers()
+    applied = tm.catalog.mask_of(["morphine", "tourniquet", "unknown_treatment"])
+    assert tm.best_deterioration_modifier(applied) == tm.treatments["tourniquet"]["deterioration_modifier"]
+    assert tm.best_deterioration_modifier(tm.catalog.mask_of(["unknown_treatment"])) == 1.0
+    assert tm.best_deterioration_modifier(0) == 1.0
+
+
+def test_orchestrator_tracks_applied_mask():
+    """Applying treatments records them in the patient's bitmask"""
+    orchestrator = PatientFlowOrchestrator(enable_diagnostic_uncertainty=False)
+    patient = orchestrator.initialize_patient("p1", "Battle Injury", "Severe")
+    orchestrator.apply_treatment(patient.id, [{"name": "tourniquet"}, {"name": "iv_fluids"}])
+
+    catalog = get_treatment_catalog()
+    assert patient.applied_treatment_mask == catalog.mask_of(["tourniquet", "iv_fluids"])
+
+
+def test_contraindications_filtered_by_mask():
+    """Contraindicated treatments are removed and cached selections are copies"""
+    manager = TreatmentProtocolManager()
+    burns = manager.get_appropriate_treatments("7200002", FacilityLevel.POI, severity="severe")
+    assert "tourniquet" not in burns
+
+    burns.append("mutated")
+    assert "mutated" not in manager.get_appropriate_treatments("7200002", FacilityLevel.POI, severity="severe")
+
+
+def test_read_paths_do_not_intern():
+    """Lookups for unknown names answer 0 without growing the catalog"""
+    catalog = get_treatment_catalog()
+    size = len(catalog)
+    manager = TreatmentProtocolManager()
+
+    assert catalog.bit_of("never_seen_treatment") == 0
+    assert catalog.known_mask_of(["never_seen_treatment", "tourniquet"]) == catalog.bit_of("tourniquet")
+    assert manager.validate_treatment_combination(["never_seen_treatment"], "7200002")
+    assert not manager.validate_treatment_combination(["tourniquet", "never_seen_treatment"], "7200002")
+    assert "never_seen_treatment" not in catalog
+    assert len(catalog) == size
+
+
+def test_selection_cache_is_shared_between_managers():
+    """A selection computed by one manager is reused by the next one"""
+    first, second = TreatmentProtocolManager(), TreatmentProtocolManager()
+    selection = first.get_appropriate_treatments("7200002", FacilityLevel.POI, severity="severe")
+
+    def fail(*args, **kwargs):
+        msg = "selection was recomputed"
+        raise AssertionError(msg)
+
+    second._select_treatments = fail
+    assert second.get_appropriate_treatments("7200002", FacilityLevel.POI, severity="severe") == selection
@@ -0,0 +1,112 @@
+"""Tests for cached utility rows and vectorized treatment selection"""
+
+import json
+import time
+
+import numpy as np
+import pytest
+
+from patient_generator.treatment_utility_model import TreatmentUtilityModel
+
+WAR_INJURY = "125670008"
+
+
+def test_cached_rows_match_calculate_utility():
+    """Row utilities equal the scalar utility function at any elapsed time"""
+    model = TreatmentUtilityModel()
+    resources = {"supplies": 100}
+    row = model._get_utility_row(WAR_INJURY, "Severe", "POI", resources)
+    assert row is model.utility_rows[(WAR_INJURY, "Severe", "POI", 100)]
+
+    for minutes in (0, 45, 150):
+        utilities = model._row_utilities(row, minutes)
+        expected = [model.calculate_utility(t, WAR_INJURY, "Severe", "POI", minutes, resources) for t in row.names]
+        assert utilities == pytest.approx(expected)
+
+
+def test_select_treatments_returns_ranked_candidates():
+    """Selections come from the protocol row and are sorted by utility"""
+    model = TreatmentUtilityModel()
+    np.random.seed(1)  # noqa: NPY002
+    selected = model.select_treatments(WAR_INJURY, "Severe", "POI", time_elapsed_minutes=10)
+
+    names = [t["name"] for t in selected]
+    assert len(names) == len(set(names)) == 3
+    assert set(names) <= set(model._get_utility_row(WAR_INJURY, "Severe", "POI", {"supplies": 100}).names)
+    scores = [t["utility_score"] for t in selected]
+    assert scores == sorted(scores, reverse=True)
+    assert all(t["facility"] == "POI" for t in selected)
+
+
+def test_batch_selection_matches_single_patient_shape():
+    """Batch selection returns per-patient results in input order"""
+    model = TreatmentUtilityModel()
+    codes = [WAR_INJURY, "unknown-code", WAR_INJURY]
+    severities = ["Severe", "Moderate", "Mild"]
+    results = model.select_treatments_batch(codes, severities, "Role1", time_elapsed_minutes=[0, 30, 600])
+
+    assert len(results) == 3
+    for selected in results:
+        assert 1 <= len(selected) <= 3
+        scores = [t["utility_score"] for t in selected]
+        assert scores == sorted(scores, reverse=True)
+
+    with pytest.raises(ValueError, match="same length"):
+        model.select_treatments_batch(codes, severities[:1], "Role1")
+
+
+def test_batch_sampling_follows_softmax():
+    """Gumbel top-1 frequencies match the softmax probabilities"""
+    model = TreatmentUtilityModel()
+    np.random.seed(0)  # noqa: NPY002
+    row = model._get_utility_row(WAR_INJURY, "Severe", "POI", {"supplies": 100})
+    utilities = model._row_utilities(row, 0)
+    probabilities = np.exp(utilities / model.TEMPERATURE)
+    probabilities /= probabilities.sum()
+
+    n = 4000
+    results = model.select_treatments_batch([WAR_INJURY] * n, ["Severe"] * n, "POI", max_treatments=1)
+    counts = dict.fromkeys(row.names, 0)
+    for selected in results:
+        counts[selected[0]["name"]] += 1
+
+    for name, probability in zip(row.names, probabilities):
+        assert counts[name] / n == pytest.approx(probability, abs=0.03)
+
+
+def test_single_and_batch_selection_agree_for_same_seed():
+    """A one-patient batch draws exactly what select_treatments draws"""
+    model = TreatmentUtilityModel()
+    np.random.seed(11)  # noqa: NPY002
+    single = model.select_treatments(WAR_INJURY, "Moderate", "Role1", time_elapsed_minutes=20)
+    np.random.seed(11)  # noqa: NPY002
+    batch = model.select_treatments_batch([WAR_INJURY], ["Moderate"], "Role1", time_elapsed_minutes=[20])
+
+    assert [t["name"] for t in single] == [t["name"] for t in batch[0]]
+
+
+def test_utility_rows_are_built_once_and_shared():
+    """Per-patient models reuse the rows of the first model for the same protocols"""
+    first = TreatmentUtilityModel()
+    start = time.perf_counter()
+    models = [TreatmentUtilityModel() for _ in range(200)]
+    elapsed = time.perf_counter() - start
+
+    assert all(model.utility_rows is first.utility_rows for model in models)
+    assert all(model.contraindication_masks is first.contraindication_masks for model in models)
+    assert elapsed < 0.5
+
+
+def test_utility_rows_follow_protocol_changes(tmp_path):
+    """A changed protocols file gets its own rows instead of the cached ones"""
+    protocols_file = tmp_path / "treatment_protocols.json"
+    protocols = json.loads(TreatmentUtilityModel().config_path.read_text())
+    protocols_file.write_text(json.dumps(protocols))
+    before = TreatmentUtilityModel(protocols_file)
+
+    protocols["facility_capabilities"]["POI"]["available_treatments"] = ["tourniquet"]
+    protocols_file.write_text(json.dumps(protocols))
+    after = TreatmentUtilityModel(protocols_file)
+
+    assert after.utility_rows is not before.utility_rows
+    assert after.facility_capabilities["POI"] == ["tourniquet"]